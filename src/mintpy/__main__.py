@@ -81,6 +81,13 @@ def get_asc_desc2horz_vert_parser(subparsers=None):
     return parser
 
 
+def get_benchmark_compression_parser(subparsers=None):
+    from mintpy.cli import benchmark_compression
+    parser = benchmark_compression.create_parser(subparsers)
+    parser.set_defaults(func=benchmark_compression.main)
+    return parser
+
+
 def get_closure_phase_bias_parser(subparsers=None):
     from mintpy.cli import closure_phase_bias
     parser = closure_phase_bias.create_parser(subparsers)
@@ -88,6 +95,13 @@ def get_closure_phase_bias_parser(subparsers=None):
     return parser
 
 
+def get_correct_timeseries_parser(subparsers=None):
+    from mintpy.cli import correct_timeseries
+    parser = correct_timeseries.create_parser(subparsers)
+    parser.set_defaults(func=correct_timeseries.main)
+    return parser
+
+
 def get_dem_error_parser(subparsers=None):
     from mintpy.cli import dem_error
     parser = dem_error.create_parser(subparsers)
@@ -173,6 +187,13 @@ def get_mask_parser(subparsers=None):
     return parser
 
 
+def get_materialize_parser(subparsers=None):
+    from mintpy.cli import materialize
+    parser = materialize.create_parser(subparsers)
+    parser.set_defaults(func=materialize.main)
+    return parser
+
+
 def get_multilook_parser(subparsers=None):
     from mintpy.cli import multilook
     parser = multilook.create_parser(subparsers)
@@ -329,6 +350,13 @@ def get_reference_point_parser(subparsers=None):
     return parser
 
 
+def get_rechunk_hdf5_parser(subparsers=None):
+    from mintpy.cli import rechunk_hdf5
+    parser = rechunk_hdf5.create_parser(subparsers)
+    parser.set_defaults(func=rechunk_hdf5.main)
+    return parser
+
+
 def get_remove_hdf5_dset(subparsers=None):
     from mintpy.cli import remove_hdf5_dset
     parser = remove_hdf5_dset.create_parser(subparsers)
@@ -613,6 +641,7 @@ def get_parser():
 
     # noise reduction / error correction
     get_closure_phase_bias_parser(sp)
+    get_correct_timeseries_parser(sp)
     get_dem_error_parser(sp)
     get_iono_split_spectrum_parser(sp)
     get_iono_tec_parser(sp)
@@ -648,8 +677,11 @@ def get_parser():
     get_prep_snap_parser(sp)
 
     # I/O
+    get_benchmark_compression_parser(sp)
     get_load_data_parser(sp)
     get_load_gbis_parser(sp)
+    get_materialize_parser(sp)
+    get_rechunk_hdf5_parser(sp)
     get_remove_hdf5_dset(sp)
     get_save_gbis_parser(sp)
     get_save_gdal_parser(sp)
@@ -0,0 +1,143 @@
+############################################################
+# Program is part of MintPy                                #
+# Copyright (c) 2013, Zhang Yunjun, Heresh Fattahi         #
+# Author: MintPy Developers, Oct 2026                      #
+############################################################
+
+
+import os
+import shutil
+import tempfile
+import time
+
+import h5py
+import numpy as np
+
+from mintpy.utils import writefile
+
+
+######################################## Sub Functions ############################################
+def read_sample(fname, dsName=None, sample_size=256, print_msg=True):
+    """Read a sample of the dataset, in the center of the image with all epochs.
+
+    Parameters: fname       - str, path of the HDF5 file
+                dsName      - str, name of the 2D / 3D dataset, None for the 1st one
+                sample_size - float, max size of the sample in MB
+    Returns:    data        - 2D / 3D np.ndarray, sample data
+                chunks      - tuple of int, chunk shape of the dataset, clipped to the sample size
+                dsName      - str, name of the sampled dataset
+    """
+    with h5py.File(fname, 'r') as f:
+        if not dsName:
+            dsName = [i for i in f.keys() if isinstance(f[i], h5py.Dataset) and f[i].ndim >= 2][0]
+        ds = f[dsName]
+        shape = ds.shape
+
+        # box in the center with the same aspect ratio
+        num_pixel = sample_size * 1024**2 / (ds.dtype.itemsize * np.prod(shape[:-2], dtype=np.int64))
+        ratio = min(np.sqrt(num_pixel / (shape[-2] * shape[-1])), 1)
+        length = max(int(shape[-2] * ratio), 1)
+        width = max(int(shape[-1] * ratio), 1)
+        y0 = (shape[-2] - length) // 2
+        x0 = (shape[-1] - width) // 2
+        if print_msg:
+            print(f'read sample of /{dsName} in {length} x {width} pixels '
+                  f'from y/x = {y0}/{x0} in file: {fname}')
+        data = ds[..., y0:y0+length, x0:x0+width]
+
+        # chunk shape
+        chunks = ds.chunks
+        if chunks:
+            chunks = tuple(min(c, s) for c, s in zip(chunks, data.shape))
+        else:
+            chunks = True
+    return data, chunks, dsName
+
+
+def benchmark_compression(data, compression, chunks=True, out_dir=None, dsName='data'):
+    """Write and read data in an HDF5 file with the given compression.
+
+    Parameters: data        - 2D / 3D np.ndarray
+                compression - str, compression type, e.g. None, lzf, gzip, zstd, blosc2
+                chunks      - tuple of int or True, chunk shape
+                out_dir     - str, directory of the temporary file
+    Returns:    result      - dict, write / read throughput in MB/s, compression ratio
+    """
+    raw_size = data.nbytes / 1024**2
+    fname = os.path.join(out_dir, f'benchmark_{compression}.h5')
+
+    # write
+    kwargs = writefile.get_hdf5_compression_kwargs(compression)
+    t0 = time.time()
+    with h5py.File(fname, 'w') as f:
+        f.create_dataset(dsName, data=data, chunks=chunks, **kwargs)
+    write_time = time.time() - t0
+
+    # read
+    t0 = time.time()
+    with h5py.File(fname, 'r') as f:
+        ds = f[dsName]
+        data_read = ds[:]
+        storage_size = ds.id.get_storage_size() / 1024**2
+    read_time = time.time() - t0
+
+    if not np.array_equal(data, data_read, equal_nan=np.issubdtype(data.dtype, np.floating)):
+        raise ValueError(f'data read is different from data written with compression={compression}!')
+    os.remove(fname)
+
+    result = dict(
+        compression=str(compression),
+        write_speed=raw_size / max(write_time, 1e-6),
+        read_speed=raw_size / max(read_time, 1e-6),
+        ratio=raw_size / max(storage_size, 1e-6),
+        disk_usage=storage_size / raw_size * 100,
+    )
+    return result
+
+
+def print_results(results, out_file=None):
+    """Print out benchmark results as a table, and save it to a text file."""
+    header = '{:<12}{:>16}{:>16}{:>10}{:>18}'.format(
+        'compression', 'write [MB/s]', 'read [MB/s]', 'ratio', 'disk usage [%]')
+    lines = [header, '-' * len(header)]
+    for result in results:
+        lines.append('{:<12}{:>16.1f}{:>16.1f}{:>10.2f}{:>18.1f}'.format(
+            result['compression'], result['write_speed'], result['read_speed'],
+            result['ratio'], result['disk_usage']))
+    msg = '\n'.join(lines)
+    print(msg)
+
+    if out_file:
+        with open(out_file, 'w') as f:
+            f.write(msg + '\n')
+        print(f'save benchmark results to file: {out_file}')
+    return msg
+
+
+######################################## Main Function ############################################
+def run_benchmark_compression(inps):
+    """Benchmark the HDF5 compression types on a sample of the input file."""
+    data, chunks, dsName = read_sample(inps.file, inps.dsName, sample_size=inps.sampleSize)
+    print(f'sample size: {data.nbytes / 1024**2:.1f} MB in {data.dtype} with chunks of {chunks}')
+
+    # temporary directory, to be removed after benchmarking
+    out_dir = tempfile.mkdtemp(prefix='benchmark_compression_',
+                               dir=inps.tmpDir if inps.tmpDir else os.path.dirname(os.path.abspath(inps.file)))
+
+    results = []
+    try:
+        for compression in inps.compression:
+            compression = None if compression in ['None', 'no'] else compression
+            print(f'benchmark compression = {compression} ...')
+            try:
+                results.append(benchmark_compression(data, compression, chunks=chunks,
+                                                     out_dir=out_dir, dsName=dsName))
+            except ImportError as e:
+                print(f'WARNING: skip compression = {compression}: {e}')
+    finally:
+        shutil.rmtree(out_dir)
+
+    print('-'*50)
+    print('read throughput is for the decompression mostly, as the file is in the OS page cache.')
+    print_results(results, out_file=inps.outfile)
+    return results
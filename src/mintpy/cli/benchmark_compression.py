@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+############################################################
+# Program is part of MintPy                                #
+# Copyright (c) 2013, Zhang Yunjun, Heresh Fattahi         #
+# Author: MintPy Developers, Oct 2026                      #
+############################################################
+
+
+import os
+import sys
+
+from mintpy.utils.arg_utils import create_argument_parser
+
+###########################################################################################
+EXAMPLE = """Example:
+  benchmark_compression.py  inputs/ifgramStack.h5
+  benchmark_compression.py  inputs/ifgramStack.h5  -d unwrapPhase  --sample-size 512
+  benchmark_compression.py  timeseries.h5  -c lzf zstd blosc2  -o compression.txt
+"""
+
+NOTE = """
+  Write and read a sample (in the center of the image with all epochs) of the input dataset
+  with each compression type in the same chunk shape, and report the write / read throughput
+  and the compression ratio, to help choose mintpy.load.compression.
+  zstd and blosc2 require the hdf5plugin package, they are skipped if it is not installed.
+  The sample file is read right after writing, thus, the read throughput measures the
+  decompression speed mostly, with the file in the OS page cache.
+"""
+
+
+def create_parser(subparsers=None):
+    synopsis = 'Benchmark the HDF5 compression types on a sample of the input file'
+    epilog = EXAMPLE
+    name = __name__.split('.')[-1]
+    parser = create_argument_parser(
+        name, synopsis=synopsis, description=synopsis+NOTE, epilog=epilog, subparsers=subparsers)
+
+    parser.add_argument('file', type=str, help='HDF5 file of interest')
+    parser.add_argument('-d', '--dset', dest='dsName', type=str,
+                        help='2D / 3D dataset to sample (default: the 1st one).')
+    parser.add_argument('-c', '--compression', dest='compression', type=str, nargs='+',
+                        default=['None', 'lzf', 'gzip', 'zstd', 'blosc2'],
+                        choices=['None', 'lzf', 'gzip', 'zstd', 'blosc2'],
+                        help='compression types to benchmark (default: %(default)s).')
+    parser.add_argument('--sample-size', dest='sampleSize', type=float, default=256,
+                        help='max size of the sample in MB (default: %(default)s).')
+    parser.add_argument('--tmp-dir', dest='tmpDir', type=str,
+                        help='directory for the temporary files (default: the directory of the input file).')
+    parser.add_argument('-o', '--output', dest='outfile', type=str,
+                        help='output text file to save the benchmark results.')
+
+    return parser
+
+
+def cmd_line_parse(iargs=None):
+    # parse
+    parser = create_parser()
+    inps = parser.parse_args(args=iargs)
+
+    # check: input file extension
+    if os.path.splitext(inps.file)[1] not in ['.h5', '.he5']:
+        raise ValueError(f'input file is NOT HDF5: {inps.file}')
+
+    return inps
+
+
+###########################################################################################
+def main(iargs=None):
+    # parse
+    inps = cmd_line_parse(iargs)
+
+    # import
+    from mintpy.benchmark_compression import run_benchmark_compression
+
+    # run
+    run_benchmark_compression(inps)
+    print('Done.')
+
+
+###########################################################################################
+if __name__ == '__main__':
+    main(sys.argv[1:])
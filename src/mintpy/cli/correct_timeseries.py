@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+############################################################
+# Program is part of MintPy                                #
+# Copyright (c) 2013, Zhang Yunjun, Heresh Fattahi         #
+# Author: MintPy Developers, Oct 2026                      #
+############################################################
+
+
+import os
+import sys
+
+from mintpy.utils.arg_utils import add_memory_argument, create_argument_parser
+
+# duplicated in mintpy.correct_timeseries
+STEP_LIST = [
+    'correct_LOD',
+    'correct_SET',
+    'correct_ionosphere',
+    'correct_troposphere',
+    'deramp',
+    'correct_topography',
+]
+
+###########################################################################################
+EXAMPLE = """example:
+  correct_timeseries.py -t smallbaselineApp.cfg
+  correct_timeseries.py -t smallbaselineApp.cfg --step correct_SET correct_troposphere deramp
+  correct_timeseries.py -t smallbaselineApp.cfg --save-step correct_troposphere --update
+"""
+
+NOTE = """
+  The phase correction steps of smallbaselineApp.py, as configured in the template file, are applied
+  to the time-series box by box in memory, in a single read/write pass (plus one read-only pass for
+  deramp to estimate the ramps), instead of writing one full time-series file per step. Only the
+  final corrected time-series file, demErr.h5 and timeseriesResidual.h5 (for correct_topography)
+  are written, plus the intermediate time-series files of the steps given in --save-step.
+  The output files are named the same as smallbaselineApp.py, e.g. timeseries_SET_ERA5_ramp_demErr.h5.
+
+  Supported corrections: LOD, SET, troposphere (GACOS / ERA5 via PyAPS), deramp and topography.
+  The ionospheric correction and the tropospheric correction from the height correlation or the
+  legacy PyAPS models (MERRA / NARR) are NOT supported, run them separately.
+"""
+
+
+def create_parser(subparsers=None):
+    synopsis = 'Apply the phase corrections to the time-series in a single pass'
+    epilog = EXAMPLE
+    name = __name__.split('.')[-1]
+    parser = create_argument_parser(
+        name, synopsis=synopsis, description=synopsis+NOTE, epilog=epilog, subparsers=subparsers)
+
+    parser.add_argument('-t', '--template', dest='template_file', required=True,
+                        help='template file with the correction options, e.g. smallbaselineApp.cfg')
+    parser.add_argument('-g', '--geometry', dest='geom_file',
+                        help='geometry file (default: the loaded one in the working directory).')
+    parser.add_argument('--dir', '--work-dir', dest='work_dir', default='./',
+                        help='working directory of smallbaselineApp.py (default: %(default)s).')
+    parser.add_argument('--step', dest='step_names', nargs='+', metavar='STEP', default=STEP_LIST,
+                        choices=STEP_LIST,
+                        help='correction steps to apply (default: all the enabled ones).\n'
+                             f'{STEP_LIST}')
+    parser.add_argument('--save-step', dest='save_steps', nargs='*', metavar='STEP', choices=STEP_LIST,
+                        help='save the intermediate time-series files of these steps\n'
+                             '(default: mintpy.compute.fusedCorrection.saveStep in the template file).')
+    parser.add_argument('--update', dest='update_mode', action='store_true',
+                        help='Enable update mode, and skip the correction if:\n'
+                             '1) output files already exist, readable and newer than input files\n'
+                             '2) all configuration parameters are the same.')
+    parser = add_memory_argument(parser)
+
+    return parser
+
+
+def cmd_line_parse(iargs=None):
+    # parse
+    parser = create_parser()
+    inps = parser.parse_args(args=iargs)
+
+    # import
+    from mintpy.utils import readfile, utils as ut
+
+    # check: existence of the template file
+    if not os.path.isfile(inps.template_file):
+        raise FileNotFoundError(f'template file not exist: {inps.template_file}')
+    inps.work_dir = os.path.abspath(inps.work_dir)
+
+    # default: --geometry option
+    if not inps.geom_file:
+        inps.geom_file = ut.check_loaded_dataset(inps.work_dir, print_msg=False)[1]
+
+    # read: --save-step and --ram options from the template file
+    template = readfile.read_template(inps.template_file)
+    template = ut.check_template_auto_value(template)
+    if inps.save_steps is None:
+        value = template.get('mintpy.compute.fusedCorrection.saveStep', False)
+        inps.save_steps = [i.strip() for i in value.split(',')] if value else []
+    if template.get('mintpy.compute.maxMemory', False):
+        inps.maxMemory = float(template['mintpy.compute.maxMemory'])
+
+    return inps
+
+
+###########################################################################################
+def main(iargs=None):
+    # parse
+    inps = cmd_line_parse(iargs)
+
+    # import
+    from mintpy.correct_timeseries import correct_timeseries
+
+    # run
+    correct_timeseries(inps)
+
+
+###########################################################################################
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -17,6 +17,7 @@ EXAMPLE = """example:
   diff.py  velocity.h5    velocity_demErr.h5
   diff.py  timeseries.h5  inputs/ERA5.h5  -o timeseries_ERA5.h5
   diff.py  timeseries.h5  inputs/ERA5.h5  -o timeseries_ERA5.h5  --force
+  diff.py  timeseries.h5  inputs/ERA5.h5  -o timeseries_ERA5.h5  --lazy    #correction stack, run materialize.py to write data
   diff.py  timeseries_ERA5_ramp_demErr.h5  ../GIANT/Stack/LS-PARAMS.h5 -o mintpy_giant.h5
   diff.py  reconUnwrapIfgram.h5  ./inputs/ifgramStack.h5  -o diffUnwrapIfgram.h5
 
@@ -42,6 +43,10 @@ def create_parser(subparsers=None):
                         help='output file name, default is file1_diff_file2.h5')
     parser.add_argument('--force','--force-diff', dest='force_diff', action='store_true',
                         help='Enforce the differencing for the shared dates only for time-series files')
+    parser.add_argument('--lazy', dest='lazy', action='store_true',
+                        help='Write a correction stack file for time-series files, without writing the data.\n'
+                             'The data is composed as file1 - file2 on the fly while reading.\n'
+                             'Use materialize.py to write the data to disk.')
     return parser
 
 
@@ -88,6 +93,7 @@ def main(iargs=None):
         file2=inps.file2,
         out_file=inps.out_file,
         force_diff=inps.force_diff,
+        lazy=inps.lazy,
     )
 
 
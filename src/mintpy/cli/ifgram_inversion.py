@@ -44,6 +44,7 @@ EXAMPLE = """example:
   ifgram_inversion.py inputs/ifgramStack.h5 -t smallbaselineApp.cfg --update
   ifgram_inversion.py inputs/ifgramStack.h5 -w no  # turn off weight for fast processing
   ifgram_inversion.py inputs/ifgramStack.h5 -c no  # turn off parallel processing
+  ifgram_inversion.py inputs/ifgramStack.h5 --incremental --update  # update with the newly added pairs only
   # offset
   ifgram_inversion.py inputs/ifgramStack.h5 -i rangeOffset   -w no -m waterMask.h5 --md offsetSNR --mt 5
   ifgram_inversion.py inputs/ifgramStack.h5 -i azimuthOffset -w no -m waterMask.h5 --md offsetSNR --mt 5
@@ -86,6 +87,9 @@ def create_parser(subparsers=None):
     solver.add_argument('--min-norm-phase', dest='minNormVelocity', action='store_false',
                         help=('Enable inversion with minimum-norm deformation phase,'
                               ' instead of the default minimum-norm deformation velocity.'))
+    solver.add_argument('--weight-cache', dest='weightCache', action='store_true',
+                        help='Cache the weight of all interferograms in the *Weight.h5 file next to the stack file,\n' +
+                             'to skip the coherence to weight conversion in the re-runs.')
     #solver.add_argument('--norm', dest='residualNorm', default='L2', choices=['L1', 'L2'],
     #                    help='Optimization method, L1 or L2 norm. (default: %(default)s).')
 
@@ -109,13 +113,21 @@ def create_parser(subparsers=None):
     #                  help='minimum area size to disable/ignore the threshold-based masking [for offset only]')
 
     # computing
-    parser = arg_utils.add_memory_argument(parser)
+    parser = arg_utils.add_memory_argument(parser, plan=True)
     parser = arg_utils.add_parallel_argument(parser)
 
     # update / skip
     parser.add_argument('--update', dest='update_mode', action='store_true',
                         help='Enable update mode, and skip inversion if output timeseries file already exists,\n' +
-                        'readable and newer than input interferograms file')
+                        'readable and newer than input interferograms file;\n' +
+                        'or resume from the last finished patch if the previous run was interrupted.')
+    parser.add_argument('--incremental', dest='incremental', action='store_true',
+                        help='Enable incremental mode, to update the inversion state of the previous run\n' +
+                        'with the newly added interferograms only, saved in the *InvState.h5 file\n' +
+                        'next to the output time-series file (not for --calc-cov).\n' +
+                        'The state file stores the weight of each pair (4 bytes per pair per pixel) and\n' +
+                        'the residual statistics, thus, only the new pairs are read. The temporal coherence\n' +
+                        'of the previous pairs is updated to the new solution in the 2nd order approximation.')
 
     return parser
 
@@ -229,7 +241,7 @@ def read_template2inps(template_file, inps):
 
     for key in key_list:
         value = template[key_prefix+key]
-        if key in ['weightFunc', 'maskDataset', 'minNormVelocity']:
+        if key in ['weightFunc', 'maskDataset', 'minNormVelocity', 'incremental', 'weightCache']:
             iDict[key] = value
         elif value:
             if key in ['maskThreshold', 'minRedundancy']:
@@ -242,7 +254,7 @@ def read_template2inps(template_file, inps):
     key_list = [x for x in list(iDict.keys()) if dask_key_prefix+x in template.keys()]
     for key in key_list:
         value = template[dask_key_prefix+key]
-        if key in ['cluster', 'config']:
+        if key in ['cluster', 'config', 'memoryPlan']:
             iDict[key] = value
         elif value:
             if key in ['numWorker']:
@@ -75,8 +75,14 @@ def create_parser(subparsers=None):
                         help='project name of dataset for INSARMAPS Web Viewer')
     parser.add_argument('--enforce', '-f', dest='updateMode', action='store_false',
                         help='Disable the update mode, or skip checking dataset already loaded.')
-    parser.add_argument('--compression', choices={'gzip', 'lzf', None}, default=None,
-                        help='compress loaded geometry while writing HDF5 file, default: None.')
+    parser.add_argument('--compression', choices={'gzip', 'lzf', 'zstd', 'blosc2', None}, default=None,
+                        help='compress loaded geometry while writing HDF5 file, default: None.\n'
+                             'zstd and blosc2 require the hdf5plugin package.')
+    parser.add_argument('--chunk-shape', dest='chunkShape', choices=['auto', 'time-major', 'image-major'],
+                        default=None, help='chunk layout of the 3D datasets in the stack HDF5 files, default: auto.\n'
+                                           'time-major for pixel-wise reading, image-major for epoch-wise reading.')
+    parser.add_argument('--num-worker', dest='numWorker', type=int, default=None,
+                        help='number of threads to read the files of the next pairs while writing, default: 1.')
 
     return parser
 
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+############################################################
+# Program is part of MintPy                                #
+# Copyright (c) 2013, Zhang Yunjun, Heresh Fattahi         #
+# Author: MintPy Developers, Oct 2026                      #
+############################################################
+
+
+import os
+import sys
+
+from mintpy.utils.arg_utils import add_memory_argument, create_argument_parser
+
+###########################################################################################
+EXAMPLE = """Example:
+  materialize.py  timeseries_SET_ERA5.h5
+  materialize.py  timeseries_SET_ERA5.h5  -o timeseries_SET_ERA5_flat.h5
+  materialize.py  timeseries_SET_ERA5.h5  --comp lzf
+"""
+
+NOTE = """
+  A correction stack file, written by diff.py --lazy or smallbaselineApp.py with
+  mintpy.compute.lazyCorrection = yes, saves the paths of the base and correction files only,
+  and its data is composed as base minus corrections on the fly while reading in MintPy.
+  Materialize it into a regular time-series file, for external programs that read the HDF5
+  file directly, or to remove the dependency on the base and correction files.
+"""
+
+
+def create_parser(subparsers=None):
+    synopsis = 'Write the data of a correction stack file to disk'
+    epilog = EXAMPLE
+    name = __name__.split('.')[-1]
+    parser = create_argument_parser(
+        name, synopsis=synopsis, description=synopsis+NOTE, epilog=epilog, subparsers=subparsers)
+
+    parser.add_argument('file', type=str, help='correction stack file to be materialized')
+    parser.add_argument('-o', '--output', dest='outfile', type=str,
+                        help='output file name (default: overwrite the input file).')
+    parser.add_argument('--comp','--compression', dest='compression', type=str,
+                        choices=['lzf', 'gzip', 'zstd', 'blosc2'],
+                        help='HDF5 compression (default: the same as the base file).')
+    parser = add_memory_argument(parser)
+
+    return parser
+
+
+def cmd_line_parse(iargs=None):
+    # parse
+    parser = create_parser()
+    inps = parser.parse_args(args=iargs)
+
+    # check: input file extension
+    if os.path.splitext(inps.file)[1] not in ['.h5', '.he5']:
+        raise ValueError(f'input file is NOT HDF5: {inps.file}')
+
+    return inps
+
+
+###########################################################################################
+def main(iargs=None):
+    # parse
+    inps = cmd_line_parse(iargs)
+
+    # import
+    from mintpy.utils import writefile
+
+    # run
+    writefile.materialize_correction_stack(
+        inps.file,
+        out_file=inps.outfile,
+        compression=inps.compression,
+        max_memory=inps.maxMemory,
+    )
+    print('Done.')
+
+
+###########################################################################################
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -8,6 +8,7 @@
 
 import sys
 
+from mintpy.utils import arg_utils
 from mintpy.utils.arg_utils import create_argument_parser
 
 ##################################################################################################
@@ -44,6 +45,7 @@ def create_parser(subparsers=None):
     parser.add_argument('-m','--method', dest='method', type=str, default='mean', choices=['mean', 'median', 'nearest'],
                         help='downsampling method (default: %(default)s) \n'
                              'e.g. nearest for geometry, average for observations')
+    parser = arg_utils.add_memory_argument(parser, plan=True)
 
     # offset
     ampcor = parser.add_argument_group('Ampcor options', 'Ampcor options for dense offsets to account for the extra margin')
@@ -98,6 +100,8 @@ def main(iargs=None):
             lks_x=inps.lks_x,
             outfile=inps.outfile,
             method=inps.method,
+            max_memory=inps.maxMemory,
+            memory_plan=inps.memoryPlan,
             search_win=inps.search_win,
             xcorr_win=inps.xcorr_win,
             margin=inps.margin,
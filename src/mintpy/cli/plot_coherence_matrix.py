@@ -60,6 +60,9 @@ def create_parser(subparsers=None):
                         help='temporal coherence file.')
     parser.add_argument('-t','--template', dest='template_file',
                         help='temporal file.')
+    parser.add_argument('--pixel-index', dest='pixel_index', action='store_true',
+                        help='read coherence from the pixel-major index file (built on the first click), '
+                             'for fast response on big stacks.')
 
     parser.add_argument('--save', dest='save_fig',
                         action='store_true', help='save the figure')
@@ -18,9 +18,10 @@ TEMPLATE = """template options:
   ## no   - save   0% disk usage, fast [default]
   ## lzf  - save ~57% disk usage, relative slow
   ## gzip - save ~62% disk usage, very slow [not recommend]
+  ## zstd / blosc2 - fast compression via the hdf5plugin package, run benchmark_compression.py to compare
   mintpy.load.processor      = aria  #[isce, aria, snap, gamma, roipac], auto for isce
   mintpy.load.updateMode     = auto  #[yes / no], auto for yes, skip re-loading if HDF5 files are complete
-  mintpy.load.compression    = auto  #[gzip / lzf / no], auto for no.
+  mintpy.load.compression    = auto  #[gzip / lzf / zstd / blosc2 / no], auto for no.
   ##---------interferogram datasets:
   mintpy.load.unwFile        = ../stack/unwrapStack.vrt
   mintpy.load.corFile        = ../stack/cohStack.vrt
@@ -73,8 +74,9 @@ def create_parser(subparsers=None):
                         help='output HDF5 file')
     parser.add_argument('--update', dest='updateMode', action='store_true',
                         help='Enable the update mode: checking dataset already loaded.')
-    parser.add_argument('--compression', choices={'gzip', 'lzf', None}, default=None,
-                        help='HDF5 file compression, default: %(default)s')
+    parser.add_argument('--compression', choices={'gzip', 'lzf', 'zstd', 'blosc2', None}, default=None,
+                        help='HDF5 file compression, default: %(default)s\n'
+                             'zstd and blosc2 require the hdf5plugin package.')
 
     # ifgramStack
     stack = parser.add_argument_group('interferogram stack')
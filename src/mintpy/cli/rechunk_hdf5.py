@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+############################################################
+# Program is part of MintPy                                #
+# Copyright (c) 2013, Zhang Yunjun, Heresh Fattahi         #
+# Author: MintPy Developers, Oct 2026                      #
+############################################################
+
+
+import os
+import sys
+
+from mintpy.utils.arg_utils import add_memory_argument, create_argument_parser
+
+###########################################################################################
+EXAMPLE = """Example:
+  rechunk_hdf5.py  inputs/ifgramStack.h5  time-major
+  rechunk_hdf5.py  timeseries.h5  image-major  -o timeseries_img.h5
+  rechunk_hdf5.py  timeseries.h5  auto
+"""
+
+NOTE = """
+  auto        - chunk shape guessed by h5py
+  time-major  - (num_epoch, 64, 64), all epochs of a pixel in one chunk, for pixel-wise reading,
+                e.g. ifgram_inversion.py, tsview.py, plot_coherence_matrix.py
+  image-major - (1, 256, 256), one epoch per chunk, for epoch-wise reading, e.g. view.py
+"""
+
+
+def create_parser(subparsers=None):
+    synopsis = 'Re-write the 3D datasets of HDF5 file in a new chunk layout'
+    epilog = EXAMPLE
+    name = __name__.split('.')[-1]
+    parser = create_argument_parser(
+        name, synopsis=synopsis, description=synopsis+NOTE, epilog=epilog, subparsers=subparsers)
+
+    parser.add_argument('file', type=str, help='HDF5 file of interest')
+    parser.add_argument('chunk_shape', type=str, choices=['auto', 'time-major', 'image-major'],
+                        help='chunk layout of the 3D datasets')
+    parser.add_argument('-o', '--output', dest='outfile', type=str,
+                        help='output file name (default: overwrite the input file).')
+    parser = add_memory_argument(parser)
+
+    return parser
+
+
+def cmd_line_parse(iargs=None):
+    # parse
+    parser = create_parser()
+    inps = parser.parse_args(args=iargs)
+
+    # check: input file extension
+    if os.path.splitext(inps.file)[1] not in ['.h5', '.he5']:
+        raise ValueError(f'input file is NOT HDF5: {inps.file}')
+
+    return inps
+
+
+###########################################################################################
+def main(iargs=None):
+    # parse
+    inps = cmd_line_parse(iargs)
+
+    # import
+    from mintpy.utils import writefile
+
+    # run
+    writefile.rechunk_hdf5(
+        inps.file,
+        chunk_shape=inps.chunk_shape,
+        out_file=inps.outfile,
+        max_memory=inps.maxMemory,
+    )
+    print('Done.')
+
+
+###########################################################################################
+if __name__ == '__main__':
+    main(sys.argv[1:])
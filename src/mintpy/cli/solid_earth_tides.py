@@ -55,6 +55,9 @@ def create_parser(subparsers=None):
     # output
     parser.add_argument('--set-file', dest='set_file', help='line-of-sight solid earth tide file name')
     parser.add_argument('-o', dest='cor_dis_file', help='Output file name for the corrected timeseries.')
+    parser.add_argument('--lazy', dest='lazy', action='store_true',
+                        help='Write the corrected timeseries as a correction stack file, without writing the data. '
+                             'Run materialize.py to write the data to disk.')
 
     return parser
 
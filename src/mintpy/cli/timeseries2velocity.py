@@ -41,7 +41,9 @@ EXAMPLE = """example:
   # uncertainty quantification of the estimated time functions
   timeseries2velocity.py timeseries_ERA5_demErr.h5 --uq residue
   timeseries2velocity.py timeseries_ERA5_demErr.h5 --uq covariance --ts-cov timeseriesCov.h5
+  timeseries2velocity.py timeseries_ERA5_demErr.h5 --uq covariance --ts-cov timeseriesCov.h5 --save-cov
   timeseries2velocity.py timeseries_ERA5_demErr.h5 --uq bootstrap
+  timeseries2velocity.py timeseries_ERA5_demErr.h5 --uq bootstrap --bootstrap-seed 12345 --bootstrap-worker 8
 """
 
 DROP_DATE_TXT = """exclude_date.txt:
@@ -97,6 +99,16 @@ def create_parser(subparsers=None):
                     help='4D time-series (co)variance file for time function STD calculation')
     uq.add_argument('--bc', '--bootstrap-count', dest='bootstrapCount', type=int, default=400,
                     help='number of iterations for bootstrapping (default: %(default)s).')
+    uq.add_argument('--bs', '--bootstrap-seed', dest='bootstrapSeed', type=int,
+                    help='seed of the random number generator for bootstrapping, for reproducible results\n'
+                         '(default: %(default)s for a random seed).')
+    uq.add_argument('--bw', '--bootstrap-worker', dest='bootstrapNumWorker', type=int, default=1,
+                    help='number of processes to run the bootstrapping iterations in parallel\n'
+                         '(default: %(default)s). Ignored with --cluster, which splits the boxes instead.')
+    uq.add_argument('--save-cov', dest='save_cov', action='store_true',
+                    help='Save the full covariance matrix of the time function parameters to HDF5 file.')
+    uq.add_argument('--cov-file', dest='cov_file',
+                    help='Output file name for the covariance matrix (default: {outfile}Cov.h5, e.g. velocityCov.h5).')
 
     # time functions
     parser = arg_utils.add_timefunc_argument(parser)
@@ -109,7 +121,8 @@ def create_parser(subparsers=None):
                        help='Output file name for the residual time-series file (default: %(default)s).')
 
     # computing
-    parser = arg_utils.add_memory_argument(parser)
+    parser = arg_utils.add_memory_argument(parser, plan=True)
+    parser = arg_utils.add_parallel_argument(parser)
 
     return parser
 
@@ -121,6 +134,7 @@ def cmd_line_parse(iargs=None):
     inps = parser.parse_args(args=iargs)
 
     # import
+    from mintpy.objects import cluster
     from mintpy.utils import readfile, utils as ut
 
     # check
@@ -135,6 +149,12 @@ def cmd_line_parse(iargs=None):
     if inps.template_file:
         inps = read_template2inps(inps.template_file, inps)
 
+    # check: --cluster and --num-worker option
+    inps.numWorker = str(cluster.DaskCluster.format_num_worker(inps.cluster, inps.numWorker))
+    if inps.cluster and inps.numWorker == '1':
+        print('WARNING: number of workers is 1, turn OFF parallel processing and continue')
+        inps.cluster = None
+
     # check: --uq / --uncertainty option
     if inps.uncertaintyQuantification == 'bootstrap':
         # 1: bootstrap count number must be larger than 1
@@ -183,6 +203,10 @@ def cmd_line_parse(iargs=None):
         # compose default output filename
         inps.outfile = f'velocity{suffix}.h5'
 
+    # default: --cov-file option
+    if inps.save_cov and not inps.cov_file:
+        inps.cov_file = f'{os.path.splitext(inps.outfile)[0]}Cov.h5'
+
     return inps
 
 
@@ -221,12 +245,21 @@ def read_template2inps(template_file, inps):
             elif key in ['uncertaintyQuantification', 'timeSeriesCovFile']:
                 iDict[key] = value
 
-            elif key in ['polynomial', 'bootstrapCount']:
+            elif key in ['polynomial', 'bootstrapCount', 'bootstrapSeed']:
                 iDict[key] = int(value)
 
-    key = 'mintpy.compute.maxMemory'
-    if key in template.keys() and template[key]:
-        inps.maxMemory = float(template[key])
+    # computing configurations
+    dask_key_prefix = 'mintpy.compute.'
+    key_list = [i for i in list(iDict.keys()) if dask_key_prefix+i in template.keys()]
+    for key in key_list:
+        value = template[dask_key_prefix+key]
+        if key in ['cluster', 'config', 'memoryPlan']:
+            iDict[key] = value
+        elif value:
+            if key in ['numWorker']:
+                iDict[key] = str(value)
+            elif key in ['maxMemory']:
+                iDict[key] = float(value)
 
     return inps
 
@@ -9,7 +9,7 @@
 import sys
 
 from mintpy.defaults.template import get_template_content
-from mintpy.utils.arg_utils import create_argument_parser
+from mintpy.utils.arg_utils import add_memory_argument, create_argument_parser
 
 ######################################################################################################
 TEMPLATE = get_template_content('residual_RMS')
@@ -53,6 +53,7 @@ def create_parser(subparsers=None):
                         help='figure size in inches - width and length')
     parser.add_argument('--tick-year-num', dest='tick_year_num',
                         type=int, default=1, help='Year number per major tick')
+    parser = add_memory_argument(parser)
     return parser
 
 
@@ -51,6 +51,9 @@ def create_parser(subparsers=None):
                         help='directory to downloaded GACOS delays data (default: %(default)s).')
     parser.add_argument('-o', dest='cor_dis_file',
                         help='Output file name for trospheric corrected timeseries.')
+    parser.add_argument('--lazy', dest='lazy', action='store_true',
+                        help='Write the corrected timeseries as a correction stack file, without writing the data. '
+                             'Run materialize.py to write the data to disk.')
 
     return parser
 
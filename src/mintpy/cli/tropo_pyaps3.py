@@ -93,6 +93,9 @@ def create_parser(subparsers=None):
     parser.add_argument('--hour', type=str, help='time of data in HH, e.g. 12, 06')
     parser.add_argument('-o','--output', dest='cor_dis_file',
                         help='Output file name for trospheric corrected timeseries.')
+    parser.add_argument('--lazy', dest='lazy', action='store_true',
+                        help='Write the corrected timeseries as a correction stack file, without writing the data. '
+                             'Run materialize.py to write the data to disk.')
     parser.add_argument('--debug', '--debug-mode', dest='debug_mode', action='store_true',
                         help='Enable debug mode, i.e. run pyaps3 without try/except to show the full message '
                              'and potential stopping points.')
@@ -14,7 +14,7 @@ from datetime import datetime as dt
 
 import numpy as np
 
-from mintpy.ifgram_inversion import estimate_timeseries
+from mintpy.ifgram_inversion import estimate_timeseries, pinv_cache
 from mintpy.objects import cluster, ifgramStack
 from mintpy.utils import isce_utils, ptime, readfile, utils as ut, writefile
 
@@ -872,6 +872,8 @@ def estimate_bias_timeseries_patch(stack_file, bias_free_conn, bw, wvl, box, wat
         'inv_quality_name'  : 'no',
     }
 
+    pinv_cache.reset_stats()
+
     # a. split mask into mask_all/par_net
     # mask for valid (~NaN) observations in ALL ifgrams (share one B in sbas inversion)
     mask_all_net = np.all(~np.isnan(bias_stack), axis=0) * np.all(bias_stack != 0, axis=0)
@@ -903,6 +905,7 @@ def estimate_bias_timeseries_patch(stack_file, bias_free_conn, bw, wvl, box, wat
             prog_bar.update(i+1, every=200, suffix=f'{i+1}/{num_pix_par} pixels')
         prog_bar.close()
     del bias_stack
+    pinv_cache.print_stats()
 
     bias_ts = bias_ts.reshape(num_date, box_len, box_wid) * phase2range
 
@@ -995,7 +998,7 @@ def estimate_bias_timeseries(stack_file, bias_free_conn, bw, cluster_kwargs, wat
             bias_ts = np.zeros((num_date, box_len, box_wid), dtype=np.float32)
 
             # initiate dask cluster and client
-            cluster_obj = cluster.DaskCluster(**cluster_kwargs)
+            cluster_obj = cluster.init_cluster(**cluster_kwargs)
             cluster_obj.open()
 
             # run dask
@@ -0,0 +1,461 @@
+############################################################
+# Program is part of MintPy                                #
+# Copyright (c) 2013, Zhang Yunjun, Heresh Fattahi         #
+# Author: MintPy Developers, Oct 2026                      #
+############################################################
+# Apply the phase correction steps of smallbaselineApp.py in a single pass over the time-series:
+# the corrections are computed / read and applied box by box in memory, and only the final
+# corrected time-series (and the requested intermediate files) are written to disk, instead of
+# one full time-series file per step.
+
+
+import os
+import time
+
+import numpy as np
+
+from mintpy import dem_error
+from mintpy.objects import cluster, timeseries
+from mintpy.objects.ramp import RampEstimator
+from mintpy.utils import ptime, readfile, utils as ut, writefile
+
+# phase correction steps of smallbaselineApp.py, in order
+STEP_LIST = [
+    'correct_LOD',
+    'correct_SET',
+    'correct_ionosphere',
+    'correct_troposphere',
+    'deramp',
+    'correct_topography',
+]
+
+
+############################################################################
+def is_fusable_step(step_name, template):
+    """Check if a step of smallbaselineApp.py can be applied in the fused pass.
+
+    The ionospheric correction from split spectrum, the tropospheric correction from the
+    height correlation and from the legacy PyAPS models (MERRA / NARR) are estimated from
+    or written by a separate workflow, thus, they are run separately as barriers.
+
+    Parameters: step_name - str, step name of smallbaselineApp.py
+                template  - dict, content of smallbaselineApp.cfg with auto values checked
+    Returns:    flag      - bool
+    """
+    if step_name not in STEP_LIST:
+        return False
+
+    if step_name == 'correct_ionosphere':
+        return not template['mintpy.ionosphericDelay.method']
+
+    if step_name == 'correct_troposphere':
+        method = template['mintpy.troposphericDelay.method']
+        model = template['mintpy.troposphericDelay.weatherModel'].upper()
+        if method == 'height_correlation':
+            return False
+        if method == 'pyaps' and model not in ['ERA5']:
+            return False
+
+    return True
+
+
+def get_correction_plan(template, work_dir, step_names):
+    """Get the enabled correction steps with their input/output time-series files.
+
+    Parameters: template   - dict, content of smallbaselineApp.cfg with auto values checked
+                work_dir   - str, working directory of smallbaselineApp.py
+                step_names - list of str, correction steps to apply
+    Returns:    plan       - list of tuple of (step_name, in_file, out_file) in order
+    """
+    from mintpy.smallbaselineApp import TimeSeriesAnalysis
+
+    fnames = TimeSeriesAnalysis.get_timeseries_filename(template, work_dir)
+    plan = []
+    for sname in [i for i in STEP_LIST if i in step_names]:
+        if not is_fusable_step(sname, template):
+            raise ValueError(f'step {sname} with the current setting can NOT be applied in the fused pass!')
+
+        in_file, out_file = fnames[sname]['input'], fnames[sname]['output']
+        if in_file != out_file:
+            plan.append((sname, in_file, out_file))
+    return plan
+
+
+############################################################################
+def prepare_correction(step_name, ts_file, template, inps):
+    """Prepare the inputs of one correction step, before the box-by-box pass.
+
+    The correction time-series files of SET / GACOS / ERA5 are calculated here (or reused in
+    the update mode), to be subtracted box by box as diff.py does.
+
+    Parameters: step_name - str, correction step name
+                ts_file   - str, path of the base time-series file (with the date/reference info)
+                template  - dict, content of smallbaselineApp.cfg with auto values checked
+                inps      - namespace, input arguments of correct_timeseries.py
+    Returns:    step      - dict, inputs of the step to apply the correction on one box
+    """
+    print('-'*50)
+    print(f'prepare step: {step_name}')
+    step = {'name' : step_name, 'meta' : {}, 'in_files' : []}
+
+    if step_name == 'correct_LOD':
+        from mintpy.local_oscilator_drift import get_ramp_rate
+
+        ts_obj = timeseries(ts_file)
+        ts_obj.open(print_msg=False)
+        diff_year = np.array(ts_obj.yearList)
+        diff_year -= diff_year[ts_obj.refIndex]
+        step['ramp_rate'] = get_ramp_rate(ts_obj.metadata, inps.geom_file)
+        step['diff_year'] = diff_year
+        step['in_files'] += [inps.geom_file]
+
+    elif step_name == 'correct_SET':
+        import mintpy.cli.solid_earth_tides
+        from mintpy.solid_earth_tides import calc_solid_earth_tides_timeseries
+
+        set_inps = mintpy.cli.solid_earth_tides.cmd_line_parse([ts_file, '-g', inps.geom_file, '--update'])
+        calc_solid_earth_tides_timeseries(
+            ts_file=ts_file,
+            geom_file=set_inps.geom_file,
+            set_comp=set_inps.set_comp,
+            set_file=set_inps.set_file,
+            date_wise_acq_time=set_inps.date_wise_acq_time,
+            update_mode=set_inps.update_mode,
+            verbose=set_inps.verbose,
+        )
+        step['cor_file'] = set_inps.set_file
+
+    elif step_name == 'correct_troposphere':
+        method = template['mintpy.troposphericDelay.method']
+        if method == 'gacos':
+            import mintpy.cli.tropo_gacos
+            from mintpy.tropo_gacos import calculate_delay_timeseries
+
+            gacos_dir = template['mintpy.troposphericDelay.gacosDir']
+            tropo_inps = mintpy.cli.tropo_gacos.cmd_line_parse(
+                ['-f', ts_file, '-g', inps.geom_file, '--dir', gacos_dir])
+            calculate_delay_timeseries(
+                tropo_file=tropo_inps.tropo_file,
+                dis_file=ts_file,
+                geom_file=inps.geom_file,
+                gacos_dir=tropo_inps.gacos_dir,
+            )
+
+        elif method == 'pyaps':
+            import mintpy.cli.tropo_pyaps3
+            from mintpy.tropo_pyaps3 import run_tropo_pyaps3
+
+            tropo_model = template['mintpy.troposphericDelay.weatherModel'].upper()
+            weather_dir = template['mintpy.troposphericDelay.weatherDir']
+            tropo_inps = mintpy.cli.tropo_pyaps3.cmd_line_parse(
+                ['-f', ts_file, '--model', tropo_model, '-g', inps.geom_file, '-w', weather_dir])
+
+            def get_dataset_size(fname):
+                atr = readfile.read_attribute(fname)
+                return (atr['LENGTH'], atr['WIDTH'])
+
+            if (os.path.isfile(tropo_inps.tropo_file)
+                    and get_dataset_size(tropo_inps.tropo_file) == get_dataset_size(ts_file)):
+                print(f'Use existed tropospheric delay file: {tropo_inps.tropo_file}')
+            else:
+                # calculate the delay only, as it is corrected box by box here
+                tropo_inps.cor_dis_file = None
+                run_tropo_pyaps3(tropo_inps)
+
+        else:
+            raise ValueError(f'un-recognized tropospheric correction method: {method}')
+        step['cor_file'] = tropo_inps.tropo_file
+
+    elif step_name == 'deramp':
+        ts_obj = timeseries(ts_file)
+        ts_obj.open(print_msg=False)
+        step['ramp_type'] = template['mintpy.deramp']
+        step['mask_file'] = template['mintpy.deramp.maskFile']
+        if step['mask_file'] and os.path.isfile(step['mask_file']):
+            print('read mask file: '+step['mask_file'])
+            step['mask'] = readfile.read(step['mask_file'])[0]
+            step['in_files'] += [step['mask_file']]
+        else:
+            print('use mask of the whole area')
+            step['mask'] = np.ones((ts_obj.length, ts_obj.width), dtype=np.bool_)
+        step['meta'] = {
+            'mintpy.deramp'          : step['ramp_type'],
+            'mintpy.deramp.maskFile' : step['mask_file'],
+        }
+        step['estimator'] = RampEstimator(
+            ramp_type=step['ramp_type'],
+            num_slice=ts_obj.numDate,
+            length=ts_obj.length,
+            width=ts_obj.width,
+            metadata=ts_obj.metadata,
+        )
+
+    elif step_name == 'correct_topography':
+        import mintpy.cli.dem_error
+
+        iargs = [ts_file, '-t', inps.template_file,
+                 '--dem-err-file', os.path.join(inps.work_dir, 'demErr.h5')]
+        if template['mintpy.topographicResidual.pixelwiseGeometry']:
+            iargs += ['-g', inps.geom_file]
+        dem_inps = mintpy.cli.dem_error.cmd_line_parse(iargs)
+        if dem_inps.cluster:
+            print(f'WARNING: {dem_inps.cluster} cluster is NOT supported in the fused pass, ignore it and continue.')
+
+        date_list = timeseries(ts_file).get_date_list()
+        date_flag = dem_error.read_exclude_date(dem_inps.excludeDate, date_list)[0]
+        if dem_inps.polyOrder > np.sum(date_flag):
+            raise ValueError("input poly order {} > number of acquisition {}! Reduce it!".format(
+                dem_inps.polyOrder, np.sum(date_flag)))
+
+        step['G_defo'] = dem_error.get_design_matrix4defo(dem_inps)
+        step['geom_file'] = dem_inps.geom_file
+        step['date_flag'] = date_flag
+        step['phase_velocity'] = dem_inps.phaseVelocity
+        step['dem_err_file'] = dem_inps.dem_err_file
+        step['meta'] = {dem_error.key_prefix+key : str(vars(dem_inps)[key]) for key in dem_error.config_keys}
+        step['in_files'] += [dem_inps.geom_file] if dem_inps.geom_file else []
+
+    else:
+        raise ValueError(f'un-recognized correction step: {step_name}')
+
+    if 'cor_file' in step.keys():
+        step['in_files'] += [step['cor_file']]
+    return step
+
+
+def read_patch(box, ts_file, steps, date_list, metadata, save_files=None, stop_step=None):
+    """Read one box of the time-series and apply the corrections in memory.
+
+    Parameters: box        - tuple of 4 int, (x0, y0, x1, y1)
+                ts_file    - str, path of the base time-series file
+                steps      - list of dict, output of prepare_correction() in order
+                date_list  - list of str, dates of the time-series
+                metadata   - dict, metadata of the base time-series file
+                save_files - dict of str, output file of the steps to save the intermediate data for
+                stop_step  - str, stop before this step, e.g. deramp for the ramp estimation
+    Returns:    ts_data    - 3D np.ndarray in size of (num_date, box_len, box_wid)
+                save_data  - dict of 3D np.ndarray, intermediate data of the steps in save_files
+                patch_data - tuple, input data of dem_error.correct_dem_error_patch(), if applicable
+    """
+    save_files = save_files if save_files else {}
+    save_data = {}
+    patch_data = None
+
+    ts_data = timeseries(ts_file).read(box=box, squeeze=False, print_msg=False)
+    for step in steps:
+        if step['name'] == stop_step:
+            break
+
+        if step['name'] == 'correct_LOD':
+            ramp_rate = step['ramp_rate'][box[1]:box[3], box[0]:box[2]]
+            for i in range(ts_data.shape[0]):
+                ts_data[i, :, :] -= ramp_rate * step['diff_year'][i]
+
+        elif 'cor_file' in step.keys():
+            # as diff.py: referenced to the time-series and with its zero values kept
+            mask = ts_data == 0.
+            cor_data, date_flag = timeseries(step['cor_file']).read_as_correction(date_list, box, metadata)
+            ts_data[date_flag] -= cor_data
+            ts_data[mask] = 0.
+            del cor_data, mask
+
+        elif step['name'] == 'deramp':
+            ts_data = step['estimator'].deramp(ts_data, box)[0]
+
+        elif step['name'] == 'correct_topography':
+            # estimated in the main thread, read its input data here
+            patch_data = dem_error.read_dem_error_patch(ts_file, step['geom_file'], box=box, ts_data=ts_data)
+
+        if step['name'] in save_files.keys():
+            save_data[step['name']] = np.array(ts_data)
+
+    return ts_data, save_data, patch_data
+
+
+############################################################################
+def run_or_skip(out_files, in_files, meta):
+    """Check whether to run the fused pass or not, in the update mode."""
+    print('-'*50)
+    print('update mode: ON')
+    flag = 'skip'
+
+    # check output files
+    if ut.run_or_skip(out_files, in_file=in_files, print_msg=False) == 'run':
+        flag = 'run'
+        print(f'1) output files NOT found or NOT newer than input files: {in_files}.')
+    else:
+        print(f'1) output files already exist and are newer than input files: {in_files}.')
+
+    # check configuration
+    if flag == 'skip':
+        atr = readfile.read_attribute(out_files[0])
+        if any(str(value) != atr.get(key, 'None') for key, value in meta.items()):
+            flag = 'run'
+            print(f'2) NOT all key configuration parameters are the same: {list(meta.keys())}.')
+        else:
+            print(f'2) all key configuration parameters are the same: {list(meta.keys())}.')
+
+    # result
+    print(f'run or skip: {flag}.')
+    return flag
+
+
+def correct_timeseries(inps):
+    """Apply the correction steps to the time-series in a single pass.
+
+    Parameters: inps     - namespace, input arguments of correct_timeseries.py
+    Returns:    out_file - str, path of the corrected time-series file, None if nothing to correct
+    """
+    start_time = time.time()
+
+    ## 1. plan
+    template = readfile.read_template(inps.template_file)
+    template = ut.check_template_auto_value(template)
+    plan = get_correction_plan(template, inps.work_dir, inps.step_names)
+    if not plan:
+        print(f'No correction for steps: {inps.step_names}.')
+        return None
+
+    ts_file, out_file = plan[0][1], plan[-1][2]
+    save_files = {sname : fout for sname, fin, fout in plan[:-1] if sname in inps.save_steps}
+    print('-'*50)
+    print(f'fused correction pass on time-series file: {ts_file}')
+    for sname, fin, fout in plan:
+        suffix = 'save' if sname in save_files.keys() or fout == out_file else 'in memory'
+        print(f'    {sname:<20} --> {os.path.basename(fout)} ({suffix})')
+
+    ts_obj = timeseries(ts_file)
+    ts_obj.open(print_msg=False)
+    date_list = ts_obj.dateList
+    num_date = ts_obj.numDate
+    length, width = ts_obj.length, ts_obj.width
+
+    ## 2. prepare the inputs of each step
+    steps = [prepare_correction(sname, ts_file, template, inps) for sname, fin, fout in plan]
+    step_names = [step['name'] for step in steps]
+    dem_step = steps[-1] if step_names[-1] == 'correct_topography' else None
+    ramp_step = steps[step_names.index('deramp')] if 'deramp' in step_names else None
+
+    # metadata of the output files: metadata of the base file + configurations of the applied steps
+    meta_dict = {}
+    meta = dict(ts_obj.metadata)
+    meta['FILE_TYPE'] = 'timeseries'
+    for step, (sname, fin, fout) in zip(steps, plan):
+        meta.update(step['meta'])
+        meta_dict[sname] = dict(meta)
+
+    # output / input files
+    out_files = [out_file] + list(save_files.values())
+    ts_res_file = None
+    if dem_step:
+        ts_res_file = os.path.join(os.path.dirname(out_file), 'timeseriesResidual.h5')
+        out_files += [dem_step['dem_err_file'], ts_res_file]
+    in_files = [ts_file]
+    for step in steps:
+        in_files += [i for i in step['in_files'] if i not in in_files]
+    config_meta = {key : value for step in steps for key, value in step['meta'].items()}
+    if inps.update_mode and run_or_skip(out_files, in_files, config_meta) == 'skip':
+        return out_file
+
+    ## 3. split into boxes aligned with the chunks of the time-series
+    # 1st dimension size: ts (obs / cor / res / intermediates) + dem_err/inc_angle/rg_dist (+pbase)
+    num_epoch = num_date * (3 + len(save_files)) + 3
+    if dem_step and dem_step['geom_file']:
+        if 'bperp' in readfile.get_dataset_list(dem_step['geom_file']):
+            num_epoch += num_date
+    max_memory = inps.maxMemory / cluster.BoxPipeline.num_box_in_memory
+    max_num_pixel = int(max_memory * 1024**3 / (num_epoch * 4 * 2.5))
+    box_list, num_box = cluster.split_box2tiles(
+        box=(0, 0, width, length),
+        max_num_pixel=max_num_pixel,
+        chunk_shape=readfile.get_hdf5_chunk_shape(ts_file, 'timeseries'),
+    )
+
+    read_kwargs = {
+        'ts_file'    : ts_file,
+        'steps'      : steps,
+        'date_list'  : date_list,
+        'metadata'   : ts_obj.metadata,
+        'save_files' : save_files,
+    }
+
+    ## 4. estimate the phase ramps (read only)
+    if ramp_step:
+        print('-'*50)
+        print(f'estimating {ramp_step["ramp_type"]} phase ramp of each acquisition box by box ...')
+        estimator = ramp_step['estimator']
+        # no need to save the intermediate data of the steps before deramp in this pass
+        ramp_read_kwargs = dict(read_kwargs, save_files=None, stop_step='deramp')
+        with cluster.BoxPipeline(box_list, read_patch, ramp_read_kwargs) as pipe:
+            prog_bar = ptime.progressBar(maxValue=num_box)
+            for i, box, (ts_data, _, _) in pipe:
+                mask = ramp_step['mask'][box[1]:box[3], box[0]:box[2]]
+                estimator.accumulate(ts_data, box, mask=mask)
+                prog_bar.update(i+1, suffix=f'{i+1}/{num_box}')
+            prog_bar.close()
+        estimator.solve()
+
+    ## 5. correct and write (read, correct and write)
+    print('-'*50)
+    # instantiate output files
+    for sname, fname in list(save_files.items()) + [(step_names[-1], out_file)]:
+        writefile.layout_hdf5(fname, metadata=meta_dict[sname], ref_file=ts_file)
+
+    if dem_step:
+        dem_meta = dict(meta_dict['correct_topography'])
+        dem_meta['FILE_TYPE'] = 'dem'
+        dem_meta['UNIT'] = 'm'
+        ds_name_dict = {'dem' : [np.float32, (length, width), None]}
+        writefile.layout_hdf5(dem_step['dem_err_file'], ds_name_dict, metadata=dem_meta)
+        writefile.layout_hdf5(ts_res_file, metadata=meta_dict['correct_topography'], ref_file=ts_file)
+
+        # limit the number of threads to 1, as dem_error.py
+        num_threads_dict = cluster.set_num_threads("1")
+
+    def write_patch(box, ts_data, save_data, delta_z=None, ts_res=None):
+        """write the block to disk"""
+        block = [0, num_date, box[1], box[3], box[0], box[2]]
+        for sname, data in save_data.items():
+            writefile.write_hdf5_block(save_files[sname], data=data, datasetName='timeseries',
+                                       block=block, print_msg=False)
+        writefile.write_hdf5_block(out_file, data=ts_data, datasetName='timeseries',
+                                   block=block, print_msg=False)
+
+        if delta_z is not None:
+            writefile.write_hdf5_block(dem_step['dem_err_file'], data=delta_z, datasetName='dem',
+                                       block=block[2:], print_msg=False)
+            writefile.write_hdf5_block(ts_res_file, data=ts_res, datasetName='timeseries',
+                                       block=block, print_msg=False)
+
+    with cluster.BoxPipeline(box_list, read_patch, read_kwargs, write_patch) as pipe:
+        for i, box, (ts_data, save_data, patch_data) in pipe:
+            if num_box > 1:
+                print(f'\n------- processing patch {i+1} out of {num_box} --------------')
+                print(f'box width:  {box[2] - box[0]}')
+                print(f'box length: {box[3] - box[1]}')
+
+            if dem_step:
+                delta_z, ts_data, ts_res = dem_error.correct_dem_error_patch(
+                    G_defo=dem_step['G_defo'],
+                    ts_file=ts_file,
+                    geom_file=dem_step['geom_file'],
+                    box=box,
+                    date_flag=dem_step['date_flag'],
+                    phase_velocity=dem_step['phase_velocity'],
+                    patch_data=patch_data,
+                )[:-1]
+                pipe.write(box, ts_data, save_data, delta_z, ts_res)
+            else:
+                pipe.write(box, ts_data, save_data)
+
+    if dem_step:
+        cluster.roll_back_num_threads(num_threads_dict)
+
+    for fname in out_files:
+        print(f'finished writing to file: {fname}')
+
+    # time info
+    m, s = divmod(time.time()-start_time, 60)
+    print(f'time used: {m:02.0f} mins {s:02.1f} secs.')
+
+    return out_file
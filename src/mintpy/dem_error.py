@@ -280,8 +280,125 @@ def estimate_dem_error(ts0, G0, tbase, date_flag=None, phase_velocity=False,
     return delta_z, ts_cor, ts_res
 
 
+def estimate_dem_error_pixelwise(ts0, G_geom0, G_defo0, tbase, date_flag=None, phase_velocity=False,
+                                 cond=1e-8):
+    """Estimate DEM error with least square optimization for pixels with different geometry in batch.
+
+    The design matrix of each pixel is [G_geom, G_defo], with only the 1st column varying with pixels.
+    Thus, the normal equations of each pixel are the shared G_defo^T G_defo bordered by a rank-one update,
+    which is solved for all pixels at once via the Schur complement:
+        delta_z = G_geom_perp^T ts / G_geom_perp^T G_geom_perp
+        X_defo  = pinv(G_defo) (ts - G_geom delta_z)
+    with G_geom_perp = (I - G_defo pinv(G_defo)) G_geom, i.e. G_geom with the deformation model projected out.
+    This is equivalent to estimate_dem_error() pixel by pixel.
+
+    Parameters: ts0            - 2D np.array in size of (numDate, numPixel), original displacement time-series
+                G_geom0        - 2D np.array in size of (numDate, numPixel), 1st column of the design matrix
+                G_defo0        - 2D np.array in size of (numDate, numParam), design matrix of the defo model
+                tbase          - 2D np.array in size of (numDate, 1), temporal baseline
+                date_flag      - 1D np.array in bool data type, mark the date used in the estimation
+                phase_velocity - bool, use phase history or phase velocity for minimization
+                cond           - float, cutoff for ‘small’ singular values in the pseudo-inverse of G_defo
+    Returns:    delta_z        - 1D np.array in size of (numPixel), estimated DEM residual
+                ts_cor         - 2D np.array in size of (numDate, numPixel),
+                                    corrected timeseries = tsOrig - delta_z_phase
+                ts_res         - 2D np.array in size of (numDate, numPixel),
+                                    residual timeseries = tsOrig - delta_z_phase - defModel
+    Example:    delta_z, ts_cor, ts_res = estimate_dem_error_pixelwise(ts, G_geom, G_defo, tbase, date_flag)
+    """
+    if date_flag is None:
+        date_flag = np.ones(ts0.shape[0], np.bool_)
+
+    # in float64 as the hstack of G_geom and G_defo in estimate_dem_error(),
+    # as G_defo from get_design_matrix4defo() is in float32
+    G_defo0 = np.asarray(G_defo0, dtype=np.float64)
+
+    # skip noisy acquisitions
+    G_geom = G_geom0[date_flag, :]
+    G_defo = G_defo0[date_flag, :]
+    ts = ts0[date_flag, :]
+
+    if phase_velocity:
+        # adjust from phase to phase velocity
+        # and remove the all-zero / all-one column of the constant term, as estimate_dem_error()
+        tbase_diff = np.diff(tbase[date_flag], axis=0).reshape(-1,1)
+        ts = np.diff(ts, axis=0) / tbase_diff
+        G_geom = np.diff(G_geom, axis=0) / tbase_diff
+        G_defo = np.diff(G_defo, axis=0)[:, 1:] / tbase_diff
+        G_defo0 = G_defo0[:, 1:]
+
+    # shared pseudo-inverse of G_defo, i.e. inv(G_defo^T G_defo) G_defo^T for G_defo in full rank
+    G_defo_inv = np.linalg.pinv(G_defo, rcond=cond)
+
+    # DEM error, with G_geom of pixels in the null space of G_defo (no topographic signal) set to zero
+    G_geom_perp = G_geom - np.dot(G_defo, np.dot(G_defo_inv, G_geom))
+    num = np.sum(G_geom_perp * ts, axis=0)
+    den = np.sum(G_geom_perp ** 2, axis=0)
+    delta_z = np.zeros(ts.shape[1], dtype=np.float64)
+    flag = den > cond * np.sum(G_geom ** 2, axis=0)
+    delta_z[flag] = num[flag] / den[flag]
+
+    # deformation model and outputs
+    X_defo = np.dot(G_defo_inv, ts - G_geom * delta_z)
+    ts_cor = ts0 - G_geom0 * delta_z
+    ts_res = ts_cor - np.dot(G_defo0, X_defo)
+
+    return delta_z, ts_cor, ts_res
+
+
+def read_dem_error_patch(ts_file, geom_file=None, box=None, ts_data=None):
+    """Read the input data of one patch of a time-series for the DEM error estimation.
+
+    Parameters: ts_file       - str, path of time-series file
+                geom_file     - str, path of geometry file
+                box           - tuple of 4 int in (x0, y0, x1, y1) for the area of interest
+                ts_data       - 3D np.ndarray in size of (num_date, box_len, box_wid), time-series
+                                of the patch in memory, e.g. corrected in the fused pass,
+                                None to read it from ts_file.
+    Returns:    ts_data       - 2D np.ndarray in size of (num_date, num_pixel)
+                sin_inc_angle - 0/1D np.ndarray, sin(inc_angle)
+                range_dist    - 0/1D np.ndarray, slant range distance in meter
+                pbase         - 2D np.ndarray, perp baseline in meter
+                mask          - 1D np.ndarray in bool in size of (num_pixel), pixels to invert
+                box           - tuple of 4 int in (x0, y0, x1, y1) for the area of interest
+    """
+    ts_obj = timeseries(ts_file)
+    ts_obj.open(print_msg=False)
+    num_date = ts_obj.numDate
+
+    # 1.1 read time-series
+    if ts_data is None:
+        ts_data = readfile.read(ts_file, box=box)[0]
+    ts_data = ts_data.reshape(num_date, -1)
+
+    # 1.2 read geometry
+    sin_inc_angle, range_dist, pbase = read_geometry(ts_file, geom_file, box=box)
+
+    # 1.3 mask of pixels to invert
+    print('skip pixels with ZERO in ALL acquisitions')
+    mask = np.nanmean(ts_data, axis=0) != 0.
+
+    print('skip pixels with NaN  in ANY acquisitions')
+    mask *= np.sum(np.isnan(ts_data), axis=0) == 0
+
+    tcoh_file = os.path.join(os.path.dirname(ts_file), 'temporalCoherence.h5')
+    if os.path.isfile(tcoh_file):
+        print('skip pixels with ZERO temporal coherence')
+        tcoh = readfile.read(tcoh_file, box=box)[0].flatten()
+        mask *= tcoh != 0.
+        del tcoh
+
+    if range_dist.size != 1:
+        print('skip pixels with ZERO / NaN value in incidenceAngle / slantRangeDistance')
+        for geom_data in [sin_inc_angle, range_dist]:
+            mask *= geom_data != 0.
+            mask *= ~np.isnan(geom_data)
+
+    return ts_data, sin_inc_angle, range_dist, pbase, mask, box
+
+
 def correct_dem_error_patch(G_defo, ts_file, geom_file=None, box=None,
-                            date_flag=None, phase_velocity=False):
+                            date_flag=None, phase_velocity=False, patch_data=None):
     """
     Correct one path of a time-series for DEM error.
 
@@ -291,6 +408,8 @@ def correct_dem_error_patch(G_defo, ts_file, geom_file=None, box=None,
                 box            - tuple of 4 int in (x0, y0, x1, y1) for the area of interest
                 date_flag      - 1D np.ndarray in bool in size of (num_date), dates used for the estimation
                 phase_velocity - bool, minimize the resdiual phase or phase velocity
+                patch_data     - tuple, input data read by read_dem_error_patch() in advance,
+                                 None to read it here.
     Returns:    delta_z        - 2D np.ndarray in size of (num_row, num_col)
                 ts_cor         - 3D np.ndarray in size of (num_date, num_row, num_col)
                 ts_res         - 3D np.ndarray in size of (num_date, num_row, num_col)
@@ -305,6 +424,7 @@ def correct_dem_error_patch(G_defo, ts_file, geom_file=None, box=None,
         debug_y, debug_x = 611, 713
         print(f'DEBUG at Y/X = {debug_y}/{debug_x}')
         box = [debug_x, debug_y, debug_x+1, debug_y+1]
+        patch_data = None
 
     # size
     if box:
@@ -319,31 +439,10 @@ def correct_dem_error_patch(G_defo, ts_file, geom_file=None, box=None,
     tbase = np.array(ts_obj.tbase, np.float32) / 365.25
     num_date = ts_obj.numDate
 
-    # 1.1 read time-series
-    ts_data = readfile.read(ts_file, box=box)[0].reshape(num_date, -1)
-
-    # 1.2 read geometry
-    sin_inc_angle, range_dist, pbase = read_geometry(ts_file, geom_file, box=box)
-
-    # 1.3 mask of pixels to invert
-    print('skip pixels with ZERO in ALL acquisitions')
-    mask = np.nanmean(ts_data, axis=0) != 0.
-
-    print('skip pixels with NaN  in ANY acquisitions')
-    mask *= np.sum(np.isnan(ts_data), axis=0) == 0
-
-    tcoh_file = os.path.join(os.path.dirname(ts_file), 'temporalCoherence.h5')
-    if os.path.isfile(tcoh_file):
-        print('skip pixels with ZERO temporal coherence')
-        tcoh = readfile.read(tcoh_file, box=box)[0].flatten()
-        mask *= tcoh != 0.
-        del tcoh
-
-    if range_dist.size != 1:
-        print('skip pixels with ZERO / NaN value in incidenceAngle / slantRangeDistance')
-        for geom_data in [sin_inc_angle, range_dist]:
-            mask *= geom_data != 0.
-            mask *= ~np.isnan(geom_data)
+    # 1.1 read time-series, geometry and mask of pixels to invert
+    if patch_data is None:
+        patch_data = read_dem_error_patch(ts_file, geom_file, box=box)
+    ts_data, sin_inc_angle, range_dist, pbase, mask = patch_data[:5]
 
     num_pixel2inv = int(np.sum(mask))
     idx_pixel2inv = np.where(mask)[0]
@@ -387,24 +486,23 @@ def correct_dem_error_patch(G_defo, ts_file, geom_file=None, box=None,
         ts_res[:, mask] = ts_res_i
 
     else:
-        print('estimating DEM error pixel-wisely ...')
+        print('estimating DEM error pixel-wisely in batch ...')
+        # pixels in chunks, to limit the memory usage of the float64 intermediate matrices
+        chunk_size = max(int(1e7 / num_date), 1)
         prog_bar = ptime.progressBar(maxValue=num_pixel2inv)
-        for i in range(num_pixel2inv):
-            idx = idx_pixel2inv[i]
+        for i0 in range(0, num_pixel2inv, chunk_size):
+            i1 = min(i0 + chunk_size, num_pixel2inv)
+            idx = idx_pixel2inv[i0:i1]
 
-            # compose design matrix
-            if pbase.shape[1] == 1:
-                pbase_i = pbase
-            else:
-                pbase_i = pbase[:, idx].reshape(-1, 1)
-
-            G_geom = pbase_i / (range_dist[idx] * sin_inc_angle[idx])
-            G = np.hstack((G_geom, G_defo))
+            # compose the 1st column of design matrix for each pixel
+            pbase_i = pbase if pbase.shape[1] == 1 else pbase[:, idx]
+            G_geom = pbase_i / (range_dist[idx] * sin_inc_angle[idx]).reshape(1, -1)
 
             # run
-            delta_z_i, ts_cor_i, ts_res_i = estimate_dem_error(
+            delta_z_i, ts_cor_i, ts_res_i = estimate_dem_error_pixelwise(
                 ts0=ts_data[:, idx],
-                G0=G,
+                G_geom0=G_geom,
+                G_defo0=G_defo,
                 tbase=tbase,
                 date_flag=date_flag,
                 phase_velocity=phase_velocity,
@@ -412,10 +510,10 @@ def correct_dem_error_patch(G_defo, ts_file, geom_file=None, box=None,
 
             # assemble
             delta_z[idx] = delta_z_i
-            ts_cor[:, idx] = ts_cor_i.flatten()
-            ts_res[:, idx] = ts_res_i.flatten()
+            ts_cor[:, idx] = ts_cor_i
+            ts_res[:, idx] = ts_res_i
 
-            prog_bar.update(i+1, every=2000, suffix=f'{i+1}/{num_pixel2inv}')
+            prog_bar.update(i1, suffix=f'{i1}/{num_pixel2inv}')
         prog_bar.close()
     del ts_data, pbase
 
@@ -490,12 +588,13 @@ def correct_dem_error(inps):
         if 'bperp' in geom_obj.datasetNames:
             num_epoch += num_date
 
-    # split in row/line direction based on the input memory limit
-    num_box = int(np.ceil((num_epoch * length * width * 4) * 2.5 / (inps.maxMemory * 1024**3)))
-    box_list, num_box = cluster.split_box2sub_boxes(
+    # split into strips / tiles aligned with the chunks of the time-series, based on the input memory limit
+    max_memory = inps.maxMemory / cluster.BoxPipeline.num_box_in_memory
+    max_num_pixel = int(max_memory * 1024**3 / (num_epoch * 4 * 2.5))
+    box_list, num_box = cluster.split_box2tiles(
         box=(0, 0, width, length),
-        num_split=num_box,
-        dimension='y',
+        max_num_pixel=max_num_pixel,
+        chunk_shape=readfile.get_hdf5_chunk_shape(inps.ts_file, 'timeseries'),
     )
 
     # 3.2 prepare the input arguments for *_patch()
@@ -507,49 +606,13 @@ def correct_dem_error(inps):
         'phase_velocity' : inps.phaseVelocity,
     }
 
-    # 3.3 invert / write block-by-block
-    for i, box in enumerate(box_list):
-        box_wid = box[2] - box[0]
-        box_len = box[3] - box[1]
-        if num_box > 1:
-            print(f'\n------- processing patch {i+1} out of {num_box} --------------')
-            print(f'box width:  {box_wid}')
-            print(f'box length: {box_len}')
-
-        # update box argument in the input data
-        data_kwargs['box'] = box
-
-        # invert
-        if not inps.cluster:
-            # non-parallel
-            delta_z, ts_cor, ts_res = correct_dem_error_patch(**data_kwargs)[:-1]
-
-        else:
-            # parallel
-            print('\n\n------- start parallel processing using Dask -------')
-
-            # initiate the output data
-            delta_z = np.zeros((box_len, box_wid), dtype=np.float32)
-            ts_cor = np.zeros((num_date, box_len, box_wid), dtype=np.float32)
-            ts_res = np.zeros((num_date, box_len, box_wid), dtype=np.float32)
-
-            # initiate dask cluster and client
-            cluster_obj = cluster.DaskCluster(inps.cluster, inps.numWorker, config_name=inps.config)
-            cluster_obj.open()
-
-            # run dask
-            delta_z, ts_cor, ts_res = cluster_obj.run(
-                func=correct_dem_error_patch,
-                func_data=data_kwargs,
-                results=[delta_z, ts_cor, ts_res],
-            )
-
-            # close dask cluster and client
-            cluster_obj.close()
+    # read the next block in the background, for non-parallel processing only
+    # as the workers read the data by themselves in parallel processing
+    read_kwargs = {key: data_kwargs[key] for key in ['ts_file', 'geom_file']}
+    read_func = None if inps.cluster else read_dem_error_patch
 
-            print('------- finished parallel processing -------\n\n')
-
-        # write the block to disk
+    def write_patch(box, delta_z, ts_cor, ts_res):
+        """write the block to disk"""
         # with 3D block in [z0, z1, y0, y1, x0, x1]
         # and  2D block in         [y0, y1, x0, x1]
 
@@ -577,6 +640,57 @@ def correct_dem_error(inps):
             datasetName='timeseries',
             block=block)
 
+    # 3.3 invert / write block-by-block
+    # with reading the next block and writing the previous block in the background
+    with cluster.BoxPipeline(box_list, read_func, read_kwargs, write_patch) as pipe:
+        for i, box, patch_data in pipe:
+            box_wid = box[2] - box[0]
+            box_len = box[3] - box[1]
+            if num_box > 1:
+                print(f'\n------- processing patch {i+1} out of {num_box} --------------')
+                print(f'box width:  {box_wid}')
+                print(f'box length: {box_len}')
+
+            # update box argument in the input data
+            data_kwargs['box'] = box
+
+            # invert
+            if not inps.cluster:
+                # non-parallel
+                delta_z, ts_cor, ts_res = correct_dem_error_patch(**data_kwargs, patch_data=patch_data)[:-1]
+
+            else:
+                # parallel
+                print(f'\n\n------- start parallel processing using {inps.cluster} cluster -------')
+
+                # finish writing the previous block first,
+                # to avoid the opened output files being inherited by the worker processes
+                pipe.wait()
+
+                # initiate the output data
+                delta_z = np.zeros((box_len, box_wid), dtype=np.float32)
+                ts_cor = np.zeros((num_date, box_len, box_wid), dtype=np.float32)
+                ts_res = np.zeros((num_date, box_len, box_wid), dtype=np.float32)
+
+                # initiate cluster (and client for dask)
+                cluster_obj = cluster.init_cluster(inps.cluster, inps.numWorker, config_name=inps.config)
+                cluster_obj.open()
+
+                # run
+                delta_z, ts_cor, ts_res = cluster_obj.run(
+                    func=correct_dem_error_patch,
+                    func_data=data_kwargs,
+                    results=[delta_z, ts_cor, ts_res],
+                )
+
+                # close cluster (and client for dask)
+                cluster_obj.close()
+
+                print('------- finished parallel processing -------\n\n')
+
+            # write the block to disk in the background
+            pipe.write(box, delta_z, ts_cor, ts_res)
+
     # roll back to the original number of threads
     cluster.roll_back_num_threads(num_threads_dict)
 
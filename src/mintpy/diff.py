@@ -55,7 +55,7 @@ def check_reference(atr1, atr2):
     return ref_date, ref_y, ref_x
 
 
-def diff_timeseries(file1, file2, out_file, force_diff=False, max_num_pixel=2e8):
+def diff_timeseries(file1, file2, out_file, force_diff=False, max_num_pixel=2e8, lazy=False):
     """Calculate the difference between two time-series files.
 
     Parameters: file1         - str, path of file1
@@ -63,8 +63,14 @@ def diff_timeseries(file1, file2, out_file, force_diff=False, max_num_pixel=2e8)
                 out_file      - str, path of output file
                 force_diff    - bool, overwrite existing output file
                 max_num_pixel - float, maximum number of pixels for each block
+                lazy          - bool, write a correction stack file without writing the data,
+                                which is composed on the fly while reading
     Returns:    out_file      - str, path of output file
     """
+    if lazy:
+        if readfile.read_attribute(file2)['FILE_TYPE'] == 'timeseries':
+            return writefile.write_correction_stack(out_file, file1, file2, force_diff=force_diff)
+        print('WARNING: --lazy is supported for timeseries file2 ONLY, ignore it and continue.')
 
     # basic info
     atr1 = readfile.read_attribute(file1)
@@ -363,7 +369,7 @@ def diff_ifgram_and_timeseries(unw_file, ts_file, cor_file):
     return cor_file
 
 
-def diff_file(file1, file2, out_file, force_diff=False, max_num_pixel=2e8):
+def diff_file(file1, file2, out_file, force_diff=False, max_num_pixel=2e8, lazy=False):
     """calculate/write file1 - file2
 
     Parameters: file1         - str, path of file1
@@ -371,6 +377,7 @@ def diff_file(file1, file2, out_file, force_diff=False, max_num_pixel=2e8):
                 out_file      - str, path of output file
                 force_diff    - bool, overwrite existing output file
                 max_num_pixel - float, maximum number of pixels for each block
+                lazy          - bool, write a correction stack file for two time-series files
     """
     start_time = time.time()
     print(f'{file1} - {file2} --> {out_file}')
@@ -387,7 +394,7 @@ def diff_file(file1, file2, out_file, force_diff=False, max_num_pixel=2e8):
             print('If the first file is timeseries, the following file must be either timeseries or velocity.')
             raise Exception('Input multiple dataset files are not the same file type!')
         if k2 in ['timeseries', 'giantTimeseries']:
-            diff_timeseries(file1, file2[0], out_file, force_diff, max_num_pixel)
+            diff_timeseries(file1, file2[0], out_file, force_diff, max_num_pixel, lazy=lazy)
         elif k2 == 'velocity':
             diff_timeseries_and_velocity(file1, file2[0], out_file, max_num_pixel)
 
@@ -10,6 +10,7 @@
 
 import os
 import time
+from collections import OrderedDict
 
 import h5py
 import numpy as np
@@ -54,6 +55,10 @@ def run_or_skip(inps):
             flag = 'run'
             print(f'1) output file {inps.outfile[0]} is NOT fully written.')
 
+        elif is_box_progress_found(inps.outfile[0], 'timeseries'):
+            flag = 'run'
+            print(f'1) output file {inps.outfile[0]} is NOT fully written (in block-by-block progress).')
+
         else:
             print(f'1) output files already exist: {inps.outfile}.')
             # check modification time
@@ -87,7 +92,226 @@ def run_or_skip(inps):
     return flag
 
 
+def box_list2str(box_list):
+    """Convert a list of boxes into a str, e.g. "0,0,500,100;0,100,500,200"."""
+    return ';'.join(','.join(str(x) for x in box) for box in box_list)
+
+
+def is_box_progress_found(fname, ds_name):
+    """Check if the block-by-block progress is recorded in the dataset, i.e. not fully written."""
+    with h5py.File(fname, 'r') as f:
+        return ds_name in f.keys() and 'NUM_BOX_DONE' in f[ds_name].attrs.keys()
+
+
+def write_box_progress(fnames, ds_names, box_list, num_box_done=None):
+    """Record the number of finished boxes in the attributes of the output datasets.
+
+    Parameters: fnames       - list of str, output files
+                ds_names     - list of str, dataset name for each of the output files
+                box_list     - list of tuple(4), boxes to be processed in sequence
+                num_box_done - int, number of finished boxes,
+                               None to remove the progress after all boxes are finished.
+    """
+    box_str = box_list2str(box_list)
+    for fname, ds_name in zip(fnames, ds_names):
+        with h5py.File(fname, 'r+') as f:
+            ds = f[ds_name]
+            if num_box_done is None:
+                for key in ['BOX_LIST', 'NUM_BOX_DONE']:
+                    if key in ds.attrs.keys():
+                        ds.attrs.pop(key)
+            else:
+                ds.attrs['BOX_LIST'] = box_str
+                ds.attrs['NUM_BOX_DONE'] = str(num_box_done)
+
+
+def read_box_progress(inps, fnames, ds_names, box_list):
+    """Read the number of finished boxes from a previous (interrupted) run to resume from.
+
+    Resume only if 1) all output files exist with the same list of boxes,
+    2) they are newer than the input dataset and 3) the key configurations are the same.
+
+    Parameters: inps         - namespace, input arguments
+                fnames       - list of str, output files
+                ds_names     - list of str, dataset name for each of the output files
+                box_list     - list of tuple(4), boxes to be processed in sequence
+    Returns:    num_box_done - int, number of boxes finished in ALL output files
+    """
+    if not all(os.path.isfile(i) for i in fnames):
+        return 0
+
+    # check the progress
+    box_str = box_list2str(box_list)
+    num_box_done = len(box_list)
+    for fname, ds_name in zip(fnames, ds_names):
+        with h5py.File(fname, 'r') as f:
+            if ds_name not in f.keys() or f[ds_name].attrs.get('BOX_LIST', '') != box_str:
+                return 0
+            num_box_done = min(num_box_done, int(f[ds_name].attrs.get('NUM_BOX_DONE', 0)))
+
+    # check modification time
+    with h5py.File(inps.ifgramStackFile, 'r') as f:
+        ti = float(f[inps.obsDatasetName].attrs.get('MODIFICATION_TIME', os.path.getmtime(inps.ifgramStackFile)))
+    if ti > min(os.path.getmtime(i) for i in fnames):
+        return 0
+
+    # check configuration
+    atr_ts = readfile.read_attribute(fnames[0])
+    if any(str(vars(inps)[key]) != atr_ts.get(key_prefix+key, 'None') for key in config_keys):
+        return 0
+
+    return num_box_done
+
+
+def get_inv_state_file(ts_file):
+    """Get the inversion state file (weight, normal equations and residual statistics) for the incremental mode,
+    next to the time-series file."""
+    return f'{os.path.splitext(ts_file)[0]}InvState.h5'
+
+
+def check_inv_state(inps, stack_obj, state_file):
+    """Check if the inversion state of the previous run could be updated with the new pairs.
+
+    The incremental inversion is applicable only if:
+    1) the inversion state file exists with the same size, reference point and key configurations,
+    2) all previous pairs are kept with the same reference phase and
+    3) all previous dates are kept as the leading dates, thus, the same design matrix
+       for the previous pairs, with zeros for the new dates.
+
+    Parameters: inps       - namespace, input arguments, with refPhase of the current pairs
+                stack_obj  - ifgramStack object
+                state_file - str, inversion state file
+    Returns:    flag       - bool, True to update the previous inversion state
+    """
+    if not os.path.isfile(state_file):
+        print(f'incremental inversion: NO inversion state file found: {state_file}.')
+        return False
+
+    with h5py.File(state_file, 'r') as f:
+        atr = dict(f.attrs)
+        date_list0 = [x.decode('utf8') for x in f['date'][:]]
+        date12_list0 = [x.decode('utf8') for x in f['date12'][:]]
+        ref_phase0 = f['refPhase'][:]
+        ds_names0 = list(f.keys())
+
+    date_list = stack_obj.get_date_list(dropIfgram=True)
+    date12_list = stack_obj.get_date12_list(dropIfgram=True)
+    keys = [key for key in config_keys if key != 'numIfgram']
+    meta_keys = ['LENGTH', 'WIDTH', 'REF_Y', 'REF_X']
+
+    msg = ''
+    if any(x not in ds_names0 for x in ['weight', 'rhs', 'timeseries', 'invQualitySum', 'invQualityGrad']):
+        msg = 'NOT all the datasets of the inversion state are found'
+    elif any(str(vars(inps)[key]) != atr.get(key_prefix+key, 'None') for key in keys):
+        msg = f'NOT all key configuration parameters are the same: {keys}'
+    elif any(atr.get(key, None) != stack_obj.metadata.get(key, None) for key in meta_keys):
+        msg = f'NOT all the metadata are the same: {meta_keys}'
+    elif date_list[:len(date_list0)] != date_list0:
+        msg = 'previous dates are NOT the leading dates of the current network'
+    elif any(x not in date12_list for x in date12_list0):
+        msg = 'NOT all previous pairs are kept in the current network'
+    else:
+        idx0 = [date12_list.index(x) for x in date12_list0]
+        if not np.allclose(inps.refPhase[idx0], ref_phase0):
+            msg = 'reference phase of the previous pairs changed'
+        else:
+            # design matrix of the previous pairs
+            A0, B0 = ifgramStack.get_design_matrix4timeseries(date12_list0)[:2]
+            A, B = ifgramStack.get_design_matrix4timeseries(date12_list)[:2]
+            G0 = B0 if inps.minNormVelocity else A0
+            G = (B if inps.minNormVelocity else A)[idx0]
+            if not (np.allclose(G[:, :G0.shape[1]], G0) and np.all(G[:, G0.shape[1]:] == 0)):
+                msg = 'design matrix of the previous pairs changed'
+
+    if msg:
+        print(f'incremental inversion: {msg}.')
+        return False
+
+    num_new = len(date12_list) - len(date12_list0)
+    print(f'incremental inversion: update the inversion state with {num_new} new pairs.')
+    return True
+
+
 ################################# Time-series Estimator ###################################
+class PinvCache:
+    """Bounded LRU cache of the pseudo-inverse of the design matrix, for the un-weighted inversion.
+
+    Pixels with the same valid-observation pattern share the same design matrix after skip_invalid_obs(),
+    and there are usually only a handful of distinct patterns, thus, the pseudo-inverse (via SVD)
+    is calculated once per pattern and re-used via a matrix product, for all groups and patches.
+
+    The cache is keyed by the valid-observation bitmask, the design matrix and the cut-off ratio.
+
+    Example:    Gplus, rank = pinv_cache.get(B, flag, rcond=1e-5)
+                X = np.dot(Gplus, y[flag])
+    """
+
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self.cache = OrderedDict()
+        self.num_hit = 0
+        self.num_miss = 0
+
+    def get(self, G, flag, rcond=1e-5):
+        """Get the pseudo-inverse of G[flag] and its rank.
+
+        Parameters: G     - 2D np.ndarray in size of (num_pair, num_par), design matrix of all pairs
+                    flag  - 1D np.ndarray of bool in size of (num_pair), valid observations
+                    rcond - float, cut-off ratio of small singular values of G[flag]
+        Returns:    Gplus - 2D np.ndarray in size of (num_par, num_valid_pair), pseudo-inverse in float64
+                    rank  - int, rank of G[flag]
+        """
+        key = (np.packbits(flag).tobytes(), G.shape, G.tobytes(), rcond)
+        if key in self.cache:
+            self.num_hit += 1
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        self.num_miss += 1
+        u, sv, vh = np.linalg.svd(G[flag].astype(np.float64), full_matrices=False)
+        keep = sv > rcond * sv[0] if sv.size > 0 else sv > 0
+        Gplus = np.dot(vh[keep].T / sv[keep], u[:, keep].T)
+        self.cache[key] = (Gplus, int(np.sum(keep)))
+        if len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+        return self.cache[key]
+
+    def reset_stats(self):
+        self.num_hit = 0
+        self.num_miss = 0
+
+    def print_stats(self):
+        if self.num_hit + self.num_miss > 0:
+            print(f'cached pseudo-inverse of design matrix: {self.num_hit} hits, {self.num_miss} misses, '
+                  f'{len(self.cache)} / {self.max_size} in cache')
+
+
+# shared within each (worker) process
+pinv_cache = PinvCache()
+
+
+def lstsq_cached(G, flag, y, rcond=1e-5):
+    """Un-weighted least squares with the cached pseudo-inverse of the design matrix.
+
+    Same as linalg.lstsq(G[flag], y, cond=rcond)[:2], i.e. the min-norm solution,
+    with the sum of squared residuals returned for full-rank and over-determined systems only.
+
+    Parameters: G     - 2D np.ndarray in size of (num_pair, num_par), design matrix of all pairs
+                flag  - 1D np.ndarray of bool in size of (num_pair), valid observations
+                y     - 2D np.ndarray in size of (num_valid_pair, num_pixel), valid observations
+                rcond - float, cut-off ratio of small singular values
+    Returns:    X     - 2D np.ndarray in size of (num_par, num_pixel), solution
+                e2    - 1D np.ndarray in size of (num_pixel), sum of squared residuals, or empty
+    """
+    Gplus, rank = pinv_cache.get(G, flag, rcond=rcond)
+    X = np.dot(Gplus, y)
+    if rank == G.shape[1] and np.sum(flag) > rank:
+        e2 = np.sum(np.square(y - np.dot(G[flag], X)), axis=0)
+    else:
+        e2 = np.array([])
+    return X, e2
+
+
 def estimate_timeseries(A, B, y, tbase_diff, weight_sqrt=None, min_norm_velocity=True,
                         rcond=1e-5, min_redundancy=1., inv_quality_name='temporalCoherence',
                         print_msg=True):
@@ -156,6 +380,9 @@ def estimate_timeseries(A, B, y, tbase_diff, weight_sqrt=None, min_norm_velocity
     num_inv_obs = 0
 
     ##### skip invalid phase/offset value [NaN]
+    # with the valid-observation bitmask and the design matrices of all pairs kept for the cached solution
+    flag = ~np.isnan(y[:, 0])
+    G0 = B if min_norm_velocity else A
     y, [A, B, weight_sqrt] = skip_invalid_obs(y, mat_list=[A, B, weight_sqrt])
 
     # check 1 - network redundancy: skip inversion if < threshold
@@ -182,7 +409,7 @@ def estimate_timeseries(A, B, y, tbase_diff, weight_sqrt=None, min_norm_velocity
                                      np.multiply(y, weight_sqrt),
                                      cond=rcond)[:2]
             else:
-                X, e2 = linalg.lstsq(B, y, cond=rcond)[:2]
+                X, e2 = lstsq_cached(G0, flag, y, rcond=rcond)
 
             # calc inversion quality
             if inv_quality_name != 'no':
@@ -202,7 +429,7 @@ def estimate_timeseries(A, B, y, tbase_diff, weight_sqrt=None, min_norm_velocity
                                      np.multiply(y, weight_sqrt),
                                      cond=rcond)[:2]
             else:
-                X, e2 = linalg.lstsq(A, y, cond=rcond)[:2]
+                X, e2 = lstsq_cached(G0, flag, y, rcond=rcond)
 
             # calc inversion quality
             if inv_quality_name != 'no':
@@ -223,6 +450,139 @@ def estimate_timeseries(A, B, y, tbase_diff, weight_sqrt=None, min_norm_velocity
     return ts, inv_quality, num_inv_obs
 
 
+def estimate_timeseries_batch(A, B, y, tbase_diff, weight_sqrt=None, min_norm_velocity=True,
+                              rcond=1e-5, min_redundancy=1., inv_quality_name='temporalCoherence',
+                              min_num_pixel=8, max_num_element=1e7, print_msg=True):
+    """Estimate time-series for a group of pixels sharing the same valid-observation pattern.
+
+    The weighted least squares problem is solved for all pixels at once via the stacked
+    normal equations, which are factorized with the batched Cholesky decomposition of NumPy:
+        (G^T W G) X = G^T W y, for each pixel
+    Pixels are processed in chunks to limit the size of the (num_pixel, num_date-1, num_pair)
+    weighted design matrix to max_num_element. For groups with less than min_num_pixel pixels,
+    or a rank deficient design matrix (min-norm solution required), or a failed factorization,
+    it falls back to the pixel-by-pixel estimate_timeseries() with its SVD-based lstsq solution.
+
+    Parameters: A/B/y/tbase_diff/weight_sqrt/min_norm_velocity/rcond/min_redundancy/inv_quality_name
+                                  - same as estimate_timeseries(), except that all pixels in y
+                                    must share the same pattern of NaN values.
+                min_num_pixel     - int, min number of pixels to use the batched solver
+                max_num_element   - float, max number of elements of the weighted design matrix per chunk
+    Returns:    ts                - 2D np.ndarray in size of (num_date, num_pixel), phase time-series
+                inv_quality       - 1D np.ndarray in size of (num_pixel), temporal coherence / residual
+                num_inv_obs       - 1D np.ndarray in size of (num_pixel), number of observations used
+    """
+
+    y = y.reshape(A.shape[0], -1)
+    if weight_sqrt is not None:
+        weight_sqrt = weight_sqrt.reshape(A.shape[0], -1)
+    num_date = A.shape[1] + 1
+    num_pixel = y.shape[1]
+
+    # initial output value
+    ts = np.zeros((num_date, num_pixel), dtype=np.float32)
+    inv_quality = np.zeros(num_pixel, dtype=np.float32)
+    if inv_quality_name == 'residual':
+        inv_quality *= np.nan
+    num_inv_obs = np.zeros(num_pixel, dtype=np.int16)
+
+    # skip invalid phase/offset value [NaN]
+    y, [A, B, weight_sqrt] = skip_invalid_obs(y, mat_list=[A, B, weight_sqrt])
+
+    # check 1 - network redundancy: skip inversion if < threshold
+    if np.min(np.sum(A != 0., axis=0)) < min_redundancy:
+        return ts, inv_quality, num_inv_obs
+
+    # un-weighted: one lstsq for all pixels, as they share the same design matrix
+    if weight_sqrt is None:
+        ts, inv_quality[:], num_inv_obs[:] = estimate_timeseries(
+            A, B, y, tbase_diff,
+            weight_sqrt=None,
+            min_norm_velocity=min_norm_velocity,
+            rcond=rcond,
+            min_redundancy=min_redundancy,
+            inv_quality_name=inv_quality_name,
+            print_msg=print_msg)
+        return ts, inv_quality, num_inv_obs
+
+    G = B if min_norm_velocity else A
+    num_obs = G.shape[0]
+
+    # check 2 - small group / rank deficiency: pixel-by-pixel lstsq
+    if num_pixel < min_num_pixel or np.linalg.matrix_rank(G) < G.shape[1]:
+        for i in range(num_pixel):
+            (ts[:, i:i+1],
+             inv_quality[i:i+1],
+             num_inv_obs[i:i+1]) = estimate_timeseries(
+                A, B, y[:, i], tbase_diff,
+                weight_sqrt=weight_sqrt[:, i],
+                min_norm_velocity=min_norm_velocity,
+                rcond=rcond,
+                min_redundancy=min_redundancy,
+                inv_quality_name=inv_quality_name,
+                print_msg=False)
+        return ts, inv_quality, num_inv_obs
+
+    ##### invert time-series in chunks of pixels
+    G = G.astype(np.float64)
+    chunk_size = max(1, int(max_num_element / G.size))
+    num_chunk = int(np.ceil(num_pixel / chunk_size))
+    if print_msg and num_chunk > 1:
+        print(f'solving normal equations in chunks of {chunk_size} pixels: {num_chunk} chunks in total ...')
+
+    for i in range(num_chunk):
+        c0 = i * chunk_size
+        c1 = min((i + 1) * chunk_size, num_pixel)
+        yi = y[:, c0:c1].astype(np.float64)
+
+        # stacked normal equations in size of (num_pixel, num_date-1, num_date-1)
+        # with G^T W in size of (num_pixel, num_date-1, num_pair)
+        wi = weight_sqrt[:, c0:c1].astype(np.float64)
+        GwT = G.T[np.newaxis, :, :] * np.square(wi).T[:, np.newaxis, :]
+        N = np.matmul(GwT, G)
+        rhs = np.matmul(GwT, yi.T[:, :, np.newaxis])
+        del GwT
+
+        try:
+            # Cholesky: N = L L^T --> L z = rhs, L^T X = z
+            L = np.linalg.cholesky(N)
+            X = np.linalg.solve(np.swapaxes(L, 1, 2), np.linalg.solve(L, rhs))
+            X = X[:, :, 0].T
+        except np.linalg.LinAlgError:
+            # non positive-definite normal matrix: pixel-by-pixel lstsq
+            for j in range(c0, c1):
+                (ts[:, j:j+1],
+                 inv_quality[j:j+1],
+                 num_inv_obs[j:j+1]) = estimate_timeseries(
+                    A, B, y[:, j], tbase_diff,
+                    weight_sqrt=weight_sqrt[:, j],
+                    min_norm_velocity=min_norm_velocity,
+                    rcond=rcond,
+                    min_redundancy=min_redundancy,
+                    inv_quality_name=inv_quality_name,
+                    print_msg=False)
+            continue
+
+        # calc inversion quality using the un-weighted residual
+        if inv_quality_name != 'no':
+            e = yi - np.dot(G, X)
+            if inv_quality_name == 'temporalCoherence':
+                inv_quality[c0:c1] = np.abs(np.sum(np.exp(1j*e), axis=0)) / num_obs
+            elif inv_quality_name == 'residual':
+                inv_quality[c0:c1] = np.sqrt(np.sum(np.abs(e) ** 2, axis=0))
+            else:
+                raise ValueError(f'un-recognized inversion quality name: {inv_quality_name}')
+
+        # assemble time-series
+        if min_norm_velocity:
+            ts[1:, c0:c1] = np.cumsum(X * tbase_diff, axis=0)
+        else:
+            ts[1:, c0:c1] = X
+        num_inv_obs[c0:c1] = num_obs
+
+    return ts, inv_quality, num_inv_obs
+
+
 def estimate_timeseries_cov(G, y, y_std, rcond=1e-5, min_redundancy=1.0):
     """Estimate the time-series covariance from network of STD via linear propagation.
     Pixel by pixel only.
@@ -261,6 +621,187 @@ def estimate_timeseries_cov(G, y, y_std, rcond=1e-5, min_redundancy=1.0):
     return ts_cov
 
 
+def estimate_timeseries_cov_batch(G, y, y_std, rcond=1e-5, min_redundancy=1.0, max_num_element=1e7):
+    """Estimate the time-series covariance for a group of pixels sharing the same valid-observation pattern.
+
+    Same as estimate_timeseries_cov(), but for all pixels at once: the pseudo-inverse of the
+    design matrix is calculated once and the diagonal network covariance is propagated via
+    the stacked matrix product Gplus * diag(y_std^2) * Gplus^T, in chunks of pixels to limit
+    the size of the (num_pixel, num_date-1, num_pair) intermediate array to max_num_element.
+
+    Parameters: G      - 2D np.ndarray in size of (num_pair, num_date-1), design matrix
+                y      - 2D np.ndarray in size of (num_pair, num_pixel), stack of obs
+                y_std  - 2D np.ndarray in size of (num_pair, num_pixel), stack of obs std. dev.
+    Returns:    ts_cov - 3D np.ndarray in size of (num_date-1, num_date-1, num_pixel), time-series covariance
+    """
+    y = y.reshape(G.shape[0], -1)
+    y_std = y_std.reshape(G.shape[0], -1)
+    num_pixel = y.shape[1]
+
+    # initial output value
+    ts_cov = np.zeros((G.shape[1], G.shape[1], num_pixel), dtype=np.float32)
+
+    # skip invalid phase/offset value [NaN]
+    y, [G, y_std] = skip_invalid_obs(y, mat_list=[G, y_std])
+
+    # check network redundancy: skip calculation if < threshold
+    if np.min(np.sum(G != 0., axis=0)) < min_redundancy:
+        return ts_cov
+
+    # linear propagation in chunks of pixels
+    Gplus = linalg.pinv(G)
+    chunk_size = max(1, int(max_num_element / Gplus.size))
+    for c0 in range(0, num_pixel, chunk_size):
+        c1 = min(c0 + chunk_size, num_pixel)
+        # Gplus * diag(y_std^2) in size of (num_pixel, num_date-1, num_pair)
+        GplusW = Gplus[np.newaxis, :, :] * np.square(y_std[:, c0:c1]).T[:, np.newaxis, :]
+        ts_cov[:, :, c0:c1] = np.matmul(GplusW, Gplus.T).transpose(1, 2, 0)
+        del GplusW
+
+    return ts_cov
+
+
+def get_obs_weight(y, weight_sqrt=None):
+    """Get the weight of observations, with the no-data value (NaN) for the invalid observations.
+
+    Parameters: y           - 2D np.ndarray in size of (num_pair, num_pixel), phase/offset with no-data value: NaN
+                weight_sqrt - 2D np.ndarray in size of (num_pair, num_pixel), square root of weight, or None
+    Returns:    weight      - 2D np.ndarray in float32 in size of (num_pair, num_pixel)
+    """
+    if weight_sqrt is None:
+        weight = np.ones(y.shape, dtype=np.float32)
+    else:
+        weight = np.square(weight_sqrt, dtype=np.float32)
+    weight[np.isnan(y)] = np.nan
+    return weight
+
+
+def update_normal_equation(norm_mat, rhs, G, weight, y=None):
+    """Add observations into the stacked normal equations in place, pair by pair,
+    a.k.a. the sequential least squares, with the no-data value (NaN) skipped pixelwisely.
+
+    Only the non-zero elements of the design matrix (the two dates / the intervals in between)
+    are touched for each pair, thus, the cost scales with the number of input pairs.
+
+    Parameters: norm_mat - 3D np.ndarray in size of (num_pixel, num_par, num_par), normal matrix G^T W G
+                rhs      - 2D np.ndarray in size of (num_pixel, num_par), right-hand side G^T W y, or None
+                G        - 2D np.ndarray in size of (num_pair, num_par), design matrix A or B of the pairs
+                weight   - 2D np.ndarray in size of (num_pair, num_pixel), weight with no-data value: NaN
+                y        - 2D np.ndarray in size of (num_pair, num_pixel), phase/offset,
+                           None to update the normal matrix only.
+    Returns:    norm_mat - 3D np.ndarray in size of (num_pixel, num_par, num_par)
+                rhs      - 2D np.ndarray in size of (num_pixel, num_par), or None
+    """
+    weight = weight.reshape(G.shape[0], -1)
+    for i in range(G.shape[0]):
+        # weight, with zero for the no-data value
+        w = np.nan_to_num(weight[i].astype(np.float64), nan=0.)
+        idx = np.flatnonzero(G[i])
+        g = G[i, idx].astype(np.float64)
+        norm_mat[:, idx[:, np.newaxis], idx] += w[:, np.newaxis, np.newaxis] * np.outer(g, g)
+
+        if rhs is not None and y is not None:
+            wy = w * np.nan_to_num(y[i].astype(np.float64), nan=0.)
+            rhs[:, idx] += wy[:, np.newaxis] * g
+
+    return norm_mat, rhs
+
+
+def solve_normal_equation(norm_mat, rhs, rcond=1e-5, M=None):
+    """Solve the stacked normal equations (G^T W G) X = G^T W y for all pixels at once.
+
+    It uses the batched Cholesky decomposition, and falls back to the pseudo-inverse
+    for singular normal matrices, e.g. networks with multiple subsets, which gives the
+    same min-norm solution as the SVD-based linalg.lstsq() in estimate_timeseries(),
+    as the eigenvalues of the normal matrix are the squares of the singular values of
+    the (weighted) design matrix.
+
+    Parameters: norm_mat - 3D np.ndarray in size of (num_pixel, num_par, num_par), normal matrix
+                rhs      - 2D np.ndarray in size of (num_pixel, num_par), right-hand side
+                rcond    - float, cut-off ratio of small singular values of the design matrix
+                M        - 2D np.ndarray in size of (num_par, num_par), re-parameterization X = M V,
+                           to minimize the norm of V (e.g. the velocity) instead of X (e.g. the phase)
+                           for the singular normal matrices, None for X.
+    Returns:    X        - 2D np.ndarray in size of (num_par, num_pixel), solution
+    """
+    try:
+        # Cholesky: N = L L^T --> L z = rhs, L^T X = z
+        L = np.linalg.cholesky(norm_mat)
+        X = np.linalg.solve(np.swapaxes(L, 1, 2), np.linalg.solve(L, rhs[:, :, np.newaxis]))
+    except np.linalg.LinAlgError:
+        if M is None:
+            X = np.matmul(np.linalg.pinv(norm_mat, rcond=rcond**2, hermitian=True), rhs[:, :, np.newaxis])
+        else:
+            # (G M)^T W (G M) V = (G M)^T W y
+            norm_mat = np.matmul(np.matmul(M.T, norm_mat), M)
+            rhs = np.matmul(rhs, M)[:, :, np.newaxis]
+            V = np.matmul(np.linalg.pinv(norm_mat, rcond=rcond**2, hermitian=True), rhs)
+            X = np.matmul(M, V)
+    return X[:, :, 0].T
+
+
+def calc_inv_quality_stats(G, X, y, inv_quality_name='temporalCoherence'):
+    """Calculate the statistics of the residual, to update the inversion quality with new pairs.
+
+    For temporal coherence: the sum of the residual phasors and its product with G, i.e.
+        sum(exp(j*e)) and G^T exp(j*e);
+    for residual: the sum of the squared residual and its product with G, i.e.
+        sum(e**2) and G^T e;
+    with e = y - G X for the valid observations only.
+
+    Parameters: G                - 2D np.ndarray in size of (num_pair, num_par), design matrix A
+                X                - 2D np.ndarray in size of (num_par, num_pixel), solution
+                y                - 2D np.ndarray in size of (num_pair, num_pixel), phase/offset with no-data value: NaN
+                inv_quality_name - str, temporalCoherence or residual
+    Returns:    q_sum            - 1D np.ndarray in size of (num_pixel,), complex64 / float32
+                q_grad           - 2D np.ndarray in size of (num_par, num_pixel), complex64 / float32
+    """
+    e = y - np.dot(G, X)
+    if inv_quality_name == 'temporalCoherence':
+        e = np.where(np.isnan(e), 0, np.exp(1j*e)).astype(np.complex64)
+        q_sum = np.sum(e, axis=0)
+    else:
+        e = np.nan_to_num(e, nan=0.).astype(np.float32)
+        q_sum = np.sum(e ** 2, axis=0)
+    q_grad = np.dot(G.T.astype(e.dtype), e)
+    return q_sum, q_grad
+
+
+def update_inv_quality_stats(q_sum, q_grad, G, flag, dX, inv_quality_name='temporalCoherence'):
+    """Update the residual statistics of calc_inv_quality_stats() to the updated solution X + dX,
+    without the observations, with e' = e - G dX.
+
+    It is exact for residual, with the 2nd order term dX^T G^T G dX;
+    and in the 2nd order Taylor expansion of exp(-j*G*dX) for temporal coherence,
+    with the phasor of each pair approximated by their mean in the 2nd order term.
+
+    Parameters: q_sum            - 1D np.ndarray in size of (num_pixel,)
+                q_grad           - 2D np.ndarray in size of (num_par, num_pixel)
+                G                - 2D np.ndarray in size of (num_pair, num_par), design matrix A
+                flag             - 2D np.ndarray in bool in size of (num_pair, num_pixel), valid observations
+                dX               - 2D np.ndarray in size of (num_par, num_pixel), update of the solution
+                inv_quality_name - str, temporalCoherence or residual
+    Returns:    q_sum / q_grad   - the same as the input
+    """
+    dtype = q_grad.dtype
+
+    # residual update of the valid observations
+    d = np.dot(G, dX) * flag
+    d2 = np.sum(d ** 2, axis=0)
+    Gd = np.dot(G.T, d)
+
+    if inv_quality_name == 'temporalCoherence':
+        # mean phasor of the valid observations
+        num_obs = np.sum(flag, axis=0)
+        q_mean = q_sum / np.maximum(num_obs, 1)
+        q_sum = q_sum - 1j * np.sum(q_grad * dX, axis=0) - 0.5 * q_mean * d2
+        q_grad = q_grad - 1j * q_mean * Gd - 0.5 * q_mean * np.dot(G.T, d ** 2)
+    else:
+        q_sum = q_sum - 2 * np.sum(q_grad * dX, axis=0) + d2
+        q_grad = q_grad - Gd
+    return q_sum.astype(dtype), q_grad.astype(dtype)
+
+
 def skip_invalid_obs(obs, mat_list):
     """Skip invalid observations in the stack of phase/offset and update corresponding matrices.
     This applies to the pixel-wised inversion only, because the region-wised inversion has valid obs in all pairs.
@@ -284,6 +825,31 @@ def skip_invalid_obs(obs, mat_list):
     return obs, mat_list
 
 
+def group_pixels_by_valid_obs(obs):
+    """Group pixels by their pattern of valid (non-NaN) observations.
+
+    Pixels in the same group share the same design matrix after skip_invalid_obs(),
+    thus, could be inverted together.
+
+    Parameters: obs       - 2D np.ndarray in size of (num_pair, num_pixel),
+                            observations (phase / offset) with no-data value: NaN.
+    Returns:    idx_list  - list of 1D np.ndarray of int, column indices of pixels in each group,
+                            sorted by the group size in descending order.
+    """
+    # pack the valid-obs mask into bytes, one row per pixel
+    flag = np.packbits(~np.isnan(obs), axis=0).T
+    flag = np.ascontiguousarray(flag).view(np.dtype((np.void, flag.shape[1]))).flatten()
+
+    # group pixels with identical bit patterns
+    group_ind = np.unique(flag, return_inverse=True)[1].flatten()
+    idx_sort = np.argsort(group_ind, kind='stable')
+    num_pixel = np.bincount(group_ind)
+    idx_list = np.split(idx_sort, np.cumsum(num_pixel)[:-1])
+    idx_list = sorted(idx_list, key=len, reverse=True)
+
+    return idx_list
+
+
 def calc_inv_quality(G, X, y, e2, inv_quality_name='temporalCoherence', weight_sqrt=None, print_msg=True):
     """Calculate the inversion quality of the time series estimation.
 
@@ -385,20 +951,38 @@ def check_design_matrix(ifgram_file, weight_func='var'):
     return A
 
 
+def get_pair_dataset_name(stack_obj, ds_name, dropIfgram=True, date12_list=None):
+    """Get the dataset name(s) to read from ifgramStack file for all or the selected pairs.
+
+    Parameters: stack_obj   - ifgramStack object
+                ds_name     - str, dataset family name, e.g. unwrapPhase, coherence
+                dropIfgram  - bool, exclude the dropped interferograms (for date12_list=None only)
+                date12_list - list of str, pairs to read in YYYYMMDD_YYYYMMDD format,
+                              None for all (kept) pairs.
+    Returns:    ds_name     - str or list of str, dataset name(s) for ifgramStack.read()
+                num_pair    - int, number of pairs to read
+    """
+    if date12_list:
+        return [f'{ds_name}-{x}' for x in date12_list], len(date12_list)
+    else:
+        return ds_name, stack_obj.get_size(dropIfgram=dropIfgram)[0]
+
+
 def read_stack_obs(stack_obj, box, ref_phase, obs_ds_name='unwrapPhase', dropIfgram=True,
-                   print_msg=True):
+                   date12_list=None, print_msg=True):
     """Read unwrapPhase / azimuthOffset / rangeOffset from ifgramStack file
 
-    Parameters: stack_obj - ifgramStack object
-                box       - tuple of 4 int
-                ref_phase - 1D array or None
-    Returns:    stack_obs - 2D array of unwrapPhase in size of (num_pair, num_pixel)
+    Parameters: stack_obj   - ifgramStack object
+                box         - tuple of 4 int
+                ref_phase   - 1D array or None
+                date12_list - list of str, pairs to read, None for all (kept) pairs
+    Returns:    stack_obs   - 2D array of unwrapPhase in size of (num_pair, num_pixel)
     """
     # Read unwrapPhase
-    num_pair = stack_obj.get_size(dropIfgram=dropIfgram)[0]
+    ds_name, num_pair = get_pair_dataset_name(stack_obj, obs_ds_name, dropIfgram, date12_list)
     if print_msg:
         print(f'reading {obs_ds_name} in {box} * {num_pair} ...')
-    stack_obs = stack_obj.read(datasetName=obs_ds_name,
+    stack_obs = stack_obj.read(datasetName=ds_name,
                                box=box,
                                dropIfgram=dropIfgram,
                                print_msg=False).reshape(num_pair, -1)
@@ -428,16 +1012,16 @@ def read_stack_obs(stack_obj, box, ref_phase, obs_ds_name='unwrapPhase', dropIfg
 
 
 def mask_stack_obs(stack_obs, stack_obj, box, mask_ds_name=None, mask_threshold=0.4,
-                   stack_std=None, dropIfgram=True, print_msg=True):
+                   stack_std=None, dropIfgram=True, date12_list=None, print_msg=True):
     """Mask input unwrapped phase by setting them to np.nan."""
 
     # Read/Generate Mask
-    num_pair = stack_obj.get_size(dropIfgram=dropIfgram)[0]
     if mask_ds_name and mask_ds_name in stack_obj.datasetNames:
+        ds_name, num_pair = get_pair_dataset_name(stack_obj, mask_ds_name, dropIfgram, date12_list)
         if print_msg:
             print(f'reading {mask_ds_name} in {box} * {num_pair} ...')
 
-        msk_data = stack_obj.read(datasetName=mask_ds_name,
+        msk_data = stack_obj.read(datasetName=ds_name,
                                   box=box,
                                   dropIfgram=dropIfgram,
                                   print_msg=False).reshape(num_pair, -1)
@@ -487,15 +1071,15 @@ def mask_stack_obs(stack_obs, stack_obj, box, mask_ds_name=None, mask_threshold=
     return stack_obs, stack_std
 
 
-def read_coherence(stack_obj, box, dropIfgram=True, print_msg=True):
+def read_coherence(stack_obj, box, dropIfgram=True, date12_list=None, print_msg=True):
     """
     Read spatial coherence
     """
 
-    num_pair = stack_obj.get_size(dropIfgram=dropIfgram)[0]
+    ds_name, num_pair = get_pair_dataset_name(stack_obj, 'coherence', dropIfgram, date12_list)
     if print_msg:
         print(f'reading coherence in {box} * {num_pair} ...')
-    coh_data = stack_obj.read(datasetName='coherence',
+    coh_data = stack_obj.read(datasetName=ds_name,
                               box=box,
                               dropIfgram=dropIfgram,
                               print_msg=False).reshape(num_pair, -1)
@@ -503,24 +1087,37 @@ def read_coherence(stack_obj, box, dropIfgram=True, print_msg=True):
     return coh_data
 
 
-def calc_weight_sqrt(stack_obj, box, weight_func='var', dropIfgram=True, chunk_size=100000):
-    """Read coherence and calculate weight_sqrt from it, chunk by chunk to save memory
+def get_num_corr_looks(meta):
+    """Get the (effective) number of looks for the coherence to weight conversion."""
+    if 'NCORRLOOKS' in meta.keys():
+        L = float(meta['NCORRLOOKS'])
+    else:
+        # use the typical ratio of resolution vs pixel size of Sentinel-1 IW mode
+        L = int(meta['ALOOKS']) * int(meta['RLOOKS'])
+        L /= 1.94
+    # make sure L >= 1
+    L = max(np.rint(L).astype(int), 1)
+    return L
+
+
+def calc_weight_sqrt(stack_obj, box, weight_func='var', dropIfgram=True, date12_list=None, chunk_size=100000,
+                     cache_file=None):
+    """Read coherence and calculate weight_sqrt from it, chunk by chunk to save memory,
+    or read weight_sqrt from the cache file directly, if given.
     """
 
+    if cache_file:
+        return read_weight_cache(cache_file, stack_obj, box,
+                                 weight_func=weight_func,
+                                 dropIfgram=dropIfgram,
+                                 date12_list=date12_list)
+
     print('calculating weight from spatial coherence ...')
 
     # read coherence
-    weight = read_coherence(stack_obj, box=box, dropIfgram=dropIfgram)
+    weight = read_coherence(stack_obj, box=box, dropIfgram=dropIfgram, date12_list=date12_list)
     num_pixel = weight.shape[1]
-
-    if 'NCORRLOOKS' in stack_obj.metadata.keys():
-        L = float(stack_obj.metadata['NCORRLOOKS'])
-    else:
-        # use the typical ratio of resolution vs pixel size of Sentinel-1 IW mode
-        L = int(stack_obj.metadata['ALOOKS']) * int(stack_obj.metadata['RLOOKS'])
-        L /= 1.94
-    # make sure L >= 1
-    L = max(np.rint(L).astype(int), 1)
+    L = get_num_corr_looks(stack_obj.metadata)
 
     # convert coherence to weight chunk-by-chunk to save memory
     num_chunk = int(np.ceil(num_pixel / chunk_size))
@@ -550,6 +1147,139 @@ def calc_weight_sqrt(stack_obj, box, weight_func='var', dropIfgram=True, chunk_s
     return weight
 
 
+def get_weight_cache_file(ifgram_file):
+    """Get the weight cache file next to the ifgramStack file, e.g. inputs/ifgramStackWeight.h5"""
+    return f'{os.path.splitext(ifgram_file)[0]}Weight.h5'
+
+
+def get_weight_cache_key(stack_obj):
+    """Get the key of the weight cache, i.e. the number of looks and the modification time of coherence."""
+    with h5py.File(stack_obj.file, 'r') as f:
+        coh_time = f['coherence'].attrs.get('MODIFICATION_TIME', os.path.getmtime(stack_obj.file))
+    return {
+        'NUM_CORR_LOOKS' : str(get_num_corr_looks(stack_obj.metadata)),
+        'COHERENCE_MODIFICATION_TIME' : str(coh_time),
+    }
+
+
+def check_weight_cache(cache_file, stack_obj, weight_func='var'):
+    """Check if the weight cache of the given weight function is up to date with the ifgramStack file.
+
+    Parameters: cache_file  - str, weight cache file
+                stack_obj   - ifgramStack object
+                weight_func - str, weight function
+    Returns:    flag        - bool, True if the cache could be used
+    """
+    if not os.path.isfile(cache_file):
+        return False
+
+    date12_list = stack_obj.get_date12_list(dropIfgram=False)
+    with h5py.File(cache_file, 'r') as f:
+        if weight_func not in f.keys():
+            return False
+        date12_list0 = ['_'.join(x) for x in f['date'][:].astype(str)]
+        atr = dict(f[weight_func].attrs)
+
+    if date12_list0 != date12_list:
+        return False
+
+    cache_key = get_weight_cache_key(stack_obj)
+    if any(atr.get(key, None) != value for key, value in cache_key.items()):
+        return False
+
+    return True
+
+
+def write_weight_cache(cache_file, stack_obj, weight_func='var', max_memory=4):
+    """Calculate weight_sqrt of all interferograms and save it to the cache file, block by block.
+
+    Each weight function is saved as one dataset, with the cache key in its attributes,
+    which are written after all blocks are finished, thus, a partially written cache is ignored.
+
+    Parameters: cache_file  - str, weight cache file
+                stack_obj   - ifgramStack object
+                weight_func - str, weight function
+                max_memory  - float, max memory to use in GB
+    Returns:    cache_file  - str, weight cache file
+    """
+    num_pair, length, width = stack_obj.get_size(dropIfgram=False)
+
+    # re-create the cache file for a different list of interferograms
+    with h5py.File(stack_obj.file, 'r') as f:
+        dates = f['date'][:]
+    if os.path.isfile(cache_file):
+        with h5py.File(cache_file, 'r') as f:
+            if 'date' not in f.keys() or not np.array_equal(f['date'][:], dates):
+                os.remove(cache_file)
+
+    if not os.path.isfile(cache_file):
+        meta = dict(stack_obj.metadata)
+        meta['FILE_TYPE'] = 'weight'
+        ds_name_dict = {"date" : [dates.dtype, dates.shape, dates]}
+        writefile.layout_hdf5(cache_file, ds_name_dict, metadata=meta, print_msg=False)
+
+    print(f'cache weight ({weight_func}) of all {num_pair} interferograms to file: {cache_file}')
+    with h5py.File(cache_file, 'r+') as f:
+        if weight_func in f.keys():
+            del f[weight_func]
+        f.create_dataset(weight_func, shape=(num_pair, length, width), dtype=np.float32,
+                         chunks=True)
+
+    # calculate and write block by block
+    box_list = stack_obj.split2boxes(max_memory=max_memory, dim0_size=num_pair*2, print_msg=False)[0]
+    for box in box_list:
+        weight_sqrt = calc_weight_sqrt(stack_obj, box, weight_func=weight_func, dropIfgram=False)
+        block = [0, num_pair, box[1], box[3], box[0], box[2]]
+        writefile.write_hdf5_block(cache_file,
+                                   data=weight_sqrt.reshape(num_pair, box[3]-box[1], box[2]-box[0]),
+                                   datasetName=weight_func,
+                                   block=block,
+                                   print_msg=False)
+
+    # mark the cache as complete
+    with h5py.File(cache_file, 'r+') as f:
+        f[weight_func].attrs.update(get_weight_cache_key(stack_obj))
+
+    return cache_file
+
+
+def read_weight_cache(cache_file, stack_obj, box, weight_func='var', dropIfgram=True, date12_list=None):
+    """Read weight_sqrt from the cache file, for all / kept / the selected interferograms.
+
+    Parameters: cache_file  - str, weight cache file
+                stack_obj   - ifgramStack object
+                box         - tuple of 4 int
+                weight_func - str, weight function
+                dropIfgram  - bool, exclude the dropped interferograms (for date12_list=None only)
+                date12_list - list of str, pairs to read, None for all (kept) pairs
+    Returns:    weight_sqrt - 2D np.ndarray in size of (num_pair, num_pixel)
+    """
+    if date12_list:
+        date12_list_all = stack_obj.get_date12_list(dropIfgram=False)
+        idx = np.array([date12_list_all.index(x) for x in date12_list])
+    elif dropIfgram:
+        with h5py.File(stack_obj.file, 'r') as f:
+            idx = np.where(f['dropIfgram'][:])[0]
+    else:
+        idx = np.arange(stack_obj.get_size(dropIfgram=False)[0])
+    if box is None:
+        box = (0, 0, stack_obj.width, stack_obj.length)
+
+    print(f'reading weight ({weight_func}) in {box} * {idx.size} from cache file: {cache_file}')
+    with h5py.File(cache_file, 'r') as f:
+        ds = f[weight_func]
+        if idx.size > 0 and np.array_equal(idx, np.arange(idx[0], idx[-1] + 1)):
+            # continuous slab
+            weight_sqrt = ds[idx[0]:idx[-1]+1, box[1]:box[3], box[0]:box[2]]
+        else:
+            # in increasing order for h5py fancy indexing
+            order = np.argsort(idx)
+            weight_sqrt = np.zeros((idx.size, box[3]-box[1], box[2]-box[0]), dtype=np.float32)
+            weight_sqrt[order] = ds[idx[order].tolist(), box[1]:box[3], box[0]:box[2]]
+
+    return weight_sqrt.reshape(idx.size, -1)
+
+
 def get_design_matrix4std(stack_obj):
     """Get the design matrix for time-series STD calculation.
     Parameters: stack_obj - ifgramStack object
@@ -589,9 +1319,170 @@ def get_design_matrix4std(stack_obj):
 
 
 
+def read_patch_mask(ifgram_file, box=None, obs_ds_name='unwrapPhase', water_mask_file=None):
+    """Read the mask of pixels to invert from the water mask and the average spatial coherence/SNR files.
+
+    Parameters: ifgram_file     - str, interferograms stack HDF5 file
+                box             - tuple of 4 int, (x0, y0, x1, y1), None for the whole image
+                obs_ds_name     - str, dataset to feed the inversion
+                water_mask_file - str, water mask filename if available
+    Returns:    mask            - 1D np.ndarray in bool in size of (num_pixel,)
+    """
+    atr = readfile.read_attribute(ifgram_file)
+    length, width = int(atr['LENGTH']), int(atr['WIDTH'])
+    stack_dir, stack_base = os.path.split(ifgram_file)
+    if not box:
+        box = (0, 0, width, length)
+    mask = np.ones((box[3] - box[1]) * (box[2] - box[0]), np.bool_)
+
+    # 1 - Water Mask
+    if water_mask_file:
+        print(f'skip pixels (on the water) with zero value in file: {os.path.basename(water_mask_file)}')
+        atr_msk = readfile.read_attribute(water_mask_file)
+        len_msk, wid_msk = int(atr_msk['LENGTH']), int(atr_msk['WIDTH'])
+        if (len_msk, wid_msk) != (length, width):
+            raise ValueError('Input water mask file has different size from ifgramStack file.')
+
+        dsNames = readfile.get_dataset_list(water_mask_file)
+        dsName = [i for i in dsNames if i in ['waterMask', 'mask']][0]
+        waterMask = readfile.read(water_mask_file, datasetName=dsName, box=box)[0].flatten()
+        mask *= np.array(waterMask, dtype=np.bool_)
+        del waterMask
+
+    # 2 - Mask for zero quality measure (average spatial coherence/SNR)
+    # usually due to lack of data in the processing
+    if 'offset' in obs_ds_name.lower():
+        stack_quality_file = os.path.join(stack_dir, '../avgSpatialSNR.h5')
+
+    elif stack_base.startswith('ion'):
+        stack_quality_file = os.path.join(stack_dir, '../avgSpatialCohIon.h5')
+
+    else:
+        stack_quality_file = os.path.join(stack_dir, '../avgSpatialCoh.h5')
+
+    if os.path.isfile(stack_quality_file):
+        atr_stack = readfile.read_attribute(stack_quality_file)
+        len_stack, wid_stack = int(atr_stack['LENGTH']), int(atr_stack['WIDTH'])
+        if (len_stack, wid_stack) == (length, width):
+            print(f'skip pixels with zero value in file: {os.path.basename(stack_quality_file)}')
+            quality = readfile.read(stack_quality_file, box=box)[0].flatten()
+            mask *= quality != 0.
+            del quality
+
+    return mask
+
+
+def read_ifgram_inversion_patch(ifgram_file, box=None, ref_phase=None, obs_ds_name='unwrapPhase',
+                                weight_func='var', water_mask_file=None, mask_ds_name=None,
+                                mask_threshold=0.4, calc_cov=False, weight_cache_file=None, date12_list=None):
+    """Read and prepare the input data of one patch of an ifgram stack for the network inversion.
+
+    Parameters: same as run_ifgram_inversion_patch(), except for:
+                date12_list - list of str, pairs to read, None for all (kept) pairs.
+                              ref_phase should be in the same size as date12_list if given.
+    Returns:    stack_obs   - 2D array in size of (num_pair, num_pixel), masked observations
+                weight_sqrt - 2D array in size of (num_pair, num_pixel), or None
+                stack_std   - 2D array in size of (num_pair, num_pixel), or None
+                mask        - 1D array in size of (num_pixel), pixels to invert
+                box         - tuple of 4 int
+    """
+
+    # keep the file open for the multiple reads below,
+    # with the chunk cache sized for the box
+    stack_obj = ifgramStack(ifgram_file)
+
+    with stack_obj.keep_open(box=box):
+        # 1.1 read / calculate weight and stack STD
+        weight_sqrt = None
+        stack_std = None
+
+        if obs_ds_name.startswith(('unwrapPhase', 'ion')):
+            # calculate weight
+            if weight_func not in ['no', 'sbas']:
+                weight_sqrt = calc_weight_sqrt(stack_obj, box,
+                                               weight_func=weight_func,
+                                               dropIfgram=True,
+                                               date12_list=date12_list,
+                                               chunk_size=100000,
+                                               cache_file=weight_cache_file)
+
+            # calculate stack STD
+            if calc_cov:
+                if weight_func == 'var':
+                    stack_std = 1. / weight_sqrt
+                else:
+                    stack_std = 1. / calc_weight_sqrt(stack_obj, box,
+                                                      weight_func='var',
+                                                      dropIfgram=True,
+                                                      date12_list=date12_list,
+                                                      chunk_size=100000,
+                                                      cache_file=weight_cache_file)
+
+        elif 'offset' in obs_ds_name.lower():
+            if calc_cov or weight_func == 'var':
+                # calculate weight for offset
+                ds_name, num_pair = get_pair_dataset_name(stack_obj, obs_ds_name+'Std', True, date12_list)
+                print('reading {} in {} * {} ...'.format(obs_ds_name+'Std', box, num_pair))
+                weight_sqrt = stack_obj.read(datasetName=ds_name,
+                                             box=box,
+                                             dropIfgram=True,
+                                             print_msg=False).reshape(num_pair, -1)
+                # handle anomalies
+                weight_sqrt[np.isnan(weight_sqrt)] = 100.
+                weight_sqrt[weight_sqrt < 0.005] = 0.005
+
+                print('convert std. dev. to the inverse of variance')
+                weight_sqrt = 1. / weight_sqrt  # use squre root of weight, to facilitate WLS, same as for phase.
+
+                # prepare for Std time-series
+                if calc_cov:
+                    stack_std = 1. / weight_sqrt
+
+                # reset weight_sqrt to None if no weighting is applied
+                if weight_func in ['no', 'sbas']:
+                    weight_sqrt = None
+                elif weight_func == 'var':
+                    pass
+                else:
+                    raise ValueError(f'un-supported weight_func = {weight_func} for {obs_ds_name}!')
+        else:
+            raise ValueError(f'un-recognized observation dataset name: {obs_ds_name}')
+
+        # 1.2 read / mask unwrapPhase and offset
+        stack_obs = read_stack_obs(stack_obj, box, ref_phase,
+                                   obs_ds_name=obs_ds_name,
+                                   dropIfgram=True,
+                                   date12_list=date12_list)
+
+        # translate zero phase value to nan (no-data value)
+        # because it's the common filled value used in phase masking
+        if 'phase' in obs_ds_name.lower():
+            stack_obs[stack_obs == 0.] = np.nan
+            print(f'convert zero value in {obs_ds_name} to NaN (no-data value)')
+
+        (stack_obs,
+         stack_std) = mask_stack_obs(stack_obs, stack_obj, box,
+                                     stack_std=stack_std,
+                                     mask_ds_name=mask_ds_name,
+                                     mask_threshold=mask_threshold,
+                                     dropIfgram=True,
+                                     date12_list=date12_list)
+
+    # 1.3 mask of pixels to invert
+    # 1.3.1 - Water Mask and zero quality measure (average spatial coherence/SNR)
+    mask = read_patch_mask(ifgram_file, box, obs_ds_name=obs_ds_name, water_mask_file=water_mask_file)
+
+    # 1.3.2 - Mask for NaN value in ALL ifgrams
+    print(f'skip pixels with {obs_ds_name} = NaN in all interferograms')
+    mask *= ~np.all(np.isnan(stack_obs), axis=0)
+
+    return stack_obs, weight_sqrt, stack_std, mask, box
+
+
 def run_ifgram_inversion_patch(ifgram_file, box=None, ref_phase=None, obs_ds_name='unwrapPhase',
                                weight_func='var', water_mask_file=None, min_norm_velocity=True,
-                               mask_ds_name=None, mask_threshold=0.4, min_redundancy=1.0, calc_cov=False):
+                               mask_ds_name=None, mask_threshold=0.4, min_redundancy=1.0, calc_cov=False,
+                               weight_cache_file=None, patch_data=None):
     """Invert one patch of an ifgram stack into timeseries.
 
     Parameters: ifgram_file       - str, interferograms stack HDF5 file, e.g. ./inputs/ifgramStack.h5
@@ -606,6 +1497,9 @@ def run_ifgram_inversion_patch(ifgram_file, box=None, ref_phase=None, obs_ds_nam
                 mask_threshold    - float, min coherence of pixels if mask_dataset_name='coherence'
                 min_redundancy    - float, the min number of ifgrams for every acquisition.
                 calc_cov          - bool, calculate the time series covariance matrix.
+                weight_cache_file - str, file with the cached weight of all pairs, None to calculate from coherence.
+                patch_data        - tuple, input data read by read_ifgram_inversion_patch() in advance,
+                                    None to read it here.
     Returns:    ts                - 3D array in size of (num_date, num_row, num_col)
                 ts_cov            - 4D array in size of (num_date, num_date, num_row, num_col) or None
                 inv_quality       - 2D array in size of (num_row, num_col)
@@ -616,7 +1510,6 @@ def run_ifgram_inversion_patch(ifgram_file, box=None, ref_phase=None, obs_ds_nam
 
     stack_obj = ifgramStack(ifgram_file)
     stack_obj.open(print_msg=False)
-    stack_dir, stack_base = os.path.split(ifgram_file)
 
     ## debug on a specific pixel
     #y, x = 555, 612
@@ -644,122 +1537,24 @@ def run_ifgram_inversion_patch(ifgram_file, box=None, ref_phase=None, obs_ds_nam
     date12_list = stack_obj.get_date12_list(dropIfgram=True)
     A, B = stack_obj.get_design_matrix4timeseries(date12_list=date12_list)[0:2]
 
-    # 1.1 read / calculate weight and stack STD
-    weight_sqrt = None
-    stack_std = None
-
-    if obs_ds_name.startswith(('unwrapPhase', 'ion')):
-        # calculate weight
-        if weight_func not in ['no', 'sbas']:
-            weight_sqrt = calc_weight_sqrt(stack_obj, box,
-                                           weight_func=weight_func,
-                                           dropIfgram=True,
-                                           chunk_size=100000)
-
-        # calculate stack STD
-        if calc_cov:
-            A_std, r0 = get_design_matrix4std(stack_obj)[:2]
-            r1 = r0 + 1
-            if weight_func == 'var':
-                stack_std = 1. / weight_sqrt
-            else:
-                stack_std = 1. / calc_weight_sqrt(stack_obj, box,
-                                                  weight_func='var',
-                                                  dropIfgram=True,
-                                                  chunk_size=100000)
-
-    elif 'offset' in obs_ds_name.lower():
-        if calc_cov or weight_func == 'var':
-            # calculate weight for offset
-            print('reading {} in {} * {} ...'.format(obs_ds_name+'Std', box, len(date12_list)))
-            weight_sqrt = stack_obj.read(datasetName=obs_ds_name+'Std',
-                                         box=box,
-                                         dropIfgram=True,
-                                         print_msg=False).reshape(len(date12_list), -1)
-            # handle anomalies
-            weight_sqrt[np.isnan(weight_sqrt)] = 100.
-            weight_sqrt[weight_sqrt < 0.005] = 0.005
-
-            print('convert std. dev. to the inverse of variance')
-            weight_sqrt = 1. / weight_sqrt  # use squre root of weight, to facilitate WLS, same as for phase.
-
-            # prepare for Std time-series
-            if calc_cov:
-                A_std, r0 = get_design_matrix4std(stack_obj)[:2]
-                r1 = r0 + 1
-                stack_std = 1. / weight_sqrt
-
-            # reset weight_sqrt to None if no weighting is applied
-            if weight_func in ['no', 'sbas']:
-                weight_sqrt = None
-            elif weight_func == 'var':
-                pass
-            else:
-                raise ValueError(f'un-supported weight_func = {weight_func} for {obs_ds_name}!')
-    else:
-        raise ValueError(f'un-recognized observation dataset name: {obs_ds_name}')
-
-    # 1.2 read / mask unwrapPhase and offset
-    stack_obs = read_stack_obs(stack_obj, box, ref_phase,
-                               obs_ds_name=obs_ds_name,
-                               dropIfgram=True)
-
-    # translate zero phase value to nan (no-data value)
-    # because it's the common filled value used in phase masking
-    if 'phase' in obs_ds_name.lower():
-        stack_obs[stack_obs == 0.] = np.nan
-        print(f'convert zero value in {obs_ds_name} to NaN (no-data value)')
-
-    (stack_obs,
-     stack_std) = mask_stack_obs(stack_obs, stack_obj, box,
-                                 stack_std=stack_std,
-                                 mask_ds_name=mask_ds_name,
-                                 mask_threshold=mask_threshold,
-                                 dropIfgram=True)
-
-    # 1.3 mask of pixels to invert
-    mask = np.ones(num_pixel, np.bool_)
-
-    # 1.3.1 - Water Mask
-    if water_mask_file:
-        print(f'skip pixels (on the water) with zero value in file: {os.path.basename(water_mask_file)}')
-        atr_msk = readfile.read_attribute(water_mask_file)
-        len_msk, wid_msk = int(atr_msk['LENGTH']), int(atr_msk['WIDTH'])
-        if (len_msk, wid_msk) != (stack_obj.length, stack_obj.width):
-            raise ValueError('Input water mask file has different size from ifgramStack file.')
-
-        dsNames = readfile.get_dataset_list(water_mask_file)
-        dsName = [i for i in dsNames if i in ['waterMask', 'mask']][0]
-        waterMask = readfile.read(water_mask_file, datasetName=dsName, box=box)[0].flatten()
-        mask *= np.array(waterMask, dtype=np.bool_)
-        del waterMask
-
-    # 1.3.2 - Mask for NaN value in ALL ifgrams
-    print(f'skip pixels with {obs_ds_name} = NaN in all interferograms')
-    mask *= ~np.all(np.isnan(stack_obs), axis=0)
-
-    # 1.3.3 Mask for zero quality measure (average spatial coherence/SNR)
-    # usually due to lack of data in the processing
-    if 'offset' in obs_ds_name.lower():
-        inv_quality_name = 'residual'
-        stack_quality_file = os.path.join(stack_dir, '../avgSpatialSNR.h5')
-
-    elif stack_base.startswith('ion'):
-        inv_quality_name = 'temporalCoherence'
-        stack_quality_file = os.path.join(stack_dir, '../avgSpatialCohIon.h5')
-
-    else:
-        inv_quality_name = 'temporalCoherence'
-        stack_quality_file = os.path.join(stack_dir, '../avgSpatialCoh.h5')
-
-    if os.path.isfile(stack_quality_file):
-        atr_stack = readfile.read_attribute(stack_quality_file)
-        len_stack, wid_stack = int(atr_stack['LENGTH']), int(atr_stack['WIDTH'])
-        if (len_stack, wid_stack) == (stack_obj.length, stack_obj.width):
-            print(f'skip pixels with zero value in file: {os.path.basename(stack_quality_file)}')
-            quality = readfile.read(stack_quality_file, box=box)[0].flatten()
-            mask *= quality != 0.
-            del quality
+    if calc_cov:
+        A_std, r0 = get_design_matrix4std(stack_obj)[:2]
+
+    inv_quality_name = 'residual' if 'offset' in obs_ds_name.lower() else 'temporalCoherence'
+
+    # 1.1 read / mask observations, weight and stack STD
+    if patch_data is None:
+        patch_data = read_ifgram_inversion_patch(
+            ifgram_file, box=box,
+            ref_phase=ref_phase,
+            obs_ds_name=obs_ds_name,
+            weight_func=weight_func,
+            water_mask_file=water_mask_file,
+            mask_ds_name=mask_ds_name,
+            mask_threshold=mask_threshold,
+            calc_cov=calc_cov,
+            weight_cache_file=weight_cache_file)
+    stack_obs, weight_sqrt, stack_std, mask = patch_data[:4]
 
     # invert pixels on mask 1+2
     num_pixel2inv = int(np.sum(mask))
@@ -797,6 +1592,7 @@ def run_ifgram_inversion_patch(ifgram_file, box=None, ref_phase=None, obs_ds_nam
     }
 
     # 2.2 un-weighted inversion (classic SBAS)
+    pinv_cache.reset_stats()
     if weight_sqrt is None:
         msg = f'estimating time-series for pixels with valid {obs_ds_name} in'
 
@@ -823,71 +1619,84 @@ def run_ifgram_inversion_patch(ifgram_file, box=None, ref_phase=None, obs_ds_nam
             inv_quality[mask_all_net] = inv_quali
             num_inv_obs[mask_all_net] = num_obsi
 
-        # c. pixel-by-pixel for pixels with obs not in all ifgrams
+        # c. group-by-group for pixels with obs not in all ifgrams
+        #    pixels with the same valid-obs pattern share one B in sbas inversion
         if np.sum(mask_part_net) > 0:
             num_pixel2inv_part = int(np.sum(mask_part_net))
             idx_pixel2inv_part = np.where(mask_part_net)[0]
             print(f'{msg} some ifgrams ({num_pixel2inv_part} pixels; {num_pixel2inv_part/num_pixel2inv*100:.1f}%) ...')
 
-            prog_bar = ptime.progressBar(maxValue=num_pixel2inv_part)
-            for i in range(num_pixel2inv_part):
-                idx = idx_pixel2inv_part[i]
+            idx_list = [idx_pixel2inv_part[x] for x in
+                        group_pixels_by_valid_obs(stack_obs[:, idx_pixel2inv_part])]
+            print(f'number of valid-observation patterns: {len(idx_list)}')
 
+            prog_bar = ptime.progressBar(maxValue=num_pixel2inv_part)
+            num_pixel_done = 0
+            for idx in idx_list:
                 # run
-                tsi, inv_quali, num_obsi = estimate_timeseries(
+                tsi, inv_quali, num_obsi = estimate_timeseries_batch(
                     y=stack_obs[:, idx],
                     weight_sqrt=None,
+                    print_msg=False,
                     **kwargs)
 
                 # save result to output matrices
-                ts[:, idx] = tsi.flatten()
+                ts[:, idx] = tsi
                 inv_quality[idx] = inv_quali
                 num_inv_obs[idx] = num_obsi
 
-                prog_bar.update(i+1, every=200, suffix=f'{i+1}/{num_pixel2inv_part} pixels')
+                num_pixel_done += idx.size
+                prog_bar.update(num_pixel_done, every=1, suffix=f'{num_pixel_done}/{num_pixel2inv_part} pixels')
             prog_bar.close()
 
-    # 2.3 weighted inversion - pixel-by-pixel
+    # 2.3 weighted inversion - group-by-group
     else:
-        print('estimating time-series via WLS pixel-by-pixel ...')
-        prog_bar = ptime.progressBar(maxValue=num_pixel2inv)
-        for i in range(num_pixel2inv):
-            idx = idx_pixel2inv[i]
+        print('estimating time-series via WLS for groups of pixels with the same valid-observation pattern ...')
+        idx_list = [idx_pixel2inv[x] for x in group_pixels_by_valid_obs(stack_obs[:, idx_pixel2inv])]
+        print(f'number of valid-observation patterns: {len(idx_list)}')
 
+        prog_bar = ptime.progressBar(maxValue=num_pixel2inv)
+        num_pixel_done = 0
+        for idx in idx_list:
             # run
-            tsi, inv_quali, num_obsi = estimate_timeseries(
+            tsi, inv_quali, num_obsi = estimate_timeseries_batch(
                 y=stack_obs[:, idx],
                 weight_sqrt=weight_sqrt[:, idx],
+                print_msg=False,
                 **kwargs)
 
             # save result to output matrices
-            ts[:, idx] = tsi.flatten()
+            ts[:, idx] = tsi
             inv_quality[idx] = inv_quali
             num_inv_obs[idx] = num_obsi
 
-            prog_bar.update(i+1, every=200, suffix=f'{i+1}/{num_pixel2inv} pixels')
+            num_pixel_done += idx.size
+            prog_bar.update(num_pixel_done, every=1, suffix=f'{num_pixel_done}/{num_pixel2inv} pixels')
         prog_bar.close()
     del weight_sqrt
+    pinv_cache.print_stats()
 
-    # 2.4 time-series std. dev. - pixel-by-pixel
+    # 2.4 time-series std. dev. - group-by-group
     if calc_cov:
         print('propagating std. dev. from network of interferograms to time-series (Yunjun et al., 2021, FRINGE) ...')
+        # index of the (N-1) non-reference dates in the (N) dates
+        idx_std = np.delete(np.arange(num_date), r0)
+        idx_list = [idx_pixel2inv[x] for x in group_pixels_by_valid_obs(stack_obs[:, idx_pixel2inv])]
+
         prog_bar = ptime.progressBar(maxValue=num_pixel2inv)
-        for i in range(num_pixel2inv):
-            idx = idx_pixel2inv[i]
-            ts_covi = estimate_timeseries_cov(A_std,
-                                              y=stack_obs[:, idx],
-                                              y_std=stack_std[:, idx],
-                                              min_redundancy=min_redundancy)
+        num_pixel_done = 0
+        for idx in idx_list:
+            ts_covi = estimate_timeseries_cov_batch(A_std,
+                                                    y=stack_obs[:, idx],
+                                                    y_std=stack_std[:, idx],
+                                                    min_redundancy=min_redundancy)
 
             # save result to output matrix
             # fill the (N-1xN-1) matrix into the (NxN) matrix
-            ts_cov[:r0, :r0, idx] = ts_covi[:r0, :r0]
-            ts_cov[:r0, r1:, idx] = ts_covi[:r0, r0:]
-            ts_cov[r1:, :r0, idx] = ts_covi[r0:, :r0]
-            ts_cov[r1:, r1:, idx] = ts_covi[r0:, r0:]
+            ts_cov[np.ix_(idx_std, idx_std, idx)] = ts_covi
 
-            prog_bar.update(i+1, every=200, suffix=f'{i+1}/{num_pixel2inv} pixels')
+            num_pixel_done += idx.size
+            prog_bar.update(num_pixel_done, every=1, suffix=f'{num_pixel_done}/{num_pixel2inv} pixels')
         prog_bar.close()
     del stack_obs
     del stack_std
@@ -902,27 +1711,221 @@ def run_ifgram_inversion_patch(ifgram_file, box=None, ref_phase=None, obs_ds_nam
     num_inv_obs = num_inv_obs.reshape(num_row, num_col)
 
     # 3.2 convert displacement unit to meter
+    ts, ts_cov = convert_timeseries_unit(ts, ts_cov, obs_ds_name, stack_obj.metadata)
+
+    return ts, ts_cov, inv_quality, num_inv_obs, box
+
+
+def convert_timeseries_unit(ts, ts_cov, obs_ds_name, meta):
+    """Convert the displacement unit of the time-series (and its covariance) to meter.
+
+    Parameters: ts          - np.ndarray, time-series in radian (phase) or pixel (offset)
+                ts_cov      - np.ndarray, time-series covariance, or None
+                obs_ds_name - str, dataset name of the inverted observation
+                meta        - dict, metadata of the ifgramStack file
+    Returns:    ts / ts_cov - np.ndarray, in meter
+    """
     if obs_ds_name.startswith(('unwrapPhase','ion')):
-        phase2range = -1 * float(stack_obj.metadata['WAVELENGTH']) / (4.*np.pi)
+        phase2range = -1 * float(meta['WAVELENGTH']) / (4.*np.pi)
         ts *= phase2range
-        ts_cov = ts_cov * np.abs(phase2range) if calc_cov else ts_cov
+        ts_cov = ts_cov * np.abs(phase2range) if ts_cov is not None else ts_cov
         print('converting LOS phase unit from radian to meter')
 
-    elif (obs_ds_name == 'azimuthOffset') & (stack_obj.metadata['PROCESSOR'] != 'cosicorr'):
-        az_pixel_size = ut.azimuth_ground_resolution(stack_obj.metadata)
-        az_pixel_size /= float(stack_obj.metadata['ALOOKS'])
+    elif (obs_ds_name == 'azimuthOffset') & (meta['PROCESSOR'] != 'cosicorr'):
+        az_pixel_size = ut.azimuth_ground_resolution(meta)
+        az_pixel_size /= float(meta['ALOOKS'])
         ts *= az_pixel_size
-        ts_cov = ts_cov * az_pixel_size if calc_cov else ts_cov
+        ts_cov = ts_cov * az_pixel_size if ts_cov is not None else ts_cov
         print(f'converting azimuth offset unit from pixel ({az_pixel_size:.2f} m) to meter')
 
-    elif (obs_ds_name == 'rangeOffset') & (stack_obj.metadata['PROCESSOR'] != 'cosicorr'):
-        rg_pixel_size = float(stack_obj.metadata['RANGE_PIXEL_SIZE'])
-        rg_pixel_size /= float(stack_obj.metadata['RLOOKS'])
+    elif (obs_ds_name == 'rangeOffset') & (meta['PROCESSOR'] != 'cosicorr'):
+        rg_pixel_size = float(meta['RANGE_PIXEL_SIZE'])
+        rg_pixel_size /= float(meta['RLOOKS'])
         ts *= -1 * rg_pixel_size
-        ts_cov = ts_cov * rg_pixel_size if calc_cov else ts_cov
+        ts_cov = ts_cov * rg_pixel_size if ts_cov is not None else ts_cov
         print(f'converting range offset unit from pixel ({rg_pixel_size:.2f} m) to meter')
 
-    return ts, ts_cov, inv_quality, num_inv_obs, box
+    return ts, ts_cov
+
+
+def run_ifgram_inversion_incremental_patch(ifgram_file, box=None, ref_phase=None, obs_ds_name='unwrapPhase',
+                                           weight_func='var', water_mask_file=None, min_norm_velocity=True,
+                                           mask_ds_name=None, mask_threshold=0.4, min_redundancy=1.0,
+                                           weight_cache_file=None, state_file=None, rcond=1e-5,
+                                           max_num_element=1e7):
+    """Invert one patch of an ifgram stack into timeseries incrementally,
+    by adding the new pairs into the inversion state of the previous run.
+
+    The inversion state is saved in the design matrix A of the phase (the two dates of each pair),
+    whose normal matrix A^T W A is as sparse as the network, thus, saved as the weight of each pair,
+    with no-data value (NaN) for the invalid observations, instead of the full normal matrix.
+    The right-hand side A^T W y and the residual statistics (calc_inv_quality_stats()) are saved
+    along with the solution, to update the inversion quality with the new pairs only.
+    Thus, only the new pairs are read from the ifgram stack.
+
+    Parameters: same as run_ifgram_inversion_patch(), except for:
+                state_file      - str, inversion state file of the previous run,
+                                  None to start from empty inversion state, i.e. the full inversion.
+                rcond           - float, cut-off ratio of small singular values of the design matrix
+                max_num_element - float, max number of elements of the normal matrices to solve at once
+    Returns:    ts              - 3D array in size of (num_date, num_row, num_col)
+                ts_cov          - None
+                inv_quality     - 2D array in size of (num_row, num_col)
+                num_inv_obs     - 2D array in size of (num_row, num_col)
+                weight          - 3D array in size of (num_pair, num_row, num_col), weight of all pairs
+                rhs             - 3D array in size of (num_date-1, num_row, num_col),
+                                  right-hand side of the normal equations A^T W y
+                ts_raw          - 3D array in size of (num_date-1, num_row, num_col),
+                                  solution in the unit of the observation
+                q_sum           - 2D array in size of (num_row, num_col), residual statistics
+                q_grad          - 3D array in size of (num_date-1, num_row, num_col), residual statistics
+                box             - tuple of 4 int
+    """
+
+    stack_obj = ifgramStack(ifgram_file)
+    stack_obj.open(print_msg=False)
+
+    ## 1. input info
+
+    # size
+    if not box:
+        box = (0, 0, stack_obj.width, stack_obj.length)
+    num_row = box[3] - box[1]
+    num_col = box[2] - box[0]
+    num_pixel = num_row * num_col
+
+    # get tbase_diff in the unit of year
+    date_list = stack_obj.get_date_list(dropIfgram=True)
+    num_date = len(date_list)
+    tbase = np.array(ptime.date_list2tbase(date_list)[0], np.float32) / 365.25
+    tbase_diff = np.diff(tbase).reshape(-1, 1)
+
+    # design matrix
+    date12_list = stack_obj.get_date12_list(dropIfgram=True)
+    A = stack_obj.get_design_matrix4timeseries(date12_list=date12_list)[0]
+    num_pair, num_par = A.shape
+    # B = A M, to minimize the norm of the velocity for singular normal matrices
+    M = np.tril(np.ones((num_par, num_par), np.float64)) * tbase_diff.T if min_norm_velocity else None
+
+    inv_quality_name = 'residual' if 'offset' in obs_ds_name.lower() else 'temporalCoherence'
+    q_dtype = np.complex64 if inv_quality_name == 'temporalCoherence' else np.float32
+
+    # 1.1 read the inversion state of the previous pairs
+    weight = np.full((num_pair, num_pixel), np.nan, dtype=np.float32)
+    rhs = np.zeros((num_par, num_pixel), dtype=np.float64)
+    X0 = np.zeros((num_par, num_pixel), dtype=np.float32)
+    q_sum0 = np.zeros(num_pixel, dtype=q_dtype)
+    q_grad0 = np.zeros((num_par, num_pixel), dtype=q_dtype)
+    idx_old = []
+    if state_file:
+        print(f'reading inversion state in {box} from file: {state_file}')
+        with h5py.File(state_file, 'r') as f:
+            date12_list0 = [x.decode('utf8') for x in f['date12'][:]]
+            idx_old = [date12_list.index(x) for x in date12_list0]
+            weight[idx_old] = f['weight'][:, box[1]:box[3], box[0]:box[2]].reshape(-1, num_pixel)
+
+            # previous dates are the leading dates
+            num_par0 = f['rhs'].shape[0]
+            rhs[:num_par0] = f['rhs'][:, box[1]:box[3], box[0]:box[2]].reshape(num_par0, -1)
+            X0[:num_par0] = f['timeseries'][:, box[1]:box[3], box[0]:box[2]].reshape(num_par0, -1)
+            q_sum0[:] = f['invQualitySum'][box[1]:box[3], box[0]:box[2]].flatten()
+            q_grad0[:num_par0] = f['invQualityGrad'][:, box[1]:box[3], box[0]:box[2]].reshape(num_par0, -1)
+    idx_new = [i for i in range(num_pair) if i not in idx_old]
+
+    # 1.2 read the new pairs
+    print(f'number of pairs to add into the inversion state: {len(idx_new)}')
+    stack_obs = None
+    if len(idx_new) > 0:
+        stack_obs, weight_sqrt = read_ifgram_inversion_patch(
+            ifgram_file, box=box,
+            ref_phase=ref_phase[idx_new],
+            obs_ds_name=obs_ds_name,
+            weight_func=weight_func,
+            mask_ds_name=mask_ds_name,
+            mask_threshold=mask_threshold,
+            weight_cache_file=weight_cache_file,
+            date12_list=[date12_list[i] for i in idx_new])[:2]
+        weight[idx_new] = get_obs_weight(stack_obs, weight_sqrt)
+        del weight_sqrt
+
+        # right-hand side: A^T W y
+        wy = np.nan_to_num(weight[idx_new] * stack_obs, nan=0.).astype(np.float64)
+        rhs += np.dot(A[idx_new].T, wy)
+        del wy
+
+    # 1.3 mask of pixels to invert
+    flag = ~np.isnan(weight)
+    mask = read_patch_mask(ifgram_file, box, obs_ds_name=obs_ds_name, water_mask_file=water_mask_file)
+    mask *= np.any(flag, axis=0)
+
+    # network redundancy: skip inversion if < threshold
+    redundancy = np.dot((A != 0.).T.astype(np.float32), flag.astype(np.float32))
+    mask *= np.min(redundancy, axis=0) >= min_redundancy
+    del redundancy
+
+    num_pixel2inv = int(np.sum(mask))
+    idx_pixel2inv = np.where(mask)[0]
+    print('number of pixels to invert: {} out of {} ({:.1f}%)'.format(
+        num_pixel2inv, num_pixel, num_pixel2inv/num_pixel*100))
+
+    ## 2. inversion
+
+    # 2.1 solve the normal equations in chunks of pixels
+    # with the solution of the previous run for the pixels NOT to invert
+    print('estimating time-series by solving the normal equations ...')
+    X = np.array(X0, dtype=np.float64)
+    chunk_size = max(1, int(max_num_element / max(num_par ** 2, 1)))
+    for c0 in range(0, num_pixel2inv, chunk_size):
+        idx = idx_pixel2inv[c0:c0+chunk_size]
+        norm_mat = np.zeros((idx.size, num_par, num_par), dtype=np.float64)
+        update_normal_equation(norm_mat, None, A, weight[:, idx])
+        X[:, idx] = solve_normal_equation(norm_mat, rhs[:, idx].T, rcond=rcond, M=M)
+        del norm_mat
+
+    # 2.2 inversion quality
+    # previous pairs: update the residual statistics to the new solution
+    q_sum, q_grad = q_sum0, q_grad0
+    if len(idx_old) > 0:
+        q_sum, q_grad = update_inv_quality_stats(q_sum, q_grad, A[idx_old], flag[idx_old], X - X0,
+                                                 inv_quality_name=inv_quality_name)
+    # new pairs
+    if stack_obs is not None:
+        q_sum_new, q_grad_new = calc_inv_quality_stats(A[idx_new], X, stack_obs,
+                                                       inv_quality_name=inv_quality_name)
+        q_sum += q_sum_new
+        q_grad += q_grad_new
+        del stack_obs, q_sum_new, q_grad_new
+
+    num_obs = np.sum(flag, axis=0)
+    if inv_quality_name == 'temporalCoherence':
+        inv_quality = np.abs(q_sum) / np.maximum(num_obs, 1)
+    else:
+        inv_quality = np.sqrt(np.maximum(q_sum, 0))
+    inv_quality = np.where(mask, inv_quality, 0 if inv_quality_name == 'temporalCoherence' else np.nan)
+
+    # 2.3 assemble time-series
+    ts = np.zeros((num_date, num_pixel), np.float32)
+    ts[1:, mask] = X[:, mask]
+    num_inv_obs = np.where(mask, num_obs, 0).astype(np.int16)
+
+    ## 3. prepare output
+
+    # 3.1 reshape
+    ts = ts.reshape(num_date, num_row, num_col)
+    inv_quality = inv_quality.astype(np.float32).reshape(num_row, num_col)
+    num_inv_obs = num_inv_obs.reshape(num_row, num_col)
+    state = [
+        weight.reshape(num_pair, num_row, num_col),
+        rhs.reshape(num_par, num_row, num_col),
+        X.astype(np.float32).reshape(num_par, num_row, num_col),
+        q_sum.reshape(num_row, num_col),
+        q_grad.reshape(num_par, num_row, num_col),
+    ]
+
+    # 3.2 convert displacement unit to meter
+    ts = convert_timeseries_unit(ts, None, obs_ds_name, stack_obj.metadata)[0]
+
+    return (ts, None, inv_quality, num_inv_obs, *state, box)
 
 
 def run_ifgram_inversion(inps):
@@ -979,7 +1982,19 @@ def run_ifgram_inversion(inps):
     else:
         ref_msg = ''
 
-    # 1.3 print key setup info
+    # 1.3 incremental mode: check the inversion state of the previous run
+    if inps.incremental and inps.calcCov:
+        print('WARNING: incremental inversion is NOT supported with --calc-cov, turn it OFF and continue.')
+        inps.incremental = False
+
+    if inps.incremental:
+        state_file = get_inv_state_file(inps.tsFile)
+        state_tmp_file = f'{os.path.splitext(state_file)[0]}_tmp.h5'
+        if not check_inv_state(inps, stack_obj, state_file):
+            print('incremental inversion: start from empty inversion state with all pairs.')
+            state_file = None
+
+    # 1.4 print key setup info
     msg = '-------------------------------------------------------------------------------\n'
     if inps.minNormVelocity:
         suffix = 'deformation velocity'
@@ -989,6 +2004,7 @@ def run_ifgram_inversion(inps):
     msg += f'minimum redundancy: {inps.minRedundancy}\n'
     msg += f'weight function: {inps.weightFunc}\n'
     msg += f'calculate covariance: {inps.calcCov} {ref_msg}\n'
+    msg += f'incremental update: {inps.incremental}\n'
 
     if inps.maskDataset:
         if inps.maskDataset in ['connectComponent']:
@@ -1026,54 +2042,36 @@ def run_ifgram_inversion(inps):
     meta['UNIT'] = 'm'
     meta['REF_DATE'] = date_list[0]
 
-    # 2.2 instantiate time-series
-    dates = np.array(date_list, dtype=np.bytes_)
-    pbase = stack_obj.get_perp_baseline_timeseries(dropIfgram=True)
-    ds_name_dict = {
-        "date"       : [dates.dtype, (num_date,), dates],
-        "bperp"      : [np.float32,  (num_date,), pbase],
-        "timeseries" : [np.float32,  (num_date, length, width), None],
-    }
-    writefile.layout_hdf5(inps.tsFile, ds_name_dict, metadata=meta)
-
-    if inps.calcCov:
-        fbase = os.path.splitext(inps.tsFile)[0]
-        fbase += 'Decor' if inps.obsDatasetName.startswith('unwrapPhase') else ''
-        tsStdFile = f'{fbase}Cov.h5'
-        meta['REF_DATE'] = ref_date4std
-        ds_name_dict = {"date"       : [dates.dtype, (num_date,), dates],
-                        "timeseries" : [np.float32,  (num_date, num_date, length, width), None]}
-        writefile.layout_hdf5(tsStdFile, ds_name_dict, meta)
-
-    # 2.3 instantiate invQualifyFile: temporalCoherence / residualInv
+    # 2.2 output file / dataset names
+    out_files = [inps.tsFile, inps.invQualityFile, inps.numInvFile]
     if 'residual' in os.path.basename(inps.invQualityFile).lower():
         inv_quality_name = 'residual'
-        meta['UNIT'] = 'pixel'
     else:
         inv_quality_name = 'temporalCoherence'
-        meta['UNIT'] = '1'
-    meta['FILE_TYPE'] = inv_quality_name
-    meta.pop('REF_DATE')
-    ds_name_dict = {meta['FILE_TYPE'] : [np.float32, (length, width)]}
-    writefile.layout_hdf5(inps.invQualityFile, ds_name_dict, metadata=meta)
-
-    # 2.4 instantiate number of inverted observations
-    meta['FILE_TYPE'] = 'mask'
-    meta['UNIT'] = '1'
-    # ignore NO_DATA_VALUE from ifgram stack file here as 1) it makes sense
-    # and 2) to avoid the weird error at https://github.com/insarlab/MintPy/issues/1185
-    if 'NO_DATA_VALUE' in meta.keys():
-        meta.pop('NO_DATA_VALUE')
-
-    ds_name_dict = {"mask" : [np.float32, (length, width)]}
-    writefile.layout_hdf5(inps.numInvFile, ds_name_dict, metadata=meta)
+    out_ds_names = ['timeseries', inv_quality_name, 'mask']
+    # data type of the residual statistics in the inversion state
+    q_dtype = np.complex64 if inv_quality_name == 'temporalCoherence' else np.float32
 
-    ## 3. run the inversion / estimation and write to disk
-
-    # 3.1 split ifgram_file into blocks to save memory
-    box_list, num_box = stack_obj.split2boxes(max_memory=inps.maxMemory)
+    if inps.calcCov:
+        fbase = os.path.splitext(inps.tsFile)[0]
+        fbase += 'Decor' if inps.obsDatasetName.startswith('unwrapPhase') else ''
+        tsStdFile = f'{fbase}Cov.h5'
+        out_files.append(tsStdFile)
+        out_ds_names.append('timeseries')
+
+    # 2.3 cache the weight of all pairs, to skip the coherence to weight conversion in the re-runs
+    weight_cache_file = None
+    weight_funcs = [inps.weightFunc] if inps.weightFunc not in ['no', 'sbas'] else []
+    weight_funcs += ['var'] if inps.calcCov and 'var' not in weight_funcs else []
+    if inps.weightCache and weight_funcs and inps.obsDatasetName.startswith(('unwrapPhase', 'ion')):
+        weight_cache_file = get_weight_cache_file(inps.ifgramStackFile)
+        for weight_func in weight_funcs:
+            if check_weight_cache(weight_cache_file, stack_obj, weight_func):
+                print(f'use cached weight ({weight_func}) from file: {weight_cache_file}')
+            else:
+                write_weight_cache(weight_cache_file, stack_obj, weight_func, max_memory=inps.maxMemory)
 
-    # 3.2 prepare the input arguments for *_patch()
+    # 2.4 prepare the input arguments for *_patch()
     data_kwargs = {
         "ifgram_file"       : inps.ifgramStackFile,
         "ref_phase"         : inps.refPhase,
@@ -1085,49 +2083,120 @@ def run_ifgram_inversion(inps):
         "mask_threshold"    : inps.maskThreshold,
         "min_redundancy"    : inps.minRedundancy,
         "calc_cov"          : inps.calcCov,
+        "weight_cache_file" : weight_cache_file,
     }
 
-    # 3.3 invert / write block-by-block
-    for i, box in enumerate(box_list):
-        box_wid = box[2] - box[0]
-        box_len = box[3] - box[1]
-        if num_box > 1:
-            print(f'\n------- processing patch {i+1} out of {num_box} --------------')
-            print(f'box width:  {box_wid}')
-            print(f'box length: {box_len}')
-
-        # update box argument in the input data
-        data_kwargs['box'] = box
-        if not inps.cluster:
-            # non-parallel
-            ts, ts_cov, inv_quality, num_inv_obs = run_ifgram_inversion_patch(**data_kwargs)[:-1]
-
-        else:
-            # parallel
-            print('\n\n------- start parallel processing using Dask -------')
-
-            # initiate the output data
-            ts = np.zeros((num_date, box_len, box_wid), np.float32)
-            ts_cov = np.zeros((num_date, num_date, box_len, box_wid), np.float32) if inps.calcCov else None
-            inv_quality = np.zeros((box_len, box_wid), np.float32)
-            num_inv_obs = np.zeros((box_len, box_wid), np.float32)
-
-            # initiate dask cluster and client
-            cluster_obj = cluster.DaskCluster(inps.cluster, inps.numWorker, config_name=inps.config)
-            cluster_obj.open()
+    # read the next block in the background, for non-parallel processing only
+    # as the workers read the data by themselves in parallel processing
+    read_keys = ['ifgram_file', 'ref_phase', 'obs_ds_name', 'weight_func', 'water_mask_file',
+                 'mask_ds_name', 'mask_threshold', 'calc_cov', 'weight_cache_file']
+    read_kwargs = {key: data_kwargs[key] for key in read_keys}
+    read_func = None if inps.cluster or inps.incremental else read_ifgram_inversion_patch
+
+    if inps.incremental:
+        # update the normal equations of the previous run with the new pairs
+        data_kwargs.pop('calc_cov')
+        data_kwargs['state_file'] = state_file
+
+    # 2.5 split ifgram_file into blocks to save memory, for BoxPipeline
+    max_memory = inps.maxMemory / cluster.BoxPipeline.num_box_in_memory
+    # align the box edges with the chunks of the datasets to read only
+    chunk_ds_names = [inps.obsDatasetName]
+    chunk_ds_names += [inps.maskDataset] if inps.maskDataset else []
+    chunk_ds_names += ['coherence'] if weight_funcs and not weight_cache_file else []
+    chunk_shape = readfile.get_hdf5_chunk_shape(inps.ifgramStackFile, chunk_ds_names)
+    num_par = num_date - 1
+    if inps.memoryPlan:
+        # measured on probe boxes
+        patch_func = run_ifgram_inversion_incremental_patch if inps.incremental else run_ifgram_inversion_patch
+        planner = cluster.MemoryPlanner(
+            'ifgram_inversion',
+            key=f'{num_pair}_{num_date}_{inps.obsDatasetName}_{inps.weightFunc}_'
+                f'cov{inps.calcCov:d}_inc{inps.incremental:d}',
+        )
+        box_list, num_box = planner.split_box((0, 0, width, length), max_memory,
+                                              probe_func=patch_func, probe_kwargs=data_kwargs,
+                                              chunk_shape=chunk_shape)
+    else:
+        # estimated from the data size
+        dim0_size = None
+        if inps.incremental:
+            # weight of all pairs, the update of the residual and the solution / rhs / statistics
+            dim0_size = stack_obj.numIfgram * 5 + num_date * 12
+        box_list, num_box = stack_obj.split2boxes(max_memory=max_memory, dim0_size=dim0_size,
+                                                  datasetName=chunk_ds_names)
+
+    # 2.6 resume from the interrupted run (in update mode only)
+    # not for the incremental mode, which restarts from the previous inversion state,
+    # as it is replaced only after all patches are finished.
+    if inps.update_mode and not inps.incremental:
+        num_box_done = read_box_progress(inps, out_files, out_ds_names, box_list)
+    else:
+        num_box_done = 0
+    if num_box_done > 0:
+        print(f'resume from the previous run with {num_box_done} out of {num_box} patches finished.')
 
-            # run dask
-            ts, ts_cov, inv_quality, num_inv_obs = cluster_obj.run(
-                func=run_ifgram_inversion_patch,
-                func_data=data_kwargs,
-                results=[ts, ts_cov, inv_quality, num_inv_obs])
+    else:
+        # instantiate time-series
+        dates = np.array(date_list, dtype=np.bytes_)
+        pbase = stack_obj.get_perp_baseline_timeseries(dropIfgram=True)
+        ds_name_dict = {
+            "date"       : [dates.dtype, (num_date,), dates],
+            "bperp"      : [np.float32,  (num_date,), pbase],
+            "timeseries" : [np.float32,  (num_date, length, width), None],
+        }
+        # in the same chunk layout as the input stack
+        chunk_shape = readfile.get_hdf5_chunk_layout(inps.ifgramStackFile, inps.obsDatasetName)
+        writefile.layout_hdf5(inps.tsFile, ds_name_dict, metadata=meta, chunk_shape=chunk_shape)
 
-            # close dask cluster and client
-            cluster_obj.close()
+        if inps.calcCov:
+            meta['REF_DATE'] = ref_date4std
+            ds_name_dict = {"date"       : [dates.dtype, (num_date,), dates],
+                            "timeseries" : [np.float32,  (num_date, num_date, length, width), None]}
+            writefile.layout_hdf5(tsStdFile, ds_name_dict, meta)
+
+        # instantiate invQualifyFile: temporalCoherence / residualInv
+        meta['FILE_TYPE'] = inv_quality_name
+        meta['UNIT'] = 'pixel' if inv_quality_name == 'residual' else '1'
+        meta.pop('REF_DATE')
+        ds_name_dict = {meta['FILE_TYPE'] : [np.float32, (length, width)]}
+        writefile.layout_hdf5(inps.invQualityFile, ds_name_dict, metadata=meta)
+
+        # instantiate number of inverted observations
+        meta['FILE_TYPE'] = 'mask'
+        meta['UNIT'] = '1'
+        # ignore NO_DATA_VALUE from ifgram stack file here as 1) it makes sense
+        # and 2) to avoid the weird error at https://github.com/insarlab/MintPy/issues/1185
+        if 'NO_DATA_VALUE' in meta.keys():
+            meta.pop('NO_DATA_VALUE')
+
+        ds_name_dict = {"mask" : [np.float32, (length, width)]}
+        writefile.layout_hdf5(inps.numInvFile, ds_name_dict, metadata=meta)
+
+        # instantiate inversion state: weight, right-hand side, solution and residual statistics
+        if inps.incremental:
+            meta['FILE_TYPE'] = 'invState'
+            date12s = np.array(date12_list, dtype=np.bytes_)
+            ds_name_dict = {
+                "date"           : [dates.dtype,   (num_date,), dates],
+                "date12"         : [date12s.dtype, (num_pair,), date12s],
+                "refPhase"       : [np.float32,    (num_pair,), inps.refPhase],
+                "weight"         : [np.float32,    (num_pair, length, width), None],
+                "rhs"            : [np.float64,    (num_par, length, width), None],
+                "timeseries"     : [np.float32,    (num_par, length, width), None],
+                "invQualitySum"  : [q_dtype,       (length, width), None],
+                "invQualityGrad" : [q_dtype,       (num_par, length, width), None],
+            }
+            writefile.layout_hdf5(state_tmp_file, ds_name_dict, metadata=meta)
+
+        # record the block-by-block progress, for resuming from interruption
+        write_box_progress(out_files, out_ds_names, box_list, num_box_done=0)
 
-            print('------- finished parallel processing -------\n\n')
+    ## 3. run the inversion / estimation and write to disk
+    state_ds_names = ['weight', 'rhs', 'timeseries', 'invQualitySum', 'invQualityGrad']
 
-        # write the block to disk
+    def write_patch(i, box, ts, ts_cov, inv_quality, num_inv_obs, *state):
+        """write the block to disk and record the progress"""
         # with 3D block in [z0, z1, y0, y1, x0, x1]
         # and  2D block in         [y0, y1, x0, x1]
         # time-series - 3D
@@ -1157,11 +2226,87 @@ def run_ifgram_inversion(inps):
                                    datasetName='mask',
                                    block=block)
 
-        if num_box > 1:
-            m, s = divmod(time.time() - start_time, 60)
-            print(f'time used: {m:02.0f} mins {s:02.1f} secs.\n')
+        # inversion state - 2D / 3D
+        if inps.incremental:
+            for ds_name, data in zip(state_ds_names, state):
+                block = [box[1], box[3], box[0], box[2]]
+                block = [0, data.shape[0]] + block if data.ndim == 3 else block
+                writefile.write_hdf5_block(state_tmp_file,
+                                           data=data,
+                                           datasetName=ds_name,
+                                           block=block)
+
+        # update the progress
+        write_box_progress(out_files, out_ds_names, box_list, num_box_done=i+1)
+
+    # 3.2 invert / write block-by-block
+    # with reading the next block and writing the previous block in the background
+    with cluster.BoxPipeline(box_list[num_box_done:], read_func, read_kwargs, write_patch) as pipe:
+        for i, box, patch_data in pipe:
+            # index in the full list of boxes, with the finished patches skipped
+            i += num_box_done
+
+            box_wid = box[2] - box[0]
+            box_len = box[3] - box[1]
+            if num_box > 1:
+                print(f'\n------- processing patch {i+1} out of {num_box} --------------')
+                print(f'box width:  {box_wid}')
+                print(f'box length: {box_len}')
+
+            # update box argument in the input data
+            data_kwargs['box'] = box
+            if not inps.cluster:
+                # non-parallel
+                if inps.incremental:
+                    results = run_ifgram_inversion_incremental_patch(**data_kwargs)[:-1]
+                else:
+                    results = run_ifgram_inversion_patch(**data_kwargs, patch_data=patch_data)[:-1]
+
+            else:
+                # parallel
+                print(f'\n\n------- start parallel processing using {inps.cluster} cluster -------')
+
+                # finish writing the previous block first,
+                # to avoid the opened output files being inherited by the worker processes
+                pipe.wait()
+
+                # initiate the output data
+                ts = np.zeros((num_date, box_len, box_wid), np.float32)
+                ts_cov = np.zeros((num_date, num_date, box_len, box_wid), np.float32) if inps.calcCov else None
+                inv_quality = np.zeros((box_len, box_wid), np.float32)
+                num_inv_obs = np.zeros((box_len, box_wid), np.float32)
+                results = [ts, ts_cov, inv_quality, num_inv_obs]
+                if inps.incremental:
+                    results += [np.zeros((num_pair, box_len, box_wid), np.float32),
+                                np.zeros((num_par, box_len, box_wid), np.float64),
+                                np.zeros((num_par, box_len, box_wid), np.float32),
+                                np.zeros((box_len, box_wid), q_dtype),
+                                np.zeros((num_par, box_len, box_wid), q_dtype)]
+
+                # initiate cluster (and client for dask)
+                cluster_obj = cluster.init_cluster(inps.cluster, inps.numWorker, config_name=inps.config)
+                cluster_obj.open()
+
+                # run
+                patch_func = run_ifgram_inversion_incremental_patch if inps.incremental else run_ifgram_inversion_patch
+                results = cluster_obj.run(
+                    func=patch_func,
+                    func_data=data_kwargs,
+                    results=results)
+
+                # close cluster (and client for dask)
+                cluster_obj.close()
 
-    # 3.4 update output data on the reference pixel (for phase)
+                print('------- finished parallel processing -------\n\n')
+
+            # write the block to disk in the background
+            pipe.write(i, box, *results)
+
+            if num_box > 1:
+                m, s = divmod(time.time() - start_time, 60)
+                print(f'time used: {m:02.0f} mins {s:02.1f} secs.\n')
+
+    # 3.3 update output data on the reference pixel (for phase)
     if not inps.skip_ref:
         # grab ref_y/x
         ref_y = int(stack_obj.metadata['REF_Y'])
@@ -1178,6 +2323,15 @@ def run_ifgram_inversion(inps):
         with h5py.File(inps.numInvFile, 'r+') as f:
             f['mask'][ref_y, ref_x] = num_pair
 
+    # 3.4 remove the progress as all patches are finished
+    write_box_progress(out_files, out_ds_names, box_list, num_box_done=None)
+
+    # 3.5 replace the inversion state of the previous run
+    if inps.incremental:
+        state_file = get_inv_state_file(inps.tsFile)
+        os.replace(state_tmp_file, state_file)
+        print(f'save inversion state to file: {state_file}')
+
     # roll back to the original number of threads
     cluster.roll_back_num_threads(num_threads_dict)
 
@@ -71,7 +71,7 @@ def read_inps2dict(inps):
 
     It grab the following contents into iDict
     1. inps & all template files
-    2. configurations: processor, autoPath, updateMode, compression, x/ystep
+    2. configurations: processor, autoPath, updateMode, compression, chunkShape, numWorker, x/ystep
     3. extra metadata: PLATFORM, PROJECT_NAME,
     4. translate autoPath
 
@@ -97,7 +97,11 @@ def read_inps2dict(inps):
     key_list = [i.split(prefix)[1] for i in template.keys() if i.startswith(prefix)]
     for key in key_list:
         value = template[prefix+key]
-        if key in ['processor', 'autoPath', 'updateMode', 'compression']:
+        if key in ['chunkShape', 'numWorker']:
+            # command line options take precedence over the template file
+            if iDict.get(key, None) is None:
+                iDict[key] = template[prefix+key]
+        elif key in ['processor', 'autoPath', 'updateMode', 'compression']:
             iDict[key] = template[prefix+key]
         elif value:
             iDict[prefix+key] = template[prefix+key]
@@ -105,6 +109,8 @@ def read_inps2dict(inps):
 
     if iDict['compression'] is False:
         iDict['compression'] = None
+    iDict['chunkShape'] = iDict.get('chunkShape', None) or 'auto'
+    iDict['numWorker'] = int(iDict.get('numWorker', None) or 1)
 
     # group - multilook
     prefix = 'mintpy.multilook.'
@@ -820,6 +826,8 @@ def load_data(inps):
     print('-'*50)
     print('updateMode : {}'.format(iDict['updateMode']))
     print('compression: {}'.format(iDict['compression']))
+    print('chunk shape: {}'.format(iDict['chunkShape']))
+    print('num of workers to read files: {}'.format(iDict['numWorker']))
     print('multilook x/ystep: {}/{}'.format(iDict['xstep'], iDict['ystep']))
     print('multilook method : {}'.format(iDict['method']))
     kwargs = dict(updateMode=iDict['updateMode'], xstep=iDict['xstep'], ystep=iDict['ystep'])
@@ -844,7 +852,8 @@ def load_data(inps):
             box=iDict['box4geo'],
             xstep=iDict['xstep'],
             ystep=iDict['ystep'],
-            compression='lzf')
+            compression='lzf',
+            num_worker=iDict['numWorker'])
 
     if run_or_skip(geom_radar_file, geom_radar_obj, iDict['box'], **kwargs) == 'run':
         geom_radar_obj.write2hdf5(
@@ -854,7 +863,8 @@ def load_data(inps):
             xstep=iDict['xstep'],
             ystep=iDict['ystep'],
             compression='lzf',
-            extra_metadata=extraDict)
+            extra_metadata=extraDict,
+            num_worker=iDict['numWorker'])
 
     # observations: ifgram, ion or offset
     # loop over obs stacks
@@ -885,8 +895,10 @@ def load_data(inps):
                 ystep=iDict['ystep'],
                 mli_method=iDict['method'],
                 compression=iDict['compression'],
+                chunk_shape=iDict['chunkShape'],
                 extra_metadata=extraDict,
-                geom_obj=geom_obj)
+                geom_obj=geom_obj,
+                num_worker=iDict['numWorker'])
 
     # used time
     m, s = divmod(time.time()-start_time, 60)
@@ -26,6 +26,24 @@ def get_relative_range_distance(meta):
     return range_dist
 
 
+def get_ramp_rate(meta, rg_dist_file=None):
+    """Get the LOD ramp rate in meter per year from the empirical model.
+    Parameters: meta         - dict, metadata of the file to be corrected
+                rg_dist_file - str, path of the geometry file with slantRangeDistance
+    Returns:    ramp_rate    - 2D np.ndarray in float32, referenced to REF_Y/X
+    """
+    if not rg_dist_file:
+        print('calculate range distance from file metadata')
+        rg_dist = get_relative_range_distance(meta)
+    else:
+        print('read range distance from file: %s' % (rg_dist_file))
+        rg_dist = readfile.read(rg_dist_file, datasetName='slantRangeDistance', print_msg=False)[0]
+        rg_dist -= rg_dist[int(meta['REF_Y']), int(meta['REF_X'])]
+
+    ramp_rate = np.array(rg_dist * 3.87e-7, np.float32)
+    return ramp_rate
+
+
 def correct_local_oscilator_drift(fname, rg_dist_file=None, out_file=None):
     print('-'*50)
     print('correct Local Oscillator Drift for Envisat using an empirical model (Marinkovic and Larsen, 2013)')
@@ -44,15 +62,7 @@ def correct_local_oscilator_drift(fname, rg_dist_file=None, out_file=None):
         out_file = f'{os.path.splitext(fname)[0]}_LOD{os.path.splitext(fname)[1]}'
 
     # Get LOD ramp rate from empirical model
-    if not rg_dist_file:
-        print('calculate range distance from file metadata')
-        rg_dist = get_relative_range_distance(atr)
-    else:
-        print('read range distance from file: %s' % (rg_dist_file))
-        rg_dist = readfile.read(rg_dist_file, datasetName='slantRangeDistance', print_msg=False)[0]
-        rg_dist -= rg_dist[int(atr['REF_Y']), int(atr['REF_X'])]
-
-    ramp_rate = np.array(rg_dist * 3.87e-7, np.float32)
+    ramp_rate = get_ramp_rate(atr, rg_dist_file)
 
     # Correct LOD Ramp for Input fname
     range2phase = -4*np.pi / float(atr['WAVELENGTH'])
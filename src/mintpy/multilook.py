@@ -12,7 +12,8 @@ import warnings
 import h5py
 import numpy as np
 
-from mintpy.stdproc.multilook import multilook_data, multilook_gdal
+from mintpy.objects import cluster
+from mintpy.stdproc.multilook import multilook_gdal
 from mintpy.utils import attribute as attr, readfile, writefile
 
 # suppress numpy.RuntimeWarning message
@@ -21,7 +22,14 @@ np_logger.setLevel(logging.WARNING)
 
 
 ######################################## Sub Functions ############################################
-def multilook_file(infile, lks_y, lks_x, outfile=None, method='mean', max_memory=4,
+def read_multilook_box(infile, dsName, box, lks_y, lks_x, method='mean'):
+    """Read and multilook the data of one dataset within the box, with multilook-on-read."""
+    data = readfile.read(infile, datasetName=dsName, box=box, xstep=lks_x, ystep=lks_y,
+                         method=method, print_msg=False)[0]
+    return data
+
+
+def multilook_file(infile, lks_y, lks_x, outfile=None, method='mean', max_memory=4, memory_plan=False,
                    search_win=None, xcorr_win=None, margin=0, off_file=None):
     """ Multilook input file.
 
@@ -30,6 +38,7 @@ def multilook_file(infile, lks_y, lks_x, outfile=None, method='mean', max_memory
                 lks_x      - int, number of looks in x / column direction.
                 outfile    - str, path of output file
                 max_memory - float, maximum used memory in GB
+                memory_plan - bool, plan the block size based on the memory measured on probe blocks
                 search_win - list(int), ampcor (half) search window in (width, length)
                 xcorr_win  - list(int), ampcor cross-correlation window in (width, length)
                 margin     - int, ampcor margin
@@ -109,7 +118,23 @@ def multilook_file(infile, lks_y, lks_x, outfile=None, method='mean', max_memory
             d=dsName, w=maxDigit, f=os.path.basename(infile)))
 
         # split in Y/row direction for IO for HDF5 only
-        if fext in ['.h5', '.he5']:
+        if fext in ['.h5', '.he5'] and memory_plan:
+            # calc step size with memory usage measured on probe blocks
+            with h5py.File(outfile, 'r') as f:
+                ds_shape, ds_dtype = f[dsName].shape, f[dsName].dtype
+            num_slice = ds_shape[0] if len(ds_shape) == 3 else 1
+            planner = cluster.MemoryPlanner(
+                'multilook',
+                key=f'{method}_{lks_y}x{lks_x}_{num_slice}x{ds_dtype}',
+            )
+            probe_kwargs = dict(infile=infile, dsName=dsName, lks_y=lks_y, lks_x=lks_x, method=method)
+            max_num_pixel = planner.get_max_num_pixel(max_memory, box,
+                                                      probe_func=read_multilook_box,
+                                                      probe_kwargs=probe_kwargs,
+                                                      row_step=lks_y)
+            row_step = max(max_num_pixel // (box[2] - box[0]) // lks_y, 1)
+
+        elif fext in ['.h5', '.he5']:
             # calc step size with memory usage up to 4 GB
             # use outfile as h5py may be be able to handle infile (non-hdf5)
             with h5py.File(outfile, 'r') as f:
@@ -134,12 +159,7 @@ def multilook_file(infile, lks_y, lks_x, outfile=None, method='mean', max_memory
             print(f'box: {box_o}')
 
             # read / multilook
-            kwargs = dict(datasetName=dsName, box=box_i, print_msg=False)
-            if method == 'nearest':
-                data = readfile.read(infile, xstep=lks_x, ystep=lks_y, **kwargs)[0]
-            else:
-                data = readfile.read(infile, **kwargs)[0]
-                data = multilook_data(data, lks_y, lks_x, method=method)
+            data = read_multilook_box(infile, dsName, box_i, lks_y, lks_x, method=method)
 
             # output block
             if data.ndim == 3:
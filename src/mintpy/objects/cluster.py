@@ -1,4 +1,4 @@
-"""Class wrapped around Dask for parallel computing."""
+"""Class wrapped around Dask / concurrent.futures for parallel computing."""
 #############################################################
 # Program is part of MintPy                                 #
 # Copyright (c) 2013, Zhang Yunjun, Heresh Fattahi          #
@@ -14,7 +14,8 @@ import shutil
 import time
 
 # supported / tested clusters
-CLUSTER_LIST = ['lsf', 'pbs', 'slurm', 'local']
+# process - local process pool via concurrent.futures, without dask
+CLUSTER_LIST = ['lsf', 'pbs', 'slurm', 'local', 'process']
 NUM_THREADS_ENV_LIST = [
     'OMP_NUM_THREADS',         # openmp
     'OPENBLAS_NUM_THREADS',    # openblas
@@ -84,6 +85,107 @@ def split_box2sub_boxes(box, num_split, dimension='x', print_msg=False):
     return sub_boxes, num_split
 
 
+def split_box2tiles(box, max_num_pixel, chunk_shape=None, print_msg=False):
+    """Divide the input box into 2D tiles with edges aligned to the chunk layout of the datasets.
+
+    Full-width strips of whole chunk rows are used if they fit into max_num_pixel, otherwise
+    the strips are split further along the columns in multiple of the chunk width. Thus, each
+    chunk is decompressed only once while reading all the tiles.
+
+    :param box: [x0, y0, x1, y1]: list[int] of size 4, in the coordinates of the datasets
+    :param max_num_pixel: int, max number of pixels per tile,
+           the tiles are NOT aligned to the chunks if a single chunk exceeds it
+    :param chunk_shape: tuple(int) of size 2, chunk shape in (row, column),
+           e.g. from readfile.get_hdf5_chunk_shape(), None for no alignment
+    :return: tiles: list(list(4 int)), the tiles in row-major order
+    :return: num_tile: int, the number of tiles
+    """
+    x0, y0, x1, y1 = box
+    length, width = y1 - y0, x1 - x0
+    if max_num_pixel >= length * width:
+        return [list(box)], 1
+
+    # fall back to the unaligned tiles for tiny memory limits
+    if chunk_shape and chunk_shape[0] * chunk_shape[1] > max_num_pixel:
+        chunk_shape = None
+
+    # calc step in the multiple of chunk size
+    chunk_y, chunk_x = chunk_shape if chunk_shape else (1, 1)
+    num_row = max_num_pixel // width
+    if num_row >= chunk_y:
+        y_step = num_row // chunk_y * chunk_y
+        x_step = width
+    else:
+        y_step = chunk_y
+        x_step = max(max_num_pixel // y_step // chunk_x, 1) * chunk_x
+
+    def get_edges(v0, v1, step):
+        """edges at v0, v1 and the multiples of step in between, i.e. aligned to the chunk grid"""
+        if step >= v1 - v0:
+            return [v0, v1]
+        return [v0] + list(range((v0 // step + 1) * step, v1, step)) + [v1]
+
+    y_edges = get_edges(y0, y1, y_step)
+    x_edges = get_edges(x0, x1, x_step)
+    tiles = []
+    for r0, r1 in zip(y_edges[:-1], y_edges[1:]):
+        for c0, c1 in zip(x_edges[:-1], x_edges[1:]):
+            tiles.append([c0, r0, c1, r1])
+
+    if print_msg:
+        print(f'split box {list(box)} into {len(tiles)} tiles of up to {y_step} rows x {min(x_step, width)} columns')
+        if chunk_shape:
+            print(f'    aligned to the chunk shape of {tuple(chunk_shape)} in (row, column)')
+
+    return tiles, len(tiles)
+
+
+def prefetch_in_order(func, kwargs_list, num_worker=1):
+    """Run func(**kwargs) for each kwargs in a thread pool, and yield the results in order.
+
+    Up to 2 * num_worker calls are submitted ahead, to overlap the reading of the next items
+    with the processing / writing of the current item in the calling thread, while limiting
+    the number of items in memory.
+
+    :param func: function, e.g. to read / decode / multilook one file
+    :param kwargs_list: list(dict), the arguments of each call
+    :param num_worker: int, number of threads, run in sequence in the calling thread if <= 1
+    :return: generator of the result of each call, in the order of kwargs_list
+    Example:
+        for i, data in enumerate(cluster.prefetch_in_order(read_pair, kwargs_list, num_worker=4)):
+            ds[i, :, :] = data
+    """
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+
+    if num_worker <= 1:
+        for kwargs in kwargs_list:
+            yield func(**kwargs)
+        return
+
+    kwargs_iter = iter(kwargs_list)
+    executor = ThreadPoolExecutor(max_workers=num_worker)
+    futures = deque()
+    try:
+        for kwargs in kwargs_iter:
+            futures.append(executor.submit(func, **kwargs))
+            if len(futures) >= num_worker * 2:
+                break
+
+        while futures:
+            result = futures.popleft().result()
+            # submit the next one, before yielding the result
+            kwargs = next(kwargs_iter, None)
+            if kwargs is not None:
+                futures.append(executor.submit(func, **kwargs))
+            yield result
+    finally:
+        # cancel the pending calls, e.g. if the caller stops early
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
 def set_num_threads(num_threads=None, print_msg=True):
     """limit/set the number of threads for all environmental variables to the given value
     and save/return the original value for backup purpose.
@@ -129,6 +231,34 @@ def roll_back_num_threads(num_threads_dict, print_msg=True):
     return
 
 
+def init_cluster(cluster_type, num_worker, config_name=None, **kwargs):
+    """Initiate the cluster object for parallel processing in blocks.
+
+    Parameters: cluster_type - str, cluster to use (local, slurm, lsf, pbs, process)
+                num_worker   - str, number of workers to use
+                config_name  - str, the name of configuration section [for dask only]
+    Returns:    cluster_obj  - DaskCluster or ProcessCluster object,
+                               both with the same open() / run() / close() interface.
+    Examples:   cluster_obj = cluster.init_cluster('local', '4')
+                cluster_obj.open()
+                results = cluster_obj.run(func, func_data, results)
+                cluster_obj.close()
+    """
+    cluster_type = cluster_type.lower()
+
+    # fall back to the process pool for local cluster if dask.distributed is not available
+    if cluster_type == 'local':
+        from importlib.util import find_spec
+        if find_spec('distributed') is None:
+            print('WARNING: dask.distributed is NOT available, use the process pool instead and continue.')
+            cluster_type = 'process'
+
+    if cluster_type == 'process':
+        return ProcessCluster(num_worker)
+    else:
+        return DaskCluster(cluster_type, num_worker, config_name=config_name, **kwargs)
+
+
 
 ############################## Beginning of DaskCluster class ##############################
 
@@ -372,7 +502,7 @@ class DaskCluster:
         :return: num_worker: int, number of workers to use
         """
 
-        if cluster_type == 'local':
+        if cluster_type in ['local', 'process']:
             num_core = os.cpu_count()
 
             # all / percentage --> num_core
@@ -475,3 +605,474 @@ class DaskCluster:
             shutil.move(item, stderr_folder)
 
 ############################## End of DaskCluster class ####################################
+
+
+
+############################## Beginning of ProcessCluster class ###########################
+
+def _run_sub_box(func, func_data, shm_specs, box):
+    """Run func on one sub box in the worker process and
+    write the results into the shared memory of the primary box.
+
+    :param func: function, a python function to run in parallel
+    :param func_data: dict, a dictionary of the argument to pass to the function
+    :param shm_specs: list of (str, tuple, np.dtype) or None, name / shape / data type
+           of the shared memory block for each of the results
+    :param box: list(4 int), the primary box in (x0, y0, x1, y1)
+    :return: sub_box: list(4 int), the processed sub box
+    """
+    from multiprocessing import shared_memory
+
+    import numpy as np
+
+    sub_results = func(**func_data)
+
+    # convert the absolute sub_box into local col/row start/end relative to the primary box
+    sub_box = sub_results[-1]
+    x0, y0, x1, y1 = sub_box
+    x0 -= box[0]
+    x1 -= box[0]
+    y0 -= box[1]
+    y1 -= box[1]
+
+    for sub_result, shm_spec in zip(sub_results[:-1], shm_specs):
+        if sub_result is not None and shm_spec is not None:
+            shm_name, shape, dtype = shm_spec
+            # worker processes share the resource tracker of the parent process,
+            # which owns and unlinks the shared memory after all workers finish
+            shm = shared_memory.SharedMemory(name=shm_name)
+            data = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            data[..., y0:y1, x0:x1] = sub_result
+            del data
+            shm.close()
+
+    return sub_box
+
+
+class ProcessCluster:
+    """
+    Generic process pool wrapper for parallel processing in blocks, without dask.
+
+    It follows the same interface as DaskCluster (open / run / close), with the computing
+    function assumption as described in DaskCluster. The sub boxes are distributed to
+    a pool of worker processes via concurrent.futures, and the results are written by the
+    workers directly into the shared memory of the primary box, instead of being pickled
+    back to the main process.
+
+    Check ifgram_inversion.py as an example.
+
+    """
+
+    def __init__(self, num_worker, **kwargs):
+        """Initiate object
+        :param num_worker: str, number of workers to use
+        """
+        self.cluster_type = 'process'
+        self.num_worker = self.format_num_worker(self.cluster_type, num_worker)
+
+        ## printout message
+        print(f"input cluster type: {self.cluster_type}")
+
+        ## initial value
+        self.executor = None
+
+
+    def open(self):
+        """Initiate the pool of worker processes"""
+        from concurrent.futures import ProcessPoolExecutor
+
+        print(f'initiate process pool with {self.num_worker} workers')
+        self.executor = ProcessPoolExecutor(max_workers=self.num_worker)
+
+
+    def run(self, func, func_data, results):
+        """Split the box into sub boxes, run func on them in parallel and assemble the results.
+
+        :param func: function, a python function to run in parallel
+        :param func_data: dict, a dictionary of the argument to pass to the function
+        :param results: list[numpy.ndarray], arrays of the appropriate structure representing
+               the final output of processed box (need to be in the same order as the function passed in
+               submit_workers returns in)
+        :return: results: tuple(numpy.ndarray), the processed results of the box
+        """
+        from concurrent.futures import as_completed
+        from multiprocessing import shared_memory
+
+        import numpy as np
+
+        # split the primary box into sub boxes for workers
+        box = func_data["box"]
+        sub_boxes, num_split = split_box2sub_boxes(
+            box,
+            num_split=self.num_worker,
+            dimension='x',
+            print_msg=False,
+        )
+        print(f'split patch into {num_split} sub boxes in x direction for workers to process')
+
+        # allocate shared memory for the results of the primary box
+        shm_list, shm_specs = [], []
+        for result in results:
+            if result is None:
+                shm_list.append(None)
+                shm_specs.append(None)
+            else:
+                shm = shared_memory.SharedMemory(create=True, size=max(result.nbytes, 1))
+                np.ndarray(result.shape, dtype=result.dtype, buffer=shm.buf)[:] = result
+                shm_list.append(shm)
+                shm_specs.append((shm.name, result.shape, result.dtype))
+
+        try:
+            # submit job for each sub box
+            submission_time = time.time()
+            futures = []
+            for i, sub_box in enumerate(sub_boxes):
+                print(f'submit a job to the worker for sub box {i}: {sub_box}')
+                sub_func_data = dict(func_data, box=sub_box)
+                futures.append(self.executor.submit(_run_sub_box, func, sub_func_data, shm_specs, box))
+
+            # wait for all workers
+            for i, future in enumerate(as_completed(futures)):
+                sub_box = future.result()
+                sub_t = time.time() - submission_time
+                print(f"\nFUTURE #{i+1} complete for sub box {sub_box}. Time used: {sub_t:.0f} seconds")
+
+            # copy the results out of the shared memory
+            for result, shm in zip(results, shm_list):
+                if shm is not None:
+                    result[:] = np.ndarray(result.shape, dtype=result.dtype, buffer=shm.buf)
+
+        finally:
+            for shm in shm_list:
+                if shm is not None:
+                    shm.close()
+                    shm.unlink()
+
+        return results
+
+
+    def close(self):
+        """Shut down the pool of worker processes."""
+        self.executor.shutdown(wait=True)
+        print('close process pool')
+
+
+    @staticmethod
+    def format_num_worker(cluster_type, num_worker):
+        """Format num_worker, same as DaskCluster.format_num_worker()."""
+        return DaskCluster.format_num_worker(cluster_type, num_worker)
+
+############################## End of ProcessCluster class #################################
+
+
+
+############################## Beginning of BoxPipeline class ##############################
+
+class BoxPipeline:
+    """
+    Box-by-box processing with the I/O overlapped with the computation.
+
+    While box i is being computed in the main thread, box i+1 is read in a background
+    thread and the results of box i-1 are written in another background thread.
+    Check num_box_in_memory for the box size.
+
+    Example:
+        box_list, num_box = stack_obj.split2boxes(max_memory / cluster.BoxPipeline.num_box_in_memory)
+        with cluster.BoxPipeline(box_list, read_func, read_kwargs, write_func) as pipe:
+            for i, box, data in pipe:
+                results = run_patch(box=box, patch_data=data)
+                pipe.write(box, *results)
+
+    Check ifgram_inversion.py as an example.
+
+    """
+
+    # number of boxes in memory at the same time: the next one being read, the current one
+    # being computed and the previous one being written in the background, thus, boxes are
+    # sized with max_memory / num_box_in_memory to honour the memory limit of the step.
+    num_box_in_memory = 3
+
+    def __init__(self, box_list, read_func=None, read_kwargs=None, write_func=None):
+        """Initiate object
+        :param box_list: list(tuple(4 int)), boxes to be processed in sequence
+        :param read_func: function, read_func(box=box, **read_kwargs) returns the input data of a box,
+               None for not reading, e.g. for parallel processing where workers read by themselves.
+        :param read_kwargs: dict, the argument to pass to read_func, except for box
+        :param write_func: function, write_func(*args, **kwargs) writes the results of a box
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.box_list = box_list
+        self.read_func = read_func
+        self.read_kwargs = read_kwargs if read_kwargs else {}
+        self.write_func = write_func
+
+        # one thread for reading and one for writing, to keep the boxes in order
+        self.reader = ThreadPoolExecutor(max_workers=1) if read_func else None
+        self.writer = ThreadPoolExecutor(max_workers=1) if write_func else None
+        self.read_future = None
+        self.write_future = None
+
+
+    def __iter__(self):
+        """Yield (index, box, data) of each box, with data read in advance in the background."""
+        if self.reader is None:
+            for i, box in enumerate(self.box_list):
+                yield i, box, None
+            return
+
+        for i, box in enumerate(self.box_list):
+            if self.read_future is None:
+                self.read_future = self.reader.submit(self.read_func, box=box, **self.read_kwargs)
+            data = self.read_future.result()
+
+            # prefetch the next box
+            self.read_future = None
+            if i + 1 < len(self.box_list):
+                self.read_future = self.reader.submit(self.read_func, box=self.box_list[i+1], **self.read_kwargs)
+
+            yield i, box, data
+            del data
+
+
+    def write(self, *args, **kwargs):
+        """Write the results of a box in the background, after the previous writing is finished."""
+        # keep at most one box in writing, to honour the memory limit
+        self.wait()
+        self.write_future = self.writer.submit(self.write_func, *args, **kwargs)
+
+
+    def wait(self):
+        """Wait for the writing in the background to finish, and raise its error if any."""
+        if self.write_future is not None:
+            future, self.write_future = self.write_future, None
+            future.result()
+
+
+    def close(self):
+        """Finish writing and shut down the background threads."""
+        try:
+            self.wait()
+        finally:
+            # cancel the prefetched box, if not started yet
+            if self.read_future is not None:
+                self.read_future.cancel()
+                self.read_future = None
+            for executor in [self.reader, self.writer]:
+                if executor is not None:
+                    executor.shutdown(wait=True)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        self.close()
+
+############################## End of BoxPipeline class ####################################
+
+
+
+class MemoryPlanner:
+    """
+    Plan the box size of a processing step based on its measured memory usage.
+
+    The memory usage of a step on a box is modeled as a linear function of the number of
+    pixels: memory = coeff[0] * num_pixel + coeff[1]. The coefficients are calibrated by
+    running the step on two small probe boxes while tracing its peak memory allocation,
+    and saved per step and data dimension into a JSON file (MemoryPlanner.coeff_file),
+    so that later runs of the same step on the same kind of data skip the probe.
+
+    Example:
+        planner = cluster.MemoryPlanner('timeseries2velocity', key=f'{num_date}_{num_param}')
+        box_list, num_box = planner.split_box((0, 0, width, length), max_memory,
+                                              probe_func=run_patch, probe_kwargs=data_kwargs)
+
+    Check timeseries2velocity.py as an example.
+
+    """
+
+    # file to save the calibrated coefficients
+    coeff_file = os.environ.get('MINTPY_MEMORY_COEFF_FILE',
+                                os.path.expanduser('~/.mintpy/memory_coeff.json'))
+    # fraction of the max memory to use for one box,
+    # leaving the rest for the interpreter, the imported modules, etc.
+    target_ratio = 0.8
+    # number of pixels of the two probe boxes
+    probe_num_pixel = (5e3, 2e4)
+
+    def __init__(self, step, key=''):
+        """Initiate object
+        :param step: str, name of the processing step, e.g. ifgram_inversion
+        :param key: str, signature of the data / configuration that the memory usage depends on,
+               e.g. the number of acquisitions, to distinguish the calibrations of the same step
+        """
+        self.step = step
+        self.key = str(key)
+
+
+    def read_coeff(self):
+        """Read the calibrated coefficients of the step from the coefficient file.
+        :return: coeff - list(float) of size 2 for (bytes per pixel, bytes in constant), or None
+        """
+        import json
+
+        if not os.path.isfile(self.coeff_file):
+            return None
+        try:
+            with open(self.coeff_file) as f:
+                coeff_dict = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return coeff_dict.get(self.step, {}).get(self.key, None)
+
+
+    def write_coeff(self, coeff):
+        """Save the calibrated coefficients of the step into the coefficient file."""
+        import json
+
+        coeff_dict = {}
+        if os.path.isfile(self.coeff_file):
+            try:
+                with open(self.coeff_file) as f:
+                    coeff_dict = json.load(f)
+            except (OSError, ValueError):
+                coeff_dict = {}
+        coeff_dict.setdefault(self.step, {})[self.key] = [float(x) for x in coeff]
+
+        # write to a temporary file first, to not corrupt the file shared among runs
+        try:
+            os.makedirs(os.path.dirname(self.coeff_file) or '.', exist_ok=True)
+            tmp_file = f'{self.coeff_file}.{os.getpid()}.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(coeff_dict, f, indent=2, sort_keys=True)
+            os.replace(tmp_file, self.coeff_file)
+            print(f'save memory coefficients of {self.step} to file: {self.coeff_file}')
+        except OSError as e:
+            print(f'WARNING: can not save memory coefficients to file: {self.coeff_file} ({e})')
+
+
+    @staticmethod
+    def measure_peak_memory(func, func_kwargs):
+        """Measure the peak memory allocated while running func(**func_kwargs).
+
+        The memory is traced via tracemalloc, which includes the buffers of NumPy arrays,
+        instead of the peak resident set size (RSS) of the process, which can not be reset
+        between runs and is disturbed by the memory cached in the allocator.
+
+        :return: peak - int, peak memory allocated in bytes
+        """
+        import tracemalloc
+
+        is_tracing = tracemalloc.is_tracing()
+        if not is_tracing:
+            tracemalloc.start()
+        try:
+            if hasattr(tracemalloc, 'reset_peak'):
+                mem0 = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+            else:
+                # python<3.9: restart the tracing to reset the peak
+                tracemalloc.stop()
+                tracemalloc.start()
+                mem0 = 0
+            func(**func_kwargs)
+            peak = tracemalloc.get_traced_memory()[1] - mem0
+        finally:
+            if not is_tracing:
+                tracemalloc.stop()
+        return max(peak, 0)
+
+
+    def calibrate(self, box, probe_func, probe_kwargs, row_step=1, print_msg=True):
+        """Calibrate the memory coefficients by running the step on two small probe boxes.
+
+        :param box: tuple(4 int), the box to be processed
+        :param probe_func: function, probe_func(box=box, **probe_kwargs) runs the step on a box
+        :param probe_kwargs: dict, the arguments to pass to probe_func, except for box
+        :param row_step: int, the number of rows of the probe boxes should be multiple of row_step
+        :return: coeff - list(float) of size 2 for (bytes per pixel, bytes in constant)
+        """
+        import numpy as np
+
+        x0, y0, x1, y1 = box
+        length, width = y1 - y0, x1 - x0
+
+        # number of rows of the probe boxes
+        num_rows = []
+        for num_pixel in self.probe_num_pixel:
+            num_row = int(np.ceil(num_pixel / width / row_step)) * row_step
+            num_row = min(num_row, length // row_step * row_step)
+            if num_row > 0 and num_row not in num_rows:
+                num_rows.append(num_row)
+
+        # run the step on the probe boxes in the middle of the data
+        # as the edges could be void of valid pixels, and thus skipped
+        num_pixels, mems = [], []
+        for num_row in num_rows:
+            r0 = y0 + (length - num_row) // 2 // row_step * row_step
+            probe_box = (x0, r0, x1, r0 + num_row)
+            mem = self.measure_peak_memory(probe_func, {**probe_kwargs, 'box': probe_box})
+            num_pixels.append(num_row * width)
+            mems.append(mem)
+            if print_msg:
+                print(f'probe box {probe_box} of {self.step}: peak memory of {mem/1024**2:.1f} MB')
+
+        # fit the linear model
+        coeff = [mems[-1] / num_pixels[-1], 0.]
+        if len(num_pixels) == 2 and mems[1] > mems[0]:
+            coeff[0] = (mems[1] - mems[0]) / (num_pixels[1] - num_pixels[0])
+            coeff[1] = max(mems[0] - coeff[0] * num_pixels[0], 0.)
+        return coeff
+
+
+    def get_max_num_pixel(self, max_memory, box, probe_func, probe_kwargs, row_step=1, print_msg=True):
+        """Get the max number of pixels per box for the given memory limit.
+
+        The coefficients are read from the coefficient file if available,
+        otherwise calibrated on probe boxes and saved to the file.
+
+        :param max_memory: float, max memory to use in GB
+        :return: max_num_pixel - int, max number of pixels per box
+        """
+        coeff = self.read_coeff()
+        if coeff is None:
+            if print_msg:
+                print(f'calibrate the memory usage of {self.step} on probe boxes ...')
+            coeff = self.calibrate(box, probe_func, probe_kwargs, row_step=row_step, print_msg=print_msg)
+            self.write_coeff(coeff)
+        elif print_msg:
+            print(f'read memory coefficients of {self.step} from file: {self.coeff_file}')
+
+        max_num_pixel = int((self.target_ratio * max_memory * 1024**3 - coeff[1]) / max(coeff[0], 1))
+        if max_num_pixel < 1:
+            # the constant part alone exceeds the memory limit: use the size of the small probe box
+            max_num_pixel = int(self.probe_num_pixel[0])
+            print(f'WARNING: max memory of {max_memory:.4f} GB is too small for {self.step}, '
+                  f'use {max_num_pixel} pixels per box instead.')
+        if print_msg:
+            print(f'memory usage: {coeff[0]:.1f} bytes per pixel + {coeff[1]/1024**2:.1f} MB')
+            print(f'max number of pixels per box: {max_num_pixel} for {max_memory:.4f} GB '
+                  f'with target ratio of {self.target_ratio}')
+        return max_num_pixel
+
+
+    def split_box(self, box, max_memory, probe_func, probe_kwargs, chunk_shape=None, print_msg=True):
+        """Split the box into sub boxes based on the measured memory usage.
+
+        Split along the row direction by default; or into 2D tiles if a single row
+        exceeds the memory limit.
+
+        :param box: tuple(4 int), the box to be processed, in (x0, y0, x1, y1)
+        :param max_memory: float, max memory to use per box in GB
+        :param probe_func / probe_kwargs: see calibrate()
+        :param chunk_shape: tuple(int) of size 2, chunk shape in (row, column) to align the boxes with
+        :return: box_list - list(list(4 int)), the sub boxes
+        :return: num_box - int, the number of sub boxes
+        """
+        max_num_pixel = self.get_max_num_pixel(max_memory, box, probe_func, probe_kwargs,
+                                               print_msg=print_msg)
+        return split_box2tiles(box, max_num_pixel, chunk_shape=chunk_shape, print_msg=print_msg)
+
+############################## End of MemoryPlanner class ##################################
@@ -21,6 +21,31 @@ RAMP_LIST = [
 ]
 
 
+def get_design_matrix4ramp(yy, xx, ramp_type='linear'):
+    """Get the design matrix of the ramp for the given pixel coordinates.
+
+    Parameters: yy/xx     - 2D np.ndarray in size of (num_pixel, 1), row/column coordinates
+                ramp_type - str, name of ramp to be estimated.
+    Returns:    G         - 2D np.ndarray in size of (num_pixel, num_param)
+    """
+    ones = np.ones(xx.shape, dtype=xx.dtype)
+    if ramp_type == 'linear':
+        G = np.hstack((yy, xx, ones))
+    elif ramp_type == 'quadratic':
+        G = np.hstack((yy**2, xx**2, yy*xx, yy, xx, ones))
+    elif ramp_type == 'linear_range':
+        G = np.hstack((xx, ones))
+    elif ramp_type == 'linear_azimuth':
+        G = np.hstack((yy, ones))
+    elif ramp_type == 'quadratic_range':
+        G = np.hstack((xx**2, xx, ones))
+    elif ramp_type == 'quadratic_azimuth':
+        G = np.hstack((yy**2, yy, ones))
+    else:
+        raise ValueError(f'un-recognized ramp type: {ramp_type}')
+    return G
+
+
 def deramp(data, mask_in=None, ramp_type='linear', metadata=None, max_num_sample=1e6, coeff_file=None,
            ignore_zero_value=True):
     '''Remove ramp from input data matrix based on pixel marked by mask
@@ -80,21 +105,7 @@ def deramp(data, mask_in=None, ramp_type='linear', metadata=None, max_num_sample
                          np.arange(0, length))
     xx = np.array(xx, dtype=np.float32).reshape(-1, 1)
     yy = np.array(yy, dtype=np.float32).reshape(-1, 1)
-    ones = np.ones(xx.shape, dtype=np.float32)
-    if ramp_type == 'linear':
-        G = np.hstack((yy, xx, ones))
-    elif ramp_type == 'quadratic':
-        G = np.hstack((yy**2, xx**2, yy*xx, yy, xx, ones))
-    elif ramp_type == 'linear_range':
-        G = np.hstack((xx, ones))
-    elif ramp_type == 'linear_azimuth':
-        G = np.hstack((yy, ones))
-    elif ramp_type == 'quadratic_range':
-        G = np.hstack((xx**2, xx, ones))
-    elif ramp_type == 'quadratic_azimuth':
-        G = np.hstack((yy**2, yy, ones))
-    else:
-        raise ValueError(f'un-recognized ramp type: {ramp_type}')
+    G = get_design_matrix4ramp(yy, xx, ramp_type)
 
     # estimate ramp
     X = np.dot(np.linalg.pinv(G[mask, :], rcond=1e-15), data[mask, :])
@@ -125,3 +136,156 @@ def deramp(data, mask_in=None, ramp_type='linear', metadata=None, max_num_sample
     ramp = ramp.reshape(dshape)
     data_out = data_out.reshape(dshape)
     return data_out, ramp
+
+
+class RampEstimator:
+    """Estimate and remove the ramp of each 2D matrix of a 3D stack, with the data read box by box.
+
+    It fits the same ramp as deramp() one 2D matrix at a time, including the masking of NaN / zero
+    values and the uniform sampling for big datasets, but only the normal equations are kept in
+    memory, thus, the stack does not need to be loaded / written as a whole.
+
+    The normal equations are accumulated for all the candidate sampling steps in one read, as the
+    number of valid pixels of each 2D matrix, which decides its sampling step, is only known after
+    reading the whole stack. The pixel coordinates are normalized by the image size for stability.
+
+    Example:
+        estimator = RampEstimator('linear', num_date, length, width, metadata=atr)
+        for box in box_list:
+            estimator.accumulate(ts_data, box, mask=mask[box[1]:box[3], box[0]:box[2]])
+        estimator.solve()
+        for box in box_list:
+            ts_data = estimator.deramp(ts_data, box)[0]
+    """
+
+    def __init__(self, ramp_type, num_slice, length, width, metadata=None, max_num_sample=1e6,
+                 ignore_zero_value=True):
+        self.ramp_type = ramp_type
+        self.num_slice = num_slice
+        self.length = length
+        self.width = width
+        self.max_num_sample = max_num_sample
+        self.ignore_zero_value = ignore_zero_value
+
+        # candidate sampling steps, as in deramp()
+        num_pixel = length * width
+        self.max_step = 1
+        if max_num_sample and num_pixel > max_num_sample:
+            self.max_step = max(int(np.ceil(np.sqrt(num_pixel / max_num_sample))), 1)
+
+        # reference point
+        self.ref_yx = None
+        if metadata and all(key in metadata.keys() for key in ['REF_X','REF_Y']):
+            self.ref_yx = (int(metadata['REF_Y']), int(metadata['REF_X']))
+
+        # normal equations: G^T * G and G^T * d for each sampling step and each 2D matrix
+        self.num_param = self.get_design_matrix([0], [0]).shape[1]
+        self.GtG = np.zeros((self.max_step, num_slice, self.num_param**2), dtype=np.float64)
+        self.Gtd = np.zeros((self.max_step, num_slice, self.num_param), dtype=np.float64)
+        self.num_sample = np.zeros((self.max_step, num_slice), dtype=np.int64)
+        self.coeff = None
+
+    def get_design_matrix(self, y, x):
+        """Design matrix in normalized coordinates for pixels at row/column index y/x."""
+        y = np.asarray(y, dtype=np.float64).reshape(-1, 1) / self.length
+        x = np.asarray(x, dtype=np.float64).reshape(-1, 1) / self.width
+        return get_design_matrix4ramp(y, x, self.ramp_type)
+
+    def accumulate(self, data, box, mask=None):
+        """Add the pixels of one box to the normal equations.
+
+        Parameters: data - 3D np.ndarray in size of (num_slice, box_len, box_wid)
+                    box  - tuple of 4 int, (x0, y0, x1, y1) of data in the full image
+                    mask - 2D np.ndarray in size of (box_len, box_wid), pixels used for estimation
+        """
+        ys = np.arange(box[1], box[3])
+        xs = np.arange(box[0], box[2])
+        if mask is None:
+            mask = np.ones((ys.size, xs.size), dtype=np.bool_)
+
+        for i in range(self.max_step):
+            step = i + 1
+            # sampled pixels in the full image: int(step/2)::step for both rows and columns
+            row_flag = ys % step == int(step/2)
+            col_flag = xs % step == int(step/2)
+            if not np.any(row_flag) or not np.any(col_flag):
+                continue
+
+            d = data[:, row_flag, :][:, :, col_flag].reshape(self.num_slice, -1)
+            flag = (mask[row_flag, :][:, col_flag] != 0).reshape(1, -1) * ~np.isnan(d)
+            if self.ignore_zero_value:
+                flag *= d != 0.
+            w = flag.astype(np.float64)
+            d = np.where(flag, d, 0).astype(np.float64)
+
+            yy, xx = np.meshgrid(ys[row_flag], xs[col_flag], indexing='ij')
+            G = self.get_design_matrix(yy, xx)
+            GG = (G[:, :, None] * G[:, None, :]).reshape(G.shape[0], -1)
+            self.GtG[i] += np.dot(w, GG)
+            self.Gtd[i] += np.dot(d, G)
+            self.num_sample[i] += np.sum(flag, axis=1)
+
+    def solve(self):
+        """Estimate the ramp coefficients of each 2D matrix from the accumulated normal equations.
+
+        Returns: coeff - 2D np.ndarray in size of (num_slice, num_param) in pixel coordinates,
+                         as the coefficients saved by deramp()
+        """
+        self.coeff = np.zeros((self.num_slice, self.num_param), dtype=np.float64)
+        for j in range(self.num_slice):
+            # sampling step based on the number of valid pixels, as in deramp()
+            num_valid = self.num_sample[0, j]
+            step = 1
+            if self.max_num_sample and num_valid > self.max_num_sample:
+                step = min(int(np.ceil(np.sqrt(num_valid / self.max_num_sample))), self.max_step)
+
+            GtG = self.GtG[step-1, j].reshape(self.num_param, self.num_param)
+            Gtd = self.Gtd[step-1, j]
+            self.coeff[j] = np.linalg.lstsq(GtG, Gtd, rcond=None)[0]
+
+        # convert from normalized to pixel coordinates
+        col_scale = get_design_matrix4ramp(
+            np.array([[1. / self.length]]),
+            np.array([[1. / self.width]]),
+            self.ramp_type,
+        )[0]
+        return self.coeff * col_scale
+
+    def get_ramp(self, box, data=None):
+        """Get the estimated ramp for one box.
+
+        Parameters: box  - tuple of 4 int, (x0, y0, x1, y1)
+                    data - 3D np.ndarray in size of (num_slice, box_len, box_wid), to mark the
+                           pixels with zero value to be unchanged, if ignore_zero_value is True.
+        Returns:    ramp - 3D np.ndarray in size of (num_slice, box_len, box_wid) in float32,
+                           referenced to REF_Y/X if available.
+        """
+        if self.coeff is None:
+            raise ValueError('ramp coefficients are NOT estimated yet, call solve() first!')
+
+        box_len, box_wid = box[3] - box[1], box[2] - box[0]
+        yy, xx = np.meshgrid(np.arange(box[1], box[3]), np.arange(box[0], box[2]), indexing='ij')
+        ramp = np.dot(self.coeff, self.get_design_matrix(yy, xx).T)
+
+        # reference in space
+        if self.ref_yx is not None:
+            ramp -= np.dot(self.coeff, self.get_design_matrix(*self.ref_yx).T)
+
+        dtype = data.dtype if data is not None else np.float32
+        ramp = np.array(ramp, dtype=dtype).reshape(self.num_slice, box_len, box_wid)
+
+        # do not change pixel with original zero value
+        if self.ignore_zero_value and data is not None:
+            ramp[data == 0] = 0
+        return ramp
+
+    def deramp(self, data, box):
+        """Remove the estimated ramp from the data of one box.
+
+        Parameters: data     - 3D np.ndarray in size of (num_slice, box_len, box_wid)
+                    box      - tuple of 4 int, (x0, y0, x1, y1)
+        Returns:    data_out - 3D np.ndarray, data after deramping
+                    ramp     - 3D np.ndarray, estimated ramp
+        """
+        ramp = self.get_ramp(box, data=data)
+        return data - ramp, ramp
@@ -12,6 +12,7 @@ import datetime as dt
 import itertools
 import os
 import time
+from contextlib import nullcontext
 
 import h5py
 import numpy as np
@@ -144,6 +145,88 @@ DSET_UNIT_DICT = {
     'intensity' : '1',
 }
 
+# correction stack: a timeseries file whose /timeseries dataset is an empty placeholder
+# (no data written on disk), with the paths of the base time-series file and the correction
+# time-series file saved in the dataset attributes (relative to the directory of the file).
+# Its data is composed on the fly as base minus correction by timeseries.read().
+CORRECTION_STACK_KEYS = ['BASE_FILE', 'CORRECTION_FILE']
+
+# raw data chunk cache of the file handle kept open by keep_open(), per dataset,
+# the HDF5 default (1 MB with 521 slots) holds less than one chunk of a typical stack,
+# thus, a 2D slice read re-decompresses the chunks shared with the previous slices.
+# Use keep_open(box=box) to size it by the chunks of the box to read, to save memory.
+RDCC_NBYTES = 256 * 1024**2
+RDCC_NSLOTS = 100003  # prime number, ~100 times the number of chunks in the cache
+
+
+def _is_kept_open(obj):
+    """Check if the file handle of the stack object is kept open by keep_open()."""
+    f = getattr(obj, 'f', None)
+    return isinstance(f, h5py.File) and bool(f.id.valid)
+
+
+def _open_hdf5(obj):
+    """Open the HDF5 file of the stack object in r mode for the with statement,
+    using the file handle kept open by keep_open() if available.
+    """
+    if _is_kept_open(obj):
+        return nullcontext(obj.f)
+    return h5py.File(obj.file, 'r')
+
+
+def _get_rdcc_nbytes(fname, box, max_nbytes=RDCC_NBYTES):
+    """Get the chunk cache size to hold the chunks overlapping with the box of any 3D dataset.
+
+    The chunk cache is allocated per dataset, thus, it is sized by the chunk footprint of the box,
+    i.e. the chunks of one chunk depth in the 1st dimension, instead of a fixed size.
+
+    Parameters: fname      - str, path of the HDF5 file
+                box        - tuple of 4 int, (x0, y0, x1, y1)
+                max_nbytes - int, max chunk cache size in bytes
+    Returns:    nbytes     - int, chunk cache size in bytes
+    """
+    nbytes = 0
+    with h5py.File(fname, 'r') as f:
+        for ds in f.values():
+            if isinstance(ds, h5py.Dataset) and ds.ndim == 3 and ds.chunks:
+                chunk_y, chunk_x = ds.chunks[-2:]
+                y1, x1 = min(box[3], ds.shape[1]), min(box[2], ds.shape[2])
+                num_chunk = (((y1 - 1) // chunk_y - box[1] // chunk_y + 1)
+                             * ((x1 - 1) // chunk_x - box[0] // chunk_x + 1))
+                nbytes = max(nbytes, num_chunk * int(np.prod(ds.chunks)) * ds.dtype.itemsize)
+    return min(max(nbytes, 1024**2), max_nbytes)
+
+
+def _keep_open(obj, rdcc_nbytes=RDCC_NBYTES, rdcc_nslots=RDCC_NSLOTS, box=None):
+    """Open the HDF5 file of the stack object in r mode, with a tuned chunk cache,
+    and keep it open for the following reads until close().
+    """
+    obj.close(print_msg=False)
+    if box:
+        rdcc_nbytes = _get_rdcc_nbytes(obj.file, box, max_nbytes=rdcc_nbytes)
+    obj.f = h5py.File(obj.file, 'r', rdcc_nbytes=rdcc_nbytes, rdcc_nslots=rdcc_nslots)
+    obj.infoCached = False
+    obj.open(print_msg=False)
+    # the file can not be modified while opened in r mode, thus, the info is reused
+    obj.infoCached = True
+    return obj
+
+
+
+def _get_reference_change(atr1, atr2):
+    """Get the reference date / point of atr1 if different from atr2, as diff.check_reference().
+    Returns:    ref_date - str, None if the same
+                ref_y/x  - int, None if the same
+    """
+    ref_date = atr1.get('REF_DATE', None)
+    ref_date = None if ref_date == atr2.get('REF_DATE', None) else ref_date
+
+    ref_y, ref_x = None, None
+    ref_yx1 = [atr1.get('REF_Y', None), atr1.get('REF_X', None)]
+    ref_yx2 = [atr2.get('REF_Y', None), atr2.get('REF_X', None)]
+    if ref_yx1 != ref_yx2 and None not in ref_yx1:
+        ref_y, ref_x = int(ref_yx1[0]), int(ref_yx1[1])
+    return ref_date, ref_y, ref_x
 
 
 ################################ timeseries class begin ################################
@@ -168,15 +251,30 @@ class timeseries:
             pass
         return None
 
+    def keep_open(self, rdcc_nbytes=RDCC_NBYTES, rdcc_nslots=RDCC_NSLOTS, box=None):
+        """Keep the file open in r mode with a larger chunk cache for repeated reads, until close().
+        Example:    with timeseries('timeseries.h5') as obj:
+                        data = obj.read(box=box)
+        """
+        return _keep_open(self, rdcc_nbytes, rdcc_nslots, box=box)
+
+    def __enter__(self):
+        return self if _is_kept_open(self) else self.keep_open()
+
+    def __exit__(self, *args):
+        self.close(print_msg=False)
+
     def open(self, print_msg=True):
         if print_msg:
             print(f'open {self.name} file: {os.path.basename(self.file)}')
+        if _is_kept_open(self) and self.infoCached:
+            return None
         self.get_metadata()
         self.get_size()
         self.get_date_list()
         self.numPixel = self.length * self.width
 
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             try:
                 self.pbase = f['bperp'][:]
                 self.pbase -= self.pbase[self.refIndex]
@@ -201,7 +299,7 @@ class timeseries:
         return None
 
     def get_metadata(self):
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             self.metadata = dict(f.attrs)
             dates = f['date'][:]
         for key, value in self.metadata.items():
@@ -220,15 +318,32 @@ class timeseries:
         return self.metadata
 
     def get_size(self):
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             self.numDate, self.length, self.width = f[self.name].shape[-3:]
         return self.numDate, self.length, self.width
 
     def get_date_list(self):
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             self.dateList = [i.decode('utf8') for i in f['date'][:]]
         return self.dateList
 
+    def get_correction_stack(self):
+        """Get the base and correction file paths if the file is a correction stack.
+        Returns:    stack_dict - dict, with absolute paths of BASE_FILE and CORRECTION_FILE,
+                                 None for a regular timeseries file
+        """
+        with _open_hdf5(self) as f:
+            ds = f.get(self.name, None)
+            if not isinstance(ds, h5py.Dataset) or CORRECTION_STACK_KEYS[-1] not in ds.attrs:
+                return None
+            stack_dict = {key: ds.attrs[key] for key in CORRECTION_STACK_KEYS}
+
+        fdir = os.path.dirname(os.path.abspath(self.file))
+        for key, value in stack_dict.items():
+            value = value.decode('utf8') if isinstance(value, bytes) else value
+            stack_dict[key] = os.path.normpath(os.path.join(fdir, value))
+        return stack_dict
+
     def read(self, datasetName=None, box=None, squeeze=True, print_msg=True):
         """Read dataset from timeseries file
         Parameters: self : timeseries object
@@ -253,7 +368,18 @@ class timeseries:
             datasetName = [datasetName]
         datasetName = [i.replace('timeseries', '').replace('-', '') for i in datasetName]
 
-        with h5py.File(self.file, 'r') as f:
+        # correction stack: compose base minus correction on the fly
+        stack_dict = self.get_correction_stack()
+        if stack_dict:
+            if box is None:
+                box = [0, 0, self.width, self.length]
+            date_list = [i for i in self.dateList if i in datasetName] if datasetName else self.dateList
+            data = self._read_correction_stack(stack_dict, date_list, box)
+            if squeeze and any(i == 1 for i in data.shape):
+                data = np.squeeze(data)
+            return data
+
+        with _open_hdf5(self) as f:
             ds = f[self.name]
             if isinstance(ds, h5py.Group):  # support for old mintpy files
                 ds = ds[self.name]
@@ -292,6 +418,73 @@ class timeseries:
                 data = np.squeeze(data)
         return data
 
+    def read_as_correction(self, date_list, box, metadata):
+        """Read this file as the correction of another time-series, on their shared dates.
+
+        The correction is referenced to the reference date / point of the other time-series,
+        as diff.py does.
+
+        Parameters: date_list - list of str, dates of the time-series to be corrected
+                    box       - tuple of 4 int, (x0, y0, x1, y1)
+                    metadata  - dict, metadata of the time-series to be corrected
+        Returns:    cor_data  - 3D np.ndarray in size of (num_shared_date, box_len, box_wid)
+                    date_flag - 1D np.ndarray of bool in size of (len(date_list),),
+                                True for the dates available in this file
+        """
+        kwargs = dict(squeeze=False, print_msg=False)
+        self.open(print_msg=False)
+        date_flag = np.array([i in self.dateList for i in date_list], dtype=np.bool_)
+        ref_date, ref_y, ref_x = _get_reference_change(metadata, self.metadata)
+        cor_date_list = [i for i in self.dateList if i in date_list or i == ref_date]
+
+        cor_data = self.read(datasetName=cor_date_list, box=box, **kwargs)
+        if ref_y is not None:
+            ref_box = (ref_x, ref_y, ref_x + 1, ref_y + 1)
+            cor_data -= self.read(datasetName=cor_date_list, box=ref_box, **kwargs)
+        if ref_date:
+            cor_data -= cor_data[cor_date_list.index(ref_date)]
+
+        cor_data = cor_data[[cor_date_list.index(i) for i in np.array(date_list)[date_flag]]]
+        return cor_data, date_flag
+
+    def _read_correction_stack(self, stack_dict, date_list, box, ref_space=True, ref_time=True):
+        """Read the correction stack as base minus correction for the given dates and box.
+
+        The correction is referenced to the reference date / point of the base file, as diff.py does,
+        and zero values (no-data) of the base file are kept. Then the result is referenced to the
+        reference date / point of this file, if changed in place by reference_date/point.py.
+
+        Parameters: stack_dict - dict, output of get_correction_stack()
+                    date_list  - list of str, dates to read
+                    box        - tuple of 4 int, (x0, y0, x1, y1)
+                    ref_space  - bool, apply the spatial referencing of this file
+                    ref_time   - bool, apply the temporal referencing of this file
+        Returns:    data       - 3D np.ndarray in size of (num_date, box_len, box_wid)
+        """
+        kwargs = dict(squeeze=False, print_msg=False)
+
+        # 1. base
+        base_obj = timeseries(stack_dict['BASE_FILE'])
+        data = base_obj.read(datasetName=date_list, box=box, **kwargs)
+        mask = data == 0.
+
+        # 2. correction on the shared dates, referenced to the base file
+        cor_obj = timeseries(stack_dict['CORRECTION_FILE'])
+        cor_data, date_flag = cor_obj.read_as_correction(date_list, box, base_obj.metadata)
+        data[date_flag] -= cor_data
+        data[mask] = 0.
+        del cor_data
+
+        # 3. referencing of this file, different from the base file
+        ref_date, ref_y, ref_x = _get_reference_change(self.metadata, base_obj.metadata)
+        if ref_space and ref_y is not None:
+            ref_box = (ref_x, ref_y, ref_x + 1, ref_y + 1)
+            data -= self._read_correction_stack(stack_dict, date_list, ref_box, ref_space=False, ref_time=False)
+        if ref_time and ref_date:
+            data -= self._read_correction_stack(stack_dict, [ref_date], box, ref_space=ref_space, ref_time=False)
+
+        return data
+
 
     def write2hdf5(self, data, outFile=None, dates=None, bperp=None, metadata=None, refFile=None, compression=None):
         """
@@ -327,9 +520,11 @@ class timeseries:
                 bperp = refobj.pbase
             # get ref file compression type if input compression is None
             if compression is None:
+                from mintpy.utils.readfile import get_hdf5_dataset_compression
                 with h5py.File(refFile, 'r') as rf:
-                    compression = rf[TIMESERIES_DSET_NAMES[0]].compression
+                    compression = get_hdf5_dataset_compression(rf[TIMESERIES_DSET_NAMES[0]])
             refobj.close(print_msg=False)
+        from mintpy.utils.writefile import get_hdf5_compression_kwargs
         data = np.array(data, dtype=np.float32)
         dates = np.array(dates, dtype=np.bytes_)
         bperp = np.array(bperp, dtype=np.float32)
@@ -352,7 +547,7 @@ class timeseries:
             f.create_dataset('timeseries',
                              data=data,
                              chunks=True,
-                             compression=compression)
+                             **get_hdf5_compression_kwargs(compression))
 
             # 1D dataset - date / bperp
             print(f'create dataset /dates      of {str(dates.dtype):<10} in size of {dates.shape}')
@@ -576,9 +771,24 @@ class geometry:
         except:
             pass
 
+    def keep_open(self, rdcc_nbytes=RDCC_NBYTES, rdcc_nslots=RDCC_NSLOTS, box=None):
+        """Keep the file open in r mode with a larger chunk cache for repeated reads, until close().
+        Example:    with geometry('inputs/geometryRadar.h5') as obj:
+                        data = obj.read(box=box)
+        """
+        return _keep_open(self, rdcc_nbytes, rdcc_nslots, box=box)
+
+    def __enter__(self):
+        return self if _is_kept_open(self) else self.keep_open()
+
+    def __exit__(self, *args):
+        self.close(print_msg=False)
+
     def open(self, print_msg=True):
         if print_msg:
             print(f'open {self.name} file: {os.path.basename(self.file)}')
+        if _is_kept_open(self) and self.infoCached:
+            return
         self.get_metadata()
         self.get_size()
         self.numPixel = self.length * self.width
@@ -586,7 +796,7 @@ class geometry:
         if 'Y_FIRST' in self.metadata.keys():
             self.geocoded = True
 
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             self.datasetNames = [i for i in f.keys() if isinstance(f[i], h5py.Dataset)]
             self.sliceList = list(self.datasetNames)
             if 'bperp' in f.keys():
@@ -602,7 +812,7 @@ class geometry:
                 self.dateList = None
 
     def get_size(self):
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             dsName = [i for i in f.keys() if i in GEOMETRY_DSET_NAMES][0]
             dsShape = f[dsName].shape
             if len(dsShape) == 3:
@@ -612,7 +822,7 @@ class geometry:
         return self.length, self.width
 
     def get_metadata(self):
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             self.metadata = dict(f.attrs)
         for key, value in self.metadata.items():
             try:
@@ -652,7 +862,7 @@ class geometry:
         elif isinstance(datasetName, str):
             datasetName = [datasetName]
 
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             familyName = datasetName[0].split('-')[0]
             ds = f[familyName]
             if print_msg:
@@ -703,6 +913,23 @@ class ifgramStack:
         except:
             pass
 
+    def keep_open(self, rdcc_nbytes=RDCC_NBYTES, rdcc_nslots=RDCC_NSLOTS, box=None):
+        """Keep the file open in r mode with a larger chunk cache for repeated reads, until close().
+        Example:    with ifgramStack('inputs/ifgramStack.h5') as stack_obj:
+                        for box in box_list:
+                            data = stack_obj.read(box=box)
+                    # with the chunk cache sized for one box
+                    with ifgramStack('inputs/ifgramStack.h5').keep_open(box=box) as stack_obj:
+                        data = stack_obj.read(box=box)
+        """
+        return _keep_open(self, rdcc_nbytes, rdcc_nslots, box=box)
+
+    def __enter__(self):
+        return self if _is_kept_open(self) else self.keep_open()
+
+    def __exit__(self, *args):
+        self.close(print_msg=False)
+
     def open(self, print_msg=True):
         """
         Time format/rules:
@@ -711,6 +938,10 @@ class ifgramStack:
         """
         if print_msg:
             print(f'open {self.name} file: {os.path.basename(self.file)}')
+        if _is_kept_open(self) and self.infoCached:
+            # reset numIfgram, which could be changed by get_size(dropIfgram=True)
+            self.get_size()
+            return
         self.get_metadata()
         self.get_size()
         self.read_datetimes()
@@ -722,7 +953,7 @@ class ifgramStack:
                                      for i in (self.sTimes - self.mTimes)],
                                     dtype=np.float32)
 
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             self.dropIfgram = f['dropIfgram'][:]
             self.pbaseIfgram = f['bperp'][:]
 
@@ -758,7 +989,7 @@ class ifgramStack:
 
     def get_metadata(self):
         # read metadata from root level
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             self.metadata = dict(f.attrs)
             dates = f['date'][:].flatten()
 
@@ -776,7 +1007,7 @@ class ifgramStack:
         return self.metadata
 
     def get_size(self, dropIfgram=False, datasetName=None):
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             # get default datasetName
             if datasetName is None:
                 datasetName = [i for i in ['unwrapPhase', 'rangeOffset', 'azimuthOffset'] if i in f.keys()][0]
@@ -791,7 +1022,7 @@ class ifgramStack:
 
     def read_datetimes(self):
         """Read date1/2 into array of datetime.datetime objects"""
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             dates = f['date'][:]
 
         # grab the date string format
@@ -837,7 +1068,7 @@ class ifgramStack:
         elif isinstance(datasetName, str):
             datasetName = [datasetName]
 
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             familyName = datasetName[0].split('-')[0]
             ds = f[familyName]
             if print_msg:
@@ -860,9 +1091,17 @@ class ifgramStack:
                 box = (0, 0, self.width, self.length)
 
             # read
-            data = ds[:,
-                      box[1]:box[3],
-                      box[0]:box[2]][dateFlag]
+            # read the continuous slab directly if possible, e.g. the newly appended pairs,
+            # to avoid reading the whole stack
+            idx = np.where(dateFlag)[0]
+            if idx.size > 0 and idx.size == idx[-1] - idx[0] + 1:
+                data = ds[idx[0]:idx[-1]+1,
+                          box[1]:box[3],
+                          box[0]:box[2]]
+            else:
+                data = ds[:,
+                          box[1]:box[3],
+                          box[0]:box[2]][dateFlag]
 
             if any(i == 1 for i in data.shape):
                 data = np.squeeze(data)
@@ -887,7 +1126,7 @@ class ifgramStack:
             maskFile = None
 
         # calculation
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             dset = f[datasetName]
             numIfgram = dset.shape[0]
             dmean = np.zeros((numIfgram), dtype=np.float32)
@@ -920,7 +1159,7 @@ class ifgramStack:
 
     # Functions considering dropIfgram value
     def get_date12_list(self, dropIfgram=True):
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             dates = f['date'][:]
             if dropIfgram:
                 dates = dates[f['dropIfgram'][:], :]
@@ -930,7 +1169,7 @@ class ifgramStack:
         return date12List
 
     def get_drop_date12_list(self):
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             dates = f['date'][:]
             dates = dates[~f['dropIfgram'][:], :]
         mDates = np.array([i.decode('utf8') for i in dates[:, 0]])
@@ -939,7 +1178,7 @@ class ifgramStack:
         return date12List
 
     def get_date_list(self, dropIfgram=False):
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             dates = f['date'][:]
             if dropIfgram:
                 dates = dates[f['dropIfgram'][:], :]
@@ -974,7 +1213,7 @@ class ifgramStack:
            Ignoring dropped ifgrams
         """
         self.open(print_msg=False)
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             if datasetName is None:
                 datasetName = [i for i in ['connectComponent', 'unwrapPhase']
                                if i in f.keys()][0]
@@ -1019,7 +1258,7 @@ class ifgramStack:
             tbase = np.array(self.tbaseIfgram, dtype=np.float64) / 365.25
             tbase = tbase[ifgram_flag]
 
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             dset = f[datasetName]
 
             # reference value for phase
@@ -1070,16 +1309,22 @@ class ifgramStack:
         return np.max(num_conn)
 
 
-    def split2boxes(self, max_memory=4, dim0_size=None, print_msg=True):
-        """Split into chunks in rows to reduce memory usage.
+    def split2boxes(self, max_memory=4, dim0_size=None, print_msg=True, datasetName=None):
+        """Split into boxes to reduce memory usage,
+        with the box edges aligned to the chunk layout of the used datasets.
 
-        Parameters: max_memory - float, max memory to use in GB
-                    dim0_size  - the 1st dimension size of all used datasets
-                                 e.g., dim0_size = num_pair * 2 + num_date
-                    print_msg  - bool
+        Parameters: max_memory  - float, max memory to use in GB
+                    dim0_size   - the 1st dimension size of all used datasets
+                                  e.g., dim0_size = num_pair * 2 + num_date
+                    print_msg   - bool
+                    datasetName - str / list(str), the used datasets to align with,
+                                  all the pair datasets by default
         Returns:    box_list   - list of tuple of 4 int
                     num_box    - int, number of boxes
         """
+        from mintpy.objects.cluster import split_box2tiles
+        from mintpy.utils.readfile import get_hdf5_chunk_shape
+
         self.open(print_msg=False)
         length = self.length
         width = self.width
@@ -1091,20 +1336,19 @@ class ifgramStack:
         ds_size = dim0_size * length * width * 4
 
         num_box = int(np.ceil(ds_size * 1.5 / (max_memory * 1024**3)))
-        y_step = int(np.ceil((length / num_box) / 10) * 10)
-        num_box = int(np.ceil(length / y_step))
+        max_num_pixel = int(np.ceil(length / num_box / 10) * 10) * width
+
+        # split into full-width strips or 2D tiles aligned with the chunks
+        datasetName = datasetName if datasetName else self.datasetNames
+        chunk_shape = get_hdf5_chunk_shape(self.file, datasetName) if num_box > 1 else None
+        box_list, num_box = split_box2tiles((0, 0, width, length), max_num_pixel, chunk_shape=chunk_shape)
+        box_list = [tuple(box) for box in box_list]
         if print_msg and num_box > 1:
             print('maximum memory size: %.1E GB' % max_memory)
-            print('split %d lines into %d patches for processing' % (length, num_box))
-            print('    with each patch up to %d lines' % y_step)
-
-        # y_step / num_box --> box_list
-        box_list = []
-        for i in range(num_box):
-            y0 = i * y_step
-            y1 = min([length, y0 + y_step])
-            box = (0, y0, width, y1)
-            box_list.append(box)
+            print('split %d lines x %d columns into %d patches for processing' % (length, width, num_box))
+            print('    with each patch up to %d pixels' % max_num_pixel)
+            if chunk_shape:
+                print(f'    aligned to the chunk shape of {chunk_shape} in (row, column)')
 
         return box_list, num_box
 
@@ -1355,7 +1599,7 @@ class ifgramStack:
     def get_perp_baseline_timeseries(self, dropIfgram=True):
         """Get spatial perpendicular baseline in timeseries from ifgramStack, ignoring dropped ifgrams"""
         # read pbase of interferograms
-        with h5py.File(self.file, 'r') as f:
+        with _open_hdf5(self) as f:
             pbaseIfgram = f['bperp'][:]
             if dropIfgram:
                 pbaseIfgram = pbaseIfgram[f['dropIfgram'][:]]
@@ -1380,6 +1624,8 @@ class ifgramStack:
             print('The same date12List2Drop / dropIfgram is already marked in the file, skip updating dropIfgram.')
             return
 
+        # release the file handle kept open in r mode
+        self.close(print_msg=False)
         with h5py.File(self.file, 'r+') as f:
             print(f'open file {self.file} with r+ mode')
             print('update HDF5 dataset "/dropIfgram".')
@@ -25,8 +25,15 @@ from mintpy.objects import (
     DATA_TYPE_DICT,
     GEOMETRY_DSET_NAMES,
     IFGRAM_DSET_NAMES,
+    cluster,
+)
+from mintpy.utils import (
+    attribute as attr,
+    ptime,
+    readfile,
+    utils0 as ut,
+    writefile,
 )
-from mintpy.utils import attribute as attr, ptime, readfile, utils0 as ut
 
 
 ########################################################################################
@@ -97,7 +104,7 @@ class ifgramStackDict:
         return dataType
 
     def write2hdf5(self, outputFile='ifgramStack.h5', access_mode='w', box=None, xstep=1, ystep=1, mli_method='nearest',
-                   compression=None, extra_metadata=None, geom_obj=None):
+                   compression=None, chunk_shape='auto', extra_metadata=None, geom_obj=None, num_worker=1):
         """Save/write an ifgramStackDict object into an HDF5 file with the structure defined in:
 
         https://mintpy.readthedocs.io/en/latest/api/data_structure/#ifgramstack
@@ -107,9 +114,12 @@ class ifgramStackDict:
                     box            - tuple, subset range in (x0, y0, x1, y1)
                     x/ystep        - int, multilook number in x/y direction
                     mli_method     - str, multilook method, nearest, mean or median
-                    compression    - str, HDF5 dataset compression method, None, lzf or gzip
+                    compression    - str, HDF5 dataset compression method, None, lzf, gzip, zstd or blosc2
+                    chunk_shape    - str, HDF5 chunk layout of the 3D datasets, auto, time-major or image-major
                     extra_metadata - dict, extra metadata to be added into output file
                     geom_obj       - geometryDict object, size reference to determine the resizing operation.
+                    num_worker     - int, number of threads to read the files of the next pairs
+                                     while writing the current one
         Returns:    outputFile     - str, Name of the HDF5 file for the InSAR stack
         """
         print('-'*50)
@@ -161,7 +171,7 @@ class ifgramStackDict:
                 dsCompression = compression
                 if dsName in ['connectComponent']:
                     dsDataType = np.int16
-                    dsCompression = 'lzf'
+                    dsCompression = compression if compression else 'lzf'
                     mli_method = 'nearest'
 
                 print(('create dataset /{d:<{w}} of {t:<25} in size of {s}'
@@ -174,8 +184,8 @@ class ifgramStackDict:
                                       shape=dsShape,
                                       maxshape=(None, dsShape[1], dsShape[2]),
                                       dtype=dsDataType,
-                                      chunks=True,
-                                      compression=dsCompression)
+                                      chunks=writefile.get_hdf5_chunks(dsShape, chunk_shape),
+                                      **writefile.get_hdf5_compression_kwargs(dsCompression))
 
                 # set no-data value - printout msg
                 if dsName.endswith('OffsetVar'):
@@ -188,29 +198,16 @@ class ifgramStackDict:
                 if xstep * ystep > 1:
                     print(f'apply {xstep} x {ystep} multilooking/downsampling via {mli_method} ...')
 
+                # read the next pairs in the background while writing the current one
+                kwargs_list = [dict(ifgramObj=self.pairsDict[pair], dsName=dsName, box=box,
+                                    xstep=xstep, ystep=ystep, mli_method=mli_method,
+                                    resize2shape=resize2shape) for pair in self.pairs]
+                data_iter = cluster.prefetch_in_order(read_ifgram_data, kwargs_list, num_worker=num_worker)
+
                 prog_bar = ptime.progressBar(maxValue=numIfgram)
-                for i, pair in enumerate(self.pairs):
+                for i, (pair, data) in enumerate(zip(self.pairs, data_iter)):
                     prog_bar.update(i+1, suffix=f'{pair[0]}_{pair[1]}')
 
-                    # read and/or resize
-                    ifgramObj = self.pairsDict[pair]
-                    data = ifgramObj.read(dsName,
-                                          box=box,
-                                          xstep=xstep,
-                                          ystep=ystep,
-                                          mli_method=mli_method,
-                                          resize2shape=resize2shape)[0]
-
-                    # special handling for offset covariance file
-                    if dsName.endswith('OffsetStd'):
-                        # set no-data value to np.nan
-                        data[data == 99.] = np.nan
-
-                        # convert variance to std. dev.
-                        dsFile = ifgramObj.datasetDict[dsName]
-                        if dsFile.endswith('cov.bip'):
-                            data = np.sqrt(data)
-
                     # write
                     ds[i, :, :] = data
 
@@ -336,12 +333,21 @@ class ifgramDict:
                     meta         - dict, metadata
         """
         self.file = self.datasetDict[family]
-        box2read = None if resize2shape else box
 
-        # 1. read input file
+        # 0. read and multilook in one go,
+        #    with the memory usage in the order of the output size
+        if not resize2shape:
+            return readfile.read(self.file,
+                                 datasetName=family,
+                                 box=box,
+                                 xstep=xstep,
+                                 ystep=ystep,
+                                 method=mli_method,
+                                 print_msg=False)
+
+        # 1. read input file in full resolution
         data, meta = readfile.read(self.file,
                                    datasetName=family,
-                                   box=box2read,
                                    xstep=1,
                                    ystep=1)
 
@@ -453,14 +459,16 @@ class geometryDict:
                 self.extraMetadata = metadata
 
     def read(self, family, box=None, xstep=1, ystep=1):
-        self.file = self.datasetDict[family]
+        # use local variable for the file path, to support reading in multiple threads
+        fname = self.datasetDict[family]
+        self.file = fname
         # relax dataset name constraint for HDF5 file
         # to support reading waterMask from waterMask.h5 file with /mask dataset
-        if self.file.endswith('.h5'):
+        if fname.endswith('.h5'):
             dsName = None
         else:
             dsName = family
-        data, metadata = readfile.read(self.file,
+        data, metadata = readfile.read(fname,
                                        datasetName=dsName,
                                        box=box,
                                        xstep=xstep,
@@ -609,9 +617,12 @@ class geometryDict:
         return self.metadata
 
     def write2hdf5(self, outputFile='geometryRadar.h5', access_mode='w', box=None, xstep=1, ystep=1,
-                   compression='lzf', extra_metadata=None):
+                   compression='lzf', extra_metadata=None, num_worker=1):
         """Save/write to HDF5 file with structure defined in:
             https://mintpy.readthedocs.io/en/latest/api/data_structure/#geometry
+
+        With num_worker > 1, the files of the next datasets / dates are read in background threads
+        while the current one is being written.
         """
         print('-'*50)
         if len(self.datasetDict) == 0:
@@ -631,6 +642,11 @@ class geometryDict:
         with h5py.File(self.outputFile, access_mode) as f:
             print(f'create HDF5 file {self.outputFile} with {access_mode} mode')
 
+            # read the 2D datasets in the background, in the same order as writing
+            kwargs_list = [dict(family=x, box=box, xstep=xstep, ystep=ystep) for x in self.dsNames if x != 'bperp']
+            data_iter = cluster.prefetch_in_order(lambda **kwargs: self.read(**kwargs)[0],
+                                                  kwargs_list, num_worker=num_worker)
+
             ###############################
             for dsName in self.dsNames:
                 # 3D datasets containing bperp
@@ -644,7 +660,7 @@ class geometryDict:
                                           maxshape=(None, dsShape[1], dsShape[2]),
                                           dtype=dsDataType,
                                           chunks=True,
-                                          compression=compression)
+                                          **writefile.get_hdf5_compression_kwargs(compression))
                     print(('create dataset /{d:<{w}} of {t:<25} in size of {s}'
                            ' with compression = {c}').format(d=dsName,
                                                              w=maxDigit,
@@ -653,17 +669,17 @@ class geometryDict:
                                                              c=str(compression)))
 
                     print('read coarse grid baseline files and linear interpolate into full resolution ...')
+                    # read and resize in the background
+                    full_shape = self.get_size()
+                    bperp_kwargs_list = [dict(fname=self.datasetDict[dsName][x], full_shape=full_shape,
+                                              box=box, xstep=xstep, ystep=ystep) for x in self.dateList]
+                    bperp_iter = cluster.prefetch_in_order(read_isce_bperp_file, bperp_kwargs_list,
+                                                           num_worker=num_worker)
+
                     prog_bar = ptime.progressBar(maxValue=self.numDate)
-                    for i, date_str in enumerate(self.dateList):
+                    for i, (date_str, data) in enumerate(zip(self.dateList, bperp_iter)):
                         prog_bar.update(i+1, suffix=date_str)
 
-                        # read and resize
-                        fname = self.datasetDict[dsName][date_str]
-                        data = read_isce_bperp_file(fname=fname,
-                                                    full_shape=self.get_size(),
-                                                    box=box,
-                                                    xstep=xstep,
-                                                    ystep=ystep)
                         # write
                         ds[i, :, :] = data
 
@@ -695,7 +711,7 @@ class geometryDict:
                                                              c=str(compression)))
 
                     # read
-                    data = self.read(family=dsName, box=box, xstep=xstep, ystep=ystep)[0]
+                    data = next(data_iter)
 
                     # water body: -1/True  for water and 0/False for land
                     # water mask:  0/False for water and 1/True  for land
@@ -729,7 +745,7 @@ class geometryDict:
                         # HyP3 (Gamma) angle of the line-of-sight vector (from ground to SAR platform)
                         # incidence angle 'theta' is measured from horizontal in radians
                         # azimuth   angle 'phi'   is measured from the east with anti-clockwise as positivve in radians
-                        atr = readfile.read_attribute(self.file)
+                        atr = readfile.read_attribute(self.datasetDict[dsName])
                         if atr.get('PROCESSOR', 'isce') == 'hyp3' and atr.get('UNIT', 'degrees').startswith('rad'):
 
                             if dsName == 'incidenceAngle':
@@ -752,7 +768,7 @@ class geometryDict:
                     ds = f.create_dataset(dsName,
                                           data=data,
                                           chunks=True,
-                                          compression=compression)
+                                          **writefile.get_hdf5_compression_kwargs(compression))
 
             ###############################
             # Generate Dataset if it doesn't exist as a binary file: incidenceAngle, slantRangeDistance
@@ -778,7 +794,7 @@ class geometryDict:
                                           data=data,
                                           dtype=dsDataType,
                                           chunks=True,
-                                          compression=compression)
+                                          **writefile.get_hdf5_compression_kwargs(compression))
 
             ###############################
             # Attributes
@@ -802,6 +818,34 @@ class geometryDict:
 
 
 ########################################################################################
+def read_ifgram_data(ifgramObj, dsName, box=None, xstep=1, ystep=1, mli_method='nearest', resize2shape=None):
+    """Read, resize and/or multilook one dataset of one interferogram, as written into the stack file.
+    Parameters: ifgramObj - ifgramDict object
+                dsName    - str, dataset name, e.g. unwrapPhase, coherence, rangeOffsetStd
+                box / x/ystep / mli_method / resize2shape - see ifgramDict.read()
+    Returns:    data      - 2D np.ndarray
+    """
+    # read and/or resize
+    data = ifgramObj.read(dsName,
+                          box=box,
+                          xstep=xstep,
+                          ystep=ystep,
+                          mli_method=mli_method,
+                          resize2shape=resize2shape)[0]
+
+    # special handling for offset covariance file
+    if dsName.endswith('OffsetStd'):
+        # set no-data value to np.nan
+        data[data == 99.] = np.nan
+
+        # convert variance to std. dev.
+        dsFile = ifgramObj.datasetDict[dsName]
+        if dsFile.endswith('cov.bip'):
+            data = np.sqrt(data)
+
+    return data
+
+
 def read_isce_bperp_file(fname, full_shape, box=None, xstep=1, ystep=1):
     """Read ISCE-2 coarse grid perpendicular baseline file, and project it to full size
     Parameters: fname      - str, bperp file name
@@ -157,7 +157,8 @@ class coherenceMatrixViewer():
 
         # read coherence
         box = (yx[1], yx[0], yx[1]+1, yx[0]+1)
-        coh = readfile.read(self.ifgram_file, datasetName='coherence', box=box)[0]
+        coh = readfile.read(self.ifgram_file, datasetName='coherence', box=box,
+                            pixel_index=self.pixel_index)[0]
 
         # ex_date for pixel-wise masking during network inversion
         ex_date12_list = self.ex_date12_list[:]   #local copy
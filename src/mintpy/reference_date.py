@@ -98,6 +98,11 @@ def change_timeseries_ref_date(ts_file, ref_date, outfile=None, max_memory=4.0,
         print_msg=True,
     )
 
+    # correction stack: update the metadata only, as the referencing is applied on the fly while reading
+    if outfile == ts_file and obj.get_correction_stack():
+        print('input file is a correction stack, skip updating the data values.')
+        box_list = []
+
     # updating existing file or write new file
     if outfile == ts_file:
         mode = 'r+'
@@ -11,6 +11,7 @@ import random
 import h5py
 import numpy as np
 
+from mintpy.objects import timeseries
 from mintpy.utils import ptime, readfile, utils as ut, writefile
 
 
@@ -110,6 +111,12 @@ def reference_file(inps):
                         print('update metadata')
                         f.attrs.update(atrNew)
 
+                elif ftype == 'timeseries' and timeseries(inps.file).get_correction_stack():
+                    # correction stack: the referencing is applied on the fly while reading
+                    print('input file is a correction stack, skip updating the data values.')
+                    print('update metadata')
+                    ut.add_attribute(inps.file, atrNew)
+
                 else:
                     with h5py.File(inps.file, 'r+') as f:
                         ds = f[ftype]
@@ -62,6 +62,12 @@ def gather_files(ts_file, geom_file):
         if not os.path.isfile(fname):
             raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), fname)
 
+    # time-series data is read via h5py directly below
+    if timeseries(ts_file).get_correction_stack():
+        msg = f'input time-series file is a correction stack: {ts_file}, with no data written on disk!'
+        msg += f'\nRun the following command to write the data first:\n  materialize.py {ts_file}'
+        raise ValueError(msg)
+
     for key, value in fDict.items():
         print(f'{key:<10}: {value}')
     return fDict
@@ -66,7 +66,7 @@ def fractal_surface_atmos(shape=(128, 128), resolution=60., p0=1., freq0=1e-3,
                 beta       : tuple of 3 float, power law exponents for a 1D profile of the data
                 display    : bool, display simulation result or not
     Returns:    fsurf      : 2D np.array in size of (length, width) in m.
-    Example:    data, atr = readfile.read_attribute('timeseriesResidual_ramp.h5', datasetName='20171115')
+    Example:    data, atr = readfile.read('timeseriesResidual.h5', datasetName='20171115')
                 step = abs(ut.range_ground_resolution(atr))
                 p0 = get_power_spectral_density(data, resolution=step)[0]
                 tropo = fractal_surface_atmos(shape=data.shape, resolution=step, p0=p0)
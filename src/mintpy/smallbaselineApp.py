@@ -583,6 +583,8 @@ class TimeSeriesAnalysis:
 
         if in_file != out_file:
             iargs = [in_file, '-g', geom_file, '-o', out_file, '--update']
+            if self.template['mintpy.compute.lazyCorrection']:
+                iargs += ['--lazy']
             print('\nsolid_earth_tides.py', ' '.join(iargs))
             if ut.run_or_skip(out_file=out_file, in_file=in_file) == 'run':
                 import mintpy.cli.solid_earth_tides
@@ -622,6 +624,7 @@ class TimeSeriesAnalysis:
         in_file = fnames['input']
         out_file = fnames['output']
         if in_file != out_file:
+            lazy        = ['--lazy'] if self.template['mintpy.compute.lazyCorrection'] else []
             poly_order  = self.template['mintpy.troposphericDelay.polyOrder']
             tropo_model = self.template['mintpy.troposphericDelay.weatherModel'].upper()
             weather_dir = self.template['mintpy.troposphericDelay.weatherDir']
@@ -652,7 +655,7 @@ class TimeSeriesAnalysis:
             # Yu et al. (2018, JGR)
             elif method == 'gacos':
                 GACOS_dir = self.template['mintpy.troposphericDelay.gacosDir']
-                iargs = ['-f', in_file, '-g', geom_file, '-o', out_file, '--dir', GACOS_dir]
+                iargs = ['-f', in_file, '-g', geom_file, '-o', out_file, '--dir', GACOS_dir] + lazy
                 print('tropospheric delay correction with gacos approach')
                 print('\ntropo_gacos.py', ' '.join(iargs))
                 if ut.run_or_skip(out_file=out_file, in_file=in_file) == 'run':
@@ -668,7 +671,7 @@ class TimeSeriesAnalysis:
 
                 if ut.run_or_skip(out_file=out_file, in_file=[in_file, tropo_file]) == 'run':
                     if os.path.isfile(tropo_file) and get_dataset_size(tropo_file) == get_dataset_size(in_file):
-                        iargs = [in_file, tropo_file, '-o', out_file, '--force']
+                        iargs = [in_file, tropo_file, '-o', out_file, '--force'] + lazy
                         print('--------------------------------------------')
                         print(f'Use existed tropospheric delay file: {tropo_file}')
                         print('\ndiff.py', ' '.join(iargs))
@@ -677,6 +680,7 @@ class TimeSeriesAnalysis:
 
                     else:
                         if tropo_model in ['ERA5']:
+                            iargs += lazy
                             print('\ntropo_pyaps3.py', ' '.join(iargs))
                             import mintpy.cli.tropo_pyaps3
                             mintpy.cli.tropo_pyaps3.main(iargs)
@@ -732,6 +736,35 @@ class TimeSeriesAnalysis:
             print('No topographic residual correction.')
 
 
+    def get_fused_step_groups(self, steps):
+        """Get the groups of consecutive steps to apply in a single pass, if fusedCorrection is on."""
+        groups = []
+        if self.template['mintpy.compute.fusedCorrection']:
+            from mintpy.correct_timeseries import is_fusable_step
+
+            group = []
+            for sname in steps + [None]:
+                if sname and is_fusable_step(sname, self.template):
+                    group.append(sname)
+                elif group:
+                    groups.append(group)
+                    group = []
+        return groups
+
+
+    def run_fused_correction(self, step_names):
+        """Apply the phase correction steps in a single pass over the time-series.
+        Only the final corrected time-series and the intermediate ones set in
+        mintpy.compute.fusedCorrection.saveStep are written to disk.
+        """
+        geom_file = ut.check_loaded_dataset(self.workDir, print_msg=False)[1]
+        iargs = ['-t', self.templateFile, '-g', geom_file, '--dir', self.workDir,
+                 '--step'] + step_names + ['--update']
+        print('\ncorrect_timeseries.py', ' '.join(iargs))
+        import mintpy.cli.correct_timeseries
+        mintpy.cli.correct_timeseries.main(iargs)
+
+
     def run_residual_phase_rms(self, step_name):
         """Noise evaluation based on the phase residual."""
         res_file = 'timeseriesResidual.h5'
@@ -749,6 +782,8 @@ class TimeSeriesAnalysis:
         if self.template['mintpy.reference.date']:
             iargs = ['-t', self.templateFile]
             in_files = self.get_timeseries_filename(self.template, self.workDir)[step_name]['input']
+            # skip the intermediate files not written by the fused correction
+            in_files = [i for i in in_files if os.path.isfile(i)]
             for in_file in in_files:
                 iargs += [in_file]
             print('\nreference_date.py', ' '.join(iargs))
@@ -901,7 +936,18 @@ class TimeSeriesAnalysis:
 
     def run(self, steps):
         """run the chosen steps."""
+        # group the consecutive phase correction steps to apply in a single pass
+        fused_groups = self.get_fused_step_groups(steps)
+        fused_steps = [i for group in fused_groups for i in group]
+
         for sname in steps:
+            if sname in fused_steps:
+                group = [x for x in fused_groups if x[0] == sname]
+                if group:
+                    print(f'\n\n******************** step - {" + ".join(group[0])} ********************')
+                    self.run_fused_correction(group[0])
+                continue
+
             print(f'\n\n******************** step - {sname} ********************')
 
             if sname == 'load_data':
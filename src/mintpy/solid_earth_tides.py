@@ -241,6 +241,7 @@ def run_solid_earth_tides(inps):
     # e.g. the absolute phase and the double referenced time-series
     print('correcting tide for using diff.py')
     iargs = [inps.dis_file, inps.set_file, '-o', inps.cor_dis_file, '--force']
+    iargs += ['--lazy'] if inps.lazy else []
     print('diff.py', ' '.join(iargs))
     mintpy.cli.diff.main(iargs)
 
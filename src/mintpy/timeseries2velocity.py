@@ -34,6 +34,7 @@ config_keys = [
     'uncertaintyQuantification',
     'timeSeriesCovFile',
     'bootstrapCount',
+    'bootstrapSeed',
 ]
 
 
@@ -56,6 +57,11 @@ def run_or_skip(inps):
         else:
             print(f'2) output file is newer than input file: {inps.timeseries_file}.')
 
+    # check covariance file
+    if flag == 'skip' and inps.save_cov and not os.path.isfile(inps.cov_file):
+        flag = 'run'
+        print(f'3) output covariance file {inps.cov_file} NOT found.')
+
     # check configuration
     if flag == 'skip':
         atr = readfile.read_attribute(inps.outfile)
@@ -127,6 +133,359 @@ def read_date_info(inps):
     return inps
 
 
+def read_timeseries2time_func_patch(ts_file, date_list, drop_date, box, ref_date=None, ref_yx=None,
+                                    ref_yx_input=None, uq_method='residue', ts_cov_file=None):
+    """Read the input data of one patch/box of the time-series file for the time function estimation.
+
+    Parameters: same as run_timeseries2time_func_patch()
+    Returns:    ts_data - 2D np.ndarray in size of (num_date, num_pixel)
+                ts_cov  - 2/3D np.ndarray in size of ([num_date,] num_date, num_pixel), or None
+                mask    - 1D np.ndarray in size of (num_pixel) in bool, pixels to estimate
+                box     - tuple of 4 int
+    """
+    num_date = len(date_list)
+    box_wid = box[2] - box[0]
+    box_len = box[3] - box[1]
+
+    # read input
+    print(f'reading data from file {ts_file} ...')
+    ts_data = readfile.read(ts_file, box=box)[0]
+
+    # referencing in time and space
+    # for file w/o reference info. e.g. ERA5.h5
+    if ref_date:
+        print(f'referecing to date: {ref_date}')
+        ref_ind = date_list.index(ref_date)
+        ts_data -= np.tile(ts_data[ref_ind, :, :], (ts_data.shape[0], 1, 1))
+
+    if ref_yx_input:
+        print(f'referencing to point (y, x): ({ref_yx_input[0]}, {ref_yx_input[1]})')
+        ref_box = (ref_yx_input[1], ref_yx_input[0], ref_yx_input[1]+1, ref_yx_input[0]+1)
+        ref_val = readfile.read(ts_file, box=ref_box)[0]
+        ts_data -= np.tile(ref_val.reshape(ts_data.shape[0], 1, 1),
+                           (1, ts_data.shape[1], ts_data.shape[2]))
+
+    ts_data = ts_data[drop_date, :, :].reshape(num_date, -1)
+
+    ts_cov = None
+    if uq_method == 'covariance':
+        print(f'reading time-series covariance matrix from file {ts_cov_file} ...')
+        ts_cov = readfile.read(ts_cov_file, box=box)[0]
+        if len(ts_cov.shape) == 4:
+            # full covariance matrix in 4D --> 3D
+            if num_date < ts_cov.shape[0]:
+                ts_cov = ts_cov[drop_date, :, :, :]
+                ts_cov = ts_cov[:, drop_date, :, :]
+            ts_cov = ts_cov.reshape(num_date, num_date, -1)
+
+        elif len(ts_cov.shape) == 3:
+            # diaginal variance matrix in 3D --> 2D
+            if num_date < ts_cov.shape[0]:
+                ts_cov = ts_cov[drop_date, :, :]
+            ts_cov = ts_cov.reshape(num_date, -1)
+
+        ## set zero value to a fixed small value to avoid divide by zero
+        #epsilon = 1e-5
+        #ts_cov[ts_cov<epsilon] = epsilon
+
+    # mask invalid pixels
+    print('skip pixels with zero/nan value in all acquisitions')
+    ts_stack = np.nanmean(ts_data, axis=0)
+    mask = np.multiply(~np.isnan(ts_stack), ts_stack!=0.)
+    del ts_stack
+    # include the reference point
+    if ref_yx:
+        ry, rx = ref_yx[0] - box[1], ref_yx[1] - box[0]
+        if 0 <= rx < box_wid and 0 <= ry < box_len:
+            mask[ry * box_wid + rx] = 1
+
+    #if ts_cov is not None:
+    #    print('skip pxiels with nan STD value in any acquisition')
+    #    num_std_nan = np.sum(np.isnan(ts_cov), axis=0)
+    #    mask *= num_std_nan == 0
+    #    del num_std_nan
+
+    return ts_data, ts_cov, mask, box
+
+
+def propagate_time_func_covariance(Gplus, ts_cov, idx=None, full_cov=False, max_memory=1):
+    """Propagate the time-series (co)variance into the time function parameters, for all pixels in batch:
+        C_m_hat = G+ * C_d * G+.T
+
+    The pixels are processed in chunks, to limit the memory usage of the intermediate matrices.
+
+    Parameters: Gplus      - 2D np.ndarray in size of (num_param, num_date), pseudo-inverse of G
+                ts_cov     - 3D np.ndarray in size of (num_date, num_date, num_pixel), time-series covariance, or
+                             2D np.ndarray in size of (num_date, num_pixel), time-series variance
+                idx        - 1D np.ndarray of int, index of the pixels of interest, None for all
+                full_cov   - bool, return the full covariance matrix of the time function parameters
+                max_memory - float, max memory to use in GB for the intermediate matrices
+    Returns:    m_cov      - 3D np.ndarray in size of (num_param, num_param, num_pixel), if full_cov=True
+                m_var      - 2D np.ndarray in size of (num_param, num_pixel), otherwise
+    """
+    covar_flag = ts_cov.ndim == 3
+    num_param, num_date = Gplus.shape
+    idx = np.arange(ts_cov.shape[-1]) if idx is None else idx
+    num_pixel = idx.size
+    if full_cov:
+        out = np.zeros((num_param, num_param, num_pixel), dtype=DATA_TYPE)
+    else:
+        out = np.zeros((num_param, num_pixel), dtype=DATA_TYPE)
+
+    # number of pixels per chunk, for the float64 intermediate matrices
+    pixel_size = (num_date * num_date + num_param * num_date + num_param * num_param) * 8
+    if not covar_flag:
+        pixel_size = (num_date + num_param * num_param) * 8
+    chunk_size = max(int(max_memory * 1024**3 / pixel_size), 1)
+
+    Gplus = np.array(Gplus, dtype=np.float64)
+    for i0 in range(0, num_pixel, chunk_size):
+        i1 = min(i0 + chunk_size, num_pixel)
+        cov = np.array(ts_cov[..., idx[i0:i1]], dtype=np.float64)
+
+        if covar_flag:
+            # full covariance: G+ * C_d * G+.T
+            GC = np.einsum('pi,ijn->pjn', Gplus, cov)
+            if full_cov:
+                out[:, :, i0:i1] = np.einsum('pjn,qj->pqn', GC, Gplus)
+            else:
+                out[:, i0:i1] = np.einsum('pjn,pj->pn', GC, Gplus)
+        else:
+            # diagonal variance: G+ * diag(v) * G+.T
+            if full_cov:
+                out[:, :, i0:i1] = np.einsum('pj,qj,jn->pqn', Gplus, Gplus, cov)
+            else:
+                out[:, i0:i1] = np.dot(Gplus ** 2, cov)
+
+    return out
+
+
+def get_model_param_names(model):
+    """Get the names of the time function parameters, in the order of the design matrix columns.
+
+    Parameters: model - dict, deformation model
+    Returns:    names - list of str, e.g. ['intercept', 'velocity', 'annualCos', 'annualSin']
+    """
+    names = []
+    # time func 1 - polynomial
+    for i in range(model['polynomial'] + 1):
+        names.append(['intercept', 'velocity', 'acceleration'][i] if i < 3 else f'poly{i}')
+
+    # time func 2 - periodic
+    for period in model['periodic']:
+        if period == 1:
+            prefix = 'annual'
+        elif period == 0.5:
+            prefix = 'semiAnnual'
+        else:
+            prefix = f'period{period}Y'
+        names += [f'{prefix}Cos', f'{prefix}Sin']
+
+    # time func 3/4 - step / polyline
+    names += [f'step{x}' for x in model['stepDate']]
+    names += [f'polyline{x}' for x in model['polyline']]
+
+    # time func 5/6 - exponential / logarithmic
+    for key in ['exp', 'log']:
+        for onset, taus in model[key].items():
+            names += [f'{key}{onset}Tau{tau}D' for tau in taus]
+
+    return names
+
+
+def run_timeseries2time_func_patch(ts_file, date_list, drop_date, model, box, ref_date=None, ref_yx=None,
+                                   ref_yx_input=None, uq_method='residue', ts_cov_file=None,
+                                   bootstrap_count=400, bootstrap_seed=None, bootstrap_num_worker=1,
+                                   save_res=False, save_cov=False, max_memory=1, patch_data=None):
+    """Estimate time functions for one patch/box of the time-series file.
+
+    Parameters: ts_file         - str, path of the time-series file
+                date_list       - list of str, dates used in the estimation
+                drop_date       - 1D np.ndarray in bool, flag of dates to keep
+                model           - dict, deformation model
+                box             - tuple of 4 int, area of interest in (x0, y0, x1, y1)
+                ref_date        - str, reference date for temporal referencing
+                ref_yx          - tuple of 2 int, reference pixel to be kept in the mask
+                ref_yx_input    - tuple of 2 int, reference pixel for spatial referencing
+                uq_method       - str, uncertainty quantification method: residue, covariance, bootstrap
+                ts_cov_file     - str, path of the time-series covariance file
+                bootstrap_count - int, number of bootstrap resampling
+                bootstrap_seed  - int, seed of the random streams for bootstrap resampling
+                bootstrap_num_worker - int, number of processes for bootstrap resampling
+                save_res        - bool, calculate and return the residual time-series
+                save_cov        - bool, calculate and return the full covariance matrix of time func params
+                max_memory      - float, max memory to use in GB for the covariance propagation / bootstrap
+                patch_data      - tuple, input data read by read_timeseries2time_func_patch() in advance,
+                                  None to read it here.
+    Returns:    m               - 3D np.ndarray in size of (num_param, box_len, box_wid), time func params
+                m_std           - 3D np.ndarray in size of (num_param, box_len, box_wid), time func params STD
+                m_cov           - 4D np.ndarray in size of (num_param, num_param, box_len, box_wid), or None
+                residue         - 2D np.ndarray in size of (box_len, box_wid), or None
+                ts_res          - 3D np.ndarray in size of (num_date, box_len, box_wid), or None
+                mask            - 2D np.ndarray in size of (box_len, box_wid) in bool, pixels estimated
+                box             - tuple of 4 int
+    """
+    atr = readfile.read_attribute(ts_file)
+    seconds = atr.get('CENTER_LINE_UTC', 0)
+    num_date = len(date_list)
+    num_param = time_func.get_num_param(model)
+
+    box_wid = box[2] - box[0]
+    box_len = box[3] - box[1]
+    num_pixel = box_len * box_wid
+
+    # initiate output
+    m = np.zeros((num_param, num_pixel), dtype=DATA_TYPE)
+    m_std = np.zeros((num_param, num_pixel), dtype=DATA_TYPE)
+    m_cov = np.zeros((num_param, num_param, num_pixel), dtype=DATA_TYPE) if save_cov else None
+    residue = np.zeros(num_pixel, dtype=DATA_TYPE) if uq_method == 'residue' else None
+    ts_res = np.full((num_date, num_pixel), np.nan, dtype=np.float32) if save_res else None
+
+    # read input
+    if patch_data is None:
+        patch_data = read_timeseries2time_func_patch(
+            ts_file, date_list, drop_date, box,
+            ref_date=ref_date,
+            ref_yx=ref_yx,
+            ref_yx_input=ref_yx_input,
+            uq_method=uq_method,
+            ts_cov_file=ts_cov_file)
+    ts_data, ts_cov, mask = patch_data[:3]
+
+    ts_data = ts_data[:, mask]
+    num_pixel2inv = int(np.sum(mask))
+    idx_pixel2inv = np.where(mask)[0]
+    print('number of pixels to invert: {} out of {} ({:.1f}%)'.format(
+        num_pixel2inv, num_pixel, num_pixel2inv/num_pixel*100))
+
+    # return if no valid pixel found
+    if num_pixel2inv == 0:
+        m = m.reshape(num_param, box_len, box_wid)
+        m_std = m_std.reshape(num_param, box_len, box_wid)
+        m_cov = m_cov.reshape(num_param, num_param, box_len, box_wid) if m_cov is not None else None
+        residue = residue.reshape(box_len, box_wid) if residue is not None else None
+        ts_res = ts_res.reshape(num_date, box_len, box_wid) if ts_res is not None else None
+        mask = mask.reshape(box_len, box_wid)
+        return m, m_std, m_cov, residue, ts_res, mask, box
+
+
+    ### estimation / solve Gm = d
+    print('estimating time functions via linalg.lstsq ...')
+
+    if uq_method == 'bootstrap':
+        ## option 1 - least squares with bootstrapping
+        # Bootstrapping is a resampling method which can be used to estimate properties
+        # of an estimator. The method relies on independently sampling the data set with
+        # replacement.
+        print(f'estimating time functions STD with bootstrap resampling ({bootstrap_count} times) ...')
+
+        # design matrix of all dates, to be resampled in each iteration
+        # and to calculate the residual time series
+        G = time_func.get_design_matrix4time_func(date_list, model=model, ref_date=ref_date, seconds=seconds)
+
+        # get mean/std among all bootstrap sampling
+        m[:, mask], m_std[:, mask], m_cov_boot = time_func.estimate_time_func_bootstrap(
+            G, ts_data,
+            bootstrap_count=bootstrap_count,
+            seed=bootstrap_seed,
+            num_worker=bootstrap_num_worker,
+            full_cov=save_cov,
+            max_memory=max_memory)
+        if save_cov:
+            m_cov[:, :, mask] = m_cov_boot
+        del m_cov_boot
+
+
+    else:
+        ## option 2 - least squares with uncertainty propagation
+        G, m[:, mask], e2 = time_func.estimate_time_func(
+            model=model,
+            date_list=date_list,
+            dis_ts=ts_data,
+            seconds=seconds)
+        #del ts_data
+        ## Compute the covariance matrix for model parameters:
+        #       G * m = d                                       (1)
+        #       m_hat = G+ * d                                  (2)
+        #     C_m_hat = G+ * C_d * G+.T                         (3)
+        #
+        # [option 2.1] For weighted least squares estimation:
+        #          G+ = (G.T * C_d^-1 * G)^-1 * G.T * C_d^-1    (4)
+        # =>  C_m_hat = (G.T * C_d^-1 * G)^-1                   (5)
+        #
+        # [option 2.2] For ordinary least squares estimation:
+        #          G+ = (G.T * G)^-1 * G.T                      (6)
+        #     C_m_hat = G+ * C_d * G+.T                         (7)
+        #
+        # [option 2.3] Assuming normality of the observation errors (in the time domain) with
+        # the variance of sigma^2, we have C_d = sigma^2 * I, then eq. (3) is simplfied into:
+        #     C_m_hat = sigma^2 * (G.T * G)^-1                  (8)
+        #
+        # Using the law of integrated expectation, we estimate the obs sigma^2 using
+        # the OLS estimation residual as:
+        #           e_hat = d - d_hat                           (9)
+        # =>  sigma_hat^2 = (e_hat.T * e_hat) / N               (10)
+        # =>      sigma^2 = sigma_hat^2 * N / (N - P)           (11)
+        #                 = (e_hat.T * e_hat) / (N - P)         (12)
+        #
+        # Eq. (12) is the generalized form of eq. (10) in Fattahi & Amelung (2015, JGR),
+        # which is for linear velocity.
+
+        if uq_method == 'covariance':
+            # option 2.2 - linear propagation from time-series (co)variance matrix
+            # for all pixels in batch, as multidimensional matrix multiplication
+            covar_flag = True if len(ts_cov.shape) == 3 else False
+            msg = 'estimating time functions STD from time-serries '
+            msg += 'covariance in batch ...' if covar_flag else 'variance in batch ...'
+            print(msg)
+
+            # calc the common pseudo-inverse matrix
+            Gplus = linalg.pinv(G)
+
+            # cov: time-series -> time func
+            if save_cov:
+                m_cov[:, :, mask] = propagate_time_func_covariance(
+                    Gplus, ts_cov, idx=idx_pixel2inv, full_cov=True, max_memory=max_memory)
+                m_std[:, mask] = np.sqrt(np.diagonal(m_cov[:, :, mask]).T)
+            else:
+                m_var = propagate_time_func_covariance(
+                    Gplus, ts_cov, idx=idx_pixel2inv, full_cov=False, max_memory=max_memory)
+                m_std[:, mask] = np.sqrt(m_var)
+
+        elif uq_method == 'residue':
+            # option 2.3 - assume obs errors following normal dist. in time
+            print('estimating time functions STD from time-series fitting residual ...')
+            G_inv = linalg.inv(np.dot(G.T, G))
+            m_var = e2.reshape(1, -1) / (num_date - num_param)
+            m_std[:, mask] = np.sqrt(np.dot(np.diag(G_inv).reshape(-1, 1), m_var))
+            if save_cov:
+                m_cov[:, :, mask] = G_inv[:, :, np.newaxis] * m_var
+
+            # simplified form for linear velocity (without matrix linear algebra)
+            # equation (10) in Fattahi & Amelung (2015, JGR)
+            # ts_diff = ts_data - np.dot(G, m)
+            # t_diff = G[:, 1] - np.mean(G[:, 1])
+            # vel_std = np.sqrt(np.sum(ts_diff ** 2, axis=0) / np.sum(t_diff ** 2)  / (num_date - 2))
+
+    # residue
+    if uq_method == 'residue':
+        residue[mask] = np.sqrt(e2)
+
+    # residual time-series
+    if save_res:
+        ts_res[:, mask] = ts_data - np.dot(G, m)[:, mask]
+
+    # reshape to the box
+    m = m.reshape(num_param, box_len, box_wid)
+    m_std = m_std.reshape(num_param, box_len, box_wid)
+    m_cov = m_cov.reshape(num_param, num_param, box_len, box_wid) if m_cov is not None else None
+    residue = residue.reshape(box_len, box_wid) if residue is not None else None
+    ts_res = ts_res.reshape(num_date, box_len, box_wid) if ts_res is not None else None
+    mask = mask.reshape(box_len, box_wid)
+
+    return m, m_std, m_cov, residue, ts_res, mask, box
+
+
 def run_timeseries2time_func(inps):
     start_time = time.time()
 
@@ -137,8 +496,6 @@ def run_timeseries2time_func(inps):
     # read date info
     inps = read_date_info(inps)
     num_date = len(inps.date_list)
-    dates = np.array(inps.date_list)
-    seconds = atr.get('CENTER_LINE_UTC', 0)
 
     # use the 1st date as reference if not found, e.g. timeseriesResidual.h5 file
     if "REF_DATE" not in atr.keys() and not inps.ref_date:
@@ -199,247 +556,176 @@ def run_timeseries2time_func(inps):
         }
         writefile.layout_hdf5(inps.res_file, ds_name_dict=ds_name_dict, metadata=atrR)
 
+    # time_func_param covariance: attributes + instantiate output file
+    if inps.save_cov:
+        atrC = dict(atrV)
+        atrC['FILE_TYPE'] = 'covariance'
+        atrC.pop('UNIT', None)
+        param_names = get_model_param_names(model)
+        ds_name_dict = {
+            "paramName"  : [np.dtype(f'S{max(len(x) for x in param_names)}'), (num_param,),
+                            np.array(param_names, np.bytes_)],
+            "covariance" : [DATA_TYPE, (num_param, num_param, length, width), None],
+        }
+        writefile.layout_hdf5(inps.cov_file, ds_name_dict=ds_name_dict, metadata=atrC)
+
 
     ## estimation
 
-    # calc number of box based on memory limit
-    memoryAll = (num_date + num_param * 2 + 2) * length * width * 4
+    # bootstrap: the same seed for all boxes, i.e. the same resampled dates for all pixels
+    bootstrap_seed = inps.bootstrapSeed
     if inps.uncertaintyQuantification == 'bootstrap':
-        memoryAll += inps.bootstrapCount * num_param * length * width * 4
-    num_box = int(np.ceil(memoryAll * 3 / (inps.maxMemory * 1024**3)))
-    box_list, num_box = cluster.split_box2sub_boxes(
-        box=(0, 0, width, length),
-        num_split=num_box,
-        dimension='y',
-        print_msg=True,
-    )
-
-    # loop for block-by-block IO
-    for i, box in enumerate(box_list):
-        box_wid = box[2] - box[0]
-        box_len = box[3] - box[1]
-        num_pixel = box_len * box_wid
-        if num_box > 1:
-            print(f'\n------- processing patch {i+1} out of {num_box} --------------')
-            print(f'box width:  {box_wid}')
-            print(f'box length: {box_len}')
-
-        # initiate output
-        m = np.zeros((num_param, num_pixel), dtype=DATA_TYPE)
-        m_std = np.zeros((num_param, num_pixel), dtype=DATA_TYPE)
-
-        # read input
-        print(f'reading data from file {inps.timeseries_file} ...')
-        ts_data = readfile.read(inps.timeseries_file, box=box)[0]
-
-        # referencing in time and space
-        # for file w/o reference info. e.g. ERA5.h5
-        if inps.ref_date:
-            print(f'referecing to date: {inps.ref_date}')
-            ref_ind = inps.date_list.index(inps.ref_date)
-            ts_data -= np.tile(ts_data[ref_ind, :, :], (ts_data.shape[0], 1, 1))
-
-        if inps.ref_yx:
-            print(f'referencing to point (y, x): ({inps.ref_yx[0]}, {inps.ref_yx[1]})')
-            ref_box = (inps.ref_yx[1], inps.ref_yx[0], inps.ref_yx[1]+1, inps.ref_yx[0]+1)
-            ref_val = readfile.read(inps.timeseries_file, box=ref_box)[0]
-            ts_data -= np.tile(ref_val.reshape(ts_data.shape[0], 1, 1),
-                               (1, ts_data.shape[1], ts_data.shape[2]))
-
-        ts_data = ts_data[inps.dropDate, :, :].reshape(num_date, -1)
-        if atrV['UNIT'] == 'mm':
-            ts_data *= 1./1000.
-
-        ts_cov = None
-        if inps.uncertaintyQuantification == 'covariance':
-            print(f'reading time-series covariance matrix from file {inps.timeSeriesCovFile} ...')
-            ts_cov = readfile.read(inps.timeSeriesCovFile, box=box)[0]
-            if len(ts_cov.shape) == 4:
-                # full covariance matrix in 4D --> 3D
-                if num_date < ts_cov.shape[0]:
-                    ts_cov = ts_cov[inps.dropDate, :, :, :]
-                    ts_cov = ts_cov[:, inps.dropDate, :, :]
-                ts_cov = ts_cov.reshape(num_date, num_date, -1)
-
-            elif len(ts_cov.shape) == 3:
-                # diaginal variance matrix in 3D --> 2D
-                if num_date < ts_cov.shape[0]:
-                    ts_cov = ts_cov[inps.dropDate, :, :]
-                ts_cov = ts_cov.reshape(num_date, -1)
-
-            ## set zero value to a fixed small value to avoid divide by zero
-            #epsilon = 1e-5
-            #ts_cov[ts_cov<epsilon] = epsilon
-
-        # mask invalid pixels
-        print('skip pixels with zero/nan value in all acquisitions')
-        ts_stack = np.nanmean(ts_data, axis=0)
-        mask = np.multiply(~np.isnan(ts_stack), ts_stack!=0.)
-        del ts_stack
-        # include the reference point
-        ry, rx = int(atrV['REF_Y']) - box[1], int(atrV['REF_X']) - box[0]
-        if 0 <= rx < box_wid and 0 <= ry < box_len:
-            mask[ry * box_wid + rx] = 1
-
-        #if ts_cov is not None:
-        #    print('skip pxiels with nan STD value in any acquisition')
-        #    num_std_nan = np.sum(np.isnan(ts_cov), axis=0)
-        #    mask *= num_std_nan == 0
-        #    del num_std_nan
-
-        ts_data = ts_data[:, mask]
-        num_pixel2inv = int(np.sum(mask))
-        idx_pixel2inv = np.where(mask)[0]
-        print('number of pixels to invert: {} out of {} ({:.1f}%)'.format(
-            num_pixel2inv, num_pixel, num_pixel2inv/num_pixel*100))
-
-        # go to next if no valid pixel found
-        if num_pixel2inv == 0:
-            continue
-
-
-        ### estimation / solve Gm = d
-        print('estimating time functions via linalg.lstsq ...')
+        if bootstrap_seed is None:
+            bootstrap_seed = np.random.SeedSequence().entropy
+        print(f'bootstrap seed: {bootstrap_seed} (use --bootstrap-seed to reproduce)')
+
+    # prepare the input arguments for *_patch()
+    data_kwargs = {
+        'ts_file'          : inps.timeseries_file,
+        'date_list'        : inps.date_list,
+        'drop_date'        : inps.dropDate,
+        'model'            : model,
+        'ref_date'         : inps.ref_date,
+        'ref_yx'           : (int(atrV['REF_Y']), int(atrV['REF_X'])) if 'REF_Y' in atrV.keys() else None,
+        'ref_yx_input'     : inps.ref_yx,
+        'uq_method'        : inps.uncertaintyQuantification,
+        'ts_cov_file'      : inps.timeSeriesCovFile,
+        'bootstrap_count'  : inps.bootstrapCount,
+        'bootstrap_seed'   : bootstrap_seed,
+        # run the iterations in parallel, if the boxes are not
+        'bootstrap_num_worker' : inps.bootstrapNumWorker if not inps.cluster else 1,
+        'save_res'         : inps.save_res,
+        'save_cov'         : inps.save_cov,
+    }
+
+    # read the next block in the background, for non-parallel processing only
+    # as the workers read the data by themselves in parallel processing
+    read_keys = ['ts_file', 'date_list', 'drop_date', 'ref_date', 'ref_yx', 'ref_yx_input',
+                 'uq_method', 'ts_cov_file']
+    read_kwargs = {key: data_kwargs[key] for key in read_keys}
+    read_func = None if inps.cluster else read_timeseries2time_func_patch
 
+    # calc number of box based on memory limit
+    # with the box edges aligned with the chunks of the time-series
+    max_memory = inps.maxMemory / cluster.BoxPipeline.num_box_in_memory
+    data_kwargs['max_memory'] = max_memory
+    chunk_shape = readfile.get_hdf5_chunk_shape(inps.timeseries_file, 'timeseries')
+    if inps.memoryPlan:
+        # measured on probe boxes
+        planner = cluster.MemoryPlanner(
+            'timeseries2velocity',
+            key=f'{num_date}_{num_param}_{inps.uncertaintyQuantification}_'
+                f'{inps.bootstrapCount}_res{inps.save_res:d}_cov{inps.save_cov:d}',
+        )
+        box_list, num_box = planner.split_box((0, 0, width, length), max_memory,
+                                              probe_func=run_timeseries2time_func_patch,
+                                              probe_kwargs=data_kwargs,
+                                              chunk_shape=chunk_shape)
+    else:
+        # estimated from the data size
+        memoryPixel = (num_date + num_param * 2 + 2) * 4
         if inps.uncertaintyQuantification == 'bootstrap':
-            ## option 1 - least squares with bootstrapping
-            # Bootstrapping is a resampling method which can be used to estimate properties
-            # of an estimator. The method relies on independently sampling the data set with
-            # replacement.
-            print('estimating time functions STD with bootstrap resampling ({} times) ...'.format(
-                inps.bootstrapCount))
-
-            # calc model of all bootstrap sampling
-            rng = np.random.default_rng()
-            m_boot = np.zeros((inps.bootstrapCount, num_param, num_pixel2inv), dtype=DATA_TYPE)
-            prog_bar = ptime.progressBar(maxValue=inps.bootstrapCount)
-            for i in range(inps.bootstrapCount):
-                # bootstrap resampling
-                boot_ind = rng.choice(num_date, size=num_date, replace=True)
-                boot_ind.sort()
-
-                # estimation
-                m_boot[i] = time_func.estimate_time_func(
-                    model=model,
-                    date_list=dates[boot_ind].tolist(),
-                    dis_ts=ts_data[boot_ind],
-                    seconds=seconds)[1]
-
-                prog_bar.update(i+1, suffix=f'iteration {i+1} / {inps.bootstrapCount}')
-            prog_bar.close()
-            #del ts_data
-
-            # get mean/std among all bootstrap sampling
-            m[:, mask] = m_boot.mean(axis=0).reshape(num_param, -1)
-            m_std[:, mask] = m_boot.std(axis=0).reshape(num_param, -1)
-            del m_boot
-
-            # get design matrix to calculate the residual time series
-            G = time_func.get_design_matrix4time_func(inps.date_list, model=model, ref_date=inps.ref_date, seconds=seconds)
-
-
-        else:
-            ## option 2 - least squares with uncertainty propagation
-            G, m[:, mask], e2 = time_func.estimate_time_func(
-                model=model,
-                date_list=inps.date_list,
-                dis_ts=ts_data,
-                seconds=seconds)
-            #del ts_data
-
-            ## Compute the covariance matrix for model parameters:
-            #       G * m = d                                       (1)
-            #       m_hat = G+ * d                                  (2)
-            #     C_m_hat = G+ * C_d * G+.T                         (3)
-            #
-            # [option 2.1] For weighted least squares estimation:
-            #          G+ = (G.T * C_d^-1 * G)^-1 * G.T * C_d^-1    (4)
-            # =>  C_m_hat = (G.T * C_d^-1 * G)^-1                   (5)
-            #
-            # [option 2.2] For ordinary least squares estimation:
-            #          G+ = (G.T * G)^-1 * G.T                      (6)
-            #     C_m_hat = G+ * C_d * G+.T                         (7)
-            #
-            # [option 2.3] Assuming normality of the observation errors (in the time domain) with
-            # the variance of sigma^2, we have C_d = sigma^2 * I, then eq. (3) is simplfied into:
-            #     C_m_hat = sigma^2 * (G.T * G)^-1                  (8)
-            #
-            # Using the law of integrated expectation, we estimate the obs sigma^2 using
-            # the OLS estimation residual as:
-            #           e_hat = d - d_hat                           (9)
-            # =>  sigma_hat^2 = (e_hat.T * e_hat) / N               (10)
-            # =>      sigma^2 = sigma_hat^2 * N / (N - P)           (11)
-            #                 = (e_hat.T * e_hat) / (N - P)         (12)
-            #
-            # Eq. (12) is the generalized form of eq. (10) in Fattahi & Amelung (2015, JGR),
-            # which is for linear velocity.
-
-            if inps.uncertaintyQuantification == 'covariance':
-                # option 2.2 - linear propagation from time-series (co)variance matrix
-                # TO DO: save the full covariance matrix of the time function parameters
-                # only the STD is saved right now
-                covar_flag = True if len(ts_cov.shape) == 3 else False
-                msg = 'estimating time functions STD from time-serries '
-                msg += 'covariance pixel-by-pixel ...' if covar_flag else 'variance pixel-by-pixel ...'
-                print(msg)
-
-                # calc the common pseudo-inverse matrix
-                Gplus = linalg.pinv(G)
-
-                # loop over each pixel
-                # or use multidimension matrix multiplication
-                # m_cov = Gplus @ ts_cov @ Gplus.T
-                prog_bar = ptime.progressBar(maxValue=num_pixel2inv)
-                for i in range(num_pixel2inv):
-                    idx = idx_pixel2inv[i]
-
-                    # cov: time-series -> time func
-                    ts_covi = ts_cov[:, :, idx] if covar_flag else np.diag(ts_cov[:, idx])
-                    m_cov = np.linalg.multi_dot([Gplus, ts_covi, Gplus.T])
-                    m_std[:, idx] = np.sqrt(np.diag(m_cov))
-
-                    prog_bar.update(i+1, every=200, suffix=f'{i+1}/{num_pixel2inv} pixels')
-                prog_bar.close()
-
-            elif inps.uncertaintyQuantification == 'residue':
-                # option 2.3 - assume obs errors following normal dist. in time
-                print('estimating time functions STD from time-series fitting residual ...')
-                G_inv = linalg.inv(np.dot(G.T, G))
-                m_var = e2.reshape(1, -1) / (num_date - num_param)
-                m_std[:, mask] = np.sqrt(np.dot(np.diag(G_inv).reshape(-1, 1), m_var))
-
-                # simplified form for linear velocity (without matrix linear algebra)
-                # equation (10) in Fattahi & Amelung (2015, JGR)
-                # ts_diff = ts_data - np.dot(G, m)
-                # t_diff = G[:, 1] - np.mean(G[:, 1])
-                # vel_std = np.sqrt(np.sum(ts_diff ** 2, axis=0) / np.sum(t_diff ** 2)  / (num_date - 2))
+            # running mean / (co)variance in float64
+            memoryPixel += num_param * (2 + (num_param if inps.save_cov else 0)) * 8
+        if inps.save_cov:
+            memoryPixel += num_param * num_param * 4
+        box_list, num_box = cluster.split_box2tiles(
+            box=(0, 0, width, length),
+            max_num_pixel=int(max_memory * 1024**3 / (memoryPixel * 3)),
+            chunk_shape=chunk_shape,
+            print_msg=True,
+        )
+
+    def write_patch(box, m, m_std, m_cov, residue, ts_res, mask):
+        """write the block to disk"""
+        # go to next if no valid pixel found
+        if not np.any(mask):
+            return
 
         # write - time func params
         block = [box[1], box[3], box[0], box[2]]
-        ds_dict = model2hdf5_dataset(model, m, m_std, mask=mask)[0]
+        ds_dict = model2hdf5_dataset(model, m.reshape(num_param, -1), m_std.reshape(num_param, -1), mask=mask.flatten())[0]
         # save dataset: residue
         if inps.uncertaintyQuantification == 'residue':
-            ds_dict['residue'] = np.zeros(num_pixel, dtype=DATA_TYPE)
-            ds_dict['residue'][mask] = np.sqrt(e2)
+            ds_dict['residue'] = residue
 
         for ds_name, data in ds_dict.items():
             writefile.write_hdf5_block(inps.outfile,
-                                       data=data.reshape(box_len, box_wid),
+                                       data=data.reshape(box[3] - box[1], box[2] - box[0]),
                                        datasetName=ds_name,
                                        block=block)
 
         # write - residual file
         if inps.save_res:
             block = [0, num_date, box[1], box[3], box[0], box[2]]
-            ts_res = np.full((num_date, box_len*box_wid), np.nan, dtype=np.float32)
-            # calculate the time-series residual
-            ts_res[:, mask] = ts_data - np.dot(G, m)[:, mask]
-            # write to HDF5 file
             writefile.write_hdf5_block(inps.res_file,
-                                       data=ts_res.reshape(num_date, box_len, box_wid),
+                                       data=ts_res,
                                        datasetName='timeseries',
                                        block=block)
 
+        # write - covariance file
+        if inps.save_cov:
+            block = [0, num_param, 0, num_param, box[1], box[3], box[0], box[2]]
+            writefile.write_hdf5_block(inps.cov_file,
+                                       data=m_cov,
+                                       datasetName='covariance',
+                                       block=block)
+
+    # loop for block-by-block IO
+    # with reading the next block and writing the previous block in the background
+    with cluster.BoxPipeline(box_list, read_func, read_kwargs, write_patch) as pipe:
+        for i, box, patch_data in pipe:
+            box_wid = box[2] - box[0]
+            box_len = box[3] - box[1]
+            if num_box > 1:
+                print(f'\n------- processing patch {i+1} out of {num_box} --------------')
+                print(f'box width:  {box_wid}')
+                print(f'box length: {box_len}')
+
+            # update box argument in the input data
+            data_kwargs['box'] = box
+
+            # estimate
+            if not inps.cluster:
+                # non-parallel
+                m, m_std, m_cov, residue, ts_res, mask = run_timeseries2time_func_patch(
+                    **data_kwargs, patch_data=patch_data)[:-1]
+
+            else:
+                # parallel
+                print(f'\n\n------- start parallel processing using {inps.cluster} cluster -------')
+
+                # finish writing the previous block first,
+                # to avoid the opened output files being inherited by the worker processes
+                pipe.wait()
+
+                # initiate the output data
+                m = np.zeros((num_param, box_len, box_wid), dtype=DATA_TYPE)
+                m_std = np.zeros((num_param, box_len, box_wid), dtype=DATA_TYPE)
+                m_cov = np.zeros((num_param, num_param, box_len, box_wid), dtype=DATA_TYPE) if inps.save_cov else None
+                residue = np.zeros((box_len, box_wid), dtype=DATA_TYPE) if inps.uncertaintyQuantification == 'residue' else None
+                ts_res = np.zeros((num_date, box_len, box_wid), dtype=np.float32) if inps.save_res else None
+                mask = np.zeros((box_len, box_wid), dtype=np.bool_)
+
+                # initiate cluster (and client for dask)
+                cluster_obj = cluster.init_cluster(inps.cluster, inps.numWorker, config_name=inps.config)
+                cluster_obj.open()
+
+                # run
+                m, m_std, m_cov, residue, ts_res, mask = cluster_obj.run(
+                    func=run_timeseries2time_func_patch,
+                    func_data=data_kwargs,
+                    results=[m, m_std, m_cov, residue, ts_res, mask],
+                )
+
+                # close cluster (and client for dask)
+                cluster_obj.close()
+
+                print('------- finished parallel processing -------\n\n')
+
+            # write the block to disk in the background
+            pipe.write(box, m, m_std, m_cov, residue, ts_res, mask)
+
     # used time
     m, s = divmod(time.time() - start_time, 60)
     print(f'time used: {m:02.0f} mins {s:02.1f} secs.')
@@ -29,6 +29,11 @@ def read_template2inps(templateFile, inps):
             inpsDict[key] = value
         elif key in ['cutoff']:
             inpsDict[key] = float(value)
+
+    # computing configurations
+    key = 'mintpy.compute.maxMemory'
+    if template.get(key, False):
+        inpsDict['maxMemory'] = float(template[key])
     return inps
 
 
@@ -83,6 +88,7 @@ def run_timeseries_rms(inps):
         inps.timeseries_file,
         mask_file=inps.maskFile,
         ramp_type=inps.deramp,
+        max_memory=inps.maxMemory,
     )
 
     # analyze RMS: generate reference/exclude_date.txt files
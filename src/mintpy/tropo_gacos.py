@@ -259,6 +259,7 @@ def run_tropo_gacos(inps):
     # e.g. the absolute delay and the double referenced time-series
     print('correcting delay for using diff.py')
     iargs = [inps.dis_file, inps.tropo_file, '-o', inps.cor_dis_file, '--force']
+    iargs += ['--lazy'] if inps.lazy else []
     print('diff.py', ' '.join(iargs))
     mintpy.cli.diff.main(iargs)
 
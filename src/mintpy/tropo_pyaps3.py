@@ -756,7 +756,7 @@ def run_tropo_pyaps3(inps):
         print(f'Skip re-calculating and use existed troposhperic delay HDF5 file: {inps.tropo_file}.')
 
     ## 3. correct tropo delay from displacement time-series (using diff.py)
-    if inps.dis_file:
+    if inps.dis_file and inps.cor_dis_file:
         print('\n'+'-'*80)
         print('Applying tropospheric correction to displacement file...')
         if ut.run_or_skip(inps.cor_dis_file, [inps.dis_file, inps.tropo_file]) == 'run':
@@ -764,12 +764,13 @@ def run_tropo_pyaps3(inps):
             # e.g. the absolute delay and the double referenced time-series
             print('correcting delay via diff.py')
             iargs = [inps.dis_file, inps.tropo_file, '-o', inps.cor_dis_file, '--force']
+            iargs += ['--lazy'] if inps.lazy else []
             print('diff.py', ' '.join(iargs))
             mintpy.cli.diff.main(iargs)
 
         else:
             print(f'Skip re-applying and use existed corrected displacement file: {inps.cor_dis_file}.')
     else:
-        print('No input displacement file, skip correcting tropospheric delays.')
+        print('No input displacement / output corrected file, skip correcting tropospheric delays.')
 
     return
@@ -279,7 +279,8 @@ def read_timeseries_data(inps):
     ts_data = []
     for fname in inps.file:
         msg = f'reading timeseries from file {fname}'
-        msg += f' with step of {inps.multilook_num} by {inps.multilook_num}' if inps.multilook_num > 1 else ''
+        if inps.multilook_num > 1:
+            msg += f' with {inps.multilook_method} multilook of {inps.multilook_num} by {inps.multilook_num}'
         vprint(msg)
 
         data, atr = readfile.read(
@@ -287,7 +288,8 @@ def read_timeseries_data(inps):
             datasetName=inps.date_list,
             box=inps.pix_box,
             xstep=inps.multilook_num,
-            ystep=inps.multilook_num)
+            ystep=inps.multilook_num,
+            method=inps.multilook_method)
 
         if atr['DATA_TYPE'].startswith('complex'):
             vprint('input data is complex, calculate its amplitude and continue')
@@ -116,6 +116,9 @@ def add_data_disp_argument(parser):
                       type=int, default=1, metavar='NUM',
                       help='multilook data in X and Y direction with a factor for display '
                            '(default: %(default)s).')
+    data.add_argument('--mli-method','--multilook-method', dest='multilook_method', default='nearest',
+                      choices=['nearest', 'mean', 'median'],
+                      help='multilook method, applied while reading the data (default: %(default)s).')
     data.add_argument('--nomultilook', '--no-multilook', dest='multilook', action='store_false',
                       help='do not multilook, for high quality display. \n'
                            'If multilook is True and multilook_num=1, '
@@ -399,23 +402,30 @@ def add_map_argument(parser):
     return parser
 
 
-def add_memory_argument(parser):
+def add_memory_argument(parser, plan=False):
     """Argument parser for memory usage options"""
     parser.add_argument('--ram', '--memory', dest='maxMemory', type=float, default=4.0,
                         help='Max amount of memory in GB to use (default: %(default)s).\n' +
                              'Adjust according to your computer memory.')
+    if plan:
+        parser.add_argument('--memory-plan', dest='memoryPlan', action='store_true',
+                            help='Plan the box size based on the memory usage measured on small probe boxes,\n'
+                                 'instead of the empirical estimation (default: %(default)s).\n'
+                                 'The calibrated coefficients are saved in ~/.mintpy/memory_coeff.json\n'
+                                 'or $MINTPY_MEMORY_COEFF_FILE, to skip the probe in later runs.')
     return parser
 
 
 def add_parallel_argument(parser):
     """Argument group parser for parallel computing options"""
     # from mintpy.objects.cluster import CLUSTER_LIST
-    CLUSTER_LIST = ['lsf', 'pbs', 'slurm', 'local']
+    CLUSTER_LIST = ['lsf', 'pbs', 'slurm', 'local', 'process']
 
-    par = parser.add_argument_group('parallel', 'parallel processing using dask')
+    par = parser.add_argument_group('parallel', 'parallel processing using dask or a local process pool')
     par.add_argument('-c', '--cluster', '--cluster-type', dest='cluster', type=str,
                      choices=CLUSTER_LIST,
-                     help='Cluster to use for parallel computing (default: %(default)s to turn OFF).')
+                     help='Cluster to use for parallel computing (default: %(default)s to turn OFF).\n'
+                          'process - local process pool without dask, e.g. for nodes without dask scheduler.')
     par.add_argument('--num-worker', dest='numWorker', type=str, default='4',
                      help='Number of workers to use (default: %(default)s).')
     par.add_argument('--config', '--config-name', dest='config', type=str, default=None,
@@ -8,13 +8,17 @@
 #   from mintpy.utils import readfile
 
 
+import copy
 import datetime as dt
 import glob
 import os
 import re
 import sys
+import threading
+import time
 import warnings
 import xml.etree.ElementTree as ET
+from collections import OrderedDict
 from typing import Union
 
 import h5py
@@ -22,6 +26,7 @@ import numpy as np
 from numpy.typing import DTypeLike
 
 from mintpy.objects import (
+    CORRECTION_STACK_KEYS,
     DSET_UNIT_DICT,
     HDFEOS,
     geometry,
@@ -31,10 +36,24 @@ from mintpy.objects import (
     sensor,
     timeseries,
 )
+from mintpy.stdproc.multilook import multilook_data
 from mintpy.utils import ptime, utils0 as ut
 
+# register the HDF5 compression filters of hdf5plugin (zstd, blosc2, etc.) to h5py if installed,
+# to read datasets compressed by them. Uncompressed / lzf / gzip datasets do not need it.
+try:
+    import hdf5plugin  # noqa: F401
+except ImportError:
+    pass
+
 SPEED_OF_LIGHT = 299792458  # meters per second
 
+# filter ID (registered at the HDF Group) of the supported HDF5 compression plugins
+HDF5_PLUGIN_FILTERS = {
+    32015: 'zstd',
+    32026: 'blosc2',
+}
+
 
 STD_METADATA_KEYS = {
     # ROI_PAC/MintPy attributes
@@ -317,7 +336,7 @@ def gdal_to_numpy_dtype(gdal_dtype: Union[str, int]) -> np.dtype:
 
 #########################################################################
 def read(fname, box=None, datasetName=None, print_msg=True, xstep=1, ystep=1, data_type=None,
-         no_data_values=None):
+         no_data_values=None, method='nearest', pixel_index=False):
     """Read one dataset and its attributes from input file.
 
     Parameters: fname          - str, path of file to read
@@ -326,6 +345,9 @@ def read(fname, box=None, datasetName=None, print_msg=True, xstep=1, ystep=1, da
                 x/ystep        - int, number of pixels to pick/multilook for each output pixel
                 data_type      - numpy data type, e.g. np.float32, np.bool_, etc. Change the output data type
                 no_data_values - list of 2 numbers, change the no-data-value in the output
+                method         - str, multilook method for x/ystep > 1, nearest, mean or median
+                pixel_index    - bool, read 3D HDF5 datasets from the pixel-major index file,
+                                 which is built on the first call, for fast point / small box queries
     Returns:    data           - 2/3/4D matrix in numpy.array format, return None if failed
                 atr            - dictionary, attributes of data, return None if failed
     Examples:
@@ -339,6 +361,8 @@ def read(fname, box=None, datasetName=None, print_msg=True, xstep=1, ystep=1, da
         data, atr = readfile.read('geometryRadar.h5', datasetName='height')
         data, atr = readfile.read('geometryRadar.h5', datasetName='bperp')
         data, atr = readfile.read('100120-110214.unw', box=(100,1100, 500, 2500))
+        data, atr = readfile.read('timeseries.h5', xstep=10, ystep=10, method='mean')
+        data, atr = readfile.read('timeseries.h5', box=(200, 300, 201, 301), pixel_index=True)
     """
     fname = os.fspath(fname)  # Convert from possible pathlib.Path
     # metadata
@@ -360,11 +384,12 @@ def read(fname, box=None, datasetName=None, print_msg=True, xstep=1, ystep=1, da
         box=box,
         xstep=xstep,
         ystep=ystep,
+        method=method,
     )
 
     fext = os.path.splitext(os.path.basename(fname))[1].lower()
     if fext in ['.h5', '.he5']:
-        data = read_hdf5_file(fname, print_msg=print_msg, **kwargs)
+        data = read_hdf5_file(fname, print_msg=print_msg, pixel_index=pixel_index, **kwargs)
 
     else:
         data, atr = read_binary_file(fname, **kwargs)
@@ -385,7 +410,128 @@ def read(fname, box=None, datasetName=None, print_msg=True, xstep=1, ystep=1, da
 
 
 #########################################################################
-def read_hdf5_file(fname, datasetName=None, box=None, xstep=1, ystep=1, print_msg=True):
+def get_hdf5_slice_index(fname):
+    """Get the index of the 2D slices in an HDF5 file, to resolve the input dataset name.
+
+    The index is built from get_slice_list() once and cached until the file is modified.
+
+    Parameters: fname       - str, path of the HDF5 file
+    Returns:    slice_index - dict, with keys:
+                              slice_list - list(str), list of 2D slice names
+                              ds_list    - list(str), dataset family names, e.g. timeseries, height
+                              ds_2d_list - list(str), family names of 2D datasets
+                              ds_3d_list - list(str), family names of 3D datasets
+                              date_index - dict, index in the 1st dimension of the 3D dataset,
+                                           e.g. {'unwrapPhase': {'20150215_20150227': 0, ...}, ...}
+    Examples:   slice_index = get_hdf5_slice_index('inputs/ifgramStack.h5')
+                ind = slice_index['date_index']['unwrapPhase']['20150215_20150227']
+    """
+    if ATTR_CACHE_SIZE > 0:
+        key = _get_file_cache_key(fname, 'slice_index')
+        slice_index = _get_cache_item(key)
+        if slice_index is not None:
+            return slice_index
+
+    slice_list = get_slice_list(fname)
+    ds_list = []
+    date_index = {}
+    num_slice = {}
+    for slice_name in slice_list:
+        ds_family = slice_name.split('-')[0]
+        if ds_family not in ds_list:
+            ds_list.append(ds_family)
+
+        if '-' in slice_name:
+            # position in the dataset family, the first one for repeated dates as list.index()
+            ind = num_slice.get(ds_family, 0)
+            num_slice[ds_family] = ind + 1
+            date_index.setdefault(ds_family, {}).setdefault(slice_name.split('-', 1)[1], ind)
+
+    ds_2d_list = [i for i in slice_list if '-' not in i]
+    slice_index = dict(
+        slice_list=slice_list,
+        ds_list=ds_list,
+        ds_2d_list=ds_2d_list,
+        ds_3d_list=[i for i in ds_list if i not in ds_2d_list],
+        date_index=date_index,
+    )
+
+    if ATTR_CACHE_SIZE > 0:
+        _set_cache_item(key, slice_index)
+    return slice_index
+
+
+def _read_correction_stack(fname, date_list, box, xstep=1, ystep=1, method='nearest'):
+    """Read the correction stack file, as base minus correction, via timeseries.read().
+
+    Parameters: fname     - str, path of the correction stack file
+                date_list - list of str, dates to read, [] or [''] for all
+                box       - tuple of 4 int, (x0, y0, x1, y1)
+                x/ystep   - int, number of pixels to pick/multilook for each output pixel
+                method    - str, multilook method for x/ystep > 1, nearest, mean or median
+    Returns:    data      - 3D np.ndarray
+    """
+    obj = timeseries(fname)
+    date_list = [i for i in date_list if i]
+    kwargs = dict(datasetName=date_list, squeeze=False, print_msg=False)
+    if xstep * ystep == 1:
+        return obj.read(box=box, **kwargs)
+
+    # compose in full resolution, then multilook, block by block in rows
+    obj.open(print_msg=False)
+    num_date = len(date_list) if date_list else obj.numDate
+    return _read_multilook_by_row(
+        lambda r0, r1: obj.read(box=(box[0], r0, box[2], r1), **kwargs),
+        box, xstep, ystep, method=method,
+        # base and correction in float32
+        row_size=(box[2] - box[0]) * num_date * 4 * 2,
+    )
+
+
+def _read_multilook_by_row(read_func, box, xstep, ystep, method='mean', row_size=None,
+                           chunk_row=None, max_block_size=32):
+    """Read and multilook the data within the box block by block in rows,
+    to keep the memory usage in the order of the output size.
+
+    Parameters: read_func      - function to read the data in rows, read_func(r0, r1) --> 2D / 3D np.ndarray
+                                 for rows r0:r1 and columns box[0]:box[2], in the coordinate of the file
+                box            - tuple of 4 int in (x0, y0, x1, y1)
+                x/ystep        - int, number of pixels to multilook for each output pixel
+                method         - str, multilook method, mean or median
+                row_size       - int, size of one row of the data to read in bytes
+                chunk_row      - int, number of rows in one chunk of the file, to align the blocks with
+                max_block_size - float, max size of the data to read per block in MB
+    Returns:    data           - 2D / 3D np.ndarray in size of (..., ysize, xsize)
+    """
+    xsize = int((box[2] - box[0]) / xstep)
+    ysize = int((box[3] - box[1]) / ystep)
+
+    # empty output if the box is smaller than the step, as the nearest sampling
+    if xsize * ysize == 0:
+        block = read_func(box[1], box[1])
+        return np.zeros(block.shape[:-2] + (ysize, xsize), dtype=block.dtype)
+
+    # number of rows per block: multiple of ystep, and of chunk_row if it fits
+    max_num_row = max(int(max_block_size * 1024**2 / max(row_size or 1, 1)), 1)
+    num_row = max(max_num_row // ystep, 1) * ystep
+    if chunk_row:
+        step = np.lcm(ystep, chunk_row)
+        if step <= max_num_row:
+            num_row = max_num_row // step * step
+
+    data = None
+    for r0 in range(0, ysize * ystep, num_row):
+        r1 = min(r0 + num_row, ysize * ystep)
+        block = read_func(box[1] + r0, box[1] + r1)[..., :xsize*xstep]
+        block = multilook_data(block, lks_y=ystep, lks_x=xstep, method=method)
+        if data is None:
+            data = np.zeros(block.shape[:-2] + (ysize, xsize), dtype=block.dtype)
+        data[..., int(r0/ystep):int(r1/ystep), :] = block
+    return data
+
+
+def read_hdf5_file(fname, datasetName=None, box=None, xstep=1, ystep=1, print_msg=True,
+                   method='nearest', pixel_index=False):
     """
     Parameters: fname       : str, name of HDF5 file to read
                 datasetName : str or list of str, dataset name in root level with/without date info
@@ -403,17 +549,21 @@ def read_hdf5_file(fname, datasetName=None, box=None, xstep=1, ystep=1, print_ms
                     ...
                 box         : 4-tuple of int area to read, defined in (x0, y0, x1, y1) in pixel coordinate
                 x/ystep     : int, number of pixels to pick/multilook for each output pixel
+                method      : str, multilook method for x/ystep > 1, nearest, mean or median
+                              mean / median is applied block by block while reading,
+                              thus, the memory usage is in the order of the output size.
+                pixel_index : bool, read 3D dataset from its pixel-major index file, if x/ystep = 1
     Returns:    data        : 2/3/4D array
                 atr         : dict, metadata
     """
+    if method not in ['nearest', 'mean', 'median']:
+        raise ValueError(f'Un-supported multilook method: {method}! Available methods: nearest, mean, median.')
+    multilook = xstep * ystep > 1 and method != 'nearest'
+
     # File Info: list of slice / dataset / dataset2d / dataset3d
-    slice_list = get_slice_list(fname)
-    ds_list = []
-    for i in [i.split('-')[0] for i in slice_list]:
-        if i not in ds_list:
-            ds_list.append(i)
-    ds_2d_list = [i for i in slice_list if '-' not in i]
-    ds_3d_list = [i for i in ds_list if i not in ds_2d_list]
+    slice_index = get_hdf5_slice_index(fname)
+    ds_list = slice_index['ds_list']
+    ds_3d_list = slice_index['ds_3d_list']
 
     # Input Argument: convert input datasetName into list of slice
     if not datasetName:
@@ -436,21 +586,35 @@ def read_hdf5_file(fname, datasetName=None, box=None, xstep=1, ystep=1, print_ms
     with h5py.File(fname, 'r') as f:
         # get dataset object
         dsNames = [i for i in [datasetName[0], dsFamily] if i in f.keys()]
-        # support for old mintpy-v0.x files
-        dsNamesOld = [i for i in slice_list if f'/{datasetName[0]}' in i]
         if len(dsNames) > 0:
             ds = f[dsNames[0]]
-        elif len(dsNamesOld) > 0:
-            ds = f[dsNamesOld[0]]
         else:
-            raise ValueError(f'input dataset {datasetName} not found in file {fname}')
+            # support for old mintpy-v0.x files
+            dsNamesOld = [i for i in slice_index['slice_list'] if f'/{datasetName[0]}' in i]
+            if len(dsNamesOld) > 0:
+                ds = f[dsNamesOld[0]]
+            else:
+                raise ValueError(f'input dataset {datasetName} not found in file {fname}')
 
         # output size for >=2D dataset if x/ystep > 1
         xsize = int((box[2] - box[0]) / xstep)
         ysize = int((box[3] - box[1]) / ystep)
 
+        # chunk info, to align the blocks for multilooking
+        row_size = (box[2] - box[0]) * ds.dtype.itemsize
+        chunk_row = ds.chunks[-2] if ds.chunks else None
+
         # 2D dataset
-        if ds.ndim == 2:
+        if ds.ndim == 2 and multilook:
+            # read and multilook block by block
+            data = _read_multilook_by_row(
+                lambda r0, r1: ds[r0:r1, box[0]:box[2]],
+                box, xstep, ystep, method=method,
+                row_size=row_size,
+                chunk_row=chunk_row,
+            )
+
+        elif ds.ndim == 2:
             # read data
             data = ds[box[1]:box[3],
                       box[0]:box[2]]
@@ -461,6 +625,12 @@ def read_hdf5_file(fname, datasetName=None, box=None, xstep=1, ystep=1, print_ms
                             int(xstep/2)::xstep]
                 data = data[:ysize, :xsize]
 
+        # 3D dataset - correction stack, composed on the fly
+        elif ds.ndim == 3 and CORRECTION_STACK_KEYS[-1] in ds.attrs:
+            data = _read_correction_stack(fname, inputDateList, box, xstep, ystep, method)
+            if any(i == 1 for i in data.shape):
+                data = np.squeeze(data)
+
         # 3D dataset
         elif ds.ndim == 3:
             # define flag matrix for index in time domain
@@ -468,16 +638,33 @@ def read_hdf5_file(fname, datasetName=None, box=None, xstep=1, ystep=1, print_ms
             if not inputDateList or inputDateList == ['']:
                 slice_flag[:] = True
             else:
-                date_list = [i.split('-', 1)[1] for i in
-                             [j for j in slice_list if j.startswith(dsFamily)]]
+                date_index = slice_index['date_index'].get(dsFamily, {})
                 for d in inputDateList:
-                    slice_flag[date_list.index(d)] = True
+                    if d not in date_index:
+                        raise ValueError(f'input date {d} not found in dataset {dsFamily} of file {fname}')
+                    slice_flag[date_index[d]] = True
 
             # read data
             num_slice = np.sum(slice_flag)
             inds = np.where(slice_flag)[0].tolist()
 
-            if xstep * ystep == 1:
+            # pixel-major index file
+            index_file = None
+            if pixel_index and xstep * ystep == 1:
+                try:
+                    index_file = update_pixel_index(fname, ds, print_msg=print_msg)
+                except OSError as e:
+                    warnings.warn(f'can not build pixel-major index, read from {fname} directly: {e}')
+
+            if index_file:
+                # read all slices of the box from the pixel-major index
+                with h5py.File(index_file, 'r') as fi:
+                    data = fi[ds.name][box[1]:box[3],
+                                       box[0]:box[2]]
+                data = np.moveaxis(data, -1, 0)
+                data = np.ascontiguousarray(data[slice_flag] if num_slice < slice_flag.size else data)
+
+            elif xstep * ystep == 1:
                 if num_slice / slice_flag.size < 0.05:
                     # single indexing if only a small fraction is read
                     data = np.zeros((num_slice, ysize, xsize), dtype=ds.dtype)
@@ -490,6 +677,23 @@ def read_hdf5_file(fname, datasetName=None, box=None, xstep=1, ystep=1, print_ms
                               box[1]:box[3],
                               box[0]:box[2]][slice_flag]
 
+            elif multilook:
+                # read and multilook block by block
+                def read_rows(r0, r1):
+                    if num_slice / slice_flag.size < 0.05:
+                        # single indexing if only a small fraction is read
+                        return np.stack([ds[ind, r0:r1, box[0]:box[2]] for ind in inds])
+                    elif num_slice == slice_flag.size:
+                        return ds[:, r0:r1, box[0]:box[2]]
+                    else:
+                        return ds[:, r0:r1, box[0]:box[2]][slice_flag]
+
+                data = _read_multilook_by_row(
+                    read_rows, box, xstep, ystep, method=method,
+                    row_size=row_size * slice_flag.size,
+                    chunk_row=chunk_row,
+                )
+
             else:
                 # sampling / nearest interplation in y/xstep
                 # use for loop to save memory
@@ -533,6 +737,16 @@ def read_hdf5_file(fname, datasetName=None, box=None, xstep=1, ystep=1, print_ms
                     sys.stdout.write('\r' + f'reading 3D cubes {i+1}/{num1}...')
                     sys.stdout.flush()
 
+                if multilook:
+                    # read and multilook block by block
+                    data[i, :, :, :] = _read_multilook_by_row(
+                        lambda r0, r1: ds[i, :, r0:r1, box[0]:box[2]],
+                        box, xstep, ystep, method=method,
+                        row_size=row_size * num2,
+                        chunk_row=chunk_row,
+                    )
+                    continue
+
                 d3 = ds[i, :,
                         box[1]:box[3],
                         box[0]:box[2]]
@@ -554,13 +768,98 @@ def read_hdf5_file(fname, datasetName=None, box=None, xstep=1, ystep=1, print_ms
     return data
 
 
-def read_binary_file(fname, datasetName=None, box=None, xstep=1, ystep=1):
+#########################################################################
+# pixel-major index of 3D HDF5 datasets, for reading the time-series of points / small boxes,
+# in size of (length, width, num_date) and chunked in (8, 8, num_date), thus, one pixel costs
+# one chunk read, instead of one chunk per date in the image-major layout.
+# It is saved in a hidden file next to the data file, and re-built if the MODIFICATION_TIME
+# attribute (or the file modification time if missing) of the source dataset changes.
+PIXEL_INDEX_CHUNK_SIZE = 8
+
+def get_pixel_index_file(fname, dsName):
+    """Get the path of the pixel-major index file of a 3D HDF5 dataset.
+
+    Parameters: fname      - str, path of the HDF5 file
+                dsName     - str, path of the 3D dataset in the HDF5 file, e.g. timeseries, /coherence
+    Returns:    index_file - str, path of the pixel-major index file, e.g. .timeseries_timeseries.pixel.h5
+    """
+    fdir, fbase = os.path.split(os.path.abspath(fname))
+    fbase = os.path.splitext(fbase)[0]
+    dsName = dsName.strip('/').replace('/', '_')
+    return os.path.join(fdir, f'.{fbase}_{dsName}.pixel.h5')
+
+
+def update_pixel_index(fname, dsName=None, max_memory=1, print_msg=True):
+    """Build the pixel-major index file of a 3D HDF5 dataset, if it is missing or outdated.
+
+    Parameters: fname      - str, path of the HDF5 file
+                dsName     - str, name of the 3D dataset, or h5py.Dataset object already opened
+                max_memory - float, max memory used while building, in GB
+    Returns:    index_file - str, path of the pixel-major index file
+    Examples:   index_file = update_pixel_index('timeseries.h5', 'timeseries')
+                index_file = update_pixel_index('inputs/ifgramStack.h5', 'coherence')
+    """
+    if not isinstance(dsName, h5py.Dataset):
+        with h5py.File(fname, 'r') as f:
+            ds = f[dsName] if dsName else f[get_hdf5_slice_index(fname)['ds_3d_list'][0]]
+            return update_pixel_index(fname, ds, max_memory=max_memory, print_msg=print_msg)
+
+    ds = dsName
+    if ds.ndim != 3:
+        raise ValueError(f'pixel-major index is for 3D dataset only, input /{ds.name} is {ds.ndim}D!')
+    if CORRECTION_STACK_KEYS[-1] in ds.attrs:
+        raise ValueError(f'pixel-major index is not supported for correction stack file: {fname}!')
+
+    index_file = get_pixel_index_file(fname, ds.name)
+    mod_time = str(ds.attrs.get('MODIFICATION_TIME', os.path.getmtime(fname)))
+
+    # check existing index file
+    if os.path.isfile(index_file):
+        try:
+            with h5py.File(index_file, 'r') as fi:
+                di = fi[ds.name]
+                if (di.attrs.get('SOURCE_MODIFICATION_TIME') == mod_time
+                        and di.shape == ds.shape[1:] + ds.shape[:1]):
+                    return index_file
+        except (OSError, KeyError):
+            pass
+
+    # build in row blocks, to a temporary file first for atomic update
+    num_slice, length, width = ds.shape
+    chunks = (min(PIXEL_INDEX_CHUNK_SIZE, length), min(PIXEL_INDEX_CHUNK_SIZE, width), num_slice)
+    row_size = num_slice * width * ds.dtype.itemsize * 2
+    num_row = max(int(max_memory * 1024**3 / row_size) // chunks[0], 1) * chunks[0]
+    if print_msg:
+        print(f'build pixel-major index of /{ds.name.strip("/")} in file {fname} --> {index_file}')
+
+    tmp_file = f'{index_file}.{os.getpid()}.tmp'
+    try:
+        with h5py.File(tmp_file, 'w') as fi:
+            di = fi.create_dataset(ds.name,
+                                   shape=(length, width, num_slice),
+                                   dtype=ds.dtype,
+                                   chunks=chunks)
+            for r0 in range(0, length, num_row):
+                r1 = min(r0 + num_row, length)
+                di[r0:r1] = np.moveaxis(ds[:, r0:r1, :], 0, -1)
+            di.attrs['SOURCE_FILE'] = os.path.abspath(fname)
+            di.attrs['SOURCE_MODIFICATION_TIME'] = mod_time
+        os.replace(tmp_file, index_file)
+    finally:
+        if os.path.isfile(tmp_file):
+            os.remove(tmp_file)
+
+    return index_file
+
+
+def read_binary_file(fname, datasetName=None, box=None, xstep=1, ystep=1, method='nearest'):
     """Read data from binary file, such as .unw, .cor, etc.
     Parameters: fname       : str, path/name of binary file
                 datasetName : str, dataset name for file with multiple bands of data
                     e.g.: incidenceAngle, azimuthAngle, rangeCoord, azimuthCoord, ...
                 box         : 4-tuple of int area to read, defined in (x0, y0, x1, y1) in pixel coordinate
                 x/ystep     : int, number of pixels to pick/multilook for each output pixel
+                method      : str, multilook method for x/ystep > 1, nearest, mean or median
     Returns:    data        : 2D array in size of (length, width) in BYTE / int16 / float32 / complex64 / float64 etc.
                 atr         : dict, metadata of binary file
     """
@@ -731,6 +1030,7 @@ def read_binary_file(fname, datasetName=None, box=None, xstep=1, ystep=1):
         cpx_band=cpx_band,
         xstep=xstep,
         ystep=ystep,
+        method=method,
     )
     if processor in ['gdal', 'gmtsar', 'hyp3', 'cosicorr']:
         data = read_gdal(fname, **kwargs)
@@ -976,10 +1276,81 @@ def get_hdf5_compression(fname):
     compression = None
     ds_name = get_dataset_list(fname)[0]
     with h5py.File(fname, 'r') as f:
-        compression = f[ds_name].compression
+        compression = get_hdf5_dataset_compression(f[ds_name])
+    return compression
+
+
+def get_hdf5_dataset_compression(ds):
+    """Get the compression type of an HDF5 dataset, including the plugin filters.
+
+    Parameters: ds          - h5py.Dataset object
+    Returns:    compression - str, e.g. lzf, gzip, zstd, blosc2, or None for no compression,
+                              unknown for un-recognized plugin filters
+    """
+    compression = ds.compression
+    if compression == 'unknown':
+        # h5py does not recognize the plugin filters, check their filter IDs
+        dcpl = ds.id.get_create_plist()
+        for i in range(dcpl.get_nfilters()):
+            filter_id = dcpl.get_filter(i)[0]
+            if filter_id in HDF5_PLUGIN_FILTERS.keys():
+                compression = HDF5_PLUGIN_FILTERS[filter_id]
+                break
     return compression
 
 
+def get_hdf5_chunk_shape(fname, datasetName=None):
+    """Get the 2D chunk shape in (row, column) shared by the datasets of input HDF5 file.
+
+    Parameters: fname       - str, path to the HDF5 file
+                datasetName - str / list(str), dataset(s) of interest, all 2D/3D datasets by default
+    Returns:    chunk_shape - tuple(int) of size 2, the least common multiple of the chunk sizes
+                              of all chunked datasets in the last two (row, column) dimensions,
+                              None for non-HDF5 file or contiguous datasets
+    """
+    ext = os.path.splitext(fname)[1].lower()
+    if ext not in ['.h5','.he5']:
+        return None
+
+    if isinstance(datasetName, str):
+        datasetName = [datasetName]
+
+    chunk_shapes = []
+    with h5py.File(fname, 'r') as f:
+        def append_chunk_shape(name, obj):
+            if (isinstance(obj, h5py.Dataset) and obj.ndim >= 2 and obj.chunks
+                    and (not datasetName or name in datasetName)):
+                chunk_shapes.append(obj.chunks[-2:])
+        f.visititems(append_chunk_shape)
+
+    if not chunk_shapes:
+        return None
+    return tuple(int(x) for x in np.lcm.reduce(np.array(chunk_shapes), axis=0))
+
+
+def get_hdf5_chunk_layout(fname, datasetName):
+    """Get the chunk layout of a 3D dataset in input HDF5 file.
+
+    Parameters: fname       - str, path to the HDF5 file
+                datasetName - str, 3D dataset name
+    Returns:    layout      - str, time-major, image-major or auto, as in writefile.CHUNK_LAYOUTS
+    """
+    ext = os.path.splitext(fname)[1].lower()
+    if ext not in ['.h5','.he5']:
+        return 'auto'
+
+    with h5py.File(fname, 'r') as f:
+        if datasetName not in f.keys() or f[datasetName].ndim != 3 or not f[datasetName].chunks:
+            return 'auto'
+        num_epoch, chunk_epoch = f[datasetName].shape[0], f[datasetName].chunks[0]
+
+    if num_epoch > 1 and chunk_epoch == num_epoch:
+        return 'time-major'
+    elif num_epoch > 1 and chunk_epoch == 1:
+        return 'image-major'
+    return 'auto'
+
+
 def get_no_data_value(fname):
     """Grab the NO_DATA_VALUE of the input file.
 
@@ -1019,6 +1390,96 @@ def _get_file_base_and_ext(fname):
 
 
 #########################################################################
+# process-level cache of read_attribute() and the HDF5 slice index, keyed by the real path,
+# the modification time and size of the data file and its metadata files.
+# Files modified in the last ATTR_CACHE_MIN_AGE seconds are not cached, as further changes
+# within the resolution of the file system timestamp would not change the key.
+# Set ATTR_CACHE_SIZE = 0 to disable it.
+ATTR_CACHE_SIZE = 256
+ATTR_CACHE_MIN_AGE = 2
+_ATTR_CACHE = OrderedDict()
+_ATTR_CACHE_LOCK = threading.Lock()
+
+
+def _get_metafile_list(fname):
+    """Get the list of potential metadata files of a binary data file."""
+    return [
+        fname + '.rsc',
+        fname + '.xml',
+        fname + '.par',
+        fname + '.hdr',                        # created with SUFFIX=ADD     in gdal envi driver
+        os.path.splitext(fname)[0] + '.hdr',   # created with SUFFIX=REPLACE in gdal envi driver
+        fname + '.vrt',
+        fname + '.aux.xml',
+    ]
+
+
+def _get_file_cache_key(fname, *args):
+    """Get the key of the metadata cache for the given file.
+
+    Parameters: fname - str, path of the existing data file
+                args  - hashable, other info of the cached item, e.g. datasetName
+    Returns:    key   - tuple, (realpath, file_stat_list, args)
+    """
+    fname = os.path.realpath(fname)
+    file_list = [fname]
+    if os.path.splitext(fname)[1].lower() not in ['.h5', '.he5']:
+        file_list += _get_metafile_list(fname)
+
+    stat_list = []
+    for fpath in file_list:
+        try:
+            fstat = os.stat(fpath)
+        except OSError:
+            continue
+        stat_list.append((fpath, fstat.st_mtime_ns, fstat.st_size))
+    return (fname, tuple(stat_list), args)
+
+
+def _get_cache_item(key):
+    """Get the cached item of the given key, None if not cached."""
+    with _ATTR_CACHE_LOCK:
+        value = _ATTR_CACHE.get(key, None)
+        if value is not None:
+            _ATTR_CACHE.move_to_end(key)
+    return value
+
+
+def _set_cache_item(key, value):
+    """Add the item to the cache, unless the file is modified too recently."""
+    mtime = max(i[1] for i in key[1])
+    if time.time_ns() - mtime < ATTR_CACHE_MIN_AGE * 1e9:
+        return
+
+    with _ATTR_CACHE_LOCK:
+        # drop entries of older versions of the same file
+        for k in [k for k in _ATTR_CACHE.keys() if k[0] == key[0] and k[1] != key[1]]:
+            _ATTR_CACHE.pop(k)
+        _ATTR_CACHE[key] = value
+        while len(_ATTR_CACHE) > ATTR_CACHE_SIZE:
+            _ATTR_CACHE.popitem(last=False)
+
+
+def clear_attribute_cache(fname=None):
+    """Remove the cached attributes and slice index of the given file, or of all files.
+
+    Parameters: fname - str, path of the data / metadata file, None for all files.
+    """
+    with _ATTR_CACHE_LOCK:
+        if fname is None:
+            _ATTR_CACHE.clear()
+            return
+
+        # a metadata file, e.g. *.rsc, invalidates its data file
+        fpath = os.path.realpath(os.fspath(fname))
+        fpaths = [fpath]
+        for suffix in ['.rsc', '.xml', '.par', '.hdr', '.vrt', '.aux.xml']:
+            if fpath.endswith(suffix):
+                fpaths.append(fpath[:-len(suffix)])
+        for key in [k for k in _ATTR_CACHE.keys() if k[0] in fpaths]:
+            _ATTR_CACHE.pop(key)
+
+
 def read_attribute(fname, datasetName=None, metafile_ext=None):
     """Read attributes of input file into a dictionary
     Parameters: fname : str, path/name of data file
@@ -1031,14 +1492,34 @@ def read_attribute(fname, datasetName=None, metafile_ext=None):
     Returns:    atr : dict, attributes dictionary
     """
     fname = os.fspath(fname)  # Convert from possible pathlib.Path
-    fdir = os.path.dirname(fname)
-    fbase, fext = os.path.splitext(os.path.basename(fname))
-    fext = fext.lower()
     if not os.path.isfile(fname):
         msg = f'input file does not exist: {fname}\n'
         msg += 'current directory: '+os.getcwd()
         raise FileNotFoundError(msg)
 
+    if ATTR_CACHE_SIZE <= 0:
+        return _read_attribute(fname, datasetName, metafile_ext)
+
+    key = _get_file_cache_key(fname, 'attribute', datasetName, metafile_ext)
+    atr = _get_cache_item(key)
+    if atr is None:
+        atr = _read_attribute(fname, datasetName, metafile_ext)
+        _set_cache_item(key, atr)
+
+    # return a copy as callers modify the dict in place
+    atr = copy.deepcopy(atr)
+    atr['FILE_PATH'] = os.path.abspath(fname)
+    return atr
+
+
+def _read_attribute(fname, datasetName=None, metafile_ext=None):
+    """Read attributes of input file into a dictionary, without cache.
+    Check read_attribute() for the parameters.
+    """
+    fdir = os.path.dirname(fname)
+    fbase, fext = os.path.splitext(os.path.basename(fname))
+    fext = fext.lower()
+
     # HDF5 files
     if fext in ['.h5', '.he5']:
         if datasetName:
@@ -1224,16 +1705,7 @@ def read_attribute(fname, datasetName=None, metafile_ext=None):
         # grab all existed potential metadata file given the data file in preferred order/priority
         # .aux.xml file does not have geo-coordinates info
         # .vrt file (e.g. incLocal.rdr.vrt from isce) does not have band interleavee info
-        metafiles = [
-            fname + '.rsc',
-            fname + '.xml',
-            fname + '.par',
-            fname + '.hdr',                        # created with SUFFIX=ADD     in gdal envi driver
-            os.path.splitext(fname)[0] + '.hdr',   # created with SUFFIX=REPLACE in gdal envi driver
-            fname + '.vrt',
-            fname + '.aux.xml',
-        ]
-        metafiles = [i for i in metafiles if os.path.isfile(i)]
+        metafiles = [i for i in _get_metafile_list(fname) if os.path.isfile(i)]
 
         # use metadata files with the specified extension if requested
         if metafile_ext:
@@ -1952,8 +2424,8 @@ def read_snap_dim(fname):
 #########################################################################
 def read_binary(fname, shape, box=None, data_type='float32', byte_order='l',
                 num_band=1, interleave='BIL', band=1, cpx_band='phase',
-                xstep=1, ystep=1):
-    """Read binary file using np.fromfile.
+                xstep=1, ystep=1, method='nearest'):
+    """Read binary file using np.memmap, with only the requested pixels read from disk.
 
     Parameters: fname : str, path/name of data file to read
                 shape : tuple of 2 int in (length, width)
@@ -1974,6 +2446,7 @@ def read_binary(fname, shape, box=None, data_type='float32', byte_order='l',
                     mag, magnitude
                     cpx
                 x/ystep  : int, number of pixels to pick/multilook for each output pixel
+                method   : str, multilook method for x/ystep > 1, nearest, mean or median
     Returns:    data     : 2D np.array
     Examples:   # ISCE files
                 atr = read_attribute(fname)
@@ -1983,15 +2456,24 @@ def read_binary(fname, shape, box=None, data_type='float32', byte_order='l',
                 data = read_binary('filt_fine.int', shape, data_type='complex64', cpx_band='phase')
                 data = read_binary('burst_01.slc', shape, data_type='complex64', cpx_band='mag')
                 data = read_binary('los.rdr', shape, num_band=2, band=1)
+                data = read_binary('filt_fine.cor', shape, xstep=3, ystep=9, method='mean')
     """
     length, width = shape
     if not box:
         box = (0, 0, width, length)
 
+    # output size if x/ystep > 1
+    xsize = int((box[2] - box[0]) / xstep)
+    ysize = int((box[3] - box[1]) / ystep)
+
     # read data
     if data_type == 'complex32':
         # for numpy un-supported data type: complex32
         data = read_complex_int16(fname, box=box, byte_order=byte_order, cpx_band='complex')[0]
+        data = _get_complex_band(data, cpx_band)
+        if xstep * ystep > 1:
+            data = multilook_data(data, lks_y=ystep, lks_x=xstep, method=method)
+            data = data[:ysize, :xsize]
 
     else:
         # for numpy supported data type
@@ -2003,69 +2485,80 @@ def read_binary(fname, shape, box=None, data_type='float32', byte_order='l',
                 digit = int(int(digit) / 8)
             data_type = f'>{letter}{digit}'
 
+        # map the file into memory, with the rows up to the end of the box only,
+        # then data is read from disk while slicing the box and x/ystep
         interleave = interleave.upper()
         if interleave == 'BIL':
-            count = box[3] * width * num_band
-            data = np.fromfile(fname, dtype=data_type, count=count).reshape(-1, width*num_band)
-            c0 = width * (band - 1) + box[0]
-            c1 = width * (band - 1) + box[2]
-            data = data[box[1]:box[3], c0:c1]
+            mm = np.memmap(fname, dtype=data_type, mode='r', shape=(box[3], num_band, width))
+            mm = mm[box[1]:box[3], band-1, box[0]:box[2]]
 
         elif interleave == 'BIP':
-            count = box[3] * width * num_band
-            data = np.fromfile(fname, dtype=data_type, count=count).reshape(-1, width*num_band)
-            inds = np.arange(box[0], box[2]) * num_band + band - 1
-            data = data[box[1]:box[3], inds]
+            mm = np.memmap(fname, dtype=data_type, mode='r', shape=(box[3], width, num_band))
+            mm = mm[box[1]:box[3], box[0]:box[2], band-1]
 
         elif interleave == 'BSQ':
-            count = (box[3] + length * (band - 1)) * width
-            data = np.fromfile(fname, dtype=data_type, count=count).reshape(-1, width)
-            r0 = length * (band - 1) + box[1]
-            r1 = length * (band - 1) + box[3]
-            data = data[r0:r1, box[0]:box[2]]
+            offset = length * width * (band - 1) * np.dtype(data_type).itemsize
+            mm = np.memmap(fname, dtype=data_type, mode='r', shape=(box[3], width), offset=offset)
+            mm = mm[box[1]:box[3], box[0]:box[2]]
 
         else:
             raise ValueError('unrecognized band interleaving:', interleave)
 
-    # adjust output band for complex data
-    if data_type.replace('>', '').startswith('c'):
-        if cpx_band.startswith('real'):
-            data = data.real
-        elif cpx_band.startswith('imag'):
-            data = data.imag
-
-        elif cpx_band.startswith('pha'):
-            data = np.angle(data)
+        if xstep * ystep == 1:
+            data = _get_complex_band(np.array(mm), cpx_band)
 
-            # set ~pi value to 0, as sometimes shown in gamma products
-            boundary_values = [-3.1415927, 3.1415927]
-            for boundary_value in boundary_values:
-                if np.sum(data == boundary_value) > 100:
-                    print(f'~pi boundary value ({boundary_value}) detected, convert to zero')
-                    data[data == boundary_value] = 0
+        elif method == 'nearest':
+            # read the sampled pixels only
+            mm = mm[int(ystep/2)::ystep,
+                    int(xstep/2)::xstep]
+            data = _get_complex_band(np.array(mm[:ysize, :xsize]), cpx_band)
 
-        elif cpx_band.startswith(('mag', 'amp')):
-            data = np.absolute(data)
-        elif cpx_band.startswith(('cpx', 'complex')):
-            pass
         else:
-            raise ValueError('unrecognized complex band:', cpx_band)
+            # multilook block by block in rows
+            data = _read_multilook_by_row(
+                lambda r0, r1: _get_complex_band(np.array(mm[r0-box[1]:r1-box[1], :]), cpx_band),
+                box, xstep, ystep, method=method,
+                row_size=(box[2] - box[0]) * mm.dtype.itemsize,
+            )
+        del mm
 
-    # skipping/multilooking
-    if xstep * ystep > 1:
-        # output size if x/ystep > 1
-        xsize = int((box[2] - box[0]) / xstep)
-        ysize = int((box[3] - box[1]) / ystep)
+    return data
 
-        # sampling
-        data = data[int(ystep/2)::ystep,
-                    int(xstep/2)::xstep]
-        data = data[:ysize, :xsize]
 
+def _get_complex_band(data, cpx_band='phase'):
+    """Get the band of interest from complex data, e.g. phase, magnitude, etc.
+    Parameters: data     : np.ndarray, data in real or complex
+                cpx_band : str, real, imag, phase, mag or cpx
+    Returns:    data     : np.ndarray, data of the band of interest, same as input for real data
+    """
+    if not np.iscomplexobj(data):
+        return data
+
+    if cpx_band.startswith('real'):
+        data = data.real
+    elif cpx_band.startswith('imag'):
+        data = data.imag
+    elif cpx_band.startswith('pha'):
+        data = np.angle(data)
+
+        # set ~pi value to 0, as sometimes shown in gamma products
+        # in full resolution, i.e. before multilooking
+        boundary_values = [-3.1415927, 3.1415927]
+        for boundary_value in boundary_values:
+            if np.sum(data == boundary_value) > 100:
+                print(f'~pi boundary value ({boundary_value}) detected, convert to zero')
+                data[data == boundary_value] = 0
+
+    elif cpx_band.startswith(('mag', 'amp')):
+        data = np.absolute(data)
+    elif cpx_band.startswith(('cpx', 'complex')):
+        pass
+    else:
+        raise ValueError('unrecognized complex band:', cpx_band)
     return data
 
 
-def read_gdal(fname, box=None, band=1, cpx_band='phase', xstep=1, ystep=1):
+def read_gdal(fname, box=None, band=1, cpx_band='phase', xstep=1, ystep=1, method='nearest'):
     """Read binary data file using gdal.
 
     Parameters: fname    : str, path/name of data file to read
@@ -2073,6 +2566,7 @@ def read_gdal(fname, box=None, band=1, cpx_band='phase', xstep=1, ystep=1):
                 band     : int, band of interest, between 1 and num_band.
                 cpx_band : str, e.g.: real, imag, phase, mag, cpx
                 x/ystep  : int, number of pixels to pick/multilook for each output pixel
+                method   : str, multilook method for x/ystep > 1, nearest, mean or median
     Returns:    data     : 2D np.array
     """
     try:
@@ -2118,9 +2612,12 @@ def read_gdal(fname, box=None, band=1, cpx_band='phase', xstep=1, ystep=1):
         xsize = int((box[2] - box[0]) / xstep)
         ysize = int((box[3] - box[1]) / ystep)
 
-        # sampling
-        data = data[int(ystep/2)::ystep,
-                    int(xstep/2)::xstep]
+        if method == 'nearest':
+            # sampling
+            data = data[int(ystep/2)::ystep,
+                        int(xstep/2)::xstep]
+        else:
+            data = multilook_data(data, lks_y=ystep, lks_x=xstep, method=method)
         data = data[:ysize, :xsize]
 
     return data
@@ -72,6 +72,150 @@ def estimate_time_func(model, date_list, dis_ts, ref_date=None, seconds=0):
     return G, m, e2
 
 
+def estimate_time_func_bootstrap(G, dis_ts, bootstrap_count=400, seed=None, num_worker=1,
+                                 full_cov=False, max_memory=1, print_msg=True):
+    """Estimate the time function parameters and their uncertainty via bootstrap resampling.
+
+    The dates are resampled with replacement, which is equivalent to the weighted least squares with
+    the weight of each date being the number of times it is drawn. The resampled systems are solved in
+    batches from the same full design matrix, and the iterations are split across processes.
+    Only the running mean / (co)variance of the parameters are kept, instead of all the samples.
+
+    Each iteration draws its dates from its own random stream spawned from np.random.SeedSequence(seed),
+    thus, the result with the same seed is reproducible, regardless of the number of workers or batches.
+
+    Parameters: G               - 2D np.ndarray in size of (num_date, num_param), design matrix
+                dis_ts          - 2D np.ndarray in size of (num_date, num_pixel), displacement observation
+                bootstrap_count - int, number of bootstrap resampling
+                seed            - int, seed of the random streams, None for a random one
+                num_worker      - int, number of processes to run the iterations
+                full_cov        - bool, return the full covariance matrix of the parameters
+                max_memory      - float, max memory to use in GB for the samples of each batch
+    Returns:    m               - 2D np.ndarray in size of (num_param, num_pixel), mean of the samples
+                m_std           - 2D np.ndarray in size of (num_param, num_pixel), STD  of the samples
+                m_cov           - 3D np.ndarray in size of (num_param, num_param, num_pixel), or None
+    """
+    num_worker = max(min(int(num_worker), bootstrap_count), 1)
+    seed_list = np.random.SeedSequence(seed).spawn(bootstrap_count)
+    kwargs = dict(G=G, full_cov=full_cov, max_memory=max_memory/num_worker)
+
+    if num_worker == 1:
+        stats = _bootstrap_time_func_batch(dis_ts=dis_ts, seed_list=seed_list, **kwargs)
+
+    else:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import shared_memory
+
+        if print_msg:
+            print(f'split {bootstrap_count} iterations into {num_worker} processes')
+
+        # share the observation with the worker processes, instead of pickling it to each of them
+        shm = shared_memory.SharedMemory(create=True, size=max(dis_ts.nbytes, 1))
+        try:
+            np.ndarray(dis_ts.shape, dtype=dis_ts.dtype, buffer=shm.buf)[:] = dis_ts
+            shm_spec = (shm.name, dis_ts.shape, dis_ts.dtype)
+            # forkserver: not to inherit the HDF5 files opened by the other threads, e.g. in BoxPipeline
+            # spawn: on Windows without forkserver
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            mp_context = multiprocessing.get_context(start_method)
+            with ProcessPoolExecutor(max_workers=num_worker, mp_context=mp_context) as executor:
+                futures = [executor.submit(_bootstrap_time_func_worker, shm_spec=shm_spec,
+                                           seed_list=list(x), **kwargs)
+                           for x in np.array_split(np.array(seed_list, dtype=object), num_worker)]
+                # merge in the order of submission, for a reproducible result
+                stats = None
+                for future in futures:
+                    stats = _merge_bootstrap_stats(stats, future.result())
+        finally:
+            shm.close()
+            shm.unlink()
+
+    num, m, m2, c2 = stats
+    m_std = np.sqrt(m2 / num)
+    m_cov = c2 / num if full_cov else None
+    return m, m_std, m_cov
+
+
+def _bootstrap_time_func_worker(G, shm_spec, seed_list, full_cov=False, max_memory=1):
+    """Run _bootstrap_time_func_batch() on the observation in the shared memory."""
+    from multiprocessing import shared_memory
+
+    shm_name, shape, dtype = shm_spec
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        dis_ts = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        stats = _bootstrap_time_func_batch(G, dis_ts, seed_list, full_cov=full_cov, max_memory=max_memory)
+        del dis_ts
+    finally:
+        shm.close()
+    return stats
+
+
+def _bootstrap_time_func_batch(G, dis_ts, seed_list, full_cov=False, max_memory=1):
+    """Solve the bootstrap iterations of seed_list in batches, and return the running statistics.
+
+    Parameters: G         - 2D np.ndarray in size of (num_date, num_param), design matrix
+                dis_ts    - 2D np.ndarray in size of (num_date, num_pixel), displacement observation
+                seed_list - list of np.random.SeedSequence, one for each iteration
+    Returns:    stats     - tuple of (num, mean, m2, c2), number of samples, their mean,
+                            sum of squared deviations, and sum of the deviation outer products (or None)
+    """
+    num_date, num_param = G.shape
+    num_pixel = dis_ts.shape[1]
+    dtype = dis_ts.dtype if dis_ts.dtype in [np.float32, np.float64] else np.float64
+
+    # number of iterations per batch, for the samples in float32/64 and their deviations in float64
+    iter_size = num_param * num_pixel * (np.dtype(dtype).itemsize + 8)
+    batch_size = max(min(int(max_memory * 1024**3 / iter_size), len(seed_list)), 1)
+
+    stats = None
+    for i0 in range(0, len(seed_list), batch_size):
+        seeds = seed_list[i0:i0+batch_size]
+        num_iter = len(seeds)
+
+        # resample with replacement, as weights of the dates
+        w = np.zeros((num_iter, num_date), dtype=np.float64)
+        for i, seed in enumerate(seeds):
+            boot_ind = np.random.default_rng(seed).choice(num_date, size=num_date, replace=True)
+            w[i] = np.bincount(boot_ind, minlength=num_date)
+
+        # solve: m = (sqrt(W) * G)+ * sqrt(W) * d, for all iterations at once
+        sw = np.sqrt(w)
+        Gplus = np.linalg.pinv(sw[:, :, np.newaxis] * G[np.newaxis, :, :]) * sw[:, np.newaxis, :]
+        m_boot = np.dot(Gplus.reshape(-1, num_date).astype(dtype), dis_ts)
+        m_boot = m_boot.reshape(num_iter, num_param, num_pixel)
+
+        # statistics of the batch
+        m = m_boot.mean(axis=0, dtype=np.float64)
+        m_dev = m_boot - m
+        del m_boot
+        m2 = np.einsum('kpn,kpn->pn', m_dev, m_dev)
+        c2 = np.einsum('kpn,kqn->pqn', m_dev, m_dev) if full_cov else None
+        del m_dev
+
+        stats = _merge_bootstrap_stats(stats, (num_iter, m, m2, c2))
+
+    return stats
+
+
+def _merge_bootstrap_stats(stats_a, stats_b):
+    """Merge the running statistics of two sets of samples (Chan et al., 1979)."""
+    if stats_a is None:
+        return stats_b
+
+    num_a, m_a, m2_a, c2_a = stats_a
+    num_b, m_b, m2_b, c2_b = stats_b
+    num = num_a + num_b
+    delta = m_b - m_a
+    m = m_a + delta * (num_b / num)
+    m2 = m2_a + m2_b + delta**2 * (num_a * num_b / num)
+    c2 = None
+    if c2_a is not None:
+        c2 = c2_a + c2_b + np.einsum('pn,qn->pqn', delta, delta) * (num_a * num_b / num)
+    return num, m, m2, c2
+
+
 def inps2model(inps, date_list=None, print_msg=True):
     """Convert time function inputs from namespace (inps) into dict object.
 
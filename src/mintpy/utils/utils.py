@@ -154,7 +154,8 @@ def check_loaded_dataset(work_dir='./', print_msg=True, relpath=False):
 
 #################################################################################
 def read_timeseries_lalo(lat, lon, ts_file, lookup_file=None, ref_lat=None, ref_lon=None,
-                         zero_first=True, win_size=1, unit='m', method='mean', print_msg=True):
+                         zero_first=True, win_size=1, unit='m', method='mean', pixel_index=False,
+                         print_msg=True):
     """ Read time-series of one pixel with input lat/lon
     Parameters: lat/lon     - float, latitude/longitude
                 ts_file     - string, filename of time-series HDF5 file
@@ -164,6 +165,7 @@ def read_timeseries_lalo(lat, lon, ts_file, lookup_file=None, ref_lat=None, ref_
                 win_size    - int, windows size centered at point of interest
                 unit        - str, output displacement unit
                 method      - str, method to calculate the output displacement and its dispersity
+                pixel_index - bool, read from the pixel-major index file, for many queries on big files
     Returns:    dates       - 1D np.ndarray of datetime.datetime objects, i.e. datetime.datetime(2010, 10, 20, 0, 0)
                 dis         - 1D np.ndarray of float32, displacement
                 dis_std     - 1D np.ndarray of float32, displacement dispersity
@@ -188,12 +190,13 @@ def read_timeseries_lalo(lat, lon, ts_file, lookup_file=None, ref_lat=None, ref_
                                              win_size=win_size,
                                              unit=unit,
                                              method=method,
+                                             pixel_index=pixel_index,
                                              print_msg=False)
     return dates, dis, dis_std
 
 
 def read_timeseries_yx(y, x, ts_file, ref_y=None, ref_x=None, zero_first=True,
-                       win_size=1, unit='m', method='mean', print_msg=True):
+                       win_size=1, unit='m', method='mean', pixel_index=False, print_msg=True):
     """ Read time-series of one pixel with input y/x
     Parameters: y/x        - int, row/column number of interest
                 ts_file    - string, filename of time-series HDF5 file
@@ -202,6 +205,7 @@ def read_timeseries_yx(y, x, ts_file, ref_y=None, ref_x=None, zero_first=True,
                 win_size   - int, windows size centered at point of interest
                 unit       - str, output displacement unit
                 method     - str, method to calculate the output displacement and its dispersity
+                pixel_index - bool, read from the pixel-major index file, for many queries on big files
     Returns:    dates      - 1D np.ndarray of datetime.datetime objects, i.e. datetime.datetime(2010, 10, 20, 0, 0)
                 dis        - 1D np.ndarray of float32, displacement
                 dis_std    - 1D np.ndarray of float32, displacement dispersity
@@ -216,13 +220,13 @@ def read_timeseries_yx(y, x, ts_file, ref_y=None, ref_x=None, zero_first=True,
     if print_msg:
         print(f'input y / x: {y} / {x}')
     box = (x, y, x+1, y+1)
-    dis = readfile.read(ts_file, box=box)[0]
+    dis = readfile.read(ts_file, box=box, pixel_index=pixel_index)[0]
     dis_std = None
 
     if win_size != 1:
         buf = int(win_size / 2)
         box_win = (x-buf, y-buf, x+buf+1, y+buf+1)
-        dis_win = readfile.read(ts_file, box=box_win)[0].reshape(obj.numDate, -1)
+        dis_win = readfile.read(ts_file, box=box_win, pixel_index=pixel_index)[0].reshape(obj.numDate, -1)
 
         if method == 'mean':
             dis = np.nanmean(dis_win, axis=1)
@@ -238,7 +242,7 @@ def read_timeseries_yx(y, x, ts_file, ref_y=None, ref_x=None, zero_first=True,
     # reference pixel
     if ref_y is not None:
         ref_box = (ref_x, ref_y, ref_x+1, ref_y+1)
-        dis -= readfile.read(ts_file, box=ref_box)[0]
+        dis -= readfile.read(ts_file, box=ref_box, pixel_index=pixel_index)[0]
 
     #start at zero
     if zero_first:
@@ -18,7 +18,14 @@ import h5py
 import numpy as np
 
 import mintpy
-from mintpy.objects import GEOMETRY_DSET_NAMES, deramp, ifgramStack, timeseries
+from mintpy.objects import (
+    GEOMETRY_DSET_NAMES,
+    RampEstimator,
+    cluster,
+    deramp,
+    ifgramStack,
+    timeseries,
+)
 from mintpy.utils import ptime, readfile, writefile
 from mintpy.utils.utils0 import *
 
@@ -95,7 +102,92 @@ def get_residual_std(timeseries_resid_file, mask_file='maskTempCoh.h5', ramp_typ
     return std_list, date_list, std_file
 
 
-def get_residual_rms(timeseries_resid_file, mask_file='maskTempCoh.h5', ramp_type='quadratic'):
+def calc_timeseries_rms(ts_file, mask_file=None, ramp_type=None, out_file=None, max_memory=4):
+    """Calculate the Root Mean Square in space for each acquisition of the (deramped) time-series,
+    and save it to a text file, as timeseries.timeseries_rms() on the output of run_deramp().
+
+    The time-series is read box by box, without writing the deramped time-series to disk:
+    the ramps are estimated from the normal equations accumulated in the 1st read, then removed
+    while accumulating the sum of squares for each acquisition in the 2nd read.
+
+    Parameters: ts_file    - str, path of the time-series file
+                mask_file  - str, path of the mask file for ramp estimation and RMS calculation
+                ramp_type  - str, ramp type to be removed, None / no for do not remove ramp
+                out_file   - str, output text file, default: rms_{fbase}.txt in the same directory
+                max_memory - float, max memory to use in GB
+    Returns:    out_file   - str, output text file
+    """
+    ts_obj = timeseries(ts_file)
+    ts_obj.open(print_msg=False)
+    num_date, length, width = ts_obj.numDate, ts_obj.length, ts_obj.width
+
+    # mask
+    mask = None
+    if mask_file and os.path.isfile(mask_file):
+        print('read mask from file: '+mask_file)
+        mask = readfile.read(mask_file)[0]
+
+    # split into boxes aligned with the chunks
+    max_num_pixel = int(max_memory / cluster.BoxPipeline.num_box_in_memory * 1024**3 / (num_date * 4 * 2))
+    box_list, num_box = cluster.split_box2tiles(
+        box=(0, 0, width, length),
+        max_num_pixel=max_num_pixel,
+        chunk_shape=readfile.get_hdf5_chunk_shape(ts_file, 'timeseries'),
+    )
+    read_kwargs = dict(squeeze=False, print_msg=False)
+
+    def get_box_mask(box):
+        if mask is None:
+            return None
+        return mask[box[1]:box[3], box[0]:box[2]]
+
+    # 1st read: estimate the ramps
+    estimator = None
+    if ramp_type and ramp_type != 'no':
+        print(f'estimating {ramp_type} phase ramp of each acquisition from file: {ts_file}')
+        estimator = RampEstimator(ramp_type, num_date, length, width, metadata=ts_obj.metadata)
+        with cluster.BoxPipeline(box_list, ts_obj.read, read_kwargs) as pipe:
+            for i, box, data in pipe:
+                estimator.accumulate(data, box, mask=get_box_mask(box))
+        estimator.solve()
+
+    # 2nd read: sum of squares of the (deramped) data within the mask
+    print(f'calculating residual RMS for each epoch from file: {ts_file}')
+    sum_sq = np.zeros(num_date, dtype=np.float64)
+    num_pixel = np.zeros(num_date, dtype=np.int64)
+    prog_bar = ptime.progressBar(maxValue=num_box)
+    with cluster.BoxPipeline(box_list, ts_obj.read, read_kwargs) as pipe:
+        for i, box, data in pipe:
+            if estimator is not None:
+                data = estimator.deramp(data, box)[0]
+            if mask is not None:
+                data[:, get_box_mask(box) == 0] = np.nan
+            sum_sq += np.nansum(np.square(data, dtype=np.float64), axis=(1, 2))
+            num_pixel += np.sum(~np.isnan(data), axis=(1, 2))
+            prog_bar.update(i+1, suffix=f'{i+1}/{num_box}')
+    prog_bar.close()
+
+    rms = np.zeros(num_date) * np.nan
+    flag = num_pixel > 0
+    rms[flag] = np.sqrt(sum_sq[flag] / num_pixel[flag])
+
+    # write text file
+    header = 'Root Mean Square in space for each acquisition of time-series\n'
+    header += f'Timeseries file: {ts_file}\n'
+    if estimator is not None:
+        header += f'Ramp type: {ramp_type}\n'
+    header += f'Mask file: {mask_file}\n'
+    header += 'Date\t\tRMS (m)'
+    if not out_file:
+        out_file = os.path.join(os.path.dirname(os.path.abspath(ts_file)),
+                                f'rms_{os.path.splitext(os.path.basename(ts_file))[0]}.txt')
+    np.savetxt(out_file, np.hstack((np.array(ts_obj.dateList).reshape(-1, 1), rms.reshape(-1, 1))),
+               fmt='%s', delimiter='\t', header=header)
+    print(f'save timeseries RMS to text file: {out_file}')
+    return out_file
+
+
+def get_residual_rms(timeseries_resid_file, mask_file='maskTempCoh.h5', ramp_type='quadratic', max_memory=4):
     """Calculate deramped Root Mean Square in space for each epoch of input timeseries file.
     Parameters: timeseries_resid_file : string,
                     timeseries HDF5 file, e.g. timeseries_ERA5_demErrInvResid.h5
@@ -103,6 +195,7 @@ def get_residual_rms(timeseries_resid_file, mask_file='maskTempCoh.h5', ramp_typ
                     mask file, e.g. maskTempCoh.h5
                 ramp_type : string,
                     ramp type, e.g. linear, quadratic, no for do not remove ramp
+                max_memory : float, max memory to use in GB
     Returns:    rms_list : list of float,
                     Root Mean Square of deramped input timeseries file
                 date_list : list of string in YYYYMMDD format,
@@ -112,37 +205,30 @@ def get_residual_rms(timeseries_resid_file, mask_file='maskTempCoh.h5', ramp_typ
         import mintpy.utils.utils as ut
         rms_list, date_list = ut.get_residual_rms('timeseriesResidual.h5', 'maskTempCoh.h5')
     """
-    # Intermediate files name
+    # RMS text file name, with the suffix of the ramp type
     # ramp_type can sometimes be False, thus, should be treated the same as "no"
+    fbase = os.path.splitext(os.path.basename(timeseries_resid_file))[0]
     if not ramp_type or ramp_type == 'no':
         print('No ramp removal')
-        deramped_file = timeseries_resid_file
     else:
-        deramped_file = f'{os.path.splitext(timeseries_resid_file)[0]}_ramp.h5'
-    fdir = os.path.dirname(os.path.abspath(deramped_file))
-    fbase = os.path.splitext(os.path.basename(deramped_file))[0]
+        fbase += '_ramp'
+    fdir = os.path.dirname(os.path.abspath(timeseries_resid_file))
     rms_file = os.path.join(fdir, f'rms_{fbase}.txt')
 
     # Get residual RMS text file
+    # with the ramp removed on the fly, without writing the deramped time-series to disk
     if run_or_skip(out_file=rms_file, in_file=[timeseries_resid_file, mask_file], readable=False) == 'run':
-        if run_or_skip(out_file=deramped_file, in_file=timeseries_resid_file) == 'run':
-            if not os.path.isfile(timeseries_resid_file):
-                msg = 'Can not find input timeseries residual file: '+timeseries_resid_file
-                msg += '\nRe-run dem_error.py to generate it.'
-                raise Exception(msg)
-            else:
-                #print('remove {} ramp from file: {}'.format(ramp_type, timeseries_resid_file))
-                deramped_file = run_deramp(
-                    timeseries_resid_file,
-                    ramp_type=ramp_type,
-                    mask_file=mask_file,
-                    out_file=deramped_file,
-                )
-
-        print('\ncalculating residual RMS for each epoch from file: '+deramped_file)
-        rms_file = timeseries(deramped_file).timeseries_rms(
-            maskFile=mask_file,
-            outFile=rms_file,
+        if not os.path.isfile(timeseries_resid_file):
+            msg = 'Can not find input timeseries residual file: '+timeseries_resid_file
+            msg += '\nRe-run dem_error.py to generate it.'
+            raise Exception(msg)
+
+        rms_file = calc_timeseries_rms(
+            timeseries_resid_file,
+            mask_file=mask_file,
+            ramp_type=ramp_type,
+            out_file=rms_file,
+            max_memory=max_memory,
         )
 
     # Read residual RMS text file
@@ -631,6 +717,7 @@ def add_attribute(fname, atr_new=dict(), print_msg=False):
         # write to RSC file
         writefile.write_roipac_rsc(atr, fname+'.rsc', print_msg=print_msg)
 
+    readfile.clear_attribute_cache(fname)
     return fname
 
 
@@ -750,13 +837,13 @@ def check_template_auto_value(templateDict, auto_file='defaults/smallbaselineApp
     templateAutoFile = os.path.join(os.path.dirname(mintpy.__file__), auto_file)
     templateAutoDict = readfile.read_template(templateAutoFile)
 
-    # if cluster != local, change auto value of numWorker
+    # if cluster != local / process, change auto value of numWorker
     cluster_key = 'mintpy.compute.cluster'
     cluster = templateDict.get(cluster_key, 'auto').lower()
     if cluster == 'auto':
         cluster = templateAutoDict[cluster_key]
 
-    if cluster != 'local':
+    if cluster not in ['local', 'process']:
         templateAutoDict['mintpy.compute.numWorker'] = '40'
 
     ## Update auto value of input template dict
@@ -14,8 +14,47 @@ import shutil
 import h5py
 import numpy as np
 
+from mintpy.objects import CORRECTION_STACK_KEYS, timeseries
 from mintpy.utils import readfile
 
+# HDF5 compression types:
+# lzf    - built-in, fast with moderate ratio
+# gzip   - built-in, slow with high ratio
+# zstd   - Zstandard after byte-shuffle, via the hdf5plugin package
+# blosc2 - Blosc2 with Zstandard codec and byte-shuffle, multi-threaded, via the hdf5plugin package
+# run benchmark_compression.py to compare them on the data in hand.
+COMPRESSIONS = [None, 'lzf', 'gzip', 'zstd', 'blosc2']
+
+
+def get_hdf5_compression_kwargs(compression=None):
+    """Get the keyword arguments of h5py create_dataset() for the given compression type.
+
+    Parameters: compression - str, compression type, e.g. None, lzf, gzip, zstd, blosc2
+    Returns:    kwargs      - dict, compression and filter options for h5py create_dataset()
+    Examples:   f.create_dataset('timeseries', data=data, chunks=True, **get_hdf5_compression_kwargs('zstd'))
+    """
+    if compression in [None, 'None', 'none', 'no', False]:
+        return dict(compression=None)
+
+    elif compression in ['lzf', 'gzip']:
+        return dict(compression=compression)
+
+    elif compression in ['zstd', 'blosc2']:
+        try:
+            import hdf5plugin
+        except ImportError:
+            msg = f'Can not import hdf5plugin, required by compression = {compression}!'
+            msg += '\nInstall it via: conda install -c conda-forge hdf5plugin OR pip install hdf5plugin'
+            raise ImportError(msg)
+
+        if compression == 'zstd':
+            return dict(shuffle=True, **hdf5plugin.Zstd(clevel=3))
+        else:
+            return dict(**hdf5plugin.Blosc2(cname='zstd', clevel=5, filters=hdf5plugin.Blosc2.SHUFFLE))
+
+    else:
+        raise ValueError(f'Un-supported compression: {compression}! Available: {COMPRESSIONS}')
+
 
 def write(datasetDict, out_file, metadata=None, ref_file=None, compression=None, ds_unit_dict=None, print_msg=True):
     """ Write one file.
@@ -27,7 +66,7 @@ def write(datasetDict, out_file, metadata=None, ref_file=None, compression=None,
                 out_file     - str, output file name
                 metadata     - dict of attributes
                 ref_file     - str, reference file to get auxliary info
-                compression  - str, compression while writing to HDF5 file, None, "lzf", "gzip"
+                compression  - str, compression while writing to HDF5 file, None, lzf, gzip, zstd, blosc2
                 ds_unit_dict - dict, top-level dataset unit definition
                     {dname : dunit,
                      dname : dunit,
@@ -87,6 +126,9 @@ def write(datasetDict, out_file, metadata=None, ref_file=None, compression=None,
         else:
             auxDsNames = []
 
+        # check compression, before touching the existing file
+        comp_kwargs = get_hdf5_compression_kwargs(compression)
+
         # check required datasets
         dsNames = list(datasetDict.keys()) + auxDsNames
         if meta['FILE_TYPE'] in ['timeseries', 'ifgramStack']:
@@ -114,7 +156,7 @@ def write(datasetDict, out_file, metadata=None, ref_file=None, compression=None,
                 ds = f.create_dataset(dsName,
                                       data=data,
                                       chunks=True,
-                                      compression=compression)
+                                      **comp_kwargs)
 
             # 2. Write extra/auxliary datasets from ref_file
             if len(auxDsNames) > 0:
@@ -130,7 +172,7 @@ def write(datasetDict, out_file, metadata=None, ref_file=None, compression=None,
                         f.create_dataset(dsName,
                                          data=ds[:],
                                          chunks=True,
-                                         compression=compression)
+                                         **comp_kwargs)
 
             # 3. metadata
             for key, value in meta.items():
@@ -222,12 +264,50 @@ def write(datasetDict, out_file, metadata=None, ref_file=None, compression=None,
         # write metadata file
         write_roipac_rsc(meta, out_file+'.rsc', print_msg=print_msg)
 
+    readfile.clear_attribute_cache(out_file)
     return out_file
 
 
 #########################################################################
 
-def layout_hdf5(fname, ds_name_dict=None, metadata=None, ds_unit_dict=None, ref_file=None, compression=None, print_msg=True):
+# chunk layout of the 3D datasets in (num_epoch, length, width)
+# auto        - chunk shape guessed by h5py, e.g. (8, 94, 94)
+# time-major  - (num_epoch, 64, 64): all epochs of a pixel in one chunk, for pixel-wise reading,
+#               e.g. network inversion, coherence matrix, time-series point query
+# image-major - (1, 256, 256): one epoch per chunk, for epoch-wise reading, e.g. view
+CHUNK_LAYOUTS = ['auto', 'time-major', 'image-major']
+
+
+def get_hdf5_chunks(ds_shape, chunk_shape='auto'):
+    """Get the chunk shape of an HDF5 dataset.
+
+    Parameters: ds_shape    - tuple(int), dataset shape
+                chunk_shape - str, chunk layout of the 3D datasets, auto, time-major or image-major,
+                              see CHUNK_LAYOUTS. Non-3D datasets are always in auto.
+                              tuple(int), chunk shape of the same dimension as the dataset
+    Returns:    chunks      - True or tuple(int), the chunks argument of h5py.Group.create_dataset()
+    Examples:   chunks = get_hdf5_chunks((54, 600, 500), 'time-major')   # (54, 64, 64)
+    """
+    if chunk_shape is None or isinstance(chunk_shape, bool) or len(ds_shape) == 0:
+        return True
+
+    if isinstance(chunk_shape, str):
+        if chunk_shape not in CHUNK_LAYOUTS:
+            raise ValueError(f'Un-recognized chunk layout: {chunk_shape}! Available: {CHUNK_LAYOUTS}')
+        if chunk_shape == 'auto' or len(ds_shape) != 3:
+            return True
+        elif chunk_shape == 'time-major':
+            chunk_shape = (ds_shape[0], 64, 64)
+        elif chunk_shape == 'image-major':
+            chunk_shape = (1, 256, 256)
+
+    if len(chunk_shape) != len(ds_shape):
+        raise ValueError(f'chunk shape {chunk_shape} and dataset shape {ds_shape} are not in the same dimension!')
+    return tuple(max(min(int(c), int(d)), 1) for c, d in zip(chunk_shape, ds_shape))
+
+
+def layout_hdf5(fname, ds_name_dict=None, metadata=None, ds_unit_dict=None, ref_file=None, compression=None,
+                chunk_shape='auto', print_msg=True):
     """Create HDF5 file with defined metadata and (empty) dataset structure
 
     Parameters: fname        - str, HDF5 file path
@@ -245,6 +325,7 @@ def layout_hdf5(fname, ds_name_dict=None, metadata=None, ds_unit_dict=None, ref_
                                }
                 ref_file     - str, reference file for the data structure
                 compression  - str, HDF5 compression type
+                chunk_shape  - str, chunk layout of the 3D datasets, auto, time-major or image-major
     Returns:    fname        - str, HDF5 file path
 
     Example:    layout_hdf5('timeseries_ERA5.h5', ref_file='timeseries.h5')
@@ -342,9 +423,9 @@ def layout_hdf5(fname, ds_name_dict=None, metadata=None, ds_unit_dict=None, ref_
             data_type  = ds_name_dict[key][0]
             data_shape = ds_name_dict[key][1]
 
-            # turn ON compression for conn comp
+            # turn ON compression for conn comp, if no compression is specified
             ds_comp = compression
-            if key in ['connectComponent']:
+            if key in ['connectComponent'] and not compression:
                 ds_comp = 'lzf'
 
             # changeable dataset shape
@@ -364,8 +445,8 @@ def layout_hdf5(fname, ds_name_dict=None, metadata=None, ds_unit_dict=None, ref_
                                   shape=data_shape,
                                   maxshape=max_shape,
                                   dtype=data_type,
-                                  chunks=True,
-                                  compression=ds_comp)
+                                  chunks=get_hdf5_chunks(data_shape, chunk_shape),
+                                  **get_hdf5_compression_kwargs(ds_comp))
 
             # write auxliary data
             if len(ds_name_dict[key]) > 2 and ds_name_dict[key][2] is not None:
@@ -383,6 +464,7 @@ def layout_hdf5(fname, ds_name_dict=None, metadata=None, ds_unit_dict=None, ref_
                     vprint(f'add /{key:<{max_digit}} attribute: UNIT = {value}')
 
     vprint(f'close  HDF5 file: {fname}')
+    readfile.clear_attribute_cache(fname)
 
     return fname
 
@@ -455,6 +537,81 @@ def write_hdf5_block(fname, data, datasetName, block=None, mode='a', print_msg=T
     return fname
 
 
+def write_correction_stack(out_file, base_file, cor_file, force_diff=False, print_msg=True):
+    """Write a correction stack file as base_file - cor_file, without writing the data.
+
+    The /timeseries dataset is an empty placeholder (filled with NaN if read directly via h5py),
+    with the relative paths of the base and correction files saved in its attributes.
+    Its data is composed on the fly by readfile.read() / timeseries.read(),
+    and can be written to disk via materialize.py.
+
+    Parameters: out_file   - str, path of the output correction stack file
+                base_file  - str, path of the base time-series file, could be a correction stack itself
+                cor_file   - str, path of the correction time-series file, e.g. inputs/ERA5.h5
+                force_diff - bool, enforce the correction for the shared dates only
+    Returns:    out_file   - str, path of the output correction stack file
+    Examples:   write_correction_stack('timeseries_ERA5.h5', 'timeseries.h5', 'inputs/ERA5.h5')
+    """
+    vprint = print if print_msg else lambda *args, **kwargs: None
+
+    # check file type
+    ftype = readfile.read_attribute(cor_file)['FILE_TYPE']
+    if ftype != 'timeseries':
+        raise ValueError(f'Correction stack supports correction file in timeseries type ONLY, not {ftype}!')
+
+    # check dates
+    date_list = timeseries(base_file).get_date_list()
+    date_list_ex = sorted(set(date_list) - set(timeseries(cor_file).get_date_list()))
+    if date_list_ex:
+        print(f'WARNING: {cor_file} does not contain all dates in {base_file}')
+        if not force_diff:
+            raise Exception('To enforce the differencing anyway, use --force option.')
+        print('Continue and enforce the differencing for their shared dates only.')
+        print(f'\twith following dates are ignored for differencing:\n{date_list_ex}')
+
+    # paths relative to the output file, so that the files can be moved together
+    out_dir = os.path.dirname(os.path.abspath(out_file))
+    stack_dict = {
+        'BASE_FILE'       : os.path.relpath(os.path.abspath(base_file), out_dir),
+        'CORRECTION_FILE' : os.path.relpath(os.path.abspath(cor_file), out_dir),
+    }
+    if os.path.abspath(out_file) in [os.path.abspath(base_file), os.path.abspath(cor_file)]:
+        raise ValueError(f'Output correction stack file can not be the same as the input: {out_file}!')
+
+    # write: the same structure as the base file, with no data written for /timeseries
+    if not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+        vprint(f'create directory: {out_dir}')
+
+    with h5py.File(base_file, 'r') as fb, h5py.File(out_file, 'w') as f:
+        vprint(f'create HDF5 file: {out_file} with w mode')
+        for key in fb.keys():
+            if not isinstance(fb[key], h5py.Dataset):
+                continue
+            if key == 'timeseries':
+                ds = f.create_dataset(key,
+                                      shape=fb[key].shape,
+                                      maxshape=(None,) + fb[key].shape[1:],
+                                      dtype=np.float32,
+                                      chunks=get_hdf5_chunks(fb[key].shape),
+                                      fillvalue=np.nan)
+                for akey, value in fb[key].attrs.items():
+                    if akey not in CORRECTION_STACK_KEYS:
+                        ds.attrs[akey] = value
+                for akey, value in stack_dict.items():
+                    ds.attrs[akey] = value
+                vprint(f'create dataset  : {key} as {base_file} - {cor_file}')
+            else:
+                fb.copy(fb[key], f, name=key)
+
+        for key, value in fb.attrs.items():
+            f.attrs[key] = value
+
+    vprint(f'close  HDF5 file: {out_file}')
+    readfile.clear_attribute_cache(out_file)
+    return out_file
+
+
 def remove_hdf5_dataset(fname, datasetNames, print_msg=True):
     """Remove an existing dataset from an HDF5 file.
     Parameters: fname : str, HDF5 file name/path
@@ -497,10 +654,148 @@ def remove_hdf5_dataset(fname, datasetNames, print_msg=True):
 
     vprint(f'finished writing to {fname}')
     vprint(f'old file is now saved as: {temp_file}. Use rm command to delete it.')
+    readfile.clear_attribute_cache(fname)
 
     return fname
 
 
+def rechunk_hdf5(fname, chunk_shape='time-major', out_file=None, max_memory=4, print_msg=True):
+    """Re-write an HDF5 file with the 3D datasets in a new chunk layout.
+
+    The compression, attributes and groups are kept. The data is copied block by block
+    in rows, aligned with the new chunks.
+
+    Parameters: fname       - str, HDF5 file path
+                chunk_shape - str, chunk layout of the 3D datasets, auto, time-major or image-major
+                out_file    - str, output HDF5 file path, None to overwrite the input file
+                max_memory  - float, max memory to use in GB
+    Returns:    out_file    - str, output HDF5 file path
+    Example:    rechunk_hdf5('inputs/ifgramStack.h5', 'time-major')
+                rechunk_hdf5('timeseries.h5', 'image-major', out_file='timeseries_img.h5')
+    """
+    vprint = print if print_msg else lambda *args, **kwargs: None
+
+    # write to a temporary file first, to not corrupt the input file in case of interruption
+    out_file = out_file if out_file else fname
+    tmp_file = os.path.join(os.path.dirname(os.path.abspath(out_file)), f'tmp_{os.path.basename(out_file)}')
+    vprint(f'read   HDF5 file: {fname} with r mode')
+    vprint(f'create HDF5 file: {tmp_file} with w mode')
+
+    try:
+        with h5py.File(fname, 'r') as fi, h5py.File(tmp_file, 'w') as fo:
+            fo.attrs.update(fi.attrs)
+
+            def copy_item(name, obj):
+                if isinstance(obj, h5py.Group):
+                    fo.require_group(name).attrs.update(obj.attrs)
+                    return
+
+                # keep the chunks of non-3D datasets
+                chunks = obj.chunks
+                if obj.ndim == 3:
+                    chunks = get_hdf5_chunks(obj.shape, chunk_shape)
+                vprint(f'create dataset /{name} of {str(obj.dtype):<10} in size of {str(obj.shape):<20} '
+                       f'with chunks = {chunks} (was {obj.chunks})')
+
+                # keep the compression, re-generate the options of the plugin filters for the new chunks
+                comp_kwargs = dict(compression=obj.compression,
+                                   compression_opts=obj.compression_opts,
+                                   shuffle=obj.shuffle)
+                if obj.compression == 'unknown':
+                    comp_kwargs = get_hdf5_compression_kwargs(readfile.get_hdf5_dataset_compression(obj))
+
+                ds = fo.create_dataset(name,
+                                       shape=obj.shape,
+                                       maxshape=obj.maxshape if chunks else None,
+                                       dtype=obj.dtype,
+                                       chunks=chunks,
+                                       **comp_kwargs)
+                ds.attrs.update(obj.attrs)
+
+                if obj.ndim < 2 or obj.size == 0:
+                    ds[()] = obj[()]
+                    return
+
+                # copy block by block in rows, with the number of rows in multiple of the new chunks
+                row_size = obj.size // obj.shape[-2] * obj.dtype.itemsize
+                chunk_row = ds.chunks[-2] if ds.chunks else 1
+                num_row = int(max_memory * 1024**3 / 2 / row_size) // chunk_row * chunk_row
+                num_row = max(num_row, chunk_row)
+                for r0 in range(0, obj.shape[-2], num_row):
+                    r1 = min(r0 + num_row, obj.shape[-2])
+                    ds[..., r0:r1, :] = obj[..., r0:r1, :]
+
+            fi.visititems(copy_item)
+
+        os.replace(tmp_file, out_file)
+    finally:
+        # remove the temporary file if failed
+        if os.path.isfile(tmp_file):
+            os.remove(tmp_file)
+
+    readfile.clear_attribute_cache(out_file)
+    vprint(f'finished writing to {out_file}')
+
+    return out_file
+
+
+def materialize_correction_stack(fname, out_file=None, compression=None, max_memory=4, print_msg=True):
+    """Write the data of a correction stack file to disk, as a regular time-series file.
+
+    The data is composed as base minus corrections and written block by block in rows.
+
+    Parameters: fname       - str, path of the correction stack file
+                out_file    - str, output HDF5 file path, None to overwrite the input file
+                compression - str, HDF5 compression type, None to use the one of the base file
+                max_memory  - float, max memory to use in GB
+    Returns:    out_file    - str, output HDF5 file path
+    Example:    materialize_correction_stack('timeseries_SET_ERA5.h5')
+                materialize_correction_stack('timeseries_SET_ERA5.h5', out_file='timeseries_flat.h5')
+    """
+    vprint = print if print_msg else lambda *args, **kwargs: None
+
+    ts_obj = timeseries(fname)
+    stack_dict = ts_obj.get_correction_stack()
+    if not stack_dict:
+        raise ValueError(f'input file is NOT a correction stack: {fname}')
+    ts_obj.open(print_msg=False)
+    vprint(f'materialize {fname} as {stack_dict["BASE_FILE"]} - {stack_dict["CORRECTION_FILE"]}')
+
+    if compression is None:
+        compression = readfile.get_hdf5_compression(stack_dict['BASE_FILE'])
+
+    # write to a temporary file first, to not corrupt the input file in case of interruption
+    out_file = out_file if out_file else fname
+    tmp_file = os.path.join(os.path.dirname(os.path.abspath(out_file)), f'tmp_{os.path.basename(out_file)}')
+    try:
+        layout_hdf5(tmp_file,
+                    ref_file=fname,
+                    ds_unit_dict=readfile.get_hdf5_dataset_attrs(fname, key='UNIT'),
+                    compression=compression,
+                    print_msg=print_msg)
+
+        # block by block in rows: base, correction and output in float32
+        row_size = ts_obj.numDate * ts_obj.width * 4 * 3
+        num_row = min(max(int(max_memory * 1024**3 / row_size), 1), ts_obj.length)
+        for r0 in range(0, ts_obj.length, num_row):
+            r1 = min(r0 + num_row, ts_obj.length)
+            vprint(f'compose and write rows {r0}-{r1} / {ts_obj.length}')
+            data = ts_obj.read(box=(0, r0, ts_obj.width, r1), squeeze=False, print_msg=False)
+            block = [0, ts_obj.numDate, r0, r1, 0, ts_obj.width]
+            write_hdf5_block(tmp_file, data=data, datasetName='timeseries', block=block, print_msg=False)
+
+        os.replace(tmp_file, out_file)
+    finally:
+        # remove the temporary file if failed
+        if os.path.isfile(tmp_file):
+            os.remove(tmp_file)
+
+    readfile.clear_attribute_cache(out_file)
+    vprint(f'finished writing to {out_file}')
+
+    return out_file
+
+
 
 #########################################################################
 
@@ -546,6 +841,7 @@ def write_roipac_rsc(metadata, out_file, update_mode=False, print_msg=False):
                 f.write('{k:<{d}}    {v}\n'.format(k=str(key),
                                                    d=maxDigit,
                                                    v=str(metadata[key])))
+        readfile.clear_attribute_cache(out_file)
     return out_file
 
 
@@ -618,6 +914,7 @@ def write_gdal_vrt(meta, out_file):
     # write VRT file
     with open(out_file, 'w') as f:
         f.write(ds_str)
+    readfile.clear_attribute_cache(out_file)
 
     return out_file
 
@@ -657,6 +954,7 @@ def write_isce_xml(meta, fname, print_msg=True):
     if print_msg:
         print(f'write file: {fname}.xml')
         print(f'write file: {fname}.vrt')
+    readfile.clear_attribute_cache(fname)
 
     return
 
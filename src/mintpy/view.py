@@ -1127,6 +1127,7 @@ def read_data4figure(i_start, i_end, inps, metadata):
         box=inps.pix_box,
         xstep=inps.multilook_num,
         ystep=inps.multilook_num,
+        method=inps.multilook_method,
         print_msg=inps.print_msg,
     )
 
@@ -1478,7 +1479,7 @@ def prepare4multi_subplots(inps, metadata):
         inps.date12List = sorted(list({x.split('-')[1] for x in inps.sliceList}))
 
     if inps.multilook_num > 1 and inps.print_msg:
-        print('multilook {0} by {0} with nearest interpolation'.format(inps.multilook_num))
+        print('multilook {0} by {0} with {1} interpolation'.format(inps.multilook_num, inps.multilook_method))
 
     elif inps.multilook and inps.multilook_num == 1:
         ## calculate multilook_num
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# Author: MintPy Developers, Oct 2026
+"""Test the fused single-pass time-series correction against the step-by-step one."""
+
+
+import argparse
+import datetime
+import os
+import shutil
+import sys
+import tempfile
+
+import h5py
+import numpy as np
+
+import mintpy
+from mintpy.objects import cluster
+from mintpy.objects.ramp import RampEstimator, deramp
+from mintpy.smallbaselineApp import TimeSeriesAnalysis
+from mintpy.utils import readfile, utils as ut, writefile
+
+################################################################################
+# setting: image size / acquisition
+length, width = 90, 70
+num_date = 15
+revisit_time = datetime.timedelta(days=12)
+start_date = datetime.datetime(2020, 1, 1)
+
+# setting: smallbaselineApp.py
+STEP_LIST = ['correct_LOD', 'correct_troposphere', 'deramp', 'correct_topography']
+# output files and their absolute tolerance in meters,
+# with the DEM error amplified from the float32 precision of the phase by ~range_dist / pbase
+OUT_FILES = {
+    'timeseries_LOD_ERA5_ramp_demErr.h5' : 1e-5,
+    'demErr.h5'                          : 1e-3,
+    'timeseriesResidual.h5'              : 1e-5,
+}
+
+
+################################################################################
+EXAMPLE = """example:
+  $MINTPY_HOME/tests/correct_timeseries.py
+  $MINTPY_HOME/tests/correct_timeseries.py --dir ~/test
+"""
+
+def cmd_line_parse(iargs=None):
+    # create parser
+    parser = argparse.ArgumentParser(description='Test correct_timeseries.py',
+                                     formatter_class=argparse.RawTextHelpFormatter,
+                                     epilog=EXAMPLE)
+    parser.add_argument('--dir', dest='test_dir', default=None,
+                        help='test directory (default: a temporary directory, removed afterwards).')
+
+    # parsing
+    inps = parser.parse_args(args=iargs)
+
+    return inps
+
+
+################################################################################
+def sim_timeseries_with_ramp(ramp_type='quadratic'):
+    """Simulate a time-series with ramps, NaN and zero pixels."""
+    rng = np.random.default_rng(12138)
+    yy, xx = np.mgrid[:length, :width].astype(np.float32)
+    coeffs = rng.normal(size=(num_date, 6)) * np.array([1e-6, 1e-6, 1e-6, 1e-4, 2e-4, 1e-2])
+    ts = (coeffs[:, 0, None, None] * yy**2 + coeffs[:, 1, None, None] * xx**2
+          + coeffs[:, 2, None, None] * xx * yy + coeffs[:, 3, None, None] * yy
+          + coeffs[:, 4, None, None] * xx + coeffs[:, 5, None, None])
+    ts += rng.normal(scale=2e-3, size=ts.shape)
+    ts = ts.astype(np.float32)
+
+    # no-data values
+    ts[:, 5:8, 5:9] = 0.
+    ts[:, 60, 40] = np.nan
+    ts[3, 30:35, 10:20] = np.nan
+
+    mask = rng.uniform(size=(length, width)) > 0.1
+    return ts, mask
+
+
+def test_ramp_estimator(ramp_type='quadratic', max_num_sample=1e6, max_num_pixel=1000, atol=1e-5):
+    print(f'Test: RampEstimator vs. deramp() for {ramp_type} ramp with max_num_sample={max_num_sample}.')
+    ts, mask = sim_timeseries_with_ramp()
+    meta = {'REF_Y': '20', 'REF_X': '30'}
+
+    # deramp one acquisition at a time, as run_deramp()
+    ts_cor = np.zeros_like(ts)
+    for i in range(num_date):
+        ts_cor[i] = deramp(ts[i], mask, ramp_type=ramp_type, metadata=meta, max_num_sample=max_num_sample)[0]
+
+    # RampEstimator box by box
+    box_list, num_box = cluster.split_box2tiles((0, 0, width, length), max_num_pixel, chunk_shape=(16, 16))
+    estimator = RampEstimator(ramp_type, num_date, length, width, metadata=meta,
+                              max_num_sample=max_num_sample)
+    for box in box_list:
+        estimator.accumulate(ts[:, box[1]:box[3], box[0]:box[2]], box,
+                             mask=mask[box[1]:box[3], box[0]:box[2]])
+    estimator.solve()
+
+    ts_cor2 = np.zeros_like(ts)
+    for box in box_list:
+        ts_cor2[:, box[1]:box[3], box[0]:box[2]] = estimator.deramp(ts[:, box[1]:box[3], box[0]:box[2]], box)[0]
+
+    # validate
+    print(f'number of boxes: {num_box}')
+    print(f'max difference: {np.nanmax(np.abs(ts_cor - ts_cor2)):.2e}')
+    assert np.array_equal(np.isnan(ts_cor), np.isnan(ts_cor2))
+    assert np.all(ts_cor2[ts == 0] == 0)
+    assert np.allclose(ts_cor, ts_cor2, atol=atol, equal_nan=True)
+    print('Pass.')
+
+
+################################################################################
+def sim_work_dir(work_dir, fused='no'):
+    """Simulate a work directory of smallbaselineApp.py, with the time-series and its corrections."""
+    os.makedirs(os.path.join(work_dir, 'inputs'), exist_ok=True)
+    rng = np.random.default_rng(12138)
+    dt_list = [start_date + revisit_time * x for x in range(num_date)]
+    date_list = [x.strftime('%Y%m%d') for x in dt_list]
+    dates = np.array(date_list, np.bytes_)
+    meta = dict(LENGTH=str(length), WIDTH=str(width), WAVELENGTH='0.0562', ALOOKS='1', RLOOKS='1',
+                PROCESSOR='isce', PLATFORM='Envisat', RANGE_PIXEL_SIZE='7.8', AZIMUTH_PIXEL_SIZE='4',
+                HEIGHT='780000', EARTH_RADIUS='6371000', STARTING_RANGE='850000', CENTER_LINE_UTC='3600',
+                ANTENNA_SIDE='-1', ORBIT_DIRECTION='ASCENDING', UNIT='m')
+
+    # ifgram stack, to locate the loaded dataset only
+    with h5py.File(os.path.join(work_dir, 'inputs/ifgramStack.h5'), 'w') as f:
+        f.attrs.update(dict(meta, FILE_TYPE='ifgramStack'))
+        f['date'] = np.array([(dates[i], dates[i+1]) for i in range(num_date-1)])
+        f['bperp'] = np.zeros(num_date-1, np.float32)
+        f['dropIfgram'] = np.ones(num_date-1, np.bool_)
+        f['unwrapPhase'] = np.zeros((num_date-1, length, width), np.float32)
+        f['coherence'] = np.ones((num_date-1, length, width), np.float32)
+
+    # geometry with the pixel-wise perpendicular baseline
+    yy, xx = np.mgrid[:length, :width].astype(np.float32)
+    inc_angle = 30 + 10 * xx / width
+    range_dist = 8.5e5 + 7.8 * xx
+    pbase = np.linspace(-150, 150, num_date)
+    rng.shuffle(pbase)
+    bperp = (pbase[:, None, None] * (1 + 0.05 * rng.normal(size=(1, length, width)))).astype(np.float32)
+    geom = {
+        'height'             : np.zeros((length, width), np.float32),
+        'latitude'           : 30 + yy * 1e-3,
+        'longitude'          : 100 + xx * 1e-3,
+        'incidenceAngle'     : inc_angle,
+        'slantRangeDistance' : range_dist,
+        'bperp'              : bperp,
+        'date'               : dates,
+    }
+    writefile.write(geom, os.path.join(work_dir, 'inputs/geometryRadar.h5'),
+                    metadata=dict(meta, FILE_TYPE='geometry'), print_msg=False)
+
+    # time-series: linear displacement + DEM error + ramp + noise
+    tbase = np.arange(num_date) * revisit_time.days / 365.25
+    vel = 0.01 * np.sin(yy / 15) * np.cos(xx / 10)
+    delta_z = rng.normal(scale=15, size=(length, width))
+    ts = tbase[:, None, None] * vel + bperp * delta_z / (range_dist * np.sin(np.deg2rad(inc_angle)))
+    ts += (rng.normal(size=(num_date, 1, 1)) * 1e-4 * yy + rng.normal(size=(num_date, 1, 1)) * 2e-4 * xx
+           + rng.normal(size=(num_date, 1, 1)) * 1e-6 * xx * yy)
+    ts += rng.normal(scale=2e-3, size=ts.shape)
+    ts -= ts[:, 20:21, 30:31]
+    ts -= ts[0]
+    ts = ts.astype(np.float32)
+    ts[:, 5:8, 5:9] = 0.
+    ts[:, 60, 40] = np.nan
+    with h5py.File(os.path.join(work_dir, 'timeseries.h5'), 'w') as f:
+        f.attrs.update(dict(meta, FILE_TYPE='timeseries', REF_Y='20', REF_X='30', REF_DATE=date_list[0]))
+        f['date'] = dates
+        f['bperp'] = pbase.astype(np.float32)
+        f.create_dataset('timeseries', data=ts, chunks=(num_date, 16, 16))
+
+    # tropospheric delay
+    tropo = rng.normal(size=(num_date, 1, 1)) * 0.01 + 1e-4 * rng.normal(size=(num_date, 1, 1)) * yy + 2.3
+    with h5py.File(os.path.join(work_dir, 'inputs/ERA5.h5'), 'w') as f:
+        f.attrs.update(dict(meta, FILE_TYPE='timeseries'))
+        f['date'] = dates
+        f['bperp'] = pbase.astype(np.float32)
+        f['timeseries'] = tropo.astype(np.float32)
+
+    # temporal coherence / mask
+    tcoh = rng.uniform(0.5, 1, size=(length, width)).astype(np.float32)
+    writefile.write(tcoh, os.path.join(work_dir, 'temporalCoherence.h5'),
+                    metadata=dict(meta, FILE_TYPE='temporalCoherence'), print_msg=False)
+    writefile.write(tcoh > 0.6, os.path.join(work_dir, 'maskTempCoh.h5'),
+                    metadata=dict(meta, FILE_TYPE='mask'), print_msg=False)
+
+    # template, with a small memory limit for multiple boxes
+    template_file = os.path.join(work_dir, 'smallbaselineApp.cfg')
+    shutil.copy2(os.path.join(os.path.dirname(mintpy.__file__), 'defaults/smallbaselineApp.cfg'), template_file)
+    ut.update_template_file(template_file, {
+        'mintpy.compute.maxMemory'        : '0.0005',
+        'mintpy.compute.fusedCorrection'  : fused,
+        'mintpy.troposphericDelay.method' : 'pyaps',
+        'mintpy.deramp'                   : 'quadratic',
+        'mintpy.load.processor'           : 'isce',
+    })
+    return template_file
+
+
+def run_correction_steps(work_dir, fused='no'):
+    template_file = sim_work_dir(work_dir, fused=fused)
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        app = TimeSeriesAnalysis(template_file, work_dir)
+        app.templateFile = template_file
+        app.template = ut.check_template_auto_value(readfile.read_template(template_file))
+        app.run(STEP_LIST)
+    finally:
+        os.chdir(cwd)
+
+
+def test_fused_correction(test_dir):
+    print('Test: fused single-pass correction vs. the step-by-step correction.')
+    dir1 = os.path.join(test_dir, 'sequential')
+    dir2 = os.path.join(test_dir, 'fused')
+    run_correction_steps(dir1, fused='no')
+    run_correction_steps(dir2, fused='yes')
+
+    # validate
+    for fname, atol in OUT_FILES.items():
+        data1, atr1 = readfile.read(os.path.join(dir1, fname))
+        data2, atr2 = readfile.read(os.path.join(dir2, fname))
+        print(f'{fname}: max difference: {np.nanmax(np.abs(data1 - data2)):.2e}')
+        assert np.array_equal(np.isnan(data1), np.isnan(data2))
+        assert np.allclose(data1, data2, atol=atol, equal_nan=True)
+        keys = [key for key in set(atr1.keys()) | set(atr2.keys()) if key not in ['FILE_PATH']]
+        assert all(atr1.get(key, None) == atr2.get(key, None) for key in keys)
+
+    # intermediate files are not written in the fused mode
+    assert not os.path.isfile(os.path.join(dir2, 'timeseries_LOD_ERA5.h5'))
+    print('Pass.')
+
+
+################################################################################
+def main(iargs=None):
+
+    print('-'*50)
+    print(f'Testing {__file__}')
+    inps = cmd_line_parse(iargs)
+
+    # scenario 1 - ramp estimation box by box, w/ and w/o sampling
+    test_ramp_estimator(ramp_type='linear')
+    test_ramp_estimator(ramp_type='quadratic')
+    test_ramp_estimator(ramp_type='quadratic', max_num_sample=1000)
+
+    # scenario 2 - fused vs. step-by-step correction
+    if inps.test_dir:
+        os.makedirs(inps.test_dir, exist_ok=True)
+        test_fused_correction(os.path.abspath(inps.test_dir))
+    else:
+        with tempfile.TemporaryDirectory() as test_dir:
+            test_fused_correction(test_dir)
+
+
+################################################################################
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -11,7 +11,7 @@ import sys
 import numpy as np
 from matplotlib import pyplot as plt
 
-from mintpy.dem_error import estimate_dem_error
+from mintpy.dem_error import estimate_dem_error, estimate_dem_error_pixelwise
 from mintpy.utils import ptime, time_func
 
 ################################################################################
@@ -136,7 +136,7 @@ def test_dem_error_with_linear_defo(date_list, tbase, rel_tol=0.05, plot=False):
     # validate
     print(f'Specified DEM error: {delta_z_sim:.2f} m')
     print(f'Estimated DEM error: {delta_z_est[0]:.2f} m')
-    assert math.isclose(delta_z_sim, delta_z_est, rel_tol=rel_tol)
+    assert math.isclose(delta_z_sim, delta_z_est[0], rel_tol=rel_tol)
     print('Pass.')
 
 
@@ -194,7 +194,49 @@ def test_dem_error_with_complex_defo(date_list, tbase, rel_tol=0.05, plot=False)
     # validate
     print(f'Specified DEM error: {delta_z_sim:.2f} m')
     print(f'Estimated DEM error: {delta_z_est[0]:.2f} m')
-    assert math.isclose(delta_z_sim, delta_z_est, rel_tol=rel_tol)
+    assert math.isclose(delta_z_sim, delta_z_est[0], rel_tol=rel_tol)
+    print('Pass.')
+
+
+def test_dem_error_pixelwise(date_list, tbase, num_pixel=200, atol=1e-8):
+    print('Test 3: batched vs. pixel-by-pixel estimation with pixel-wise geometry.')
+
+    # setting
+    model = {'polynomial' : 2, 'stepDate' : ['20190818']}
+    rng = np.random.default_rng(12138)
+
+    # simulate pixel-wise geometry, DEM error and time-series
+    pbase = sim_pbase_and_topo_residual(num_date, delta_z_sim, ref_ind, max_pbase=max_pbase)[0]
+    pbase = pbase.reshape(-1, 1) * rng.uniform(0.95, 1.05, size=(1, num_pixel))
+    sin_inc_angle = np.sin(np.deg2rad(rng.uniform(30, 45, size=num_pixel)))
+    G_geom = pbase / (rng.uniform(750e3, 850e3, size=num_pixel) * sin_inc_angle)
+    G_defo = time_func.get_design_matrix4time_func(date_list, model)
+    delta_z = rng.normal(scale=delta_z_sim, size=num_pixel)
+    ts_obs = np.dot(G_defo, rng.normal(scale=0.05, size=(G_defo.shape[1], num_pixel)))
+    ts_obs += G_geom * delta_z + rng.normal(scale=0.005, size=ts_obs.shape)
+    date_flag = np.ones(num_date, np.bool_)
+    date_flag[[3, 20]] = False
+
+    tbase = tbase.reshape(-1, 1)
+    for phase_velocity in [False, True]:
+        # batched
+        out1 = estimate_dem_error_pixelwise(ts_obs, G_geom, G_defo, tbase, date_flag,
+                                            phase_velocity=phase_velocity, cond=cond)
+
+        # pixel-by-pixel
+        out2 = [np.zeros(num_pixel), np.zeros(ts_obs.shape), np.zeros(ts_obs.shape)]
+        for i in range(num_pixel):
+            G = np.hstack((G_geom[:, i:i+1], G_defo))
+            results = estimate_dem_error(ts_obs[:, i:i+1], G, tbase, date_flag,
+                                         phase_velocity=phase_velocity, cond=cond)
+            out2[0][i] = results[0][0]
+            out2[1][:, i:i+1], out2[2][:, i:i+1] = results[1:]
+
+        # validate
+        print(f'phase_velocity = {phase_velocity}: max difference of DEM error: '
+              f'{np.max(np.abs(out1[0] - out2[0])):.1e} m')
+        for name, x1, x2 in zip(['delta_z', 'ts_cor', 'ts_res'], out1, out2):
+            assert np.allclose(x1, x2, rtol=0, atol=atol), f'{name} is NOT the same!'
     print('Pass.')
 
 
@@ -228,6 +270,9 @@ def main(iargs=None):
         plot=inps.plot,
     )
 
+    # scenario 3 - pixel-wise geometry in batch
+    test_dem_error_pixelwise(date_list, tbase)
+
 
 ################################################################################
 if __name__ == '__main__':
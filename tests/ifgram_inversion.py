@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# Author: MintPy Developers, Oct 2026
+"""Test the batched network inversion against the pixel-by-pixel solution."""
+
+
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+
+import h5py
+import numpy as np
+
+from mintpy import ifgram_inversion
+from mintpy.cli import ifgram_inversion as cli
+from mintpy.ifgram_inversion import (
+    PinvCache,
+    calc_inv_quality_stats,
+    estimate_timeseries,
+    estimate_timeseries_batch,
+    estimate_timeseries_cov,
+    estimate_timeseries_cov_batch,
+    get_obs_weight,
+    group_pixels_by_valid_obs,
+    solve_normal_equation,
+    update_inv_quality_stats,
+    update_normal_equation,
+)
+from mintpy.objects import ifgramStack
+from mintpy.utils import ptime, readfile
+
+################################################################################
+# setting: time / acquisition / network
+revisit_time = datetime.timedelta(days=12)
+start_date = datetime.datetime(2020, 1, 1)
+num_date = 30
+num_conn = 4        # sequential network with 4 connections
+num_pixel = 500
+wavelength = 0.0556
+
+
+################################################################################
+EXAMPLE = """example:
+  $MINTPY_HOME/tests/ifgram_inversion.py
+"""
+
+def cmd_line_parse(iargs=None):
+    # create parser
+    parser = argparse.ArgumentParser(description='Test ifgram_inversion.py',
+                                     formatter_class=argparse.RawTextHelpFormatter,
+                                     epilog=EXAMPLE)
+
+    # parsing
+    inps = parser.parse_args(args=iargs)
+
+    return inps
+
+
+################################################################################
+def sim_network_obs(date_list, num_pixel, nan_ratio=0.02):
+    """Simulate a sequential network of unwrapped phase with random no-data values."""
+    date12_list = []
+    for i in range(num_date):
+        for j in range(i+1, min(i+1+num_conn, num_date)):
+            date12_list.append(f'{date_list[i]}_{date_list[j]}')
+    A, B = ifgramStack.get_design_matrix4timeseries(date12_list)[:2]
+
+    # phase time-series: linear velocity + noise
+    np.random.seed(12138)
+    tbase = np.array(ptime.date_list2tbase(date_list)[0], np.float32) / 365.25
+    vel = np.random.randn(1, num_pixel) * 0.02 * (-4 * np.pi / wavelength)
+    ts = np.dot(tbase.reshape(-1, 1), vel)
+    obs = np.dot(A, ts[1:, :]) + np.random.randn(A.shape[0], num_pixel) * 0.5
+    obs = obs.astype(np.float32)
+
+    # weight
+    weight_sqrt = np.random.uniform(0.5, 3.0, size=obs.shape).astype(np.float32)
+
+    # no-data values, with a few shared patterns
+    patterns = np.random.rand(5, A.shape[0]) < nan_ratio
+    flag = patterns[np.random.randint(0, 5, size=num_pixel)].T
+    obs[flag] = np.nan
+
+    return A, B, obs, weight_sqrt, np.diff(tbase).reshape(-1, 1)
+
+
+def run_pixel_by_pixel(A, B, y, tbase_diff, weight_sqrt=None, **kwargs):
+    ts = np.zeros((A.shape[1]+1, y.shape[1]), dtype=np.float32)
+    inv_quality = np.zeros(y.shape[1], dtype=np.float32)
+    num_inv_obs = np.zeros(y.shape[1], dtype=np.int16)
+    for i in range(y.shape[1]):
+        ts[:, i:i+1], inv_quality[i:i+1], num_inv_obs[i:i+1] = estimate_timeseries(
+            A, B, y[:, i], tbase_diff,
+            weight_sqrt=weight_sqrt[:, i] if weight_sqrt is not None else None,
+            print_msg=False,
+            **kwargs)
+    return ts, inv_quality, num_inv_obs
+
+
+def run_group_by_group(A, B, y, tbase_diff, weight_sqrt=None, **kwargs):
+    ts = np.zeros((A.shape[1]+1, y.shape[1]), dtype=np.float32)
+    inv_quality = np.zeros(y.shape[1], dtype=np.float32)
+    num_inv_obs = np.zeros(y.shape[1], dtype=np.int16)
+    for idx in group_pixels_by_valid_obs(y):
+        ts[:, idx], inv_quality[idx], num_inv_obs[idx] = estimate_timeseries_batch(
+            A, B, y[:, idx], tbase_diff,
+            weight_sqrt=weight_sqrt[:, idx] if weight_sqrt is not None else None,
+            print_msg=False,
+            **kwargs)
+    return ts, inv_quality, num_inv_obs
+
+
+def compare_results(out1, out2, rtol=1e-4, atol=1e-3):
+    for name, x1, x2 in zip(['timeseries', 'temporalCoherence', 'numInvIfgram'], out1, out2):
+        assert np.allclose(x1, x2, rtol=rtol, atol=atol), f'{name} is NOT the same!'
+
+
+################################################################################
+def test_group_pixels_by_valid_obs(obs):
+    print('Test 1: group pixels by the pattern of valid observations.')
+    idx_list = group_pixels_by_valid_obs(obs)
+    assert sum(idx.size for idx in idx_list) == obs.shape[1]
+    for idx in idx_list:
+        flag = np.isnan(obs[:, idx])
+        assert np.all(flag == flag[:, :1])
+    print(f'{len(idx_list)} groups found for {obs.shape[1]} pixels')
+    print('Pass.')
+
+
+def test_batch_inversion(A, B, obs, tbase_diff, weight_sqrt=None, min_norm_velocity=True):
+    msg = 'WLS' if weight_sqrt is not None else 'OLS'
+    msg += ' with min-norm velocity' if min_norm_velocity else ' with min-norm phase'
+    print(f'Test 2: batched vs. pixel-by-pixel inversion: {msg}.')
+    kwargs = dict(weight_sqrt=weight_sqrt, min_norm_velocity=min_norm_velocity)
+    out1 = run_pixel_by_pixel(A, B, obs, tbase_diff, **kwargs)
+    out2 = run_group_by_group(A, B, obs, tbase_diff, **kwargs)
+    compare_results(out1, out2)
+    print('Pass.')
+
+
+def test_batch_cov_propagation(A, obs, weight_sqrt):
+    print('Test 3: batched vs. pixel-by-pixel time-series covariance propagation.')
+    obs_std = 1. / weight_sqrt
+    cov1 = np.zeros((A.shape[1], A.shape[1], obs.shape[1]), dtype=np.float32)
+    for i in range(obs.shape[1]):
+        cov1[:, :, i] = estimate_timeseries_cov(A, obs[:, i], obs_std[:, i])
+
+    cov2 = np.zeros(cov1.shape, dtype=np.float32)
+    for idx in group_pixels_by_valid_obs(obs):
+        cov2[:, :, idx] = estimate_timeseries_cov_batch(A, obs[:, idx], obs_std[:, idx])
+
+    assert np.allclose(cov1, cov2, rtol=1e-4, atol=1e-6), 'time-series covariance is NOT the same!'
+    print('Pass.')
+
+
+def test_sequential_normal_equation(A, B, obs, tbase_diff, weight_sqrt):
+    print('Test 4: sequential (old + new pairs) normal equations vs. pixel-by-pixel inversion.')
+    out1 = run_pixel_by_pixel(A, B, obs, tbase_diff, weight_sqrt=weight_sqrt)
+    num_pair, num_par = B.shape
+    flags = [np.arange(num_pair) < num_pair - 10, np.arange(num_pair) >= num_pair - 10]
+
+    # add the previous pairs and then the new pairs
+    # 1. in the design matrix of the velocity
+    # 2. in the design matrix of the phase, with B = A M
+    M = np.tril(np.ones((num_par, num_par))) * tbase_diff.T
+    for G in [B, A]:
+        norm_mat = np.zeros((obs.shape[1], num_par, num_par), dtype=np.float64)
+        rhs = np.zeros((obs.shape[1], num_par), dtype=np.float64)
+        for flag in flags:
+            update_normal_equation(norm_mat, rhs, G[flag], get_obs_weight(obs[flag], weight_sqrt[flag]), obs[flag])
+        ts = np.zeros(out1[0].shape, dtype=np.float32)
+        if G is B:
+            ts[1:] = np.cumsum(solve_normal_equation(norm_mat, rhs) * tbase_diff, axis=0)
+        else:
+            ts[1:] = solve_normal_equation(norm_mat, rhs, M=M)
+        assert np.allclose(out1[0], ts, rtol=1e-4, atol=1e-3), 'timeseries is NOT the same!'
+
+    # singular normal matrices: the min-norm velocity via M
+    flag = np.all(A[:, :5] == 0, axis=1)
+    norm_mat = np.zeros((obs.shape[1], num_par, num_par), dtype=np.float64)
+    rhs = np.zeros((obs.shape[1], num_par), dtype=np.float64)
+    update_normal_equation(norm_mat, rhs, A[flag], get_obs_weight(obs[flag], weight_sqrt[flag]), obs[flag])
+    out1 = run_pixel_by_pixel(A[flag], B[flag], obs[flag], tbase_diff, weight_sqrt=weight_sqrt[flag],
+                              min_redundancy=0)
+    assert np.allclose(out1[0][1:], solve_normal_equation(norm_mat, rhs, M=M), rtol=1e-4, atol=1e-3), \
+        'timeseries of the singular network is NOT the same!'
+    print('Pass.')
+
+
+def test_pinv_cache(B, obs):
+    print('Test 5: LRU cache of the pseudo-inverse keyed by the valid-observation bitmask.')
+    cache = PinvCache(max_size=2)
+    idx_list = group_pixels_by_valid_obs(obs)[:3]
+    for idx in idx_list + idx_list[-1:]:
+        flag = ~np.isnan(obs[:, idx[0]])
+        Gplus = cache.get(B, flag)[0]
+        assert np.allclose(Gplus, np.linalg.pinv(B[flag]), atol=1e-5), 'pseudo-inverse is NOT the same!'
+    assert (cache.num_hit, cache.num_miss, len(cache.cache)) == (1, 3, 2), 'cache hit/miss is NOT expected!'
+    print('Pass.')
+
+
+def test_inv_quality_stats(A, B, obs, tbase_diff, weight_sqrt, num_new_date=3):
+    print('Test 6: inversion quality updated from the residual statistics vs. the full inversion.')
+    # previous pairs: pairs between the leading dates
+    num_par = A.shape[1]
+    num_par0 = num_par - num_new_date
+    flag0 = np.all(A[:, num_par0:] == 0, axis=1)
+    obs_flag = ~np.isnan(obs)
+
+    for inv_quality_name, atol in [('temporalCoherence', 5e-3), ('residual', 1e-2)]:
+        out1 = run_pixel_by_pixel(A[flag0][:, :num_par0], B[flag0][:, :num_par0], obs[flag0], tbase_diff[:num_par0],
+                                  weight_sqrt=weight_sqrt[flag0], inv_quality_name=inv_quality_name)
+        out2 = run_pixel_by_pixel(A, B, obs, tbase_diff, weight_sqrt=weight_sqrt, inv_quality_name=inv_quality_name)
+
+        # previous pairs: statistics at the previous solution, updated to the new solution
+        X0 = np.zeros((num_par, obs.shape[1]), dtype=np.float32)
+        X0[:num_par0] = out1[0][1:]
+        X = out2[0][1:]
+        q_sum, q_grad = calc_inv_quality_stats(A[flag0], X0, obs[flag0], inv_quality_name)
+        if inv_quality_name == 'temporalCoherence':
+            assert np.allclose(np.abs(q_sum) / np.sum(obs_flag[flag0], axis=0), out1[1], atol=1e-5)
+        q_sum, q_grad = update_inv_quality_stats(q_sum, q_grad, A[flag0], obs_flag[flag0], X - X0, inv_quality_name)
+
+        # new pairs: statistics at the new solution
+        q_sum_new, q_grad_new = calc_inv_quality_stats(A[~flag0], X, obs[~flag0], inv_quality_name)
+        q_sum += q_sum_new
+        q_grad += q_grad_new
+
+        # compare with the full inversion
+        if inv_quality_name == 'temporalCoherence':
+            inv_quality = np.abs(q_sum) / np.sum(obs_flag, axis=0)
+        else:
+            inv_quality = np.sqrt(q_sum)
+        q_sum2, q_grad2 = calc_inv_quality_stats(A, X, obs, inv_quality_name)
+        print(f'{inv_quality_name}: max difference: {np.max(np.abs(inv_quality - out2[1])):.1e}')
+        assert np.allclose(inv_quality, out2[1], atol=atol), f'{inv_quality_name} is NOT the same!'
+        if inv_quality_name == 'residual':
+            # exact for residual
+            assert np.allclose(q_sum, q_sum2, rtol=1e-4) and np.allclose(q_grad, q_grad2, atol=1e-3)
+    print('Pass.')
+
+
+def sim_ifgram_stack(stack_file, num_row=20, num_col=25):
+    """Simulate an ifgram stack file, with the same network as sim_network_obs()."""
+    dt_list = [start_date + revisit_time * x for x in range(num_date)]
+    date_list = [x.strftime('%Y%m%d') for x in dt_list]
+    A, B, obs, weight_sqrt, tbase_diff = sim_network_obs(date_list, num_row * num_col)
+    date12_list = []
+    for i in range(num_date):
+        for j in range(i+1, min(i+1+num_conn, num_date)):
+            date12_list.append((date_list[i], date_list[j]))
+
+    # coherence from the weight of var, roughly
+    rng = np.random.default_rng(12138)
+    coh = rng.uniform(0.3, 0.95, size=obs.shape).astype(np.float32)
+    obs[np.isnan(obs)] = 0
+    obs -= obs[:, :1]
+
+    meta = dict(FILE_TYPE='ifgramStack', LENGTH=str(num_row), WIDTH=str(num_col), REF_Y='0', REF_X='0',
+                WAVELENGTH=str(wavelength), ALOOKS='1', RLOOKS='1', PLATFORM='Sen', UNIT='radian')
+    with h5py.File(stack_file, 'w') as f:
+        f.attrs.update(meta)
+        f['date'] = np.array(date12_list, np.bytes_)
+        f['bperp'] = np.zeros(len(date12_list), np.float32)
+        f['dropIfgram'] = np.ones(len(date12_list), np.bool_)
+        f['unwrapPhase'] = obs.reshape(-1, num_row, num_col)
+        f['coherence'] = coh.reshape(-1, num_row, num_col)
+    return A
+
+
+def test_incremental_inversion(test_dir, num_new_date=3):
+    print('Test 7: incremental inversion with the new pairs only vs. the full inversion.')
+    stack_file = os.path.join(test_dir, 'inputs/ifgramStack.h5')
+    os.makedirs(os.path.dirname(stack_file), exist_ok=True)
+    A = sim_ifgram_stack(stack_file)
+    flag_new = ~np.all(A[:, A.shape[1]-num_new_date:] == 0, axis=1)
+
+    # record the number of pairs read from the stack
+    num_pair_read = []
+    read_stack_obs = ifgram_inversion.read_stack_obs
+    def read_stack_obs_with_count(*args, **kwargs):
+        stack_obs = read_stack_obs(*args, **kwargs)
+        num_pair_read.append(stack_obs.shape[0])
+        return stack_obs
+    ifgram_inversion.read_stack_obs = read_stack_obs_with_count
+
+    try:
+        out_files = [os.path.join(test_dir, x) for x in ['timeseries.h5', 'temporalCoherence.h5', 'numInvIfgram.h5']]
+        opts = ['-o'] + out_files + ['--ram', '0.0002', '--incremental']
+
+        # 1. previous pairs
+        with h5py.File(stack_file, 'r+') as f:
+            f['dropIfgram'][:] = ~flag_new
+        cli.main([stack_file] + opts)
+
+        # 2. previous + new pairs
+        with h5py.File(stack_file, 'r+') as f:
+            f['dropIfgram'][:] = True
+        num_pair_read.clear()
+        cli.main([stack_file] + opts)
+        print(f'number of pairs read in the incremental run: {num_pair_read}')
+        assert all(x == np.sum(flag_new) for x in num_pair_read), 'NOT only the new pairs are read!'
+        assert len(num_pair_read) > 1, 'NOT processed in multiple patches!'
+
+        # 3. full inversion
+        out_files2 = [os.path.join(test_dir, f'full_{os.path.basename(x)}') for x in out_files]
+        cli.main([stack_file, '-o'] + out_files2)
+
+    finally:
+        ifgram_inversion.read_stack_obs = read_stack_obs
+
+    for fname1, fname2, atol in zip(out_files, out_files2, [1e-5, 5e-3, 0]):
+        data1 = readfile.read(fname1)[0]
+        data2 = readfile.read(fname2)[0]
+        print(f'{os.path.basename(fname1)}: max difference: {np.max(np.abs(data1 - data2)):.1e}')
+        assert np.allclose(data1, data2, rtol=1e-4, atol=atol), f'{os.path.basename(fname1)} is NOT the same!'
+    print('Pass.')
+
+
+################################################################################
+def main(iargs=None):
+
+    print('-'*50)
+    print(f'Testing {__file__}')
+    cmd_line_parse(iargs)
+
+    # prepare common data
+    dt_list = [start_date + revisit_time * x for x in range(num_date)]
+    date_list = [x.strftime('%Y%m%d') for x in dt_list]
+    A, B, obs, weight_sqrt, tbase_diff = sim_network_obs(date_list, num_pixel)
+
+    test_group_pixels_by_valid_obs(obs)
+    for min_norm_velocity in [True, False]:
+        test_batch_inversion(A, B, obs, tbase_diff, weight_sqrt=None, min_norm_velocity=min_norm_velocity)
+        test_batch_inversion(A, B, obs, tbase_diff, weight_sqrt=weight_sqrt, min_norm_velocity=min_norm_velocity)
+    test_batch_cov_propagation(A, obs, weight_sqrt)
+    test_sequential_normal_equation(A, B, obs, tbase_diff, weight_sqrt)
+    test_pinv_cache(B, obs)
+    test_inv_quality_stats(A, B, obs, tbase_diff, weight_sqrt)
+
+    with tempfile.TemporaryDirectory() as test_dir:
+        test_incremental_inversion(test_dir)
+
+
+################################################################################
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# Author: MintPy Developers, Oct 2026
+"""Test mintpy.objects.cluster module for the box tiling and the box-wise processing pools."""
+
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from mintpy.objects import cluster
+
+# test data size
+length, width = 300, 200
+
+
+def calc_patch(box, data, scale=2.):
+    """Function to run on one box, with all the results in the box size."""
+    block = data[box[1]:box[3], box[0]:box[2]]
+    return block * scale, (~np.isnan(block)).astype(np.int16), box
+
+
+def alloc_patch(box, num_byte=1000):
+    """Function to run on one box: allocate num_byte per pixel."""
+    num_pixel = (box[2] - box[0]) * (box[3] - box[1])
+    return np.ones(num_pixel * num_byte, dtype=np.uint8)
+
+
+def check_tiles(tiles, box, max_num_pixel, chunk_shape=None):
+    """Check the tiles cover the box exactly, within the size limit and aligned to the chunks."""
+    x0, y0, x1, y1 = box
+    count = np.zeros((y1 - y0, x1 - x0), dtype=np.int16)
+    for c0, r0, c1, r1 in tiles:
+        count[r0-y0:r1-y0, c0-x0:c1-x0] += 1
+        assert (c1 - c0) * (r1 - r0) <= max_num_pixel
+        if chunk_shape:
+            assert all(r % chunk_shape[0] == 0 for r in [r0, r1] if r not in [y0, y1])
+            assert all(c % chunk_shape[1] == 0 for c in [c0, c1] if c not in [x0, x1])
+    assert np.all(count == 1)
+
+
+################################################################################
+def test_split_box2tiles():
+    print('Test 1: split box into tiles aligned to the chunks.')
+
+    box = (3, 5, width, length)
+    for max_num_pixel, chunk_shape in [
+            (10000, None),          # full-width strips
+            (10000, (16, 16)),      # full-width strips in multiple of chunk rows
+            (1000, (16, 16)),       # 2D tiles in multiple of chunks
+            (100, None),            # 2D tiles for tiny memory limits
+        ]:
+        tiles, num_tile = cluster.split_box2tiles(box, max_num_pixel, chunk_shape=chunk_shape)
+        print(f'max_num_pixel={max_num_pixel}, chunk_shape={chunk_shape}: {num_tile} tiles')
+        assert num_tile == len(tiles)
+        check_tiles(tiles, box, max_num_pixel, chunk_shape)
+
+    # fall back to the unaligned tiles, if a single chunk exceeds the limit
+    max_num_pixel = 2000
+    tiles = cluster.split_box2tiles(box, max_num_pixel, chunk_shape=(125, 188))[0]
+    print(f'max_num_pixel={max_num_pixel}, chunk_shape=(125, 188): {len(tiles)} unaligned tiles')
+    check_tiles(tiles, box, max_num_pixel)
+
+    # one tile if it fits
+    assert cluster.split_box2tiles(box, length * width, chunk_shape=(16, 16)) == ([list(box)], 1)
+    print('Pass.')
+
+
+def test_prefetch_in_order():
+    print('Test 2: prefetch in order with thread pool.')
+
+    def func(x):
+        time.sleep(0.01 * (x % 3))
+        return x * 2
+
+    kwargs_list = [dict(x=i) for i in range(20)]
+    for num_worker in [1, 3]:
+        results = list(cluster.prefetch_in_order(func, kwargs_list, num_worker=num_worker))
+        assert results == [i * 2 for i in range(20)]
+
+    # stop early: the pending calls are cancelled
+    gen = cluster.prefetch_in_order(func, kwargs_list, num_worker=2)
+    assert [next(gen), next(gen)] == [0, 2]
+    gen.close()
+    print('Pass.')
+
+
+def test_box_pipeline():
+    print('Test 3: box pipeline with the background reading and writing.')
+    data = np.random.default_rng(12138).random((length, width), dtype=np.float32)
+    box_list = cluster.split_box2tiles((0, 0, width, length), 5000)[0]
+
+    def read_func(box, data):
+        return data[box[1]:box[3], box[0]:box[2]]
+
+    out = np.zeros_like(data)
+    def write_func(box, block):
+        out[box[1]:box[3], box[0]:box[2]] = block
+
+    with cluster.BoxPipeline(box_list, read_func, {'data': data}, write_func) as pipe:
+        for i, box, block in pipe:
+            assert box == box_list[i]
+            pipe.write(box, block * 2)
+    assert np.array_equal(out, data * 2)
+
+    # the error of the writing is raised in the main thread
+    def write_error(box, block):
+        raise OSError('disk full')
+
+    try:
+        with cluster.BoxPipeline(box_list, read_func, {'data': data}, write_error) as pipe:
+            for i, box, block in pipe:
+                pipe.write(box, block)
+        raise AssertionError('the writing error is NOT raised')
+    except OSError as e:
+        assert str(e) == 'disk full'
+
+    # stop early
+    with cluster.BoxPipeline(box_list, read_func, {'data': data}) as pipe:
+        for i, box, block in pipe:
+            if i == 1:
+                break
+    print('Pass.')
+
+
+def test_process_cluster(num_worker='2'):
+    print('Test 4: process pool with the results in shared memory.')
+    data = np.random.default_rng(12138).random((length, width), dtype=np.float32)
+    data[10:20, 30:40] = np.nan
+    box = (20, 10, 180, 290)
+    box_len, box_wid = box[3] - box[1], box[2] - box[0]
+
+    # serial
+    scaled, valid = calc_patch(box, data)[:2]
+
+    # parallel
+    results = [np.zeros((box_len, box_wid), np.float32), np.zeros((box_len, box_wid), np.int16)]
+    cluster_obj = cluster.ProcessCluster(num_worker)
+    cluster_obj.open()
+    try:
+        results = cluster_obj.run(calc_patch, {'box': box, 'data': data}, results)
+    finally:
+        cluster_obj.close()
+
+    assert np.array_equal(results[0], scaled, equal_nan=True)
+    assert np.array_equal(results[1], valid)
+    print('Pass.')
+
+
+def test_memory_planner():
+    print('Test 5: memory planner with the memory measured on probe boxes.')
+    num_byte = 1000
+
+    # peak memory
+    peak = cluster.MemoryPlanner.measure_peak_memory(alloc_patch, {'box': (0, 0, 10, 10), 'num_byte': num_byte})
+    print(f'peak memory of 100 pixels x {num_byte} bytes: {peak} bytes')
+    assert 100 * num_byte <= peak < 100 * num_byte * 1.1
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        planner = cluster.MemoryPlanner('test', key=f'{num_byte}')
+        planner.coeff_file = os.path.join(tmp_dir, 'memory_coeff.json')
+        box = (0, 0, width, length)
+        max_memory = 100 * num_byte * 1000 / planner.target_ratio / 1024**3
+
+        # calibrate and save the coefficients
+        max_num_pixel = planner.get_max_num_pixel(max_memory, box, alloc_patch, {'num_byte': num_byte})
+        coeff = planner.read_coeff()
+        print(f'calibrated coefficients: {coeff}')
+        assert abs(coeff[0] - num_byte) < num_byte * 0.01
+        assert abs(max_num_pixel - 100000) < 100000 * 0.01
+
+        # split into boxes
+        tiles, num_tile = planner.split_box(box, max_memory, alloc_patch, {'num_byte': num_byte},
+                                            chunk_shape=(16, 16))
+        check_tiles(tiles, box, max_num_pixel, chunk_shape=(16, 16))
+    print('Pass.')
+
+
+if __name__ == '__main__':
+
+    print('-'*50)
+    print(f'Testing {__file__}')
+
+    test_split_box2tiles()
+
+    test_prefetch_in_order()
+
+    test_box_pipeline()
+
+    test_process_cluster()
+
+    test_memory_planner()
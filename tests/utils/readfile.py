@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# Author: MintPy Developers, Oct 2026
+"""Test mintpy.utils.readfile module for the multilook-on-read, the correction stack and the pixel-major index files."""
+
+
+import os
+import tempfile
+import time
+import warnings
+
+import h5py
+import numpy as np
+
+from mintpy.diff import diff_file
+from mintpy.objects import timeseries
+from mintpy.stdproc.multilook import multilook_data
+from mintpy.utils import readfile, writefile
+
+# test data size
+num_date, length, width = 5, 41, 37
+date_list = [f'202001{i+1:02d}' for i in range(num_date)]
+metadata = {'LENGTH': str(length), 'WIDTH': str(width), 'UNIT': 'm'}
+
+
+def prep_test_data(test_dir):
+    """Write the time-series in HDF5 and its 1st date in binary into test_dir."""
+    rng = np.random.default_rng(12138)
+    ts = rng.normal(size=(num_date, length, width)).astype(np.float32)
+    ts[:, 3:6, 7:9] = np.nan
+
+    ts_file = os.path.join(test_dir, 'timeseries.h5')
+    ds_dict = {
+        'date'       : np.array(date_list, np.bytes_),
+        'bperp'      : np.zeros(num_date, np.float32),
+        'timeseries' : ts,
+    }
+    writefile.write(ds_dict, ts_file, metadata=dict(metadata, FILE_TYPE='timeseries'), print_msg=False)
+
+    bin_file = os.path.join(test_dir, 'disp.bin')
+    ts[0].tofile(bin_file)
+    return ts_file, bin_file, ts
+
+
+def multilook_box(data, box, xstep, ystep, method):
+    """Reference: multilook the full resolution data within the box."""
+    data = data[..., box[1]:box[3], box[0]:box[2]]
+    xsize, ysize = (box[2] - box[0]) // xstep, (box[3] - box[1]) // ystep
+    if method == 'nearest':
+        data = data[..., int(ystep/2)::ystep, int(xstep/2)::xstep]
+    else:
+        data = multilook_data(data, lks_y=ystep, lks_x=xstep, method=method)
+    return data[..., :ysize, :xsize]
+
+
+################################################################################
+def test_read_multilook(ts_file, bin_file, ts):
+    print('Test 1: multilook-on-read vs. multilook after reading.')
+
+    for method in ['nearest', 'mean', 'median']:
+        for box, xstep, ystep in [
+                ((0, 0, width, length), 3, 3),      # full size, not a multiple of the steps
+                ((2, 5, 30, 40), 4, 2),             # sub box
+                ((0, 0, width, length), 1, 5),      # multilook in y only
+            ]:
+            kwargs = dict(box=box, xstep=xstep, ystep=ystep, method=method, print_msg=False)
+            ts_ref = multilook_box(ts, box, xstep, ystep, method)
+
+            # HDF5: 3D dataset, 2D slice, multiple slices
+            data = readfile.read(ts_file, **kwargs)[0]
+            assert np.array_equal(data, ts_ref, equal_nan=True)
+            data = readfile.read(ts_file, datasetName=f'timeseries-{date_list[2]}', **kwargs)[0]
+            assert np.array_equal(data, ts_ref[2], equal_nan=True)
+            data = readfile.read(ts_file, datasetName=[date_list[1], date_list[3]], **kwargs)[0]
+            assert np.array_equal(data, ts_ref[[1, 3]], equal_nan=True)
+
+            # binary
+            data = readfile.read_binary(bin_file, (length, width), box=box,
+                                        xstep=xstep, ystep=ystep, method=method)
+            assert np.array_equal(data, ts_ref[0], equal_nan=True)
+        print(f'method = {method}: same.')
+    print('Pass.')
+
+
+def test_read_multilook_by_row(ts):
+    print('Test 2: multilook block by block in rows.')
+
+    box = (1, 2, 35, 40)
+    def read_func(r0, r1):
+        return ts[:, r0:r1, box[0]:box[2]]
+
+    row_size = (box[2] - box[0]) * num_date * 4
+    for chunk_row in [None, 4, 7]:
+        # tiny blocks of a few rows, to read in multiple blocks
+        data = readfile._read_multilook_by_row(read_func, box, 3, 2, method='mean', row_size=row_size,
+                                               chunk_row=chunk_row, max_block_size=row_size * 5 / 1024**2)
+        assert np.array_equal(data, multilook_box(ts, box, 3, 2, 'mean'), equal_nan=True)
+    print('Pass.')
+
+
+def test_read_multilook_empty(ts_file, bin_file):
+    print('Test 3: multilook-on-read with the box smaller than the step.')
+
+    box = (0, 0, 2, 2)
+    for method in ['nearest', 'mean', 'median']:
+        kwargs = dict(box=box, xstep=3, ystep=3, method=method, print_msg=False)
+        assert readfile.read(ts_file, **kwargs)[0].shape == (num_date, 0, 0)
+        assert readfile.read(ts_file, datasetName=f'timeseries-{date_list[0]}', **kwargs)[0].shape == (0, 0)
+        data = readfile.read_binary(bin_file, (length, width), box=box, xstep=3, ystep=3, method=method)
+        assert data.shape == (0, 0)
+    print('Pass.')
+
+
+def test_read_correction_stack(test_dir, ts_file):
+    print('Test 4: correction stack file vs. the regular time-series file.')
+
+    # corrections: the 2nd one with a different reference date / point and a missing date
+    rng = np.random.default_rng(12138)
+    cor_files = [os.path.join(test_dir, f'cor{i}.h5') for i in range(2)]
+    for i, cor_file in enumerate(cor_files):
+        cor_dates = date_list if i == 0 else date_list[:-1]
+        atr = dict(metadata, FILE_TYPE='timeseries')
+        if i == 1:
+            atr.update({'REF_Y': '5', 'REF_X': '7', 'REF_DATE': date_list[2]})
+        ds_dict = {
+            'date'       : np.array(cor_dates, np.bytes_),
+            'bperp'      : np.zeros(len(cor_dates), np.float32),
+            'timeseries' : rng.normal(size=(len(cor_dates), length, width)).astype(np.float32),
+        }
+        writefile.write(ds_dict, cor_file, metadata=atr, print_msg=False)
+
+    # regular and correction stack files, with two corrections in a row
+    base_file = ts_file
+    for i, cor_file in enumerate(cor_files):
+        full_file = os.path.join(test_dir, f'ts_cor{i}.h5')
+        lazy_file = os.path.join(test_dir, f'ts_cor{i}_lazy.h5')
+        diff_file(base_file, [cor_file], full_file, force_diff=True)
+        diff_file(base_file if i == 0 else os.path.join(test_dir, f'ts_cor{i-1}_lazy.h5'),
+                  [cor_file], lazy_file, force_diff=True, lazy=True)
+        assert timeseries(lazy_file).get_correction_stack()
+        base_file = full_file
+
+        # read: all, sub box and dates, multilook
+        for kwargs in [
+                dict(),
+                dict(datasetName=[date_list[1], date_list[3]], box=(3, 4, 30, 35)),
+                dict(datasetName=f'timeseries-{date_list[2]}'),
+                dict(xstep=3, ystep=2, method='nearest'),
+                dict(xstep=3, ystep=2, method='mean'),
+                dict(xstep=3, ystep=2, method='median'),
+            ]:
+            data1 = readfile.read(full_file, print_msg=False, **kwargs)[0]
+            data2 = readfile.read(lazy_file, print_msg=False, **kwargs)[0]
+            assert np.allclose(data1, data2, atol=1e-6, equal_nan=True)
+
+        # read as the correction of another time-series
+        for box in [(0, 0, width, length), (3, 4, 30, 35)]:
+            data1, flag1 = timeseries(full_file).read_as_correction(date_list, box, metadata)
+            data2, flag2 = timeseries(lazy_file).read_as_correction(date_list, box, metadata)
+            assert np.array_equal(flag1, flag2)
+            assert np.allclose(data1, data2, atol=1e-6, equal_nan=True)
+
+    # materialize
+    out_file = writefile.materialize_correction_stack(lazy_file, out_file=os.path.join(test_dir, 'ts_mat.h5'),
+                                                      print_msg=False)
+    assert not timeseries(out_file).get_correction_stack()
+    assert np.allclose(readfile.read(full_file)[0], readfile.read(out_file)[0], atol=1e-6, equal_nan=True)
+
+    # materialize failure, e.g. with a missing correction file: no temporary file left
+    os.rename(cor_files[-1], f'{cor_files[-1]}.bak')
+    try:
+        writefile.materialize_correction_stack(lazy_file, out_file=os.path.join(test_dir, 'ts_mat2.h5'),
+                                               print_msg=False)
+    except OSError as e:
+        print(f'expected failure: {e}')
+    else:
+        raise AssertionError('materialize_correction_stack() should fail with a missing correction file!')
+    finally:
+        os.rename(f'{cor_files[-1]}.bak', cor_files[-1])
+    assert not os.path.isfile(os.path.join(test_dir, 'tmp_ts_mat2.h5'))
+    assert not os.path.isfile(os.path.join(test_dir, 'ts_mat2.h5'))
+    print('Pass.')
+
+
+def test_read_pixel_index(test_dir):
+    print('Test 5: pixel-major index file vs. reading the HDF5 file directly.')
+
+    # a separate copy, as the file is modified below
+    ts_file = os.path.join(test_dir, 'ts_pixel.h5')
+    rng = np.random.default_rng(12138)
+    ts = rng.normal(size=(num_date, length, width)).astype(np.float32)
+    ds_dict = {
+        'date'       : np.array(date_list, np.bytes_),
+        'bperp'      : np.zeros(num_date, np.float32),
+        'timeseries' : ts,
+    }
+    writefile.write(ds_dict, ts_file, metadata=dict(metadata, FILE_TYPE='timeseries'), print_msg=False)
+    index_file = readfile.get_pixel_index_file(ts_file, 'timeseries')
+
+    def read_direct(y, x):
+        with h5py.File(ts_file, 'r') as f:
+            return f['timeseries'][:, y, x]
+
+    def check_read():
+        # point time-series, sub box with dates, single date
+        for y, x in [(0, 0), (20, 17), (length-1, width-1)]:
+            data = readfile.read(ts_file, box=(x, y, x+1, y+1), pixel_index=True, print_msg=False)[0]
+            assert np.array_equal(data.flatten(), read_direct(y, x))
+        for kwargs in [
+                dict(box=(3, 4, 30, 35), datasetName=[date_list[1], date_list[3]]),
+                dict(datasetName=f'timeseries-{date_list[2]}'),
+            ]:
+            data1 = readfile.read(ts_file, print_msg=False, **kwargs)[0]
+            data2 = readfile.read(ts_file, pixel_index=True, print_msg=False, **kwargs)[0]
+            assert np.array_equal(data1, data2)
+
+    # 1. build the index file on the first read, and re-use it afterwards
+    assert not os.path.isfile(index_file)
+    check_read()
+    assert os.path.isfile(index_file)
+    mtime = os.path.getmtime(index_file)
+    check_read()
+    assert os.path.getmtime(index_file) == mtime
+
+    # 2. re-build after the MODIFICATION_TIME attribute changes
+    with h5py.File(ts_file, 'r+') as f:
+        f['timeseries'][:, 20, 17] += 1
+        f['timeseries'].attrs['MODIFICATION_TIME'] = str(time.time())
+    check_read()
+
+    # 3. re-build after the file modification time changes, without MODIFICATION_TIME
+    with h5py.File(ts_file, 'r+') as f:
+        del f['timeseries'].attrs['MODIFICATION_TIME']
+    readfile.update_pixel_index(ts_file, 'timeseries', print_msg=False)
+    with h5py.File(ts_file, 'r+') as f:
+        f['timeseries'][:, 0, 0] -= 1
+    os.utime(ts_file, (time.time() + 10, time.time() + 10))
+    check_read()
+
+    # 4. fallback to the direct read, if the index file can not be written, e.g. read-only directory
+    os.remove(index_file)
+    get_index_file = readfile.get_pixel_index_file
+    readfile.get_pixel_index_file = lambda *args: os.path.join(test_dir, 'read_only', 'index.h5')
+    try:
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            check_read()
+        assert any('can not build pixel-major index' in str(i.message) for i in w)
+    finally:
+        readfile.get_pixel_index_file = get_index_file
+    assert not os.path.isfile(index_file)
+    print('Pass.')
+
+
+if __name__ == '__main__':
+
+    print('-'*50)
+    print(f'Testing {__file__}')
+
+    with tempfile.TemporaryDirectory() as test_dir:
+        ts_file, bin_file, ts = prep_test_data(test_dir)
+
+        test_read_multilook(ts_file, bin_file, ts)
+
+        test_read_multilook_by_row(ts)
+
+        test_read_multilook_empty(ts_file, bin_file)
+
+        test_read_correction_stack(test_dir, ts_file)
+
+        test_read_pixel_index(test_dir)
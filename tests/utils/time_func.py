@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# Author: MintPy Developers, Oct 2026
+"""Test mintpy.utils.time_func module for the bootstrap estimation of the time functions."""
+
+
+import datetime
+
+import numpy as np
+
+from mintpy.utils import time_func
+
+# test data size / time function
+num_date, num_pixel = 40, 300
+model = {'polynomial' : 1, 'periodic' : [1.0]}
+bootstrap_count = 50
+seed = 12138
+
+
+def prep_test_data():
+    """Simulate displacement time-series with linear and annual motion and noise."""
+    dt_list = [datetime.datetime(2020, 1, 1) + datetime.timedelta(days=12*i) for i in range(num_date)]
+    date_list = [x.strftime('%Y%m%d') for x in dt_list]
+    G = time_func.get_design_matrix4time_func(date_list, model)
+
+    rng = np.random.default_rng(seed)
+    dis_ts = np.dot(G, rng.normal(scale=0.01, size=(G.shape[1], num_pixel)))
+    dis_ts += rng.normal(scale=0.005, size=dis_ts.shape)
+    return G, dis_ts
+
+
+def run_bootstrap_loop(G, dis_ts):
+    """Reference: solve each bootstrap iteration via linalg.lstsq() on the resampled dates in a loop."""
+    m_boot = np.zeros((bootstrap_count, G.shape[1], dis_ts.shape[1]))
+    for i, seed_i in enumerate(np.random.SeedSequence(seed).spawn(bootstrap_count)):
+        boot_ind = np.random.default_rng(seed_i).choice(num_date, size=num_date, replace=True)
+        m_boot[i] = np.linalg.lstsq(G[boot_ind], dis_ts[boot_ind], rcond=None)[0]
+    return m_boot.mean(axis=0), m_boot.std(axis=0)
+
+
+################################################################################
+def test_bootstrap_vs_loop(G, dis_ts):
+    print('Test 1: bootstrap in batch vs. linalg.lstsq() in loop.')
+    m_ref, m_std_ref = run_bootstrap_loop(G, dis_ts)
+    m, m_std = time_func.estimate_time_func_bootstrap(G, dis_ts, bootstrap_count, seed=seed, print_msg=False)[:2]
+    assert np.allclose(m, m_ref, rtol=1e-8, atol=1e-12), 'mean is NOT the same!'
+    assert np.allclose(m_std, m_std_ref, rtol=1e-8, atol=1e-12), 'STD is NOT the same!'
+    print('Pass.')
+
+
+def test_bootstrap_reproducible(G, dis_ts):
+    print('Test 2: bootstrap with the same seed for different number of workers and batches.')
+    kwargs = dict(bootstrap_count=bootstrap_count, seed=seed, full_cov=True, print_msg=False)
+    out1 = time_func.estimate_time_func_bootstrap(G, dis_ts, num_worker=1, **kwargs)
+
+    # tiny max_memory for several batches: 3 iterations per batch
+    iter_size = G.shape[1] * num_pixel * (dis_ts.dtype.itemsize + 8)
+    max_memory = iter_size * 3.5 / 1024**3
+    for num_worker, max_mem in [(2, 1), (1, max_memory), (2, max_memory * 2)]:
+        out2 = time_func.estimate_time_func_bootstrap(G, dis_ts, num_worker=num_worker, max_memory=max_mem,
+                                                      **kwargs)
+        print(f'num_worker = {num_worker}, max_memory = {max_mem:.1e} GB: same.')
+        for name, x1, x2 in zip(['mean', 'STD', 'covariance'], out1, out2):
+            assert np.allclose(x1, x2, rtol=1e-8, atol=1e-14), f'{name} is NOT the same!'
+
+    # different seed
+    m = time_func.estimate_time_func_bootstrap(G, dis_ts, bootstrap_count, seed=seed+1, print_msg=False)[0]
+    assert not np.allclose(m, out1[0], rtol=1e-8, atol=1e-14)
+    print('Pass.')
+
+
+if __name__ == '__main__':
+
+    print('-'*50)
+    print(f'Testing {__file__}')
+
+    G, dis_ts = prep_test_data()
+
+    test_bootstrap_vs_loop(G, dis_ts)
+
+    test_bootstrap_reproducible(G, dis_ts)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# Author: MintPy Developers, Oct 2026
+"""Test mintpy.utils.utils1 module for the residual RMS of the time-series."""
+
+
+import os
+import tempfile
+
+import numpy as np
+
+from mintpy.objects import timeseries
+from mintpy.utils import utils1 as ut, writefile
+
+# test data size
+num_date, length, width = 8, 60, 50
+date_list = [f'202001{i+1:02d}' for i in range(num_date)]
+metadata = {'LENGTH': str(length), 'WIDTH': str(width), 'UNIT': 'm', 'REF_Y': '10', 'REF_X': '10',
+            'REF_DATE': date_list[0]}
+
+
+def prep_test_data(test_dir):
+    """Write the time-series with ramps, NaN and zero pixels, and the mask into test_dir."""
+    rng = np.random.default_rng(12138)
+    yy, xx = np.mgrid[:length, :width].astype(np.float32)
+    ts = (rng.normal(size=(num_date, 1, 1)) * 1e-4 * yy + rng.normal(size=(num_date, 1, 1)) * 2e-4 * xx
+          + rng.normal(size=(num_date, 1, 1)) * 1e-6 * xx * yy)
+    ts += rng.normal(scale=3e-3, size=ts.shape)
+    ts = ts.astype(np.float32)
+    ts[:, 5:9, 20:30] = 0.
+    ts[:, 40:43, 3:6] = np.nan
+    ts[2, 30:35, :] = np.nan
+
+    ts_file = os.path.join(test_dir, 'timeseriesResidual.h5')
+    ds_dict = {
+        'date'       : np.array(date_list, np.bytes_),
+        'bperp'      : np.zeros(num_date, np.float32),
+        'timeseries' : ts,
+    }
+    writefile.write(ds_dict, ts_file, metadata=dict(metadata, FILE_TYPE='timeseries'), print_msg=False)
+
+    mask = rng.uniform(size=(length, width)) > 0.2
+    mask_file = os.path.join(test_dir, 'maskTempCoh.h5')
+    writefile.write(mask, mask_file, metadata=dict(metadata, FILE_TYPE='mask'), print_msg=False)
+    return ts_file, mask_file
+
+
+def read_rms(rms_file):
+    return np.loadtxt(rms_file, dtype=bytes).astype(str)[:, 1].astype(np.float64)
+
+
+################################################################################
+def test_calc_timeseries_rms(test_dir, ts_file, mask_file):
+    print('Test 1: RMS with the ramp removed on the fly vs. run_deramp() + timeseries_rms().')
+
+    for ramp_type in ['linear', 'quadratic', 'no']:
+        for mfile in [mask_file, 'no']:
+            # old: write the deramped time-series and calculate its RMS
+            if ramp_type == 'no':
+                deramped_file = ts_file
+            else:
+                deramped_file = ut.run_deramp(ts_file, ramp_type, mask_file=mfile,
+                                              out_file=os.path.join(test_dir, 'ts_ramp.h5'))
+            rms_file1 = timeseries(deramped_file).timeseries_rms(maskFile=mfile,
+                                                                 outFile=os.path.join(test_dir, 'rms1.txt'))
+
+            # new: in multiple boxes
+            for max_memory in [1, 5e-5]:
+                rms_file2 = ut.calc_timeseries_rms(ts_file, mask_file=mfile, ramp_type=ramp_type,
+                                                   out_file=os.path.join(test_dir, 'rms2.txt'),
+                                                   max_memory=max_memory)
+                rms1, rms2 = read_rms(rms_file1), read_rms(rms_file2)
+                print(f'ramp = {ramp_type}, mask = {mfile != "no"}, max_memory = {max_memory}: '
+                      f'max difference: {np.max(np.abs(rms1 - rms2)):.1e} m')
+                assert np.allclose(rms1, rms2, rtol=1e-5, atol=1e-9), 'RMS is NOT the same!'
+    print('Pass.')
+
+
+def test_get_residual_rms(test_dir, ts_file, mask_file):
+    print('Test 2: residual RMS without writing the deramped time-series file.')
+    rms_list, dates, rms_file = ut.get_residual_rms(ts_file, mask_file, ramp_type='quadratic')
+    assert os.path.basename(rms_file) == 'rms_timeseriesResidual_ramp.txt'
+    assert not os.path.isfile(os.path.join(test_dir, 'timeseriesResidual_ramp.h5'))
+    assert dates == date_list and len(rms_list) == num_date
+    print('Pass.')
+
+
+if __name__ == '__main__':
+
+    print('-'*50)
+    print(f'Testing {__file__}')
+
+    with tempfile.TemporaryDirectory() as test_dir:
+        ts_file, mask_file = prep_test_data(test_dir)
+
+        test_calc_timeseries_rms(test_dir, ts_file, mask_file)
+
+        test_get_residual_rms(test_dir, ts_file, mask_file)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# Author: MintPy Developers, Oct 2026
+"""Test mintpy.utils.writefile module for the HDF5 compression and re-chunking."""
+
+
+import os
+import tempfile
+
+import h5py
+import numpy as np
+
+from mintpy.utils import readfile, writefile
+
+try:
+    import hdf5plugin  # noqa: F401
+    HAS_HDF5PLUGIN = True
+except ImportError:
+    HAS_HDF5PLUGIN = False
+
+# test data size
+num_date, length, width = 6, 70, 90
+date_list = [f'202001{i+1:02d}' for i in range(num_date)]
+metadata = {'LENGTH': str(length), 'WIDTH': str(width), 'UNIT': 'm', 'FILE_TYPE': 'timeseries'}
+
+
+def prep_test_data():
+    rng = np.random.default_rng(12138)
+    ts = rng.normal(size=(num_date, length, width)).astype(np.float32)
+    ts[:, 3:6, 7:9] = np.nan
+    ds_dict = {
+        'date'       : np.array(date_list, np.bytes_),
+        'bperp'      : rng.normal(size=num_date).astype(np.float32),
+        'timeseries' : ts,
+    }
+    return ds_dict
+
+
+def check_file(fname, ds_dict, compression):
+    """Check the data and the compression of all datasets in the file."""
+    assert readfile.get_hdf5_compression(fname) == compression
+    with h5py.File(fname, 'r') as f:
+        for key, value in ds_dict.items():
+            assert np.array_equal(f[key][()], value, equal_nan=(value.dtype.kind == 'f'))
+            if f[key].chunks:
+                assert readfile.get_hdf5_dataset_compression(f[key]) == compression
+    data = readfile.read(fname, datasetName=date_list[2:4], box=(5, 6, 40, 50), print_msg=False)[0]
+    assert np.array_equal(data, ds_dict['timeseries'][2:4, 6:50, 5:40], equal_nan=True)
+
+
+################################################################################
+def test_compression_round_trip(test_dir, ds_dict):
+    print('Test 1: write, re-chunk and read with compression.')
+
+    for compression in writefile.COMPRESSIONS:
+        if compression in ['zstd', 'blosc2'] and not HAS_HDF5PLUGIN:
+            print(f'compression = {compression}: skip as hdf5plugin is NOT installed.')
+            continue
+
+        # write
+        fname = os.path.join(test_dir, f'ts_{compression}.h5')
+        writefile.write(ds_dict, fname, metadata=metadata, compression=compression, print_msg=False)
+        check_file(fname, ds_dict, compression)
+
+        # re-chunk to a new file: the plugin filter options are re-generated from the filter ID
+        for chunk_shape in ['image-major', 'time-major']:
+            out_file = os.path.join(test_dir, f'ts_{compression}_{chunk_shape}.h5')
+            writefile.rechunk_hdf5(fname, chunk_shape, out_file=out_file, print_msg=False)
+            check_file(out_file, ds_dict, compression)
+            with h5py.File(out_file, 'r') as f:
+                assert f['timeseries'].chunks == writefile.get_hdf5_chunks(f['timeseries'].shape, chunk_shape)
+            assert readfile.read_attribute(out_file)['FILE_TYPE'] == 'timeseries'
+
+        # re-chunk in place, with a small memory to copy in multiple blocks
+        writefile.rechunk_hdf5(fname, 'image-major', max_memory=1e-4, print_msg=False)
+        check_file(fname, ds_dict, compression)
+        assert not os.path.isfile(os.path.join(test_dir, f'tmp_{os.path.basename(fname)}'))
+        print(f'compression = {compression}: same.')
+    print('Pass.')
+
+
+def test_rechunk_failure(test_dir, ds_dict):
+    print('Test 2: re-chunk failure leaves the input file intact and no temporary file.')
+
+    fname = os.path.join(test_dir, 'ts_fail.h5')
+    writefile.write(ds_dict, fname, metadata=metadata, print_msg=False)
+    for out_file in [None, os.path.join(test_dir, 'ts_fail_out.h5')]:
+        try:
+            # un-recognized chunk layout, raised while copying the 3D dataset
+            writefile.rechunk_hdf5(fname, 'row-major', out_file=out_file, print_msg=False)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('rechunk_hdf5() should raise ValueError for un-recognized chunk layout!')
+        out_file = out_file if out_file else fname
+        assert not os.path.isfile(os.path.join(test_dir, f'tmp_{os.path.basename(out_file)}'))
+    assert not os.path.isfile(os.path.join(test_dir, 'ts_fail_out.h5'))
+    check_file(fname, ds_dict, None)
+    print('Pass.')
+
+
+if __name__ == '__main__':
+
+    print('-'*50)
+    print(f'Testing {__file__}')
+
+    with tempfile.TemporaryDirectory() as test_dir:
+        ds_dict = prep_test_data()
+
+        test_compression_round_trip(test_dir, ds_dict)
+
+        test_rechunk_failure(test_dir, ds_dict)